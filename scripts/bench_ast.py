@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Syntax tree memory benchmark.
+
+Parses a set of typical command lines and reports how many bytes each
+tree keeps alive (tokens included), measured with tracemalloc, and how
+long parsing takes.
+
+Usage:
+    python scripts/bench_ast.py
+    python scripts/bench_ast.py --lines 20000
+    python scripts/bench_ast.py --script build.sh   # lines of a real script
+
+The trees are kept in a list while measuring, as the parse cache keeps
+them, so the figure is the per-line cost of a cached script line.
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from akujobip1.syntax import parse_tokens
+from akujobip1.tokenizer import tokenize
+
+SAMPLE_LINES = [
+    "ls -la",
+    "make -j4 && ./run_tests > test.log 2> errors.log || echo failed",
+    "grep -rn TODO src | sort | uniq -c | sort -rn | head -20",
+    'echo "Building $PROJECT in $HOME/build"; cd build',
+    "cat < input.txt | tr a-z A-Z >> output.txt",
+    "sleep 30 &",
+    "git status; git diff --stat",
+    "cp src/*.py backup/ && rm -f *.pyc",
+]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, default=10000)
+    parser.add_argument("--script", help="take the lines from this file")
+    options = parser.parse_args()
+
+    sample = SAMPLE_LINES
+    if options.script:
+        with open(options.script) as script:
+            sample = [line.rstrip("\n") for line in script]
+        sample = [line for line in sample if line.strip()]
+    # Distinct strings, as a script's lines would be
+    lines = [
+        sample[i % len(sample)] + " " * (i // len(sample) % 2)
+        for i in range(options.lines)
+    ]
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    trees = [
+        parse_tokens(tokenize(line, operators=True, expand=True)) for line in lines
+    ]
+    seconds = time.perf_counter() - start
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    per_line = (after - before) / len(trees)
+    print(f"lines: {len(trees)}  distinct: {len(sample)}")
+    print(f"{'memory per line':<20}{per_line:>10.0f} bytes")
+    print(f"{'time per line':<20}{seconds / len(trees) * 1e6:>10.1f} us")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
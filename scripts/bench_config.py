@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Config loading startup benchmark.
+
+Starts a fresh interpreter that imports akujobip1.config and calls
+load_config(), first with an empty config cache (cold: PyYAML is imported
+and every file parsed) and then with the cache written by the previous
+run (warm: the files are only stat()ed), and reports the median wall
+time of each in milliseconds. A bare interpreter start is timed too, so
+the difference is what loading the config costs.
+
+Usage:
+    python scripts/bench_config.py            # 20 starts of each kind
+    python scripts/bench_config.py -n 50
+    python scripts/bench_config.py --config ~/.config/akujobip1/config.yaml
+
+The benchmark runs in a temporary directory with its own HOME and
+XDG_CACHE_HOME, using the given file (or the repository's akujobip1.yaml
+example if there is one) as $AKUJOBIP1_CONFIG, so the real cache is left
+alone.
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+LOAD = (
+    f"import sys; sys.path.insert(0, {str(SRC)!r}); "
+    "from akujobip1.config import load_config; load_config()"
+)
+
+SAMPLE_CONFIG = """\
+prompt:
+  text: "bench> "
+execution:
+  show_exit_codes: always
+  default_timeout: 30
+glob:
+  max_matches: 50000
+memo:
+  commands: [git status, ls]
+debug:
+  log_file: ~/bench.log
+"""
+
+
+def start_ms(code: str, env: dict, cwd: str) -> float:
+    """Wall time of one interpreter running code, in milliseconds."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], env=env, cwd=cwd, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--runs", type=int, default=20)
+    parser.add_argument("--config", help="config file to load")
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work:
+        config_file = os.path.join(work, "config.yaml")
+        if options.config:
+            shutil.copy(os.path.expanduser(options.config), config_file)
+        else:
+            Path(config_file).write_text(SAMPLE_CONFIG)
+        cache_home = os.path.join(work, "cache")
+        env = dict(
+            os.environ,
+            HOME=work,
+            XDG_CACHE_HOME=cache_home,
+            AKUJOBIP1_CONFIG=config_file,
+        )
+
+        bare, cold, warm = [], [], []
+        for _ in range(options.runs):
+            bare.append(start_ms("pass", env, work))
+            shutil.rmtree(cache_home, ignore_errors=True)
+            cold.append(start_ms(LOAD, env, work))
+            warm.append(start_ms(LOAD, env, work))
+
+    base = statistics.median(bare)
+    print(f"{'start':<12}{'median ms':>10}{'config ms':>11}")
+    for name, times in (("interpreter", bare), ("cold", cold), ("warm", warm)):
+        median = statistics.median(times)
+        print(f"{name:<12}{median:>10.1f}{median - base:>11.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
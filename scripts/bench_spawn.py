@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Spawn strategy micro-benchmark.
+
+Runs the same short command repeatedly through execute_external_command()
+with each execution.spawn_strategy and reports commands per second.
+
+Usage:
+    python scripts/bench_spawn.py                 # 500 runs of 'true'
+    python scripts/bench_spawn.py -n 2000
+    python scripts/bench_spawn.py --ballast-mb 512 # grow shell RSS first
+    python scripts/bench_spawn.py --ballast-mb 0 256 512 1024  # sweep
+
+The --ballast-mb option allocates and touches memory in the benchmark
+process before timing, which makes fork() pay for copying larger page
+tables while posix_spawn() stays flat. With several sizes, the ballast is
+grown step by step and every strategy is timed at each size. The zygote
+is started before any ballast exists (as the shell starts it before
+building up state), so its launch latency should not move either.
+"""
+
+import argparse
+import time
+
+from akujobip1.executor import execute_external_command
+from akujobip1.zygote import ZYGOTE
+
+STRATEGIES = ("fork", "posix_spawn", "zygote")
+
+
+def bench(strategy: str, command: list, runs: int) -> float:
+    """Return commands per second for one strategy."""
+    config = {
+        "execution": {"show_exit_codes": "never", "spawn_strategy": strategy},
+        "debug": {"show_fork_pids": False},
+    }
+
+    # Warm up (page cache, dynamic loader)
+    for _ in range(10):
+        execute_external_command(command, config)
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        execute_external_command(command, config)
+    elapsed = time.perf_counter() - start
+    return runs / elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--runs", type=int, default=500)
+    parser.add_argument("--ballast-mb", type=int, nargs="+", default=[0])
+    parser.add_argument("command", nargs="*", default=["true"])
+    options = parser.parse_args()
+
+    # Fork the zygote while this process is still small
+    if not ZYGOTE.start():
+        print("zygote unavailable on this platform")
+        return 1
+
+    print(f"command: {' '.join(options.command)}  runs: {options.runs}")
+    print(f"{'ballast':>10}" + "".join(f"{name:>14}" for name in STRATEGIES))
+
+    ballast = []
+    for size_mb in sorted(options.ballast_mb):
+        # Grow the ballast to size_mb, touching every page so it is
+        # resident and must be mapped in a fork
+        while len(ballast) < size_mb:
+            chunk = bytearray(1024 * 1024)
+            for offset in range(0, len(chunk), 4096):
+                chunk[offset] = 1
+            ballast.append(chunk)
+
+        results = [bench(name, options.command, options.runs) for name in STRATEGIES]
+        print(f"{size_mb:>7} MB" + "".join(f"{rate:>9.1f} c/s" for rate in results))
+
+    ZYGOTE.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tokenizer throughput benchmark.
+
+Compares shlex.split() (what parse_command() used before) with
+akujobip1.tokenizer.split() on a corpus of command lines taken from
+tests/test_parser.py, and reports lines per second for each.
+
+Usage:
+    python scripts/bench_tokenizer.py              # corpus repeated to 100k lines
+    python scripts/bench_tokenizer.py -n 500000
+
+The corpus is every string literal passed as the first argument to
+parse_command() or parse() in the parser tests. Both implementations are
+checked to agree on every line (result or error message) before anything
+is timed.
+"""
+
+import argparse
+import ast
+import os
+import shlex
+import time
+
+from akujobip1.tokenizer import TokenizeError, split
+
+TEST_FILE = os.path.join(os.path.dirname(__file__), "..", "tests", "test_parser.py")
+
+PARSER_FUNCTIONS = {"parse_command", "parse"}
+
+
+def load_corpus(path: str) -> list:
+    """Collect the command lines the parser tests feed to the parser."""
+    with open(path) as f:
+        tree = ast.parse(f.read())
+    lines = []
+    for node in ast.walk(tree):
+        if (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Name)
+            and node.func.id in PARSER_FUNCTIONS
+            and node.args
+            and isinstance(node.args[0], ast.Constant)
+            and isinstance(node.args[0].value, str)
+        ):
+            lines.append(node.args[0].value)
+    return lines
+
+
+def outcome(function, line: str):
+    """Result of function(line), or its error message."""
+    try:
+        return function(line)
+    except (ValueError, TokenizeError) as e:
+        return str(e)
+
+
+def bench(function, lines: list) -> float:
+    """Return lines per second for function over lines."""
+    start = time.perf_counter()
+    for line in lines:
+        try:
+            function(line)
+        except ValueError:
+            pass
+    return len(lines) / (time.perf_counter() - start)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--lines", type=int, default=100_000)
+    options = parser.parse_args()
+
+    corpus = load_corpus(TEST_FILE)
+    for line in corpus:
+        if outcome(shlex.split, line) != outcome(split, line):
+            print(f"MISMATCH: {line!r}")
+            return 1
+
+    lines = (corpus * (options.lines // len(corpus) + 1))[: options.lines]
+    print(f"corpus: {len(corpus)} distinct lines, {len(lines)} timed")
+
+    baseline = bench(shlex.split, lines)
+    fast = bench(split, lines)
+    print(f"{'shlex.split':<18}{baseline:>12,.0f} lines/s")
+    print(f"{'tokenizer.split':<18}{fast:>12,.0f} lines/s  ({fast / baseline:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
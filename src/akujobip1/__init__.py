@@ -4,5 +4,11 @@ AkujobiP1Shell - A simple shell implementation using POSIX system calls.
 This package provides a basic shell implementation for CSC456 Programming Assignment 1.
 """
 
+import time
+
 __version__ = "1.0.0"
 __author__ = "John Akujobi"
+
+# When the package started loading (the "imports" phase shown by
+# akujobip1 --startup-profile)
+IMPORT_STARTED = time.perf_counter()
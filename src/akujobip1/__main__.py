@@ -4,11 +4,12 @@ Main entry point for running akujobip1 as a module.
 This file allows the shell to be executed with:
     python -m akujobip1
 
-It simply calls the cli() function from shell.py.
+It simply calls the main() function from shell.py, which passes the
+command-line arguments (-c, script file, -e) on to cli().
 """
 
 import sys
-from akujobip1.shell import cli
+from akujobip1.shell import main
 
 if __name__ == "__main__":
-    sys.exit(cli())
+    sys.exit(main())
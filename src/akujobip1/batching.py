@@ -0,0 +1,229 @@
+"""
+Argument batching for the `batch` built-in and execution.auto_batch.
+
+The kernel limits the combined size of a new program's arguments and
+environment (ARG_MAX - on Linux a quarter of the stack limit, usually
+2 MiB). A wildcard over a large tree can easily exceed it, and exec
+then fails with "Argument list too long". Like xargs, this module
+measures each argv against os.sysconf('SC_ARG_MAX') (less the current
+environment) and, when it would not fit, runs the command several
+times, each with as many arguments as fit.
+
+Arguments arrive as a lazy stream from parser.iter_arguments(): each
+batch is filled and run before the next arguments are read, so memory
+stays bounded by one batch (plus the matches of the pattern being
+expanded, which must be sorted) however many paths a wildcard matches.
+
+The fixed part of every batch is the command and the words before the
+first wildcard-expanded argument; everything from there on is split:
+
+    batch rm -f build/**/*.o     ->  rm -f <first N .o files>
+                                     rm -f <next N .o files> ...
+
+As with xargs, trailing arguments are batched too, so commands whose
+last argument is special (cp *.txt dest/) should not be batched.
+
+Example:
+    batch grep -l TODO src/**/*.py
+    batch -P 4 gzip -9 logs/**/*.log
+"""
+
+import itertools
+import os
+import struct
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from akujobip1.config import as_settings
+from akujobip1.executor import display_exit_status, execute_external_command
+
+# POSIX minimum ARG_MAX, used when sysconf cannot tell us
+_POSIX_ARG_MAX = 4096
+
+# Room left for the auxiliary vector and anything the exec adds (xargs
+# uses the same margin)
+_HEADROOM = 2048
+
+# Bytes per argv/envp pointer
+_POINTER_SIZE = struct.calcsize("P")
+
+# xargs' exit status when some batch exited 1-125
+BATCH_FAILED_EXIT = 123
+
+
+def argument_limit() -> int:
+    """
+    Return how many bytes of argv fit in one exec.
+
+    ARG_MAX minus the current environment (which every child inherits)
+    and some headroom, never less than the POSIX minimum.
+
+    Returns:
+        Size budget for argv_size()
+    """
+    try:
+        arg_max = os.sysconf("SC_ARG_MAX")
+    except (ValueError, OSError, AttributeError):
+        arg_max = -1
+    if arg_max <= 0:
+        arg_max = _POSIX_ARG_MAX
+    return max(arg_max - _HEADROOM - environment_size(), _POSIX_ARG_MAX)
+
+
+def argument_size(arg: str) -> int:
+    """Bytes one argument takes: its encoding, the NUL and its pointer."""
+    return len(os.fsencode(arg)) + 1 + _POINTER_SIZE
+
+
+def argv_size(args: Iterable[str]) -> int:
+    """
+    Bytes an argument vector takes in the new process.
+
+    Example:
+        >>> argv_size(['ls', '-l'])  # (3 + 8) + (3 + 8) on 64-bit
+        22
+    """
+    return sum(argument_size(arg) for arg in args)
+
+
+def environment_size() -> int:
+    """Bytes the current environment takes ("NAME=value", NUL, pointer)."""
+    return sum(
+        len(name) + len(value) + 2 + _POINTER_SIZE
+        for name, value in os.environb.items()
+    )
+
+
+def split_fixed(words: Iterator[Tuple[str, bool]]) -> Tuple[List[str], Iterator[str]]:
+    """
+    Separate the words repeated in every batch from the ones to split.
+
+    Args:
+        words: (argument, expanded) pairs as from parser.iter_arguments(),
+               starting with the command name
+
+    Returns:
+        (fixed, rest) - fixed is the command and every word before the
+        first wildcard-expanded one; rest lazily yields the others. If
+        nothing was expanded, only the command and its leading options
+        are fixed.
+
+    Examples:
+        >>> fixed, rest = split_fixed(iter([('rm', False), ('-f', False),
+        ...                                 ('a.o', True), ('b.o', True)]))
+        >>> fixed, list(rest)
+        (['rm', '-f'], ['a.o', 'b.o'])
+    """
+    fixed: List[str] = []
+    for arg, expanded in words:
+        if expanded and fixed:
+            rest = itertools.chain([arg], (word for word, _ in words))
+            return fixed, rest
+        fixed.append(arg)
+
+    # No wildcard: the (already complete) line splits after its options
+    split = 1
+    while split < len(fixed) and fixed[split].startswith("-"):
+        split += 1
+    return fixed[:split], iter(fixed[split:])
+
+
+def batch_arguments(
+    fixed: List[str], words: Iterable[str], limit: int
+) -> Iterator[List[str]]:
+    """
+    Yield argument vectors of fixed + as many words as fit in limit.
+
+    Every batch gets at least one word (a single word too large for the
+    limit on its own still runs, and fails as it would unbatched).
+
+    Args:
+        fixed: Words that start every batch (command and options)
+        words: Words to distribute (consumed lazily)
+        limit: Byte budget per argv, as from argument_limit()
+
+    Yields:
+        Argument vectors; just fixed if words is empty
+
+    Example:
+        >>> list(batch_arguments(['echo'], ['a', 'b', 'c'], argv_size(['echo', 'a', 'b'])))
+        [['echo', 'a', 'b'], ['echo', 'c']]
+    """
+    fixed_size = argv_size(fixed)
+    batch = list(fixed)
+    size = fixed_size
+    for word in words:
+        word_size = argument_size(word)
+        if size + word_size > limit and len(batch) > len(fixed):
+            yield batch
+            batch = list(fixed)
+            size = fixed_size
+        batch.append(word)
+        size += word_size
+    if len(batch) > len(fixed) or size == fixed_size:
+        yield batch
+
+
+def execute_batched(
+    fixed: List[str], words: Iterable[str], config: Dict[str, Any], jobs: int = 1
+) -> int:
+    """
+    Run fixed + words, split into as many execs as ARG_MAX requires.
+
+    If everything fits in one exec this is exactly
+    execute_external_command(). Otherwise batches run one after another
+    (or up to jobs at a time), the exit status is displayed once for the
+    whole command, and the result follows xargs: running stops early if
+    a batch cannot be run (126/127) or is killed by a signal.
+
+    Args:
+        fixed: Words that start every batch
+        words: Words to distribute (consumed lazily)
+        config: Configuration dictionary
+        jobs: Batches to run at once (1 = sequential)
+
+    Returns:
+        0 if every batch succeeded, 123 if some batch exited 1-125,
+        otherwise the exit code of the batch that stopped the run
+    """
+    batches = batch_arguments(fixed, words, argument_limit())
+    first = next(batches)
+    second = next(batches, None)
+    if second is None:
+        # Common case: no split needed
+        return execute_external_command(first, config)
+
+    # Per-batch exit statuses would be noise; report the total at the end
+    execution_config = config.get("execution", {})
+    if execution_config is None:
+        execution_config = {}
+    # Compiled once here rather than again for every batch
+    quiet_config = as_settings(
+        dict(config, execution=dict(execution_config, show_exit_codes="never"))
+    )
+
+    all_batches = itertools.chain([first, second], batches)
+    exit_code = 0
+    if jobs > 1:
+        # Lazy import: only needed for parallel batches
+        from akujobip1.parallel import run_parallel
+
+        items = (tuple(batch) for batch in all_batches)
+        if run_parallel([], items, quiet_config, jobs, keep_order=True):
+            exit_code = BATCH_FAILED_EXIT
+    else:
+        for batch in all_batches:
+            code = execute_external_command(batch, quiet_config)
+            if code in (126, 127) or code > 128:
+                # Could not run, or interrupted: the rest would fare no better
+                print(
+                    f"batch: {fixed[0]}: stopped after exit code {code}",
+                    file=sys.stderr,
+                )
+                exit_code = code
+                break
+            if code != 0:
+                exit_code = BATCH_FAILED_EXIT
+
+    display_exit_status(exit_code << 8, config)
+    return exit_code
@@ -0,0 +1,226 @@
+"""
+Brace expansion module.
+
+Expands brace expressions in a word the way bash does, before wildcards
+are matched:
+    - Lists: a{b,c}d -> abd acd, {a,b}{1,2} -> a1 a2 b1 b2, and nested
+      lists x{a,b{1,2}} -> xa xb1 xb2. x{,s} gives x and xs.
+    - Sequences: {1..5}, {5..1}, {0..10..5}, {01..10} (zero-padded to the
+      wider end), {-2..2}, {a..e} and {a..z..2}
+Only unquoted braces count: "{a,b}", '{a,b}' and \\{a,b} stay literal,
+as do braces without a top-level comma or a valid sequence ({}, {a},
+{1..x}) and ${...}. Words that come out empty are dropped.
+
+Results are generated lazily: a sequence yields one number at a time and
+the combinations of several expressions are produced as they are
+consumed, so {1..1000000} is never held as a list unless the caller
+collects it (iter_arguments() streams it straight into the batching
+module). This replaces running an external `seq` for counting loops.
+
+POSIX References:
+    Brace expansion is a bash extension (not in POSIX sh); the rules
+    follow the bash manual, section "Brace Expansion".
+"""
+
+import re
+from typing import Iterator, List, Optional, Tuple
+
+from akujobip1.tokenizer import Parts, Token, make_word
+
+# {x..y} or {x..y..step} with integer or single-letter ends
+_INTEGER_SEQUENCE = re.compile(r"([-+]?\d+)\.\.([-+]?\d+)(?:\.\.([-+]?\d+))?")
+_LETTER_SEQUENCE = re.compile(r"([A-Za-z])\.\.([A-Za-z])(?:\.\.([-+]?\d+))?")
+
+# A word as its text plus a same-length mask: '1' for quoted characters
+# (never syntax), '0' for unquoted ones
+_Word = Tuple[str, str]
+
+
+def expand_token(token: Token) -> Optional[Iterator[Token]]:
+    """
+    Brace-expand one token.
+
+    Args:
+        token: A token with braces set (see tokenizer.Token)
+
+    Returns:
+        A lazy iterator over the resulting words (each a Token with its
+        own wildcard flags and glob pattern, at the original position),
+        or None if the word has no brace expression
+
+    Examples:
+        >>> [word.value for word in expand_token(tokenize('f{1..3}.txt')[0])]
+        ['f1.txt', 'f2.txt', 'f3.txt']
+        >>> expand_token(tokenize('{a}')[0]) is None
+        True
+    """
+    text = "".join(piece for piece, _ in token.braces)
+    mask = "".join(
+        ("1" if quoted else "0") * len(piece) for piece, quoted in token.braces
+    )
+    if _find_brace(text, mask) is None:
+        return None
+    return (
+        make_word(_to_parts(word_text, word_mask), token.start, token.end)
+        for word_text, word_mask in _expand(text, mask)
+        if word_text or "1" in word_mask
+    )
+
+
+def expand_braces(word: str) -> List[str]:
+    """
+    Brace-expand an unquoted word (every brace is syntax).
+
+    Examples:
+        >>> expand_braces('file.{c,h}')
+        ['file.c', 'file.h']
+        >>> expand_braces('{01..10..3}')
+        ['01', '04', '07', '10']
+        >>> expand_braces('{a}')
+        ['{a}']
+    """
+    return [text for text, _ in _expand(word, "0" * len(word)) if text]
+
+
+def _expand(text: str, mask: str) -> Iterator[_Word]:
+    """Yield every expansion of a word, leftmost expression varying slowest."""
+    found = _find_brace(text, mask)
+    if found is None:
+        yield text, mask
+        return
+
+    start, end, alternatives = found
+    prefix, prefix_mask = text[:start], mask[:start]
+    suffix, suffix_mask = text[end + 1 :], mask[end + 1 :]
+    # Most words have one expression: skip the recursion when nothing
+    # after it (or inside an alternative) can expand
+    suffix_expands = _find_brace(suffix, suffix_mask) is not None
+    for alternative, alternative_mask in alternatives:
+        if "{" in alternative:
+            # Alternatives may contain expressions of their own ({a,b{1,2}})
+            middles = _expand(alternative, alternative_mask)
+        else:
+            middles = iter(((alternative, alternative_mask),))
+        for middle, middle_mask in middles:
+            if not suffix_expands:
+                yield prefix + middle + suffix, prefix_mask + middle_mask + suffix_mask
+                continue
+            for rest, rest_mask in _expand(suffix, suffix_mask):
+                yield prefix + middle + rest, prefix_mask + middle_mask + rest_mask
+
+
+def _find_brace(text: str, mask: str) -> Optional[Tuple[int, int, Iterator[_Word]]]:
+    """
+    Find the first brace expression in a word.
+
+    Returns:
+        (offset of '{', offset of the matching '}', lazy alternatives),
+        or None if there is none
+    """
+    position = text.find("{")
+    while position >= 0:
+        if mask[position] == "0" and not (
+            # ${...} is parameter syntax, not a brace expression
+            position > 0
+            and text[position - 1] == "$"
+            and mask[position - 1] == "0"
+        ):
+            found = _brace_at(text, mask, position)
+            if found is not None:
+                return found
+        # Not an expression: this '{' is literal, try the next one
+        position = text.find("{", position + 1)
+    return None
+
+
+def _brace_at(
+    text: str, mask: str, start: int
+) -> Optional[Tuple[int, int, Iterator[_Word]]]:
+    """Parse the brace expression opening at start (None if it isn't one)."""
+    depth = 0
+    commas = []
+    position = start + 1
+    length = len(text)
+    while position < length:
+        if mask[position] == "0":
+            char = text[position]
+            if char == "{":
+                depth += 1
+            elif char == "}":
+                if depth == 0:
+                    break
+                depth -= 1
+            elif char == "," and depth == 0:
+                commas.append(position)
+        position += 1
+    else:
+        # No matching '}'
+        return None
+
+    end = position
+    if commas:
+        bounds = [start] + commas + [end]
+        alternatives = [
+            (text[left + 1 : right], mask[left + 1 : right])
+            for left, right in zip(bounds, bounds[1:])
+        ]
+        return start, end, iter(alternatives)
+
+    inner = text[start + 1 : end]
+    if "1" in mask[start + 1 : end]:
+        # Sequences must be entirely unquoted
+        return None
+    sequence = _sequence(inner)
+    if sequence is None:
+        return None
+    return start, end, ((item, "0" * len(item)) for item in sequence)
+
+
+def _sequence(expression: str) -> Optional[Iterator[str]]:
+    """Lazy items of a {x..y[..step]} sequence, or None if it isn't one."""
+    match = _INTEGER_SEQUENCE.fullmatch(expression)
+    if match is not None:
+        first, last, step = match.groups()
+        # A leading zero on either end pads every item to the wider end
+        width = 0
+        if _zero_padded(first) or _zero_padded(last):
+            width = max(len(first), len(last))
+        numbers = _range(int(first), int(last), step)
+        if width:
+            return (f"{number:0{width}d}" for number in numbers)
+        return (str(number) for number in numbers)
+
+    match = _LETTER_SEQUENCE.fullmatch(expression)
+    if match is not None:
+        first, last, step = match.groups()
+        return (chr(code) for code in _range(ord(first), ord(last), step))
+    return None
+
+
+def _range(first: int, last: int, step: Optional[str]) -> range:
+    """Inclusive range from first to last in either direction."""
+    # The step's sign is ignored and 0 means 1, as in bash
+    increment = abs(int(step)) if step else 1
+    increment = increment or 1
+    if first <= last:
+        return range(first, last + 1, increment)
+    return range(first, last - 1, -increment)
+
+
+def _zero_padded(number: str) -> bool:
+    """True for integers written with a leading zero (01, -007)."""
+    digits = number.lstrip("+-")
+    return len(digits) > 1 and digits[0] == "0"
+
+
+def _to_parts(text: str, mask: str) -> Parts:
+    """Split a masked word back into (text, quoted) pieces."""
+    if "1" not in mask:
+        return [(text, False)]
+    parts = []
+    start = 0
+    for position in range(1, len(text) + 1):
+        if position == len(text) or mask[position] != mask[start]:
+            parts.append((text[start:position], mask[start] == "1"))
+            start = position
+    return parts
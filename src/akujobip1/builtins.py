@@ -7,11 +7,28 @@ directly by the shell without forking a new process.
 POSIX References:
     - chdir(): https://pubs.opengroup.org/onlinepubs/9699919799/functions/chdir.html
     - getcwd(): https://pubs.opengroup.org/onlinepubs/9699919799/functions/getcwd.html
+    - hash: https://pubs.opengroup.org/onlinepubs/9699919799/utilities/hash.html
+    - type: https://pubs.opengroup.org/onlinepubs/9699919799/utilities/type.html
+    - jobs: https://pubs.opengroup.org/onlinepubs/9699919799/utilities/jobs.html
+    - wait: https://pubs.opengroup.org/onlinepubs/9699919799/utilities/wait.html
+    - kill: https://pubs.opengroup.org/onlinepubs/9699919799/utilities/kill.html
 """
 
+import itertools
+import math
 import os
+import resource
+import signal
 import sys
-from typing import List, Dict, Any, Optional
+import time
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+from akujobip1.jobs import JOB_TABLE, format_job
+from akujobip1.parser import PARSE_CACHE
+from akujobip1.pathcache import COMMAND_HASH, search_path
+
+# Shell options changed by the set built-in (and the -e command-line flag)
+SHELL_OPTIONS: Dict[str, bool] = {"errexit": False}
 
 
 class BuiltinCommand:
@@ -76,6 +93,8 @@ class CdCommand(BuiltinCommand):
     - cd (no args) - change to home directory
     - cd <path> - change to specified directory
     - cd - - change to previous directory (OLDPWD)
+
+    $PWD and $OLDPWD are updated after every successful change.
     """
 
     # Class variable to track previous directory for cd -
@@ -143,9 +162,15 @@ class CdCommand(BuiltinCommand):
             print(f"cd: {target}: {e}", file=sys.stderr)
             return 1
 
-        # Update previous directory
+        # Update previous directory, and $PWD/$OLDPWD for expansions and
+        # child processes (as bash does)
         if current:
             CdCommand._previous_directory = current
+            os.environ["OLDPWD"] = current
+        try:
+            os.environ["PWD"] = os.getcwd()
+        except OSError:
+            pass
 
         # Optionally show pwd after cd
         # Handle None values in config (malformed config)
@@ -229,15 +254,836 @@ class HelpCommand(BuiltinCommand):
         print("  cd [dir]   Change directory (cd - for previous, cd for home)")
         print("  pwd        Print working directory")
         print("  help       Show this help message")
+        print("  hash [-r]  Show (or with -r, clear) remembered command paths")
+        print("  hash -s    Show the parse cache's hit rate")
+        print("  type name  Show how a command name would be interpreted")
+        print("  jobs       List background jobs (start one with: cmd &)")
+        print("  wait [%n]  Wait for background jobs to finish")
+        print("  kill %n    Send a signal (default TERM) to a job or pid")
+        print("  parallel   Run a command per argument, N at a time (-j N, -k)")
+        print("  set -e|+e  Stop (or not) a script at the first failing command")
+        print("  time cmd   Run cmd and show its CPU time, memory and page faults")
+        print("  timeout    Run a command with a time limit (timeout [-k 5] 10s cmd)")
+        print("  memo cmd   Replay cmd's cached output (--stats, --clear)")
+        print("  batch cmd  Run cmd in as many execs as its arguments need (-P N)")
+        return 0
+
+
+class HashCommand(BuiltinCommand):
+    """
+    Inspect or reset the command hash table.
+
+    Supports:
+    - hash - list remembered commands with hit counts
+    - hash -r - forget every remembered location
+    - hash -s - show hit counts of the parse and expansion caches
+    - hash name... - look up and remember each name
+    """
+
+    def execute(self, args: List[str], config: Dict[str, Any]) -> int:
+        """
+        Execute hash command.
+
+        Args:
+            args: Command arguments (args[0]='hash', then -r, -s or names)
+            config: Configuration dictionary
+
+        Returns:
+            0 on success, 1 if any name was not found
+
+        Example:
+            >>> cmd = HashCommand()
+            >>> cmd.execute(['hash', 'ls'], {})
+            0
+            >>> cmd.execute(['hash'], {})
+            hits    command
+               1    /usr/bin/ls
+            0
+            >>> cmd.execute(['hash', '-s'], {})
+            parse: 3 hits, 1 misses (75.0% hit rate), 2 lines cached
+            expand: 2 hits, 2 misses (50.0% hit rate), 2 results cached
+            0
+        """
+        if len(args) == 1:
+            entries = COMMAND_HASH.entries()
+            if not entries:
+                print("hash: hash table empty")
+                return 0
+            print("hits\tcommand")
+            for _name, hits, path in entries:
+                print(f"{hits:4}\t{path}")
+            return 0
+
+        if args[1] == "-r":
+            COMMAND_HASH.forget()
+            return 0
+
+        if args[1] == "-s":
+            stats = PARSE_CACHE.stats()
+            for label, hits, misses, size, unit in (
+                ("parse", stats["hits"], stats["misses"], stats["lines"], "lines"),
+                (
+                    "expand",
+                    stats["expansion_hits"],
+                    stats["expansion_misses"],
+                    stats["expansions"],
+                    "results",
+                ),
+            ):
+                lookups = hits + misses
+                rate = 100.0 * hits / lookups if lookups else 0.0
+                print(
+                    f"{label}: {hits} hits, {misses} misses "
+                    f"({rate:.1f}% hit rate), {size} {unit} cached"
+                )
+            return 0
+
+        exit_code = 0
+        for name in args[1:]:
+            if get_builtin(name):
+                # Built-ins are never hashed (same as bash)
+                continue
+            if COMMAND_HASH.lookup(name) is None:
+                print(f"hash: {name}: not found", file=sys.stderr)
+                exit_code = 1
+        return exit_code
+
+
+class TypeCommand(BuiltinCommand):
+    """
+    Describe how each name would be interpreted if used as a command.
+    """
+
+    def execute(self, args: List[str], config: Dict[str, Any]) -> int:
+        """
+        Execute type command.
+
+        Args:
+            args: Command arguments (args[0]='type', args[1:]=names)
+            config: Configuration dictionary
+
+        Returns:
+            0 if every name was found, 1 otherwise
+
+        Example:
+            >>> cmd = TypeCommand()
+            >>> cmd.execute(['type', 'cd', 'ls'], {})
+            cd is a shell builtin
+            ls is /usr/bin/ls
+            0
+        """
+        exit_code = 0
+        for name in args[1:]:
+            if get_builtin(name):
+                print(f"{name} is a shell builtin")
+                continue
+
+            # type reports but doesn't remember (it must not alter the table)
+            hashed = COMMAND_HASH.peek(name)
+            if hashed is not None:
+                print(f"{name} is hashed ({hashed})")
+                continue
+
+            if "/" in name:
+                path = name if os.path.exists(name) else None
+            else:
+                path = search_path(name, os.get_exec_path())
+            if path is None:
+                print(f"type: {name}: not found", file=sys.stderr)
+                exit_code = 1
+            else:
+                print(f"{name} is {path}")
+        return exit_code
+
+
+class JobsCommand(BuiltinCommand):
+    """
+    List background jobs.
+
+    Finished jobs are shown once with their final state and then removed.
+    """
+
+    def execute(self, args: List[str], config: Dict[str, Any]) -> int:
+        """
+        Execute jobs command.
+
+        Args:
+            args: Command arguments (only args[0]='jobs' expected)
+            config: Configuration dictionary
+
+        Returns:
+            0 (always succeeds)
+
+        Example:
+            >>> cmd = JobsCommand()
+            >>> cmd.execute(['jobs'], {})
+            [1]   Running                 sleep 30 &
+            [2]   Done                    make
+            0
+        """
+        JOB_TABLE.reap()
+        for job in JOB_TABLE.jobs():
+            print(format_job(job))
+            if job.done:
+                JOB_TABLE.remove(job)
+        return 0
+
+
+class WaitCommand(BuiltinCommand):
+    """
+    Wait for background jobs.
+
+    Supports:
+    - wait - wait for every job, return 0
+    - wait %n|pid... - wait for the given jobs, return the last one's status
+    """
+
+    def execute(self, args: List[str], config: Dict[str, Any]) -> int:
+        """
+        Execute wait command.
+
+        Args:
+            args: Command arguments (args[0]='wait', then job specs)
+            config: Configuration dictionary
+
+        Returns:
+            Exit code of the last job waited for, 0 with no arguments,
+            127 if a job spec is unknown
+
+        Example:
+            >>> cmd = WaitCommand()
+            >>> cmd.execute(['wait', '%1'], {})
+            0
+        """
+        if len(args) == 1:
+            for job in JOB_TABLE.jobs():
+                JOB_TABLE.wait(job)
+                JOB_TABLE.remove(job)
+            return 0
+
+        exit_code = 0
+        for spec in args[1:]:
+            job = JOB_TABLE.find(spec)
+            if job is None:
+                print(f"wait: {spec}: no such job", file=sys.stderr)
+                exit_code = 127
+                continue
+            exit_code = JOB_TABLE.wait(job)
+            JOB_TABLE.remove(job)
+        return exit_code
+
+
+class KillCommand(BuiltinCommand):
+    """
+    Send a signal to jobs or processes.
+
+    Supports:
+    - kill %n|pid... - send SIGTERM
+    - kill -SIG %n|pid... / kill -s SIG %n|pid... - send SIG (name or number)
+
+    Jobs are signalled as a whole process group, so every stage of a
+    background pipeline receives the signal.
+    """
+
+    def execute(self, args: List[str], config: Dict[str, Any]) -> int:
+        """
+        Execute kill command.
+
+        Args:
+            args: Command arguments (args[0]='kill', optional signal, targets)
+            config: Configuration dictionary
+
+        Returns:
+            0 on success, 1 if any target could not be signalled
+
+        Example:
+            >>> cmd = KillCommand()
+            >>> cmd.execute(['kill', '-INT', '%1'], {})
+            0
+        """
+        targets = args[1:]
+        sig: Optional[int] = signal.SIGTERM
+        spec = ""
+        if targets and targets[0] == "-s" and len(targets) > 1:
+            spec = targets[1]
+            targets = targets[2:]
+        elif targets and targets[0].startswith("-") and len(targets[0]) > 1:
+            spec = targets[0][1:]
+            targets = targets[1:]
+        if spec:
+            sig = _parse_signal(spec)
+
+        if sig is None:
+            print(f"kill: {spec}: invalid signal specification", file=sys.stderr)
+            return 1
+        if not targets:
+            print(
+                "kill: usage: kill [-s sigspec | -sigspec] pid | %job ...",
+                file=sys.stderr,
+            )
+            return 1
+
+        exit_code = 0
+        for target in targets:
+            try:
+                if target.startswith("%"):
+                    job = JOB_TABLE.find(target)
+                    if job is None:
+                        print(f"kill: {target}: no such job", file=sys.stderr)
+                        exit_code = 1
+                        continue
+                    os.killpg(job.pgid, sig)
+                else:
+                    os.kill(int(target), sig)
+            except ValueError:
+                print(
+                    f"kill: {target}: arguments must be process or job IDs",
+                    file=sys.stderr,
+                )
+                exit_code = 1
+            except ProcessLookupError:
+                print(f"kill: ({target}) - No such process", file=sys.stderr)
+                exit_code = 1
+            except PermissionError:
+                print(f"kill: ({target}) - Operation not permitted", file=sys.stderr)
+                exit_code = 1
+        return exit_code
+
+
+class ParallelCommand(BuiltinCommand):
+    """
+    Run a command once per argument, several at a time.
+
+    Supports:
+    - parallel [-j N] [-k] cmd [args] ::: a b c - one job per argument
+    - parallel cmd {1} {2} ::: a b ::: x y - one job per combination
+    - producer | parallel cmd {} - one job per line of stdin (streamed)
+
+    '{}' in cmd is replaced by the argument (appended if absent). At most
+    N jobs (default: number of CPUs) run at once; each job's output is
+    collected and printed as one block when it finishes. -k prints the
+    blocks in input order instead of completion order.
+    """
+
+    def execute(self, args: List[str], config: Dict[str, Any]) -> int:
+        """
+        Execute parallel command.
+
+        Args:
+            args: Command arguments (args[0]='parallel', options, command)
+            config: Configuration dictionary
+
+        Returns:
+            0 if every job succeeded, the number of failed jobs (at most
+            101) otherwise, or 255 on a usage error
+
+        Example:
+            >>> cmd = ParallelCommand()
+            >>> cmd.execute(['parallel', '-k', 'echo', ':::', 'a', 'b'], {})
+            a
+            b
+            0
+        """
+        # Lazy import: only needed when the built-in actually runs
+        from akujobip1.parallel import argument_items, run_parallel
+
+        max_jobs = os.cpu_count() or 1
+        keep_order = False
+        words = args[1:]
+
+        # Options come before the command
+        while words and words[0].startswith("-"):
+            option = words.pop(0)
+            if option in ("-k", "--keep-order"):
+                keep_order = True
+            elif option.startswith("-j") or option == "--jobs":
+                # -j N, -jN or --jobs N
+                value = option[2:] if option.startswith("-j") else ""
+                if not value:
+                    value = words.pop(0) if words else ""
+                if not value.isdigit():
+                    print(f"parallel: -j: invalid number: '{value}'", file=sys.stderr)
+                    return 255
+                max_jobs = int(value)
+            elif option == "--":
+                break
+            else:
+                print(f"parallel: {option}: invalid option", file=sys.stderr)
+                return 255
+
+        # Split "cmd args ::: a b ::: c d" into template and argument groups
+        template = []
+        groups: List[List[str]] = []
+        for word in words:
+            if word == ":::":
+                groups.append([])
+            elif groups:
+                groups[-1].append(word)
+            else:
+                template.append(word)
+
+        if not template:
+            print(
+                "parallel: usage: parallel [-j N] [-k] command [args] [::: arg...]",
+                file=sys.stderr,
+            )
+            return 255
+
+        # -j 0 means no limit: every argument's job starts at once
+        return run_parallel(
+            template, argument_items(groups), config, max_jobs, keep_order
+        )
+
+
+class SetCommand(BuiltinCommand):
+    """
+    Set or show shell options.
+
+    Supports:
+    - set -e / set -o errexit - stop a script at the first failing command
+    - set +e / set +o errexit - keep going after failures (default)
+    - set -o - show the current options
+
+    errexit only applies to non-interactive runs (-c, scripts, piped
+    stdin); an interactive shell never exits because a command failed.
+    """
+
+    # Short flags and their long option names
+    FLAGS = {"e": "errexit"}
+
+    def execute(self, args: List[str], config: Dict[str, Any]) -> int:
+        """
+        Execute set command.
+
+        Args:
+            args: Command arguments (args[0]='set', then option flags)
+            config: Configuration dictionary
+
+        Returns:
+            0 on success, 2 on an invalid option
+
+        Example:
+            >>> cmd = SetCommand()
+            >>> cmd.execute(['set', '-e'], {})
+            0
+            >>> SHELL_OPTIONS['errexit']
+            True
+        """
+        words = args[1:]
+        if not words or words == ["-o"] or words == ["+o"]:
+            for name in sorted(SHELL_OPTIONS):
+                state = "on" if SHELL_OPTIONS[name] else "off"
+                print(f"{name:<15}{state}")
+            return 0
+
+        while words:
+            word = words.pop(0)
+            if word[:1] not in ("-", "+") or len(word) < 2:
+                print(f"set: {word}: invalid option", file=sys.stderr)
+                return 2
+            enable = word[0] == "-"
+            if word[1:] == "o":
+                name = words.pop(0) if words else ""
+                if name not in SHELL_OPTIONS:
+                    print(f"set: {name}: invalid option name", file=sys.stderr)
+                    return 2
+                SHELL_OPTIONS[name] = enable
+                continue
+            for flag in word[1:]:
+                if flag not in self.FLAGS:
+                    print(f"set: {word[0]}{flag}: invalid option", file=sys.stderr)
+                    return 2
+                SHELL_OPTIONS[self.FLAGS[flag]] = enable
         return 0
 
 
+class TimeCommand(BuiltinCommand):
+    """
+    Run a command and report the resources it used.
+
+    Supports:
+    - time cmd [args] - run cmd, then print wall-clock time, user/sys CPU,
+      peak RSS, page faults and context switches to stderr
+
+    External commands are measured exactly, from wait4() on the child.
+    Built-ins run inside the shell, so they are measured with getrusage()
+    on the shell itself (peak RSS is then the shell's), plus whatever
+    children they reaped (every job of parallel, a job waited for).
+    'time a | b' times the whole pipeline (see shell._run_stages()).
+    """
+
+    def execute(self, args: List[str], config: Dict[str, Any]) -> int:
+        """
+        Execute time command.
+
+        Args:
+            args: Command arguments (args[0]='time', then the command)
+            config: Configuration dictionary
+
+        Returns:
+            Exit code of the timed command (2 on a usage error)
+
+        Example:
+            >>> cmd = TimeCommand()
+            >>> cmd.execute(['time', 'sleep', '0.1'], {})
+            <BLANKLINE>
+            real    0m0.102s
+            user    0m0.001s
+            sys     0m0.000s
+            maxrss  1792 KB
+            faults  86 minor, 0 major
+            ctxsw   2 voluntary, 0 involuntary
+            0
+        """
+        # Lazy import: the executor is only needed when timing
+        from akujobip1.executor import (
+            ResourceUsage,
+            execute_external_command,
+            last_resource_usage,
+        )
+
+        command = args[1:]
+        if not command:
+            print("time: usage: time command [args...]", file=sys.stderr)
+            return 2
+
+        builtin = get_builtin(command[0])
+        if builtin is None:
+            exit_code = execute_external_command(command, config)
+            usage = last_resource_usage() or ResourceUsage()
+        else:
+            children = last_resource_usage()
+            before = resource.getrusage(resource.RUSAGE_SELF)
+            started = time.perf_counter()
+            exit_code = builtin.execute(command, config)
+            elapsed = time.perf_counter() - started
+            after = resource.getrusage(resource.RUSAGE_SELF)
+            usage = ResourceUsage(
+                elapsed,
+                after.ru_utime - before.ru_utime,
+                after.ru_stime - before.ru_stime,
+                after.ru_maxrss,
+                after.ru_minflt - before.ru_minflt,
+                after.ru_majflt - before.ru_majflt,
+                after.ru_nvcsw - before.ru_nvcsw,
+                after.ru_nivcsw - before.ru_nivcsw,
+            )
+            if last_resource_usage() is not children:
+                # The built-in ran and reaped children of its own
+                usage += last_resource_usage()
+
+        print_time_report(usage)
+        return exit_code
+
+
+class TimeoutCommand(BuiltinCommand):
+    """
+    Run an external command with a time limit.
+
+    Supports:
+    - timeout DURATION cmd [args] - terminate cmd after DURATION
+    - timeout -k GRACE DURATION cmd [args] - SIGKILL GRACE after SIGTERM
+
+    Durations are seconds, optionally with an s/m/h/d suffix (1.5, 30s,
+    2m). A command still running at the deadline gets SIGTERM, then
+    SIGKILL once the grace period (default: execution.timeout_grace)
+    passes, and the exit code is 124.
+    """
+
+    # Duration suffixes, as accepted by GNU timeout
+    UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+    def execute(self, args: List[str], config: Dict[str, Any]) -> int:
+        """
+        Execute timeout command.
+
+        Args:
+            args: Command arguments (args[0]='timeout', options, duration, cmd)
+            config: Configuration dictionary
+
+        Returns:
+            Exit code of cmd, 124 if it timed out, or 125 on a usage error
+
+        Example:
+            >>> cmd = TimeoutCommand()
+            >>> cmd.execute(['timeout', '0.5', 'sleep', '10'], {})
+            sleep: timed out after 0.5s
+            [Exit: 124]
+            124
+        """
+        # Lazy import: the executor is only needed when running a command
+        from akujobip1.executor import execute_external_command
+
+        words = args[1:]
+        grace = None
+        if words and words[0] == "-k":
+            grace = self._parse_duration(words[1]) if len(words) > 1 else None
+            if grace is None:
+                print("timeout: -k: invalid grace period", file=sys.stderr)
+                return 125
+            words = words[2:]
+
+        if len(words) < 2:
+            print(
+                "timeout: usage: timeout [-k grace] duration command [args...]",
+                file=sys.stderr,
+            )
+            return 125
+
+        duration = self._parse_duration(words[0])
+        if duration is None:
+            print(f"timeout: invalid time interval '{words[0]}'", file=sys.stderr)
+            return 125
+
+        # A duration of 0 disables the limit, as in GNU timeout
+        return execute_external_command(words[1:], config, duration, grace)
+
+    def _parse_duration(self, text: str) -> Optional[float]:
+        """Parse '10', '1.5', '30s', '2m'... into seconds (None if invalid)."""
+        multiplier = 1
+        if text and text[-1] in self.UNITS:
+            multiplier = self.UNITS[text[-1]]
+            text = text[:-1]
+        try:
+            seconds = float(text) * multiplier
+        except ValueError:
+            return None
+        # inf and nan parse as floats, but are no time interval
+        if seconds < 0 or not math.isfinite(seconds):
+            return None
+        return seconds
+
+
+class MemoCommand(BuiltinCommand):
+    """
+    Run a command through the on-disk result cache.
+
+    Supports:
+    - memo cmd [args] - replay cmd's cached stdout, stderr and exit code,
+      or run it (stdin is /dev/null) and cache the result
+    - memo --stats - show hit rate, entry count and cache size
+    - memo --clear - delete every cached result
+
+    A result is reused only while argv, the working directory, the
+    command's executable, the memo.env variables and the size/mtime of
+    every file argument are unchanged (see the memo module).
+    """
+
+    def execute(self, args: List[str], config: Dict[str, Any]) -> int:
+        """
+        Execute memo command.
+
+        Args:
+            args: Command arguments (args[0]='memo', then an option or cmd)
+            config: Configuration dictionary
+
+        Returns:
+            Exit code of cmd (replayed or real), 0 for --stats/--clear,
+            or 2 on a usage error
+
+        Example:
+            >>> cmd = MemoCommand()
+            >>> cmd.execute(['memo', 'git', 'status', '-s'], {})
+             M README.md
+            0
+            >>> cmd.execute(['memo', '--stats'], {})
+            memo: 1 hits, 1 misses (50.0% hit rate)
+            memo: 1 entries, 0.0 of 64.0 MB in ~/.cache/akujobip1/memo
+            0
+        """
+        # Lazy import: the cache is only needed when memo is used
+        from akujobip1.memo import cache_from_config, run_memoized
+
+        if len(args) < 2:
+            print(
+                "memo: usage: memo [--stats | --clear | command [args...]]",
+                file=sys.stderr,
+            )
+            return 2
+
+        if args[1] == "--stats":
+            cache, _ = cache_from_config(config)
+            stats = cache.stats()
+            lookups = stats["hits"] + stats["misses"]
+            rate = 100.0 * stats["hits"] / lookups if lookups else 0.0
+            print(
+                f"memo: {stats['hits']} hits, {stats['misses']} misses "
+                f"({rate:.1f}% hit rate)"
+            )
+            print(
+                f"memo: {stats['entries']} entries, "
+                f"{stats['bytes'] / 1048576:.1f} of "
+                f"{cache.max_bytes / 1048576:.1f} MB in {cache.directory}"
+            )
+            return 0
+
+        if args[1] == "--clear":
+            cache, _ = cache_from_config(config)
+            removed = cache.clear()
+            print(f"memo: removed {removed} cached results")
+            return 0
+
+        if args[1].startswith("-"):
+            print(f"memo: {args[1]}: invalid option", file=sys.stderr)
+            return 2
+
+        if get_builtin(args[1]) is not None:
+            # Built-ins act on the shell itself - nothing to replay
+            print(f"memo: {args[1]}: cannot cache a built-in", file=sys.stderr)
+            return 2
+
+        return run_memoized(args[1:], config)
+
+
+class BatchCommand(BuiltinCommand):
+    """
+    Run a command with more arguments than one exec can take.
+
+    Supports:
+    - batch cmd [args] - run cmd as often as needed, each time with as
+      many of the wildcard-expanded arguments as fit in ARG_MAX
+    - batch -P N cmd [args] - run up to N of those batches at once
+
+    The shell streams the arguments of a batch line (wildcards are
+    expanded as batches are filled), so glob.max_matches does not apply.
+    Words before the first expanded argument are repeated in every batch
+    (see the batching module).
+    """
+
+    def execute(self, args: List[str], config: Dict[str, Any]) -> int:
+        """
+        Execute batch command on already expanded arguments.
+
+        Args:
+            args: Command arguments (args[0]='batch', options, command)
+            config: Configuration dictionary
+
+        Returns:
+            See run()
+        """
+        return self.run(iter([(arg, False) for arg in args[1:]]), config)
+
+    def run(self, words: Iterator[Tuple[str, bool]], config: Dict[str, Any]) -> int:
+        """
+        Execute batch command on a lazy argument stream.
+
+        Args:
+            words: (argument, expanded) pairs after the word 'batch', as
+                   from parser.iter_arguments()
+            config: Configuration dictionary
+
+        Returns:
+            0 if every batch succeeded, 123 if some batch failed, the exit
+            code that stopped the run (126, 127, 128+n), or 2 on a usage
+            error
+
+        Example:
+            >>> cmd = BatchCommand()
+            >>> cmd.execute(['batch', 'echo', 'a', 'b'], {})
+            a b
+            0
+        """
+        # Lazy import: only needed when the built-in actually runs
+        from akujobip1.batching import execute_batched, split_fixed
+
+        jobs = 1
+        first = next(words, None)
+        # Options come before the command
+        while first is not None and first[0].startswith("-"):
+            option = first[0]
+            if option == "--":
+                first = next(words, None)
+                break
+            if not option.startswith("-P"):
+                print(f"batch: {option}: invalid option", file=sys.stderr)
+                return 2
+            # -P N or -PN
+            value = option[2:]
+            if not value:
+                following = next(words, None)
+                value = following[0] if following is not None else ""
+            if not value.isdigit() or int(value) < 1:
+                print(f"batch: -P: invalid number: '{value}'", file=sys.stderr)
+                return 2
+            jobs = int(value)
+            first = next(words, None)
+
+        if first is None:
+            print("batch: usage: batch [-P N] command [args...]", file=sys.stderr)
+            return 2
+
+        if get_builtin(first[0]) is not None:
+            # Built-ins take any number of arguments - nothing to split
+            print(f"batch: {first[0]}: cannot batch a built-in", file=sys.stderr)
+            return 2
+
+        fixed, rest = split_fixed(itertools.chain([first], words))
+        return execute_batched(fixed, rest, config, jobs)
+
+
+def print_time_report(usage: Any) -> None:
+    """
+    Print a ResourceUsage the way the time built-in does (to stderr).
+
+    Also used for 'time a | b', which the shell runs as a whole pipeline.
+    """
+    print(file=sys.stderr)
+    for label, seconds in (
+        ("real", usage.real_time),
+        ("user", usage.user_time),
+        ("sys", usage.system_time),
+    ):
+        minutes, seconds = divmod(seconds, 60)
+        print(f"{label:<8}{int(minutes)}m{seconds:.3f}s", file=sys.stderr)
+    print(f"{'maxrss':<8}{usage.max_rss_kb} KB", file=sys.stderr)
+    print(
+        f"{'faults':<8}{usage.minor_faults} minor, {usage.major_faults} major",
+        file=sys.stderr,
+    )
+    print(
+        f"{'ctxsw':<8}{usage.voluntary_switches} voluntary, "
+        f"{usage.involuntary_switches} involuntary",
+        file=sys.stderr,
+    )
+
+
+def _parse_signal(spec: str) -> Optional[int]:
+    """
+    Convert a signal spec (TERM, SIGTERM, 15) to a signal number.
+
+    Returns:
+        Signal number, or None if spec is not a valid signal
+    """
+    if spec.isdigit():
+        number = int(spec)
+        valid = {int(s) for s in signal.valid_signals()}
+        return number if number in valid or number == 0 else None
+    name = spec.upper()
+    if not name.startswith("SIG"):
+        name = "SIG" + name
+    try:
+        return int(signal.Signals[name])
+    except KeyError:
+        return None
+
+
 # Built-in command registry
 BUILTINS: Dict[str, BuiltinCommand] = {
     "exit": ExitCommand(),
     "cd": CdCommand(),
     "pwd": PwdCommand(),
     "help": HelpCommand(),
+    "hash": HashCommand(),
+    "type": TypeCommand(),
+    "jobs": JobsCommand(),
+    "wait": WaitCommand(),
+    "kill": KillCommand(),
+    "parallel": ParallelCommand(),
+    "set": SetCommand(),
+    "time": TimeCommand(),
+    "timeout": TimeoutCommand(),
+    "memo": MemoCommand(),
+    "batch": BatchCommand(),
 }
 
 
@@ -3,19 +3,71 @@ Configuration management module.
 
 This module handles loading and managing configuration from YAML files
 with support for environment variables and multiple config locations.
+
+Parsing YAML dominates startup (importing PyYAML alone takes longer than
+the rest of the shell), so the parsed contents of the config files are
+cached with marshal in $XDG_CACHE_HOME/akujobip1/config.marshal (default
+~/.cache/akujobip1/config.marshal). The cache is keyed on:
+    - the path of every config source and $AKUJOBIP1_CONFIG itself
+    - each file's size, mtime, ctime and inode (or its absence)
+so editing, replacing, creating or deleting any of them simply misses.
+A warm start stats the files, reads one small file and never imports
+yaml. Defaults, merging, path expansion and validation still run every
+time: they are cheap, and they depend on the code and the environment
+rather than on the files. Loads that printed a warning (invalid YAML, no
+PyYAML) are not cached, so the warning is repeated until it is fixed.
+
+load_config() returns a Settings object rather than a plain dict. It is
+a read-only Mapping, so config.get("glob", {}).get("enabled", True) and
+config["prompt"]["text"] keep working, but the settings read for every
+prompt or command (prompt, execution, glob, parser, debug) are also
+compiled once into frozen attributes with invalid values already
+replaced by defaults:
+    settings.execution.show_exit_codes is ShowExitCodes.ON_FAILURE
+    settings.execution.format_exit_code(1) == "[Exit: 1]"
+    settings.glob.max_matches == 100000
+Code on the hot path calls as_settings(config), which returns a Settings
+as is and compiles a plain dict (as tests and callers may still pass).
+
+Interactive sessions pick up edits without a restart: a ConfigWatcher
+re-checks the same cache key at most every config.reload_interval
+seconds (between prompts, never while a line runs) and swaps in new
+Settings, keeping the old ones if a file no longer parses.
 """
 
+import marshal
+import math
 import os
 import sys
-from pathlib import Path
-from typing import Dict, Any, Optional
+import time
+from enum import Enum
+from types import MappingProxyType
+from typing import (
+    Dict,
+    Any,
+    Callable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
 import copy
 
-try:
-    import yaml
-except ImportError:
-    print("Warning: PyYAML not installed. Using defaults only.", file=sys.stderr)
-    yaml = None
+# Bump when the cache layout changes (old caches then just miss)
+_CACHE_FORMAT_VERSION = 1
+
+# Launch strategies accepted by execution.spawn_strategy.
+# 'auto' picks posix_spawn when the platform provides it, else fork.
+# 'zygote' routes foreground commands through a helper process forked at
+# startup (zygote.py); pipelines and background jobs use posix_spawn then.
+SPAWN_STRATEGIES = ("auto", "fork", "posix_spawn", "zygote")
+
+# The PyYAML module, imported on first use (False if not installed); a
+# warm start from the config cache never needs it
+_yaml: Any = None
 
 
 def get_default_config() -> Dict[str, Any]:
@@ -26,19 +78,51 @@ def get_default_config() -> Dict[str, Any]:
         Default configuration dictionary with all settings.
     """
     return {
-        "prompt": {"text": "AkujobiP1> "},
+        "prompt": {
+            "text": "AkujobiP1> ",
+            # Prompt/exit message when stdin is piped (never with -c/scripts)
+            "show_in_batch": False,
+        },
         "exit": {"message": "Bye!"},
         "execution": {
             "show_exit_codes": "on_failure",  # Options: never, on_failure, always
             "exit_code_format": "[Exit: {code}]",
+            "spawn_strategy": "auto",  # Options: auto, fork, posix_spawn, zygote
+            "show_pipestatus": False,
+            "show_rusage": False,
+            "default_timeout": 0,  # Seconds per command, 0 = no limit
+            "timeout_grace": 2,  # Seconds between SIGTERM and SIGKILL
+            "auto_batch": False,  # Split commands that exceed ARG_MAX
+        },
+        "glob": {
+            "enabled": True,
+            "show_expansions": False,
+            "cache_max_mb": 16,  # Directory listings kept between commands
+            "recursive": True,  # '**' matches any number of directories
+            "walk_workers": 0,  # Threads for '**' walks, 0 = automatic
+            "max_depth": 0,  # Levels '**' may descend, 0 = unlimited
+            "max_matches": 100000,  # More from '**' is an error, 0 = unlimited
+            "follow_symlinks": False,  # '**' descends into symlinked dirs
+        },
+        "parser": {
+            "cache_entries": 256,  # Parsed lines kept for reuse, 0 = off
+            "max_capture_mb": 16,  # Most output one $(command) may print
+        },
+        "memo": {
+            "commands": [],  # Commands whose results are always cached
+            "env": ["PATH", "LANG", "LC_ALL", "TZ"],  # Part of the cache key
+            "max_size_mb": 64,
+            "directory": "",  # Empty = $XDG_CACHE_HOME/akujobip1/memo
         },
-        "glob": {"enabled": True, "show_expansions": False},
         "builtins": {
             "cd": {"enabled": True, "show_pwd_after": False},
             "pwd": {"enabled": True},
             "help": {"enabled": True},
         },
         "errors": {"verbose": False},
+        "config": {
+            "reload_interval": 2,  # Seconds between checks for edits, 0 = never
+        },
         "debug": {
             "log_commands": False,
             "log_file": "~/.akujobip1.log",
@@ -160,10 +244,135 @@ def validate_config(config: Dict[str, Any]) -> bool:
             )
             valid = False
 
+        spawn_strategy = config["execution"].get("spawn_strategy", "auto")
+        if spawn_strategy not in SPAWN_STRATEGIES:
+            print(
+                f"Warning: Invalid spawn_strategy value '{spawn_strategy}', "
+                "must be 'auto', 'fork', 'posix_spawn', or 'zygote'",
+                file=sys.stderr,
+            )
+            valid = False
+
+        # Timeouts must be non-negative numbers of seconds
+        for key in ("default_timeout", "timeout_grace"):
+            value = config["execution"].get(key, 0)
+            if (
+                isinstance(value, bool)
+                or not isinstance(value, (int, float))
+                or value < 0
+            ):
+                print(
+                    f"Warning: execution.{key} should be a non-negative "
+                    f"number of seconds, got {value!r}",
+                    file=sys.stderr,
+                )
+                valid = False
+
+    # Listing cache size must be a non-negative number of MB (0 = off)
+    glob_config = config.get("glob")
+    if isinstance(glob_config, dict):
+        cache_max_mb = glob_config.get("cache_max_mb", 16)
+        if (
+            isinstance(cache_max_mb, bool)
+            or not isinstance(cache_max_mb, (int, float))
+            or cache_max_mb < 0
+        ):
+            print(
+                f"Warning: glob.cache_max_mb should be a non-negative number, "
+                f"got {cache_max_mb!r}",
+                file=sys.stderr,
+            )
+            valid = False
+
+        # Walk limits must be non-negative whole numbers (0 = no limit)
+        for key in ("walk_workers", "max_depth", "max_matches"):
+            value = glob_config.get(key, 0)
+            if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+                print(
+                    f"Warning: glob.{key} should be a non-negative integer, "
+                    f"got {value!r}",
+                    file=sys.stderr,
+                )
+                valid = False
+
+    # Parse cache size must be a non-negative whole number (0 = off)
+    parser_config = config.get("parser")
+    if isinstance(parser_config, dict):
+        entries = parser_config.get("cache_entries", 256)
+        if isinstance(entries, bool) or not isinstance(entries, int) or entries < 0:
+            print(
+                "Warning: parser.cache_entries should be a non-negative "
+                f"integer, got {entries!r}",
+                file=sys.stderr,
+            )
+            valid = False
+
+        max_capture_mb = parser_config.get("max_capture_mb", 16)
+        if (
+            isinstance(max_capture_mb, bool)
+            or not isinstance(max_capture_mb, (int, float))
+            or max_capture_mb <= 0
+        ):
+            print(
+                f"Warning: parser.max_capture_mb should be a positive number, "
+                f"got {max_capture_mb!r}",
+                file=sys.stderr,
+            )
+            valid = False
+
+    # Reload interval must be a non-negative number of seconds (0 = never)
+    reload_config = config.get("config")
+    if isinstance(reload_config, dict):
+        interval = reload_config.get("reload_interval", 2)
+        if (
+            isinstance(interval, bool)
+            or not isinstance(interval, (int, float))
+            or interval < 0
+        ):
+            print(
+                "Warning: config.reload_interval should be a non-negative "
+                f"number of seconds, got {interval!r}",
+                file=sys.stderr,
+            )
+            valid = False
+
+    # Validate memo settings
+    memo_config = config.get("memo")
+    if isinstance(memo_config, dict):
+        for key in ("commands", "env"):
+            names = memo_config.get(key, [])
+            if not isinstance(names, list) or not all(
+                isinstance(name, str) for name in names
+            ):
+                print(
+                    f"Warning: memo.{key} should be a list of names, got {names!r}",
+                    file=sys.stderr,
+                )
+                valid = False
+
+        max_size_mb = memo_config.get("max_size_mb", 64)
+        if (
+            isinstance(max_size_mb, bool)
+            or not isinstance(max_size_mb, (int, float))
+            or max_size_mb <= 0
+        ):
+            print(
+                f"Warning: memo.max_size_mb should be a positive number, "
+                f"got {max_size_mb!r}",
+                file=sys.stderr,
+            )
+            valid = False
+
     # Validate boolean fields
     bool_paths = [
+        ("prompt", "show_in_batch"),
+        ("execution", "show_pipestatus"),
+        ("execution", "show_rusage"),
+        ("execution", "auto_batch"),
         ("glob", "enabled"),
         ("glob", "show_expansions"),
+        ("glob", "recursive"),
+        ("glob", "follow_symlinks"),
         ("errors", "verbose"),
         ("debug", "log_commands"),
         ("debug", "show_fork_pids"),
@@ -187,7 +396,293 @@ def validate_config(config: Dict[str, Any]) -> bool:
     return valid
 
 
-def load_yaml_file(filepath: Path) -> Optional[Dict[str, Any]]:
+class ShowExitCodes(Enum):
+    """When display_exit_status() prints a command's exit code."""
+
+    NEVER = "never"
+    ON_FAILURE = "on_failure"
+    ALWAYS = "always"
+
+
+class PromptSettings(NamedTuple):
+    """The prompt section, resolved (text: the default if not a string)."""
+
+    text: str
+    show_in_batch: bool
+
+
+class ExecutionSettings(NamedTuple):
+    """
+    The execution section, resolved.
+
+    Attributes:
+        show_exit_codes: When to print exit codes (unknown values: NEVER)
+        format_exit_code: Renders exit_code_format for a code (the default
+                          format if the configured one is invalid)
+        spawn_strategy: auto, fork, posix_spawn or zygote (unknown: auto)
+        show_pipestatus: Print per-stage exit codes after pipelines
+        show_rusage: Print resource usage after each command
+        default_timeout: Seconds per command, 0 = no limit
+        timeout_grace: Seconds between SIGTERM and SIGKILL
+        auto_batch: Split commands that exceed ARG_MAX
+    """
+
+    show_exit_codes: ShowExitCodes
+    format_exit_code: Callable[[int], str]
+    spawn_strategy: str
+    show_pipestatus: bool
+    show_rusage: bool
+    default_timeout: float
+    timeout_grace: float
+    auto_batch: bool
+
+
+class GlobSettings(NamedTuple):
+    """The glob section, resolved (cache_max_mb in bytes)."""
+
+    enabled: bool
+    show_expansions: bool
+    cache_max_bytes: int
+    recursive: bool
+    walk_workers: int
+    max_depth: int
+    max_matches: int
+    follow_symlinks: bool
+
+
+class ParserSettings(NamedTuple):
+    """The parser section, resolved (max_capture_mb in bytes)."""
+
+    cache_entries: int
+    max_capture_bytes: int
+
+
+class DebugSettings(NamedTuple):
+    """The debug section, resolved."""
+
+    log_commands: bool
+    log_file: str
+    show_fork_pids: bool
+
+
+class Settings(Mapping[str, Any]):
+    """
+    A loaded configuration: compiled sections plus a read-only dict view.
+
+    Indexing and iteration go to the view (nested sections are read-only
+    mappings too), so a Settings can be passed anywhere a config dict is
+    read. Build one with as_settings(). The sections are NamedTuples and
+    Settings a hand-written slotted class rather than frozen dataclasses:
+    importing dataclasses (which imports inspect) would cost more than
+    the rest of startup.
+
+    Example:
+        >>> settings = as_settings({'execution': {'show_exit_codes': 'always'}})
+        >>> settings.execution.show_exit_codes
+        <ShowExitCodes.ALWAYS: 'always'>
+        >>> settings['execution']['show_exit_codes']
+        'always'
+    """
+
+    __slots__ = ("prompt", "execution", "glob", "parser", "debug", "view")
+
+    prompt: PromptSettings
+    execution: ExecutionSettings
+    glob: GlobSettings
+    parser: ParserSettings
+    debug: DebugSettings
+    view: Mapping[str, Any]
+
+    def __init__(
+        self,
+        prompt: PromptSettings,
+        execution: ExecutionSettings,
+        glob: GlobSettings,
+        parser: ParserSettings,
+        debug: DebugSettings,
+        view: Mapping[str, Any],
+    ) -> None:
+        values = (prompt, execution, glob, parser, debug, view)
+        for name, value in zip(self.__slots__, values):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"cannot assign to field '{name}'")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"cannot delete field '{name}'")
+
+    def __repr__(self) -> str:
+        return (
+            f"Settings(prompt={self.prompt!r}, execution={self.execution!r}, "
+            f"glob={self.glob!r}, parser={self.parser!r}, debug={self.debug!r})"
+        )
+
+    def __getitem__(self, key: str) -> Any:
+        return self.view[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.view)
+
+    def __len__(self) -> int:
+        return len(self.view)
+
+
+def as_settings(config: Mapping[str, Any]) -> Settings:
+    """
+    Compile a configuration dictionary into Settings.
+
+    Invalid values fall back to the defaults, as every reader of the
+    dictionary did (validate_config() has already warned about them).
+
+    Args:
+        config: Configuration dictionary, or a Settings (returned as is)
+
+    Returns:
+        The Settings for config
+    """
+    # type() rather than isinstance(): this runs several times per
+    # command, and isinstance() on a Mapping subclass goes through the ABC
+    # machinery
+    if type(config) is Settings:
+        return config
+    defaults = get_default_config()
+
+    prompt = _section(config, "prompt")
+    text = prompt.get("text", defaults["prompt"]["text"])
+    prompt_settings = PromptSettings(
+        text=text if isinstance(text, str) else defaults["prompt"]["text"],
+        show_in_batch=prompt.get("show_in_batch", False) is True,
+    )
+
+    execution = _section(config, "execution")
+    default_execution = defaults["execution"]
+    show_mode = execution.get("show_exit_codes", "on_failure")
+    strategy = execution.get("spawn_strategy", "auto")
+    grace = _number(execution.get("timeout_grace"), default_execution["timeout_grace"])
+    execution_settings = ExecutionSettings(
+        show_exit_codes=(
+            ShowExitCodes(show_mode)
+            if show_mode in ("never", "on_failure", "always")
+            else ShowExitCodes.NEVER
+        ),
+        format_exit_code=_exit_code_formatter(
+            execution.get("exit_code_format", default_execution["exit_code_format"])
+        ),
+        spawn_strategy=(strategy if strategy in SPAWN_STRATEGIES else "auto"),
+        show_pipestatus=bool(execution.get("show_pipestatus", False)),
+        show_rusage=bool(execution.get("show_rusage", False)),
+        default_timeout=max(_number(execution.get("default_timeout"), 0), 0.0),
+        timeout_grace=grace if grace >= 0 else default_execution["timeout_grace"],
+        auto_batch=bool(execution.get("auto_batch", False)),
+    )
+
+    glob = _section(config, "glob")
+    default_glob = defaults["glob"]
+    cache_max_mb = _number(glob.get("cache_max_mb"), default_glob["cache_max_mb"])
+    if cache_max_mb < 0:
+        cache_max_mb = default_glob["cache_max_mb"]
+    recursive = glob.get("recursive", True)
+    follow_symlinks = glob.get("follow_symlinks", False)
+    glob_settings = GlobSettings(
+        enabled=bool(glob.get("enabled", True)),
+        show_expansions=bool(glob.get("show_expansions", False)),
+        cache_max_bytes=int(cache_max_mb * 1024 * 1024),
+        recursive=recursive if isinstance(recursive, bool) else True,
+        walk_workers=_count(glob.get("walk_workers"), 0),
+        max_depth=_count(glob.get("max_depth"), 0),
+        max_matches=_count(glob.get("max_matches"), default_glob["max_matches"]),
+        follow_symlinks=(
+            follow_symlinks if isinstance(follow_symlinks, bool) else False
+        ),
+    )
+
+    parser = _section(config, "parser")
+    default_parser = defaults["parser"]
+    max_capture_mb = _number(
+        parser.get("max_capture_mb"), default_parser["max_capture_mb"]
+    )
+    if max_capture_mb <= 0:
+        max_capture_mb = default_parser["max_capture_mb"]
+    parser_settings = ParserSettings(
+        cache_entries=_count(
+            parser.get("cache_entries"), default_parser["cache_entries"]
+        ),
+        max_capture_bytes=int(max_capture_mb * 1024 * 1024),
+    )
+
+    debug = _section(config, "debug")
+    log_file = debug.get("log_file", defaults["debug"]["log_file"])
+    debug_settings = DebugSettings(
+        log_commands=bool(debug.get("log_commands", False)),
+        log_file=log_file if isinstance(log_file, str) else "",
+        show_fork_pids=bool(debug.get("show_fork_pids", False)),
+    )
+
+    return Settings(
+        prompt=prompt_settings,
+        execution=execution_settings,
+        glob=glob_settings,
+        parser=parser_settings,
+        debug=debug_settings,
+        view=_read_only(config),
+    )
+
+
+def _section(config: Mapping[str, Any], name: str) -> Mapping[str, Any]:
+    """config[name], or {} if missing or not a mapping (malformed config)."""
+    section = config.get(name)
+    return section if isinstance(section, Mapping) else {}
+
+
+def _number(value: Any, default: float) -> float:
+    """value as a float if it is an int or float (not bool), else default."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return float(default)
+    return float(value)
+
+
+def _count(value: Any, default: int) -> int:
+    """value if it is a non-negative int, else default."""
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        return default
+    return value
+
+
+def _exit_code_formatter(format_str: Any) -> Callable[[int], str]:
+    """format_str.format(code=...) as a function, checked once up front."""
+    if isinstance(format_str, str):
+        try:
+            format_str.format(code=0)
+        except (KeyError, IndexError, ValueError, AttributeError):
+            # Invalid format string - use the default
+            pass
+        else:
+            return lambda code: format_str.format(code=code)
+    return lambda code: f"[Exit: {code}]"
+
+
+def _read_only(config: Mapping[str, Any]) -> Mapping[str, Any]:
+    """A read-only copy of config (nested dicts included)."""
+    return MappingProxyType(
+        {
+            key: _read_only(value) if isinstance(value, Mapping) else value
+            for key, value in config.items()
+        }
+    )
+
+
+def default_cache_path() -> str:
+    """Return $XDG_CACHE_HOME/akujobip1/config.marshal (XDG default: ~/.cache)."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "akujobip1", "config.marshal")
+
+
+def load_yaml_file(
+    filepath: Union[str, "os.PathLike[str]"],
+) -> Optional[Dict[str, Any]]:
     """
     Load a YAML file and return its contents.
 
@@ -197,10 +692,12 @@ def load_yaml_file(filepath: Path) -> Optional[Dict[str, Any]]:
     Returns:
         Dictionary from YAML file, or None if file doesn't exist or is invalid
     """
-    if yaml is None:
+    # Checked first, so yaml is only imported when there is a file to read
+    if not os.path.exists(filepath):
         return None
 
-    if not filepath.exists():
+    yaml = _import_yaml()
+    if yaml is None:
         return None
 
     try:
@@ -224,7 +721,7 @@ def load_yaml_file(filepath: Path) -> Optional[Dict[str, Any]]:
         return None
 
 
-def load_config() -> Dict[str, Any]:
+def load_config() -> Settings:
     """
     Load configuration from files with priority order:
     1. Start with built-in defaults
@@ -233,39 +730,229 @@ def load_config() -> Dict[str, Any]:
     4. Merge $AKUJOBIP1_CONFIG (environment variable, highest priority)
 
     Later configs override earlier ones. Missing files are silently skipped.
+    The files' parsed contents come from the config cache when none of
+    them changed since it was written (see the module docstring).
 
     Returns:
-        Configuration dictionary (always valid, uses defaults for missing/invalid values)
+        The compiled Settings: its sections (settings.execution, ...) hold
+        resolved values, and it reads as a read-only configuration mapping
+        too. Always valid: missing or invalid values are the defaults.
     """
-    # Start with default configuration
+    sources = _config_sources()
+    config, _ = _load(sources, _cache_key(sources))
+    return config
+
+
+class ConfigWatcher:
+    """
+    Reloads the configuration when one of its files changes.
+
+    Long-lived interactive sessions pass their config to poll() before
+    each prompt. It costs one clock read until config.reload_interval
+    seconds have passed since the last check; then the files are stat()ed
+    (the config cache key, so nothing is read if none changed). A changed
+    file is loaded as at startup, and:
+        - if any existing file cannot be read or parsed, the previous
+          settings are kept (after the file's warning and a notice)
+        - otherwise the new Settings replace the old ones; what is built
+          from them (parse cache, glob listing cache, walk options) is
+          reconfigured by its readers only where a value changed
+
+    The files watched are those of the directory the watcher was created
+    in: a cd does not switch to another ./akujobip1.yaml.
+
+    Example:
+        >>> watcher = ConfigWatcher()  # before loading, so no edit is missed
+        >>> config = load_config()
+        >>> config = watcher.poll(config)  # config itself unless a file changed
+    """
+
+    __slots__ = ("_sources", "_key", "_next_check", "_clock")
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        Record the state of the config files; the first poll() checks it.
+
+        Args:
+            clock: Monotonic time source in seconds (for tests)
+        """
+        self._clock = clock
+        self._sources = _config_sources()
+        self._key = _cache_key(self._sources)
+        self._next_check = clock()
+
+    def poll(self, config: Mapping[str, Any]) -> Mapping[str, Any]:
+        """
+        Return config, or new Settings if a check is due and a config file
+        changed since the last one.
+        """
+        if self._clock() < self._next_check:
+            return config
+        key = _cache_key(self._sources)
+        if key != self._key:
+            # Recorded even if the load fails, so a broken file is
+            # reported once rather than at every check until it is fixed
+            self._key = key
+            reloaded, complete = _load(self._sources, key)
+            if complete:
+                config = reloaded
+            else:
+                print(
+                    "akujobip1: config reload failed, keeping the previous settings",
+                    file=sys.stderr,
+                )
+        interval = _number(_section(config, "config").get("reload_interval"), 2)
+        self._next_check = self._clock() + interval if interval > 0 else math.inf
+        return config
+
+
+def _load(sources: List[str], cache_key: Tuple[Any, ...]) -> Tuple[Settings, bool]:
+    """
+    Load the config files sources, whose state is cache_key.
+
+    Returns:
+        (the Settings, whether every existing file was read - False if a
+        warning was printed and its contents replaced by defaults)
+    """
+    cache_path = default_cache_path()
+
+    complete = True
+    layers = _read_cache(cache_path, cache_key)
+    if layers is None:
+        layers, complete = _load_layers(sources)
+        # Nothing worth caching without any file, nor after a warning
+        if complete and any(os.path.exists(source) for source in sources):
+            _write_cache(cache_path, cache_key, layers)
+
+    # Start with default configuration, then merge each file's settings
     config = get_default_config()
+    for layer in layers:
+        config = merge_config(config, layer)
 
-    # Priority 1 (lowest): User config directory
-    user_config_dir = Path.home() / ".config" / "akujobip1"
-    user_config_file = user_config_dir / "config.yaml"
-    if user_data := load_yaml_file(user_config_file):
-        config = merge_config(config, user_data)
+    # Expand paths (~ and environment variables)
+    config = expand_paths(config)
+
+    # Validate final configuration (prints warnings but doesn't fail)
+    validate_config(config)
 
-    # Priority 2: Current directory
-    local_config_file = Path.cwd() / "akujobip1.yaml"
-    if local_data := load_yaml_file(local_config_file):
-        config = merge_config(config, local_data)
+    return as_settings(config), complete
 
+
+def _config_sources() -> List[str]:
+    """
+    Config files in priority order, lowest first.
+
+    Built with os.path rather than pathlib, whose import alone costs more
+    than loading a cached config.
+    """
+    sources = [
+        # Priority 1 (lowest): User config directory
+        os.path.join(os.path.expanduser("~"), ".config", "akujobip1", "config.yaml"),
+        # Priority 2: Current directory
+        os.path.join(os.getcwd(), "akujobip1.yaml"),
+    ]
     # Priority 3 (highest): Environment variable
     if env_config_path := os.environ.get("AKUJOBIP1_CONFIG"):
-        env_config_file = Path(env_config_path).expanduser()
-        if env_data := load_yaml_file(env_config_file):
-            config = merge_config(config, env_data)
-        elif env_config_file.exists():
+        sources.append(os.path.expanduser(env_config_path))
+    return sources
+
+
+def _load_layers(sources: List[str]) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Parse the config files.
+
+    Returns:
+        (non-empty file contents in priority order, whether every
+        existing file was read - False if any warning was printed)
+    """
+    layers = []
+    complete = True
+    for index, source in enumerate(sources):
+        if data := load_yaml_file(source):
+            layers.append(data)
+            continue
+        if data is None and os.path.exists(source):
+            # load_yaml_file() printed a warning (or PyYAML is missing)
+            complete = False
+        # The third source is $AKUJOBIP1_CONFIG, which should not be empty
+        if index == 2 and os.path.exists(source):
+            complete = False
             print(
-                f"Warning: Invalid or unreadable config file at $AKUJOBIP1_CONFIG: {env_config_path}",
+                "Warning: Invalid or unreadable config file at "
+                f"$AKUJOBIP1_CONFIG: {os.environ.get('AKUJOBIP1_CONFIG', source)}",
                 file=sys.stderr,
             )
+    return layers, complete
 
-    # Expand paths (~ and environment variables)
-    config = expand_paths(config)
 
-    # Validate final configuration (prints warnings but doesn't fail)
-    validate_config(config)
+def _cache_key(sources: List[str]) -> Tuple[Any, ...]:
+    """What the cached contents depend on: $AKUJOBIP1_CONFIG and each file's state."""
+    states: List[Any] = [os.environ.get("AKUJOBIP1_CONFIG")]
+    for source in sources:
+        try:
+            st = os.stat(source)
+        except (OSError, ValueError):
+            states.append((source, None))
+            continue
+        states.append((source, st.st_size, st.st_mtime_ns, st.st_ctime_ns, st.st_ino))
+    return tuple(states)
 
-    return config
+
+def _read_cache(path: str, key: Tuple[Any, ...]) -> Optional[List[Dict[str, Any]]]:
+    """Cached file contents for key, or None on a miss or unreadable cache."""
+    try:
+        with open(path, "rb") as f:
+            version, cached_key, layers = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if version != _CACHE_FORMAT_VERSION or cached_key != key:
+        return None
+    if not isinstance(layers, list) or not all(
+        isinstance(layer, dict) for layer in layers
+    ):
+        return None
+    return layers
+
+
+def _write_cache(path: str, key: Tuple[Any, ...], layers: List[Dict[str, Any]]) -> None:
+    """Store the file contents for key; failures are ignored."""
+    try:
+        data = marshal.dumps((_CACHE_FORMAT_VERSION, key, layers))
+    except ValueError:
+        # Values marshal can't store (e.g. YAML timestamps) - load them each time
+        return
+
+    # Write to a temporary file and rename, so a shell starting at the
+    # same time never reads a half-written cache (named by pid rather than
+    # with tempfile, which is slow to import)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except OSError:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+
+
+def _import_yaml() -> Any:
+    """The yaml module, or None (with a warning, once) if PyYAML is missing."""
+    global _yaml
+    if _yaml is None:
+        try:
+            import yaml
+
+            _yaml = yaml
+        except ImportError:
+            print(
+                "Warning: PyYAML not installed. Using defaults only.", file=sys.stderr
+            )
+            _yaml = False
+    return _yaml or None
@@ -2,39 +2,280 @@
 External command executor module.
 
 This module handles execution of external commands using POSIX
-system calls: fork(), execvp(), and waitpid().
+system calls: fork(), execv(), posix_spawn(), and wait4(). Command names
+are resolved against PATH through the command hash table (pathcache.py).
+
+wait4() is waitpid() plus the child's resource usage (CPU time, max RSS,
+page faults, context switches), which is recorded for every foreground
+command and pipeline and reported by the time built-in and by
+execution.show_rusage.
+
+Commands can be given a deadline (execution.default_timeout or the timeout
+built-in). The shell then sleeps in poll() on the children's pidfds, which
+become readable when they exit, instead of blocking in wait4() forever; a
+command still running at the deadline gets SIGTERM, then SIGKILL after a
+grace period, and the shell reports exit code 124.
+
+Redirections (<, >, 2>&1, here-strings; see the redirection module) and
+pipes reach a command as (source_fd, target_fd) pairs, which become
+posix_spawn() file actions or dup2() calls in the forked child - the
+shell's own descriptors 0-2 are never touched for an external command.
 
 POSIX References:
     - fork(): https://pubs.opengroup.org/onlinepubs/9699919799/functions/fork.html
     - exec family: https://pubs.opengroup.org/onlinepubs/9699919799/functions/exec.html
+    - posix_spawn(): https://pubs.opengroup.org/onlinepubs/9699919799/functions/posix_spawn.html
     - waitpid(): https://pubs.opengroup.org/onlinepubs/9699919799/functions/wait.html
+    - getrusage() fields: https://pubs.opengroup.org/onlinepubs/9699919799/functions/getrusage.html
     - Exit status macros: https://pubs.opengroup.org/onlinepubs/9699919799/functions/wait.html
 """
 
+import errno
 import os
+import select
+import selectors
 import sys
 import signal
-from typing import List, Dict, Any
+import time
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+from akujobip1.config import ShowExitCodes, as_settings
+from akujobip1.jobs import JOB_TABLE
+from akujobip1.pathcache import COMMAND_HASH
+from akujobip1.zygote import ZYGOTE, ZygoteError
+
+# Exit code of a command killed for exceeding its timeout (as GNU timeout)
+TIMEOUT_EXIT_CODE = 124
+
+# Seconds between SIGTERM and SIGKILL when execution.timeout_grace is unset
+DEFAULT_TIMEOUT_GRACE = 2.0
+
+# execution.show_exit_codes modes, looked up once (reading a member from
+# an Enum class costs more than the rest of display_exit_status())
+_SHOW_ALWAYS = ShowExitCodes.ALWAYS
+_SHOW_ON_FAILURE = ShowExitCodes.ON_FAILURE
+
+# Initial size of a capture_output() buffer (doubled as needed)
+_CAPTURE_CHUNK = 65536
+
+# Source descriptor in a redirection pair meaning "close the target"
+# (n>&- on the command line)
+CLOSE_FD = -1
+
+
+class ResourceUsage:
+    """
+    Resources used by a command (from wait4()), plus its wall-clock time.
+
+    Attributes:
+        real_time: Wall-clock seconds from launch to reap
+        user_time: CPU seconds in user mode
+        system_time: CPU seconds in the kernel
+        max_rss_kb: Peak resident set size in kilobytes (Linux units). Linux
+                    counts the image the child had before exec(), so this
+                    is never below the launcher's (shell or zygote) RSS.
+        minor_faults: Page faults served without I/O
+        major_faults: Page faults that required I/O
+        voluntary_switches: Context switches while waiting (I/O, sleep)
+        involuntary_switches: Context switches forced by the scheduler
+
+    A plain slotted class rather than a dataclass: importing dataclasses
+    (and the inspect module it pulls in) would slow down shell startup.
+    """
+
+    __slots__ = (
+        "real_time",
+        "user_time",
+        "system_time",
+        "max_rss_kb",
+        "minor_faults",
+        "major_faults",
+        "voluntary_switches",
+        "involuntary_switches",
+    )
+
+    def __init__(
+        self,
+        real_time: float = 0.0,
+        user_time: float = 0.0,
+        system_time: float = 0.0,
+        max_rss_kb: int = 0,
+        minor_faults: int = 0,
+        major_faults: int = 0,
+        voluntary_switches: int = 0,
+        involuntary_switches: int = 0,
+    ) -> None:
+        self.real_time = real_time
+        self.user_time = user_time
+        self.system_time = system_time
+        self.max_rss_kb = max_rss_kb
+        self.minor_faults = minor_faults
+        self.major_faults = major_faults
+        self.voluntary_switches = voluntary_switches
+        self.involuntary_switches = involuntary_switches
 
+    def _fields(self) -> Tuple[Any, ...]:
+        """The attributes, in order."""
+        return tuple(getattr(self, name) for name in self.__slots__)
 
-def execute_external_command(args: List[str], config: Dict[str, Any]) -> int:
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ResourceUsage):
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{name}={value!r}" for name, value in zip(self.__slots__, self._fields())
+        )
+        return f"ResourceUsage({fields})"
+
+    @classmethod
+    def from_rusage(cls, rusage: Any, real_time: float = 0.0) -> "ResourceUsage":
+        """Build from a struct_rusage (os.wait4() / resource.getrusage())."""
+        return cls(real_time, *rusage_fields(rusage))
+
+    def __add__(self, other: "ResourceUsage") -> "ResourceUsage":
+        """
+        Combine the usage of processes that ran together (pipeline stages).
+
+        CPU time, faults and switches add up; wall time and peak RSS are
+        the largest of the two, since the processes overlapped.
+        """
+        return ResourceUsage(
+            max(self.real_time, other.real_time),
+            self.user_time + other.user_time,
+            self.system_time + other.system_time,
+            max(self.max_rss_kb, other.max_rss_kb),
+            self.minor_faults + other.minor_faults,
+            self.major_faults + other.major_faults,
+            self.voluntary_switches + other.voluntary_switches,
+            self.involuntary_switches + other.involuntary_switches,
+        )
+
+    def summary(self) -> str:
+        """
+        One-line summary (used by execution.show_rusage).
+
+        Example:
+            >>> ResourceUsage(0.5, 0.25, 0.125, 2048, 100, 1, 3, 4).summary()
+            'real 0.500s user 0.250s sys 0.125s maxrss 2048KB faults 100/1 ctxsw 3/4'
+        """
+        return (
+            f"real {self.real_time:.3f}s user {self.user_time:.3f}s "
+            f"sys {self.system_time:.3f}s maxrss {self.max_rss_kb}KB "
+            f"faults {self.minor_faults}/{self.major_faults} "
+            f"ctxsw {self.voluntary_switches}/{self.involuntary_switches}"
+        )
+
+
+def rusage_fields(rusage: Any) -> Tuple[float, float, int, int, int, int, int]:
     """
-    Execute external command using fork/exec/wait.
+    Extract the fields ResourceUsage keeps, in its attribute order.
+
+    Also used by the zygote to forward its children's usage.
+    """
+    return (
+        rusage.ru_utime,
+        rusage.ru_stime,
+        rusage.ru_maxrss,
+        rusage.ru_minflt,
+        rusage.ru_majflt,
+        rusage.ru_nvcsw,
+        rusage.ru_nivcsw,
+    )
+
+
+# Usage of the most recent foreground command, pipeline or parallel run
+_last_usage: Optional[ResourceUsage] = None
+
+
+def last_resource_usage() -> Optional[ResourceUsage]:
+    """
+    Resource usage of the most recent foreground command or pipeline.
+
+    Also set by $(command), by the parallel built-in (all of its jobs
+    together) and by waiting for a background job.
+
+    Returns:
+        ResourceUsage, or None if nothing has run yet
+    """
+    return _last_usage
+
+
+def record_usage(usage: ResourceUsage) -> None:
+    """Remember usage as the most recent command's (see last_resource_usage())."""
+    global _last_usage
+    _last_usage = usage
+
+
+def resolve_spawn_strategy(config: Dict[str, Any]) -> str:
+    """
+    Resolve the configured spawn strategy to a concrete launch method.
+
+    Args:
+        config: Configuration dictionary containing execution settings
+
+    Returns:
+        'fork', 'posix_spawn' or 'zygote' ('zygote' starts the zygote if
+        needed and falls back to posix_spawn/fork if it cannot run)
+
+    Example:
+        >>> resolve_spawn_strategy({'execution': {'spawn_strategy': 'fork'}})
+        'fork'
+        >>> resolve_spawn_strategy({})  # auto on Linux
+        'posix_spawn'
+    """
+    # Unknown values are already auto (validate_config warned about them)
+    strategy = as_settings(config).execution.spawn_strategy
+
+    if strategy == "zygote":
+        if ZYGOTE.start():
+            return "zygote"
+        strategy = "auto"
+
+    if strategy in ("auto", "posix_spawn"):
+        if hasattr(os, "posix_spawn"):
+            return "posix_spawn"
+        return "fork"
+    return strategy
+
+
+def execute_external_command(
+    args: List[str],
+    config: Dict[str, Any],
+    timeout: Optional[float] = None,
+    grace: Optional[float] = None,
+    redirections: Sequence[Tuple[int, int]] = (),
+) -> int:
+    """
+    Execute external command using fork/exec/wait or posix_spawn/wait.
 
     This function demonstrates POSIX process management by:
-    1. Forking the current process to create a child
-    2. In child: replacing process image with command using execvp()
-    3. In parent: waiting for child completion using waitpid()
+    1. Creating a child process running the command, either by
+       fork() + execv() or by a single posix_spawn() call
+    2. In parent: waiting for child completion using waitpid()
+
+    posix_spawn() (the default via spawn_strategy 'auto') avoids copying
+    the shell's page tables on every launch, so its cost does not grow with
+    the size of the Python interpreter. fork() is kept for teaching and for
+    platforms without posix_spawn.
 
     Args:
         args: Command arguments where args[0] is the command name.
               Must be non-empty list with at least one element.
         config: Configuration dictionary containing execution settings.
+        timeout: Seconds the command may run before it is terminated
+                 (None = execution.default_timeout, 0 = no limit)
+        grace: Seconds between SIGTERM and SIGKILL once the timeout
+               expires (None = execution.timeout_grace)
+        redirections: (source_fd, target_fd) pairs to apply in the child
+                      (see the redirection module)
 
     Returns:
         Exit code from the executed command:
         - 0: Success
-        - 1-125: Command-specific error codes
+        - 1-123: Command-specific error codes
+        - 124: Timed out (killed after exceeding the timeout)
         - 126: Command not executable (permission denied)
         - 127: Command not found
         - 128+N: Terminated by signal N
@@ -57,124 +298,987 @@ def execute_external_command(args: List[str], config: Dict[str, Any]) -> int:
         print("Error: No command specified", file=sys.stderr)
         return 1
 
+    started = time.perf_counter()
+    timeout, grace = _timeout_settings(config, timeout, grace)
+    strategy = resolve_spawn_strategy(config)
+    if strategy == "zygote" and _zygote_can_redirect(args, redirections):
+        try:
+            return _execute_via_zygote(
+                args, config, started, timeout, grace, redirections
+            )
+        except ZygoteError as e:
+            # Zygote died - run this (and later) commands without it
+            print(f"Warning: {e}, using posix_spawn", file=sys.stderr)
+            strategy = "posix_spawn" if hasattr(os, "posix_spawn") else "fork"
+
+    pid, exit_code = start_command(args, config, strategy, redirections)
+    if pid is None:
+        # Command never started (not found, not executable, fork failed)
+        if redirections:
+            # start_command() only displays this for unredirected commands
+            display_exit_status(exit_code << 8, config)
+        record_usage(ResourceUsage(time.perf_counter() - started))
+        return exit_code
+
+    # Step 3: Wait for child to complete
+    # POSIX waitpid() suspends execution until the specified child changes state.
+    # With options=0, it waits for termination (not stop/continue).
+    # wait4() is the same wait, and also returns the child's struct rusage.
+    # Returns tuple: (child_pid, status, rusage)
+    # status is encoded - use POSIX macros (WIFEXITED, WEXITSTATUS, etc.) to decode.
+    # Reference: https://pubs.opengroup.org/onlinepubs/9699919799/functions/wait.html
+    # With a timeout, first sleep until the child exits or the deadline
+    # passes (killing it then), so the wait4() below never blocks for long.
+    timed_out = timeout > 0 and _wait_for_exit([pid], timeout, grace)
+    try:
+        child_pid, status, rusage = os.wait4(pid, 0)
+    except ChildProcessError:
+        # This shouldn't happen (child already reaped)
+        # But handle it defensively
+        print("Error: Child process not found", file=sys.stderr)
+        return 1
+    usage = ResourceUsage.from_rusage(rusage, time.perf_counter() - started)
+    record_usage(usage)
+
+    if timed_out:
+        return _report_timeout(args[0], timeout, config, usage)
+
+    # Step 4: Display exit status (and resource usage) if configured
+    display_exit_status(status, config, usage=usage)
+
+    # Step 5: Extract and return exit code using POSIX status macros
+    return status_to_exit_code(status)
+
+
+def execute_pipeline(
+    stages: List[List[str]],
+    config: Dict[str, Any],
+    background: bool = False,
+    command: str = "",
+    redirections: Optional[Sequence[Sequence[Tuple[int, int]]]] = None,
+) -> int:
+    """
+    Execute a pipeline (cmd1 | cmd2 | ... | cmdN), optionally in the background.
+
+    Each adjacent pair of stages is connected with a pipe(). All stages
+    are started before any is waited for, so they run concurrently and
+    data flows straight from one child to the next through the kernel -
+    the shell never reads or copies it, and nothing touches the disk.
+    The shell closes its copies of every pipe end right after the stages
+    using it have started, so readers see EOF and writers get SIGPIPE
+    exactly as they would under /bin/sh.
+
+    Built-in commands may appear in a pipeline; they run in a forked
+    child (a subshell), so e.g. 'cd' in a pipeline doesn't affect the shell.
+
+    Background pipelines (cmd &) are not waited for. Their processes are
+    put in a new process group (so Ctrl+C at the prompt doesn't reach them),
+    read stdin from /dev/null, and are registered in the job table, which
+    reaps them asynchronously.
+
+    Args:
+        stages: Argument lists, one per stage (each non-empty)
+        config: Configuration dictionary containing execution settings
+        background: Start the pipeline as a background job and return at once
+        command: Command line text shown by the jobs built-in
+        redirections: Each stage's own (source_fd, target_fd) pairs,
+                      applied after its pipes (see the redirection module)
+
+    Returns:
+        Exit code of the last stage (POSIX pipeline semantics), or 0 once a
+        background job has been started
+
+    Example:
+        >>> execute_pipeline([['ls'], ['grep', 'txt'], ['wc', '-l']], config)
+        2
+        0
+        >>> execute_pipeline([['sleep', '10']], config, True, 'sleep 10')
+        [1] 12345
+        0
+    """
+    if not stages or not all(stages):
+        print("Error: No command specified", file=sys.stderr)
+        return 1
+
+    start_time = time.perf_counter()
+    strategy = resolve_spawn_strategy(config)
+    started: List[Tuple[Optional[int], int]] = []
+    read_end: Optional[int] = None
+    pgid: Optional[int] = None
+
+    if background:
+        # Background jobs must not compete with the shell for terminal input
+        read_end = os.open(os.devnull, os.O_RDONLY)
+
+    # Step 1: Start every stage, wiring stdin/stdout through pipes
+    # POSIX pipe() returns a (read, write) pair of file descriptors.
+    # Python creates them close-on-exec, so only the dup2()'d copies on
+    # fds 0/1 survive into each command.
+    # Reference: https://pubs.opengroup.org/onlinepubs/9699919799/functions/pipe.html
+    try:
+        for index, args in enumerate(stages):
+            pairs: List[Tuple[int, int]] = []
+            if read_end is not None:
+                pairs.append((read_end, 0))
+
+            write_end = None
+            next_read = None
+            if index < len(stages) - 1:
+                try:
+                    next_read, write_end = os.pipe()
+                except OSError as e:
+                    print(f"Error: Pipe failed: {e}", file=sys.stderr)
+                    started.append((None, 1))
+                    break
+                pairs.append((write_end, 1))
+            if redirections is not None:
+                pairs.extend(redirections[index])
+
+            if background:
+                # First stage leads a new process group; the rest join it
+                pid, exit_code = start_command(
+                    args, config, strategy, pairs, pgid=pgid or 0
+                )
+                if pgid is None and pid is not None:
+                    pgid = pid
+            else:
+                pid, exit_code = start_command(args, config, strategy, pairs)
+            started.append((pid, exit_code))
+
+            # The parent must not hold pipe ends open, or readers never
+            # see EOF
+            if read_end is not None:
+                os.close(read_end)
+            if write_end is not None:
+                os.close(write_end)
+            read_end = next_read
+    finally:
+        if read_end is not None:
+            os.close(read_end)
+
+    if background:
+        pids = [pid for pid, _ in started if pid is not None]
+        if not pids:
+            # Nothing started; errors were already reported
+            return started[-1][1]
+        # Register with the job table, which reaps the job asynchronously
+        job = JOB_TABLE.add(pids, command or " | ".join(" ".join(a) for a in stages))
+        print(f"[{job.job_id}] {pids[-1]}", file=sys.stderr)
+        return 0
+
+    # With a timeout, wait (without reaping) until every stage has exited,
+    # terminating whatever is still running at the deadline
+    timeout, grace = _timeout_settings(config, None, None)
+    running = [pid for pid, _ in started if pid is not None]
+    timed_out = timeout > 0 and _wait_for_exit(running, timeout, grace)
+
+    # Step 2: Reap every stage, in order, adding up their resource usage
+    pipestatus: List[int] = []
+    status = 0
+    usage = ResourceUsage()
+    for pid, exit_code in started:
+        if pid is None:
+            status = exit_code << 8
+        else:
+            try:
+                _, status, rusage = os.wait4(pid, 0)
+                usage += ResourceUsage.from_rusage(rusage)
+            except ChildProcessError:
+                status = 1 << 8
+        pipestatus.append(status_to_exit_code(status))
+    usage.real_time = time.perf_counter() - start_time
+    record_usage(usage)
+
+    if timed_out:
+        return _report_timeout(stages[0][0], timeout, config, usage)
+
+    # Step 3: The pipeline's status is the last stage's status
+    display_exit_status(status, config, pipestatus=pipestatus, usage=usage)
+    return pipestatus[-1]
+
+
+def capture_command(
+    args: List[str], config: Dict[str, Any]
+) -> Tuple[int, bytes, bytes]:
+    """
+    Run an external command and collect its output instead of showing it.
+
+    stdout and stderr go to separate pipes that are drained together
+    through a selector (so a chatty stderr cannot deadlock a full stdout
+    pipe); stdin is /dev/null. Used by the memo built-in.
+
+    Args:
+        args: Command arguments where args[0] is the command name
+        config: Configuration dictionary
+
+    Returns:
+        (exit_code, stdout, stderr). If the command could not be started,
+        the error has already been reported and both outputs are empty.
+
+    Example:
+        >>> capture_command(['echo', 'hi'], {})
+        (0, b'hi\\n', b'')
+    """
+    started = time.perf_counter()
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    out_read, out_write = os.pipe()
+    err_read, err_write = os.pipe()
+    try:
+        pid, exit_code = start_command(
+            args,
+            config,
+            resolve_spawn_strategy(config),
+            [(devnull, 0), (out_write, 1), (err_write, 2)],
+        )
+    finally:
+        for fd in (devnull, out_write, err_write):
+            os.close(fd)
+
+    output = {out_read: bytearray(), err_read: bytearray()}
+    selector = selectors.DefaultSelector()
+    try:
+        if pid is not None:
+            for fd in output:
+                selector.register(fd, selectors.EVENT_READ)
+            while selector.get_map():
+                for key, _ in selector.select():
+                    data = os.read(key.fd, 65536)
+                    if data:
+                        output[key.fd] += data
+                    else:
+                        selector.unregister(key.fd)
+    finally:
+        selector.close()
+        os.close(out_read)
+        os.close(err_read)
+
+    if pid is None:
+        record_usage(ResourceUsage(time.perf_counter() - started))
+        return exit_code, b"", b""
+
+    _, status, rusage = os.wait4(pid, 0)
+    record_usage(ResourceUsage.from_rusage(rusage, time.perf_counter() - started))
+    return status_to_exit_code(status), bytes(output[out_read]), bytes(output[err_read])
+
+
+def capture_output(
+    stages: List[List[str]],
+    config: Dict[str, Any],
+    max_bytes: int,
+    redirections: Optional[Sequence[Sequence[Tuple[int, int]]]] = None,
+) -> Tuple[int, Optional[bytearray]]:
+    """
+    Run a command or pipeline and collect its stdout, up to max_bytes.
+
+    The stages are wired together as in execute_pipeline(); the last one
+    writes into a pipe that is read with readv() directly into a
+    preallocated bytearray, doubled whenever it fills (never past
+    max_bytes + 1), so a large output costs no chain of intermediate
+    bytes objects. stdin and stderr are the shell's. Used for $(command).
+    The stages' combined resource usage is recorded as the last usage.
+
+    Args:
+        stages: Argument lists, one per stage (each non-empty)
+        config: Configuration dictionary
+        max_bytes: Most output to accept (must be positive)
+        redirections: Each stage's own (source_fd, target_fd) pairs, as
+                      in execute_pipeline()
+
+    Returns:
+        (exit code of the last stage, output). output is None if the
+        command printed more than max_bytes; it was then sent SIGTERM
+        (and its pipe closed) instead of being read to the end.
+
+    Example:
+        >>> capture_output([['echo', 'hi']], {}, 1024)
+        (0, bytearray(b'hi\\n'))
+    """
+    start_time = time.perf_counter()
+    strategy = resolve_spawn_strategy(config)
+    started: List[Tuple[Optional[int], int]] = []
+    out_read, out_write = os.pipe()
+    read_end: Optional[int] = None
+    try:
+        for index, args in enumerate(stages):
+            pairs: List[Tuple[int, int]] = []
+            if read_end is not None:
+                pairs.append((read_end, 0))
+            next_read = None
+            if index < len(stages) - 1:
+                next_read, write_end = os.pipe()
+            else:
+                write_end = out_write
+            pairs.append((write_end, 1))
+            if redirections is not None:
+                pairs.extend(redirections[index])
+            started.append(start_command(args, config, strategy, pairs))
+
+            if read_end is not None:
+                os.close(read_end)
+            if write_end != out_write:
+                os.close(write_end)
+            read_end = next_read
+    finally:
+        if read_end is not None:
+            os.close(read_end)
+        # Only the children may hold the write end, or the read never ends
+        os.close(out_write)
+
+    try:
+        output = _read_capped(out_read, max_bytes)
+    finally:
+        os.close(out_read)
+
+    if output is None:
+        # Too much output: stop the writers instead of draining them
+        for pid, _ in started:
+            if pid is not None:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+
+    status = 0
+    usage = ResourceUsage()
+    for pid, exit_code in started:
+        if pid is None:
+            status = exit_code << 8
+        else:
+            try:
+                _, status, rusage = os.wait4(pid, 0)
+                usage += ResourceUsage.from_rusage(rusage)
+            except ChildProcessError:
+                status = 1 << 8
+    usage.real_time = time.perf_counter() - start_time
+    record_usage(usage)
+    return status_to_exit_code(status), output
+
+
+def _read_capped(fd: int, max_bytes: int) -> Optional[bytearray]:
+    """Read fd to EOF into one bytearray (None once past max_bytes)."""
+    buffer = bytearray(min(_CAPTURE_CHUNK, max_bytes + 1))
+    length = 0
+    while True:
+        if length == len(buffer):
+            if length > max_bytes:
+                return None
+            # Double the buffer, but read at most one byte past the cap
+            buffer.extend(bytes(min(length, max_bytes + 1 - length)))
+        with memoryview(buffer)[length:] as free:
+            count = os.readv(fd, [free])
+        if count == 0:
+            break
+        length += count
+    del buffer[length:]
+    return buffer
+
+
+def write_output(stream: Any, data: bytes) -> None:
+    """
+    Write captured bytes to a text stream (sys.stdout / sys.stderr).
+
+    Goes through the stream's binary buffer when it has one, so output is
+    passed on byte for byte; anything already buffered as text is flushed
+    first to keep the order.
+    """
+    if not data:
+        return
+    buffer = getattr(stream, "buffer", None)
+    if buffer is None:
+        stream.write(bytes(data).decode(errors="replace"))
+        return
+    stream.flush()
+    buffer.write(data)
+    buffer.flush()
+
+
+def start_command(
+    args: List[str],
+    config: Dict[str, Any],
+    strategy: str,
+    redirections: Sequence[Tuple[int, int]] = (),
+    pgid: Optional[int] = None,
+) -> Tuple[Optional[int], int]:
+    """
+    Start one command without waiting for it.
+
+    Used for pipeline stages, background jobs and the parallel built-in;
+    the caller owns the child and must reap it. Resolves the command
+    through the hash table, then launches it with the given strategy.
+    Built-in commands (only reachable here from a pipeline or background
+    job) are run in a forked child.
+
+    Args:
+        args: Command arguments where args[0] is the command name
+        config: Configuration dictionary
+        strategy: 'fork' or 'posix_spawn' (from resolve_spawn_strategy);
+                  'zygote' means posix_spawn here, since the caller needs
+                  the child to be its own
+        redirections: (source_fd, target_fd) pairs to dup2() in the child,
+                      in order (source CLOSE_FD closes the target)
+        pgid: Process group to put the child in (0 = new group led by the
+              child), or None to stay in the shell's group
+
+    Returns:
+        (pid, 0) if the child started, or (None, exit_code) if it could not
+        be started. In the latter case the error has already been reported
+        (and for standalone commands, displayed).
+    """
+    show_pids = as_settings(config).debug.show_fork_pids
+
+    builtin = None
+    if redirections:
+        # Lazy import: builtins is a higher-level module than the executor
+        from akujobip1.builtins import get_builtin
+
+        builtin = get_builtin(args[0])
+
+    path = None
+    if builtin is None:
+        # Resolve the command through the hash table before creating a child.
+        # Unknown commands (cached misses included) are reported right here,
+        # so "command not found" costs no fork at all.
+        path = COMMAND_HASH.lookup(args[0])
+        if path is None:
+            exit_code = _exec_error_exit_code(args[0], FileNotFoundError())
+            if not redirections:
+                display_exit_status(exit_code << 8, config)
+            return None, exit_code
+
     # Debug output if enabled
-    # Handle None values in config (malformed config)
-    debug_config = config.get("debug", {})
-    if debug_config is None:
-        debug_config = {}
-    if debug_config.get("show_fork_pids", False):
+    if show_pids:
+        print(f"[About to fork for: {args[0]}]", file=sys.stderr)
+
+    if builtin is None and strategy in ("posix_spawn", "zygote"):
+        # posix_spawn() creates the child and execs the command in one call.
+        # glibc implements it with a vfork-style clone, so no page tables are
+        # copied. Exec failures are reported to the parent as OSError.
+        # Reference: https://pubs.opengroup.org/onlinepubs/9699919799/functions/posix_spawn.html
+        try:
+            pid = _spawn_child(path, args, redirections, pgid)
+        except OSError as e:
+            # Same exit codes the forked child would have produced
+            exit_code = _exec_error_exit_code(args[0], e)
+            if not redirections:
+                display_exit_status(exit_code << 8, config)
+            return None, exit_code
+    else:
+        # Step 1: Fork the process
+        # POSIX fork() creates an exact duplicate of the current process.
+        # Both parent and child continue from this point, but fork() returns:
+        #   - 0 in the child process
+        #   - child's PID in the parent process
+        #   - -1 on error (raises OSError in Python)
+        # Reference: https://pubs.opengroup.org/onlinepubs/9699919799/functions/fork.html
+        if builtin is not None:
+            # Unflushed output would otherwise be written twice
+            sys.stdout.flush()
+            sys.stderr.flush()
+        try:
+            pid = os.fork()
+        except OSError as e:
+            # Fork can fail if system resource limits are reached
+            # Common errors: EAGAIN (process limit), ENOMEM (out of memory)
+            print(f"Error: Fork failed: {e}", file=sys.stderr)
+            return None, 1
+
+        # Step 2: Handle child and parent differently
+        if pid == 0:
+            # CHILD PROCESS PATH - never returns
+            if pgid is not None:
+                _join_process_group(0, pgid)
+            if builtin is not None:
+                _run_builtin_child(builtin, args, config, redirections)
+            _exec_child(path, args, redirections)
+
+        if pgid is not None:
+            # Set it from both sides so it holds whichever runs first
+            # Reference: https://pubs.opengroup.org/onlinepubs/9699919799/functions/setpgid.html
+            _join_process_group(pid, pgid)
+
+    # PARENT PROCESS PATH
+    # Debug output showing child PID
+    if show_pids:
+        print(f"[Forked child PID: {pid}]", file=sys.stderr)
+    return pid, 0
+
+
+def _execute_via_zygote(
+    args: List[str],
+    config: Dict[str, Any],
+    started: float,
+    timeout: float,
+    grace: float,
+    redirections: Sequence[Tuple[int, int]] = (),
+) -> int:
+    """
+    Run one foreground command through the zygote and wait for it.
+
+    Same behaviour as the fork/posix_spawn path, except that the zygote
+    creates the child and forwards its wait status to us. Redirection
+    source fds are passed to the zygote along with the request.
+
+    Raises:
+        ZygoteError: The zygote is gone (caller falls back)
+    """
+    show_pids = as_settings(config).debug.show_fork_pids
+
+    path = COMMAND_HASH.lookup(args[0])
+    if path is None:
+        exit_code = _exec_error_exit_code(args[0], FileNotFoundError())
+        display_exit_status(exit_code << 8, config)
+        record_usage(ResourceUsage(time.perf_counter() - started))
+        return exit_code
+
+    if show_pids:
         print(f"[About to fork for: {args[0]}]", file=sys.stderr)
 
-    # Step 1: Fork the process
-    # POSIX fork() creates an exact duplicate of the current process.
-    # Both parent and child continue from this point, but fork() returns:
-    #   - 0 in the child process
-    #   - child's PID in the parent process
-    #   - -1 on error (raises OSError in Python)
-    # Reference: https://pubs.opengroup.org/onlinepubs/9699919799/functions/fork.html
+    # The child writes straight to fd 1/2 from another process
+    sys.stdout.flush()
+    sys.stderr.flush()
     try:
-        pid = os.fork()
+        pid = ZYGOTE.spawn(path, args, redirections)
+    except ZygoteError:
+        raise
     except OSError as e:
-        # Fork can fail if system resource limits are reached
-        # Common errors: EAGAIN (process limit), ENOMEM (out of memory)
-        print(f"Error: Fork failed: {e}", file=sys.stderr)
-        return 1
+        # Launch failed inside the zygote; errno comes back intact, so the
+        # exit codes match the posix_spawn path (127, 126, 1)
+        exit_code = _exec_error_exit_code(args[0], e)
+        display_exit_status(exit_code << 8, config)
+        record_usage(ResourceUsage(time.perf_counter() - started))
+        return exit_code
+
+    if show_pids:
+        print(f"[Forked child PID: {pid}]", file=sys.stderr)
+
+    # pidfds work for any process, not only our children, so the deadline
+    # is enforced the same way. The zygote reaps the child with wait4()
+    # and forwards its rusage too.
+    timed_out = timeout > 0 and _wait_for_exit([pid], timeout, grace)
+    status, fields = ZYGOTE.wait4(pid)
+    usage = ResourceUsage(time.perf_counter() - started, *fields)
+    record_usage(usage)
+    if timed_out:
+        return _report_timeout(args[0], timeout, config, usage)
+    display_exit_status(status, config, usage=usage)
+    return status_to_exit_code(status)
+
+
+def _zygote_can_redirect(
+    args: List[str], redirections: Sequence[Tuple[int, int]]
+) -> bool:
+    """
+    True if the zygote can apply these redirections for this command.
+
+    The zygote only dup2()s, so closing redirections ('>&-') go through
+    start_command(), as do redirected built-ins (which run in a fork).
+    """
+    if not redirections:
+        return True
+    if any(source == CLOSE_FD for source, _ in redirections):
+        return False
+    # Lazy import: builtins is a higher-level module than the executor
+    from akujobip1.builtins import get_builtin
+
+    return get_builtin(args[0]) is None
+
+
+def _timeout_settings(
+    config: Dict[str, Any], timeout: Optional[float], grace: Optional[float]
+) -> Tuple[float, float]:
+    """
+    Resolve timeout and grace period, falling back to the configuration.
+
+    Returns:
+        (timeout, grace) in seconds; timeout 0 means no limit
+    """
+    # The configured values are already resolved (see as_settings())
+    execution = as_settings(config).execution
+    if timeout is None:
+        timeout = execution.default_timeout
+    if grace is None:
+        grace = execution.timeout_grace
+
+    # Invalid values mean no limit / the default grace period
+    if isinstance(timeout, bool) or not isinstance(timeout, (int, float)):
+        timeout = 0
+    if isinstance(grace, bool) or not isinstance(grace, (int, float)) or grace < 0:
+        grace = DEFAULT_TIMEOUT_GRACE
+    return max(float(timeout), 0.0), float(grace)
+
+
+def _wait_for_exit(pids: List[int], timeout: float, grace: float) -> bool:
+    """
+    Sleep until every process in pids has exited, enforcing a deadline.
+
+    The processes are not reaped, so the caller collects their statuses
+    with wait4() (or from the zygote) as usual. Processes still running
+    after timeout seconds get SIGTERM; those still running grace seconds
+    later get SIGKILL.
+
+    Args:
+        pids: Processes to wait for
+        timeout: Seconds until the deadline (> 0)
+        grace: Seconds between SIGTERM and SIGKILL
+
+    Returns:
+        True if the deadline passed and signals were sent, False if every
+        process exited in time
+    """
+    watcher = _ExitWatcher(pids)
+    try:
+        if watcher.wait(timeout):
+            return False
+        watcher.signal_remaining(signal.SIGTERM)
+        if not watcher.wait(grace):
+            watcher.signal_remaining(signal.SIGKILL)
+            watcher.wait(None)
+        return True
+    finally:
+        watcher.close()
+
+
+class _ExitWatcher:
+    """
+    Waits for a set of processes to exit without reaping them.
+
+    Each process is watched through a pidfd (Linux 5.3+) registered with
+    poll(): a pidfd becomes readable when its process exits, so waiting
+    costs no CPU and needs no thread or SIGCHLD handler. Processes without
+    a pidfd are checked with waitid(WNOWAIT) at a backing-off interval.
+    """
+
+    # Longest sleep between checks of processes without a pidfd
+    _MAX_POLL_INTERVAL = 0.05
+
+    # Longest single poll() (its millisecond timeout is a C int); longer
+    # timeouts just poll again
+    _MAX_POLL_WAIT = 86400.0
+
+    def __init__(self, pids: List[int]) -> None:
+        self._poller = select.poll()
+        self._pidfds: Dict[int, int] = {}
+        self._unwatched: List[int] = []
+        pidfd_open = getattr(os, "pidfd_open", None)
+        for pid in pids:
+            try:
+                if pidfd_open is None:
+                    raise OSError("pidfd_open unavailable")
+                pidfd = pidfd_open(pid)
+            except OSError:
+                self._unwatched.append(pid)
+                continue
+            self._pidfds[pidfd] = pid
+            self._poller.register(pidfd, select.POLLIN)
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        """
+        Wait up to timeout seconds (None = forever) for every process.
 
-    # Step 2: Handle child and parent differently
-    if pid == 0:
-        # CHILD PROCESS PATH
-        # CRITICAL: Reset signal handlers to default so child can be interrupted
-        # Without this, Ctrl+C would kill the parent shell
-        # This MUST be the first thing done in the child process to avoid race conditions
-        signal.signal(signal.SIGINT, signal.SIG_DFL)
-
-        # Try to replace process image with the command
-        # POSIX execvp() replaces the current process image with a new one.
-        # It searches PATH for the executable and passes arguments as a vector.
-        # On success, this call NEVER returns (process image is completely replaced).
-        # Only returns (implicitly via exception) if exec fails.
-        # Reference: https://pubs.opengroup.org/onlinepubs/9699919799/functions/exec.html
+        Returns:
+            True if all of them have exited
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        interval = 0.001
+        while True:
+            self._unwatched = [p for p in self._unwatched if not _has_exited(p)]
+            if not (self._pidfds or self._unwatched):
+                return True
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            if self._unwatched:
+                # No pidfd for some process: sleep in short, growing steps
+                limit = interval if remaining is None else min(interval, remaining)
+                interval = min(interval * 2, self._MAX_POLL_INTERVAL)
+            else:
+                limit = remaining
+            if limit is not None:
+                limit = min(limit, self._MAX_POLL_WAIT)
+            if not self._pidfds:
+                time.sleep(limit)
+                continue
+            events = self._poller.poll(None if limit is None else limit * 1000)
+            for pidfd, _ in events:
+                self._poller.unregister(pidfd)
+                del self._pidfds[pidfd]
+                os.close(pidfd)
+
+    def signal_remaining(self, sig: int) -> None:
+        """Send sig to every process that has not exited yet."""
+        for pid in list(self._pidfds.values()) + self._unwatched:
+            try:
+                os.kill(pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def close(self) -> None:
+        """Close the remaining pidfds."""
+        for pidfd in self._pidfds:
+            os.close(pidfd)
+        self._pidfds.clear()
+
+
+def _has_exited(pid: int) -> bool:
+    """Check whether pid has exited, without reaping it."""
+    try:
+        result = os.waitid(os.P_PID, pid, os.WEXITED | os.WNOHANG | os.WNOWAIT)
+        return result is not None
+    except ChildProcessError:
+        # Not our child (zygote strategy): gone once kill(pid, 0) fails
         try:
-            os.execvp(args[0], args)
-        except FileNotFoundError:
-            # Command not found in PATH
-            # Use POSIX standard exit code 127
-            print(f"{args[0]}: command not found", file=sys.stderr)
-            os._exit(
-                127
-            )  # CRITICAL: Must use os._exit(), NOT return! (bypasses Python cleanup)
-        except PermissionError:
-            # Command found but not executable
-            # Use POSIX standard exit code 126
-            print(f"{args[0]}: Permission denied", file=sys.stderr)
-            os._exit(
-                126
-            )  # CRITICAL: Must use os._exit(), NOT return! (bypasses Python cleanup)
-        except Exception as e:
-            # Catch any other unexpected errors
-            # Use generic error code 1
-            print(f"{args[0]}: {e}", file=sys.stderr)
-            os._exit(
-                1
-            )  # CRITICAL: Must use os._exit(), NOT return! (bypasses Python cleanup)
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return True
+        return False
+
+
+def _report_timeout(
+    name: str, timeout: float, config: Dict[str, Any], usage: ResourceUsage
+) -> int:
+    """Report a command killed for exceeding its timeout; return 124."""
+    print(f"{name}: timed out after {timeout:g}s", file=sys.stderr)
+    display_exit_status(TIMEOUT_EXIT_CODE << 8, config, usage=usage)
+    return TIMEOUT_EXIT_CODE
+
+
+def status_to_exit_code(status: int) -> int:
+    """
+    Convert a raw wait status into a shell exit code.
+
+    POSIX defines macros to interpret the encoded wait status:
+    - WIFEXITED(status): True if child exited normally via exit() or return
+    - WEXITSTATUS(status): Extract exit code (0-255) if WIFEXITED is true
+    - WIFSIGNALED(status): True if child was terminated by signal
+    - WTERMSIG(status): Extract signal number if WIFSIGNALED is true
+    Reference: https://pubs.opengroup.org/onlinepubs/9699919799/functions/wait.html
+
+    Args:
+        status: Raw process exit status from os.waitpid()
+
+    Returns:
+        0-255 for normal exit, 128+N for signal N, 1 otherwise
 
+    Example:
+        >>> status_to_exit_code(256)  # exit(1)
+        1
+        >>> status_to_exit_code(15)  # killed by SIGTERM
+        143
+    """
+    if os.WIFEXITED(status):
+        # Process exited normally - extract exit code (0-255)
+        return os.WEXITSTATUS(status)
+    elif os.WIFSIGNALED(status):
+        # Process was terminated by signal (e.g., SIGKILL, SIGTERM, SIGSEGV)
+        # Return 128 + signal number (POSIX convention for signal termination)
+        return 128 + os.WTERMSIG(status)
     else:
-        # PARENT PROCESS PATH
-        # Debug output showing child PID
-        # Handle None values in config (malformed config)
-        debug_config = config.get("debug", {})
-        if debug_config is None:
-            debug_config = {}
-        if debug_config.get("show_fork_pids", False):
-            print(f"[Forked child PID: {pid}]", file=sys.stderr)
-
-        # Step 3: Wait for child to complete
-        # POSIX waitpid() suspends execution until the specified child changes state.
-        # With options=0, it waits for termination (not stop/continue).
-        # Returns tuple: (child_pid, status)
-        # status is encoded - use POSIX macros (WIFEXITED, WEXITSTATUS, etc.) to decode.
-        # Reference: https://pubs.opengroup.org/onlinepubs/9699919799/functions/wait.html
+        # Process was stopped or continued (shouldn't happen with default waitpid)
+        # Return generic error code
+        return 1
+
+
+def _spawn_child(
+    path: str,
+    args: List[str],
+    redirections: Sequence[Tuple[int, int]] = (),
+    pgid: Optional[int] = None,
+) -> int:
+    """
+    Launch path with posix_spawn() and return the child's PID.
+
+    The child starts with SIGINT and SIGPIPE at their default dispositions,
+    matching the reset the forked child performs, so Ctrl+C interrupts the
+    command rather than the shell and pipeline writers die quietly when
+    their reader exits (Python itself ignores SIGPIPE).
+
+    Args:
+        path: Resolved executable path (from the command hash table)
+        args: Command arguments where args[0] is the command name
+        redirections: (source_fd, target_fd) pairs applied with dup2()
+        pgid: Process group for the child (0 = new group), None to inherit
+
+    Raises:
+        OSError: If the command could not be executed
+    """
+    file_actions = [
+        (
+            (os.POSIX_SPAWN_CLOSE, target)
+            if source == CLOSE_FD
+            else (os.POSIX_SPAWN_DUP2, source, target)
+        )
+        for source, target in redirections
+    ]
+    options: Dict[str, Any] = {}
+    if pgid is not None:
+        options["setpgroup"] = pgid
+    return os.posix_spawn(
+        path,
+        args,
+        os.environ,
+        file_actions=file_actions,
+        setsigdef=(signal.SIGINT, signal.SIGPIPE),
+        **options,
+    )
+
+
+def _exec_child(
+    path: str, args: List[str], redirections: Sequence[Tuple[int, int]] = ()
+) -> None:
+    """
+    Replace the forked child with the command. Never returns.
+
+    Args:
+        path: Resolved executable path (from the command hash table)
+        args: Command arguments where args[0] is the command name
+        redirections: (source_fd, target_fd) pairs applied with dup2()
+    """
+    # CRITICAL: Reset signal handlers to default so child can be interrupted
+    # Without this, Ctrl+C would kill the parent shell
+    # This MUST be the first thing done in the child process to avoid race conditions
+    _reset_child_signals()
+
+    # Try to replace process image with the command
+    # POSIX execv() replaces the current process image with a new one.
+    # The PATH search execvp() would do was already done (and cached) by
+    # the command hash table, so exec the resolved path directly.
+    # On success, this call NEVER returns (process image is completely replaced).
+    # Only returns (implicitly via exception) if exec fails.
+    # Reference: https://pubs.opengroup.org/onlinepubs/9699919799/functions/exec.html
+    try:
+        _apply_redirections(redirections)
+        os.execv(path, args)
+    except Exception as e:
+        # CRITICAL: Must use os._exit(), NOT return! (bypasses Python cleanup)
+        os._exit(_exec_error_exit_code(args[0], e))
+
+
+def _run_builtin_child(
+    builtin: Any,
+    args: List[str],
+    config: Dict[str, Any],
+    redirections: Sequence[Tuple[int, int]],
+) -> None:
+    """
+    Run a built-in command inside a forked child (pipeline stage). Never returns.
+    """
+    exit_code = 1
+    try:
+        _reset_child_signals()
+        _apply_redirections(redirections)
+        for source, target in redirections:
+            # Built-ins use sys.stdin/stdout/stderr, which may not be backed
+            # by fds 0/1/2 (replaced streams, or input the shell had already
+            # read ahead into sys.stdin's buffer), so rebind them
+            if source == CLOSE_FD:
+                continue
+            if target == 0:
+                sys.stdin = open(0, "r", closefd=False)
+            elif target == 1:
+                sys.stdout = open(1, "w", closefd=False)
+            elif target == 2:
+                sys.stderr = open(2, "w", closefd=False)
+        exit_code = builtin.execute(args, config)
+        # 'exit' in a pipeline only ends this subshell
+        if exit_code < 0:
+            exit_code = 0
+    except BaseException as e:
+        print(f"{args[0]}: {e}", file=sys.stderr)
+    finally:
         try:
-            child_pid, status = os.waitpid(pid, 0)
-        except ChildProcessError:
-            # This shouldn't happen (child already reaped)
-            # But handle it defensively
-            print("Error: Child process not found", file=sys.stderr)
-            return 1
-
-        # Step 4: Display exit status if configured
-        display_exit_status(status, config)
-
-        # Step 5: Extract and return exit code using POSIX status macros
-        # POSIX defines macros to interpret the encoded wait status:
-        # - WIFEXITED(status): True if child exited normally via exit() or return
-        # - WEXITSTATUS(status): Extract exit code (0-255) if WIFEXITED is true
-        # - WIFSIGNALED(status): True if child was terminated by signal
-        # - WTERMSIG(status): Extract signal number if WIFSIGNALED is true
-        # Reference: https://pubs.opengroup.org/onlinepubs/9699919799/functions/wait.html
-        if os.WIFEXITED(status):
-            # Process exited normally - extract exit code (0-255)
-            return os.WEXITSTATUS(status)
-        elif os.WIFSIGNALED(status):
-            # Process was terminated by signal (e.g., SIGKILL, SIGTERM, SIGSEGV)
-            # Return 128 + signal number (POSIX convention for signal termination)
-            return 128 + os.WTERMSIG(status)
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            # CRITICAL: Must use os._exit(), NOT return! (bypasses Python cleanup)
+            os._exit(exit_code)
+
+
+def _apply_redirections(redirections: Sequence[Tuple[int, int]]) -> None:
+    """dup2() (or close) each pair in a forked child, in order."""
+    for source, target in redirections:
+        if source == CLOSE_FD:
+            try:
+                os.close(target)
+            except OSError:
+                # Closing a descriptor that isn't open is not an error
+                pass
         else:
-            # Process was stopped or continued (shouldn't happen with default waitpid)
-            # Return generic error code
-            return 1
+            os.dup2(source, target)
+
+
+def _join_process_group(pid: int, pgid: int) -> None:
+    """setpgid() that ignores the benign races between parent and child."""
+    try:
+        os.setpgid(pid, pgid)
+    except OSError:
+        # Child already exec'd (EACCES) or exited (ESRCH)
+        pass
 
 
-def display_exit_status(status: int, config: Dict[str, Any]) -> None:
+def _reset_child_signals() -> None:
+    """Restore default SIGINT/SIGPIPE handling in a forked child."""
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGPIPE, signal.SIG_DFL)
+
+
+def _exec_error_exit_code(name: str, error: Exception) -> int:
+    """
+    Report an exec failure and return the matching POSIX exit code.
+
+    Shared by the forked child (after execv fails) and the parent
+    (after posix_spawn fails) so both strategies behave identically.
+
+    Args:
+        name: Command name (args[0])
+        error: Exception raised by the exec call
+
+    Returns:
+        127 if not found, 126 if not executable or the arguments are too
+        long, 1 otherwise
+    """
+    if isinstance(error, FileNotFoundError):
+        # Command not found in PATH
+        # Use POSIX standard exit code 127
+        print(f"{name}: command not found", file=sys.stderr)
+        return 127
+    if isinstance(error, PermissionError):
+        # Command found but not executable
+        # Use POSIX standard exit code 126
+        print(f"{name}: Permission denied", file=sys.stderr)
+        return 126
+    if isinstance(error, OSError) and error.errno == errno.E2BIG:
+        # argv + environment exceed ARG_MAX (typically a huge wildcard)
+        # Same exit code as bash, plus a hint at the batching built-in
+        print(
+            f"{name}: Argument list too long (split it with: batch {name} ...)",
+            file=sys.stderr,
+        )
+        return 126
+    # Catch any other unexpected errors
+    # Use generic error code 1
+    print(f"{name}: {error}", file=sys.stderr)
+    return 1
+
+
+def display_exit_status(
+    status: int,
+    config: Dict[str, Any],
+    pipestatus: Optional[List[int]] = None,
+    usage: Optional[ResourceUsage] = None,
+) -> None:
     """
     Display exit status based on configuration.
 
     Shows exit code or signal termination information depending on
-    the configuration setting for show_exit_codes.
+    the configuration setting for show_exit_codes. For pipelines, the
+    per-stage exit codes (like bash's PIPESTATUS) can also be shown.
 
     Args:
         status: Raw process exit status from os.waitpid()
         config: Configuration dictionary with execution settings
+        pipestatus: Exit code of every pipeline stage, or None for a
+                    single command
+        usage: Resource usage of the command (from wait4()), or None
 
     Configuration:
         config['execution']['show_exit_codes']:
@@ -184,6 +1288,10 @@ def display_exit_status(status: int, config: Dict[str, Any]) -> None:
         config['execution']['exit_code_format']:
             - Format string for exit code display (default: '[Exit: {code}]')
             - Must contain {code} placeholder
+        config['execution']['show_pipestatus']:
+            - True: After a pipeline, print '[Pipestatus: 0 1 0]'
+        config['execution']['show_rusage']:
+            - True: Print '[Usage: real 0.004s user ... ctxsw 1/0]' to stderr
 
     Returns:
         None - prints to stdout or stderr
@@ -197,42 +1305,21 @@ def display_exit_status(status: int, config: Dict[str, Any]) -> None:
         >>> display_exit_status(256, config)  # 256 = 1 << 8
         [Exit: 1]
     """
-    # Get configuration settings with defaults
-    # Handle None values in config (malformed config)
-    execution_config = config.get("execution", {})
-    if execution_config is None:
-        execution_config = {}
-    show_mode = execution_config.get("show_exit_codes", "on_failure")
-    format_str = execution_config.get("exit_code_format", "[Exit: {code}]")
+    # Settings resolved once per config: unknown modes mean never, and an
+    # invalid exit_code_format has already been replaced by the default
+    execution = as_settings(config).execution
+    show_mode = execution.show_exit_codes
 
     # Check how the process terminated
     if os.WIFEXITED(status):
         # Process exited normally
         exit_code = os.WEXITSTATUS(status)
 
-        # Determine if we should display based on mode
-        should_display = False
-        if show_mode == "always":
-            should_display = True
-        elif show_mode == "on_failure" and exit_code != 0:
-            should_display = True
-        elif show_mode == "never":
-            should_display = False
-
         # Display if configured
-        if should_display:
-            # Use format string from config
-            # Guard against non-string format values (None, int, etc.)
-            if not isinstance(format_str, str):
-                format_str = "[Exit: {code}]"
-
-            # Handle format errors gracefully
-            try:
-                message = format_str.format(code=exit_code)
-                print(message)
-            except (KeyError, ValueError, AttributeError):
-                # Format string is invalid - use default
-                print(f"[Exit: {exit_code}]")
+        if show_mode is _SHOW_ALWAYS or (
+            show_mode is _SHOW_ON_FAILURE and exit_code != 0
+        ):
+            print(execution.format_exit_code(exit_code))
 
     elif os.WIFSIGNALED(status):
         # Process was terminated by signal
@@ -249,3 +1336,12 @@ def display_exit_status(status: int, config: Dict[str, Any]) -> None:
 
     # Note: WIFCONTINUED exists on some systems but not all
     # We don't handle it as it's rare and not relevant for our use case
+
+    # Per-stage statuses for pipelines (bash's PIPESTATUS)
+    if pipestatus is not None and execution.show_pipestatus:
+        codes = " ".join(str(code) for code in pipestatus)
+        print(f"[Pipestatus: {codes}]")
+
+    # Resource usage (like /usr/bin/time, but for every command)
+    if usage is not None and execution.show_rusage:
+        print(f"[Usage: {usage.summary()}]", file=sys.stderr)
@@ -0,0 +1,465 @@
+"""
+Parameter and tilde expansion module.
+
+Resolves the $ and ~ expansions that tokenize(line, expand=True) records
+in Token.expansions, right before the words are brace-expanded and
+globbed:
+    - $NAME and ${NAME}: the environment variable (unset -> empty)
+    - $? (last exit status), $$ (the shell's PID), $0, $# (0 - there are
+      no positional parameters) and ${#NAME} (length of the value)
+    - ${NAME:-word} / ${NAME-word}: word if NAME is unset (or empty)
+    - ${NAME:=word} / ${NAME=word}: the same, and NAME is set to word
+    - ${NAME:+word} / ${NAME+word}: word if NAME is set (and not empty)
+    - ${NAME:?word} / ${NAME?word}: error "NAME: word" if NAME is unset
+      (or empty) - the line is not run
+    - ~ ($HOME), ~user (from the password database), ~+ (the current
+      directory) and ~- ($OLDPWD); an unknown user stays literal
+    - $(command): what the command (or pipeline) writes to stdout, less
+      trailing newlines; $? becomes its exit status
+
+Results of unquoted expansions are split into fields on $IFS (default
+space, tab, newline) and may be globbed; results inside "..." are never
+split, and "$UNSET" is still one (empty) argument while an unquoted
+$UNSET disappears. Home directories never split. Here-strings and
+here-document bodies expand to one string (expand_string() and
+expand_here_document()) and are never split.
+
+A substituted command runs through the executor like a pipeline stage
+(built-ins in a forked child, so $(cd /tmp) changes nothing), with its
+stdout on a pipe that the shell reads with readv() straight into one
+bytearray: it starts at 64 KiB and doubles as needed instead of
+concatenating a bytes object per read. parser.max_capture_mb caps it - a
+command printing more is killed and the line is not run, so a runaway
+$(yes) costs at most that much memory.
+
+Tokenizing stays independent of the environment, so the parse cache can
+keep the tokens of a line with expansions; only this step reruns. The
+home directory of each ~user is looked up once: getpwnam() may read
+/etc/passwd or ask NSS (LDAP, sssd) on every call.
+
+POSIX References:
+    Shell Command Language, 2.6.1 Tilde Expansion, 2.6.2 Parameter
+    Expansion, 2.6.3 Command Substitution and 2.6.5 Field Splitting:
+    https://pubs.opengroup.org/onlinepubs/9699919799/utilities/V3_chap02.html#tag_18_06
+"""
+
+import os
+import pwd
+import re
+import sys
+from typing import Any, Dict, List, Optional
+
+from akujobip1.config import as_settings
+from akujobip1.tokenizer import (
+    Command,
+    Parameter,
+    Parts,
+    Piece,
+    Tilde,
+    Token,
+    TokenizeError,
+    make_word,
+    scan_here_document,
+)
+
+# Special parameters the shell keeps up to date ($$ is looked up live,
+# since it changes in forked children)
+SPECIAL_PARAMETERS: Dict[str, str] = {"?": "0", "0": "akujobip1", "#": "0"}
+
+# Default $IFS
+_DEFAULT_IFS = " \t\n"
+
+# Home directories by user name (None for unknown users)
+_HOME_DIRECTORIES: Dict[str, Optional[str]] = {}
+
+
+class ExpansionError(ValueError):
+    """
+    ${NAME?word} / ${NAME:?word} with NAME unset, a bad assignment, or a
+    $(command) whose output exceeds parser.max_capture_mb.
+    """
+
+
+def expand_parameters(
+    tokens: List[Token], config: Optional[Dict[str, Any]] = None
+) -> List[Token]:
+    """
+    Resolve the parameter and tilde expansions in a list of tokens.
+
+    Tokens without expansions are returned as they are; each other token
+    becomes as many tokens as its value splits into (possibly none).
+
+    Args:
+        tokens: Tokens from tokenize(line, expand=True)
+        config: Configuration dictionary (for running $(command))
+
+    Returns:
+        New token list, ready for brace expansion and globbing
+
+    Raises:
+        ExpansionError: A ${NAME?word} check failed, or a $(command)
+                        printed too much
+
+    Examples:
+        >>> os.environ['GREETING'] = 'hello world'
+        >>> [t.value for t in expand_parameters(tokenize('echo $GREETING', expand=True))]
+        ['echo', 'hello', 'world']
+        >>> [t.value for t in expand_parameters(tokenize('echo "$GREETING"', expand=True))]
+        ['echo', 'hello world']
+    """
+    result: List[Token] = []
+    for token in tokens:
+        if token.expansions is None:
+            result.append(token)
+            continue
+        fields = _Fields(config or {})
+        fields.add_pieces(token.expansions, split_literals=False)
+        result.extend(
+            make_word(parts, token.start, token.end) for parts in fields.words()
+        )
+    return result
+
+
+def expand_string(token: Token, config: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Expand a word to one string, without field splitting or globbing.
+
+    Used for a here-string (<<<word), which is never split: with A='a  b',
+    <<<$A gives 'a  b' where the argument $A gives 'a' and 'b'.
+
+    Raises:
+        ExpansionError: As expand_parameters()
+    """
+    if token.expansions is None:
+        return token.value
+    return _Fields(config or {}).word_string(token.expansions)
+
+
+def expand_here_document(body: str, config: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Expand the $ expansions in a here-document body (see scan_here_document()).
+
+    Raises:
+        ExpansionError: A malformed ${...} or $(, or as expand_parameters()
+    """
+    if "$" not in body and "\\" not in body:
+        return body
+    try:
+        pieces = scan_here_document(body)
+    except TokenizeError as e:
+        raise ExpansionError(f"here-document: {e}") from None
+    return _Fields(config or {}).word_string(pieces)
+
+
+def home_directory(user: str) -> Optional[str]:
+    """
+    Home directory for a tilde prefix.
+
+    Args:
+        user: The text after '~' ('' for the current user, '+' or '-')
+
+    Returns:
+        The directory, or None if there is none (the prefix stays literal)
+
+    Examples:
+        >>> home_directory('root')
+        '/root'
+        >>> home_directory('no-such-user') is None
+        True
+    """
+    if user == "":
+        home = os.environ.get("HOME")
+        if home is not None:
+            return home
+        # $HOME unset: fall back to the password database, like bash
+        user = _current_user()
+        if user is None:
+            return None
+    elif user == "+":
+        try:
+            return os.getcwd()
+        except OSError:
+            return None
+    elif user == "-":
+        return os.environ.get("OLDPWD")
+
+    if user not in _HOME_DIRECTORIES:
+        try:
+            _HOME_DIRECTORIES[user] = pwd.getpwnam(user).pw_dir
+        except KeyError:
+            _HOME_DIRECTORIES[user] = None
+    return _HOME_DIRECTORIES[user]
+
+
+def parameter_value(name: str) -> Optional[str]:
+    """
+    Value of a parameter, or None if it is unset.
+
+    Examples:
+        >>> parameter_value('?')
+        '0'
+        >>> parameter_value('1') is None  # no positional parameters
+        True
+    """
+    if name in SPECIAL_PARAMETERS:
+        return SPECIAL_PARAMETERS[name]
+    if name == "$":
+        return str(os.getpid())
+    if name in ("@", "*", "-"):
+        return ""
+    if name == "!" or name.isdigit():
+        return None
+    return os.environ.get(name)
+
+
+def command_output(command_line: str, config: Dict[str, Any]) -> str:
+    """
+    Run a command line and return its output, as $(command_line) does.
+
+    Args:
+        command_line: The text inside $(...) - any command line (lists
+                      with ;, && and || too; '&' is ignored)
+        config: Configuration dictionary
+
+    Returns:
+        Everything the commands wrote to stdout, less trailing newlines
+        (NUL bytes are dropped; other undecodable bytes are kept as
+        surrogate escapes, like os.fsdecode())
+
+    Raises:
+        ExpansionError: The output exceeded parser.max_capture_mb, or a
+                        word inside could not be expanded
+
+    Example:
+        >>> command_output('printf "a\\n\\n"', {})
+        'a'
+    """
+    # Lazy import: the parser and executor import this module themselves
+    from akujobip1.executor import capture_output
+    from akujobip1.globber import GlobLimitError
+    from akujobip1.parser import expand_command, parse
+    from akujobip1.redirection import (
+        RedirectionError,
+        open_redirections,
+        read_here_documents,
+    )
+    from akujobip1.syntax import ParseError, Pipeline, run_list
+
+    try:
+        tree = parse(command_line)
+    except ParseError as e:
+        raise ExpansionError(f"$({command_line}): {e}") from None
+    max_bytes = capture_limit(config)
+    output = bytearray()
+    # No input follows a $(...): here-documents in it come out empty
+    here_documents = read_here_documents(tree, None)
+
+    def run_pipeline(pipeline: Pipeline, background: bool) -> int:
+        try:
+            stages = [
+                expand_command(command, command_line, config)
+                for command in pipeline.commands
+            ]
+        except GlobLimitError as e:
+            raise ExpansionError(str(e)) from None
+        if not all(stages):
+            # Words that expanded to nothing: an empty command does nothing
+            return 0
+        redirections = []
+        try:
+            for command in pipeline.commands:
+                redirections.append(
+                    open_redirections(
+                        command.redirects, command_line, config, here_documents
+                    )
+                )
+            exit_code, captured = capture_output(
+                stages,
+                config,
+                max_bytes - len(output),
+                [opened.pairs for opened in redirections],
+            )
+        except (RedirectionError, GlobLimitError) as e:
+            # As in bash, only this command fails; the line goes on
+            print(f"akujobip1: {e}", file=sys.stderr)
+            return 1
+        finally:
+            for opened in redirections:
+                opened.close()
+        if captured is None:
+            raise ExpansionError(
+                f"$({command_line}): output exceeds {max_bytes} bytes "
+                "(parser.max_capture_mb)"
+            )
+        output.extend(captured)
+        SPECIAL_PARAMETERS["?"] = str(exit_code)
+        return exit_code
+
+    run_list(tree, run_pipeline)
+    if b"\0" in output:
+        output = output.replace(b"\0", b"")
+    return output.decode(sys.getfilesystemencoding(), "surrogateescape").rstrip("\n")
+
+
+def capture_limit(config: Dict[str, Any]) -> int:
+    """Bytes a $(command) may print (parser.max_capture_mb)."""
+    return as_settings(config).parser.max_capture_bytes
+
+
+def split_fields(value: str) -> List[str]:
+    """
+    Split an unquoted expansion result on $IFS.
+
+    IFS whitespace collapses and is trimmed at both ends; every other
+    IFS character ends a field (so "a::b" with IFS=: has an empty field).
+    An empty $IFS disables splitting.
+
+    Examples:
+        >>> split_fields('  a  b ')
+        ['a', 'b']
+    """
+    ifs = os.environ.get("IFS", _DEFAULT_IFS)
+    if not ifs:
+        return [value] if value else []
+    whitespace = "".join(char for char in ifs if char in _DEFAULT_IFS)
+    others = "".join(char for char in ifs if char not in _DEFAULT_IFS)
+    value = value.strip(whitespace)
+    if not value:
+        return []
+    spaces = f"[{re.escape(whitespace)}]" if whitespace else ""
+    if others:
+        separator = (
+            f"{spaces}*[{re.escape(others)}]{spaces}*"
+            if spaces
+            else f"[{re.escape(others)}]"
+        )
+        if spaces:
+            separator += f"|{spaces}+"
+    else:
+        separator = f"{spaces}+"
+    fields = re.split(separator, value)
+    if fields[-1] == "" and len(fields) > 1:
+        # A trailing delimiter ends the last field, it does not start one
+        fields.pop()
+    return fields
+
+
+class _Fields:
+    """Words being built from a token's pieces (field splitting)."""
+
+    __slots__ = ("config", "fields", "splitting")
+
+    def __init__(self, config: Dict[str, Any], splitting: bool = True) -> None:
+        self.config = config
+        self.fields: List[Parts] = [[]]
+        # False for assignments, which are never split
+        self.splitting = splitting
+
+    def words(self) -> List[Parts]:
+        """The finished words, without fields that came out empty."""
+        return [
+            parts
+            for parts in self.fields
+            if any(text or quoted for text, quoted in parts)
+        ]
+
+    def add(self, text: str, quoted: bool) -> None:
+        """Append text to the current field."""
+        self.fields[-1].append((text, quoted))
+
+    def split(self, value: str) -> None:
+        """Append an unquoted result, starting a new field at each delimiter."""
+        if not self.splitting:
+            self.add(value, False)
+            return
+        ifs = os.environ.get("IFS", _DEFAULT_IFS)
+        if value[:1] and value[0] in ifs and self.fields[-1]:
+            self.fields.append([])
+        for index, field in enumerate(split_fields(value)):
+            if index:
+                self.fields.append([])
+            self.add(field, False)
+        if value[-1:] and value[-1] in ifs:
+            self.fields.append([])
+
+    def add_pieces(self, pieces: List[Piece], split_literals: bool) -> None:
+        """
+        Append expanded pieces.
+
+        Args:
+            pieces: Token.expansions or a Parameter's word
+            split_literals: Split unquoted literal text as well (the word
+                            of an unquoted ${NAME:-word} is an expansion
+                            result)
+        """
+        for piece in pieces:
+            if isinstance(piece, tuple):
+                text, is_quoted = piece
+                if is_quoted or not split_literals:
+                    self.add(text, is_quoted)
+                else:
+                    self.split(text)
+            elif isinstance(piece, Tilde):
+                home = home_directory(piece.user)
+                if home is None:
+                    self.add("~" + piece.user, False)
+                else:
+                    self.add(home, True)
+            elif isinstance(piece, Command):
+                output = command_output(piece.text, self.config)
+                self.add_value(output, piece.quoted)
+            else:
+                self.add_parameter(piece)
+
+    def add_parameter(self, parameter: Parameter) -> None:
+        """Append the result of one $NAME / ${NAME...} expansion."""
+        name = parameter.name
+        value = parameter_value(name)
+        if parameter.length:
+            self.add_value(str(len(value or "")), parameter.quoted)
+            return
+
+        operator = parameter.operator
+        if operator is not None:
+            missing = value is None or (operator[0] == ":" and value == "")
+            action = operator[-1]
+            if action == "-" and missing:
+                self.add_pieces(parameter.word, not parameter.quoted)
+                return
+            if action == "+":
+                if not missing:
+                    self.add_pieces(parameter.word, not parameter.quoted)
+                return
+            if action == "=" and missing:
+                if name in SPECIAL_PARAMETERS or not name.isidentifier():
+                    raise ExpansionError(f"${name}: cannot assign in this way")
+                value = self.word_string(parameter.word)
+                os.environ[name] = value
+            elif action == "?" and missing:
+                message = (
+                    self.word_string(parameter.word) or "parameter null or not set"
+                )
+                raise ExpansionError(f"{name}: {message}")
+
+        self.add_value(value or "", parameter.quoted)
+
+    def add_value(self, value: str, quoted: bool) -> None:
+        """Append an expansion's value (split unless quoted)."""
+        if quoted:
+            self.add(value, True)
+        else:
+            self.split(value)
+
+    def word_string(self, pieces: List[Piece]) -> str:
+        """Expand a Parameter's word to one string (no field splitting)."""
+        fields = _Fields(self.config, splitting=False)
+        fields.add_pieces(pieces, split_literals=False)
+        return "".join(text for parts in fields.fields for text, _ in parts)
+
+
+def _current_user() -> Optional[str]:
+    """Login name of the current user from the password database."""
+    try:
+        return pwd.getpwuid(os.getuid()).pw_name
+    except KeyError:
+        return None
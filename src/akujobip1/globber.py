@@ -0,0 +1,740 @@
+"""
+Wildcard expansion engine module.
+
+Expands *, ? and [...] patterns like glob.glob(), but remembers directory
+listings between commands. glob.glob() lists a directory from scratch on
+every call, so repeating `ls *.log` or `rm tmp_*` in a directory with
+100k entries pays for the full listing each time.
+
+Listings are read with os.scandir() and cached per directory. Before a
+cached listing is reused, the directory is stat()ed: creating, removing or
+renaming an entry updates the directory's st_mtime_ns, so a changed
+directory is simply listed again. Compiled fnmatch patterns are cached
+too, and so are the names each pattern matched in a listing, so running
+the same command again costs one stat() per directory. Remembered
+matches are kept sorted, which makes sorting the final result nearly
+free. The cache is bounded by glob.cache_max_mb (least recently used
+listings are dropped first).
+
+Timestamp granularity: a directory changed twice within one tick of its
+filesystem's clock keeps the same mtime. A listing taken less than
+_RACY_WINDOW_NS after the directory's last change is therefore never
+trusted (the same rule git uses for its index), so it is re-read until
+the directory has been quiet for a while.
+
+Matching rules are those of glob.glob(): names starting with '.' only
+match patterns starting with '.', intermediate components match only
+directories, and a trailing '/' matches only directories.
+
+Recursive patterns: a '**' component matches any number of directory
+levels (src/**/*.py finds .py files at every depth), as with
+glob.glob(recursive=True) or bash's globstar. Large trees are walked by a
+pool of threads, each scanning one directory at a time with scandir() (the
+GIL is released while the kernel reads directory entries), and the
+shell's thread matches results as they arrive. Settings (glob section):
+    - recursive: False makes '**' an ordinary '*'
+    - walk_workers: threads for the walk (0 = one per CPU, max 32; raise
+      it for network filesystems, where scans mostly wait on I/O)
+    - max_depth: directory levels '**' may descend (0 = unlimited)
+    - max_matches: a '**' pattern matching more paths than this is an
+      error (0 = unlimited); other patterns are never limited, as in bash
+    - follow_symlinks: descend into symlinked directories (as glob.glob
+      does); off by default, like bash. When on, a directory that is
+      already one of its own ancestors is skipped, so symlink loops end.
+Walked directories are not kept in the listing cache.
+
+Recording: between start_recording() and stop_recording() the cache notes
+every directory a glob depended on (listed, or looked up a name in) with
+its mtime and inode. The parser's cache stores that with an expanded
+command line and reuses the expansion while dependencies_unchanged()
+holds - one stat() per directory instead of a glob. Recursive walks are
+not recorded (their directories are never stat()ed), so expansions that
+used '**' are not reusable this way.
+
+POSIX References:
+    - Pattern matching: https://pubs.opengroup.org/onlinepubs/9699919799/utilities/V3_chap02.html#tag_18_13
+"""
+
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from akujobip1.config import as_settings
+
+# Default cap on cached listings (glob.cache_max_mb)
+DEFAULT_CACHE_MAX_MB = 16
+
+# Changes closer than this to a listing may not have moved the mtime yet
+# (FAT has 2 s timestamps, some network filesystems 1 s)
+_RACY_WINDOW_NS = 2_000_000_000
+
+# Rough per-name cost of a cached listing: the str object plus its slots
+# in the names/visible tuples and the directory set
+_ENTRY_OVERHEAD = 80
+
+# Directory -> (mtime_ns, (st_dev, st_ino)) that a set of glob results
+# depended on (see ListingCache.start_recording())
+Dependencies = Dict[str, Tuple[int, Tuple[int, int]]]
+
+# Compiled patterns kept (fnmatch.translate() is the slow part)
+_MAX_PATTERNS = 512
+
+# Match results remembered per listing
+_MAX_MATCHES_PER_LISTING = 16
+
+_MAGIC = re.compile(r"[*?[]")
+
+# Defaults for the recursive ('**') walk
+DEFAULT_MAX_MATCHES = 100000
+_MAX_WORKERS = 32
+
+# pattern -> compiled match function
+_patterns: Dict[str, Callable[[str], Any]] = {}
+
+
+class GlobLimitError(ValueError):
+    """A '**' pattern matched more paths than glob.max_matches allows."""
+
+
+class WalkOptions:
+    """
+    Settings for recursive ('**') expansion.
+
+    Attributes:
+        recursive: Treat '**' as "any number of directories"
+        workers: Walker threads (0 = automatic, 1 = no threads)
+        max_depth: Directory levels below the start to descend (0 = no limit)
+        max_matches: Most paths one '**' pattern may produce (0 = no
+                     limit); patterns without '**' are not limited
+        follow_symlinks: Descend into symlinks to directories
+    """
+
+    __slots__ = ("recursive", "workers", "max_depth", "max_matches", "follow_symlinks")
+
+    def __init__(
+        self,
+        recursive: bool = True,
+        workers: int = 0,
+        max_depth: int = 0,
+        max_matches: int = DEFAULT_MAX_MATCHES,
+        follow_symlinks: bool = False,
+    ) -> None:
+        self.recursive = recursive
+        self.workers = workers
+        self.max_depth = max_depth
+        self.max_matches = max_matches
+        self.follow_symlinks = follow_symlinks
+
+    def without_match_limit(self) -> "WalkOptions":
+        """A copy of these settings with max_matches disabled."""
+        return WalkOptions(
+            self.recursive, self.workers, self.max_depth, 0, self.follow_symlinks
+        )
+
+    def worker_count(self) -> int:
+        """Number of walker threads to use."""
+        if self.workers > 0:
+            return min(self.workers, _MAX_WORKERS)
+        # One per CPU: on a single CPU the walk stays in the calling thread,
+        # where there is no hand-off cost per directory
+        return min(_MAX_WORKERS, os.cpu_count() or 1)
+
+
+class _WalkedDirectory:
+    """One directory's entries, as scanned by the walker."""
+
+    __slots__ = ("path", "names", "directories")
+
+    def __init__(self, path: str, names: List[str], directories: Set[str]) -> None:
+        # Relative to the walk's starting directory ('' for the start)
+        self.path = path
+        self.names = names
+        self.directories = directories
+
+
+class _Listing:
+    """One cached directory listing."""
+
+    __slots__ = (
+        "mtime_ns",
+        "inode",
+        "names",
+        "visible",
+        "directories",
+        "matches",
+        "size",
+    )
+
+    def __init__(
+        self,
+        mtime_ns: int,
+        inode: Tuple[int, int],
+        names: Tuple[str, ...],
+        directories: FrozenSet[str],
+    ) -> None:
+        self.mtime_ns = mtime_ns
+        self.inode = inode
+        self.names = names
+        # Names that don't start with '.' (what most patterns may match)
+        self.visible = tuple(name for name in names if name[0] != ".")
+        self.directories = directories
+        # (pattern, dironly) -> matching names
+        self.matches: Dict[Tuple[str, bool], List[str]] = {}
+        self.size = sum(len(name) + _ENTRY_OVERHEAD for name in names)
+
+
+class ListingCache:
+    """
+    Directory listings validated by the directory's mtime, with LRU eviction.
+
+    Example:
+        >>> cache = ListingCache()
+        >>> names, directories = cache.listing('/etc')
+        >>> 'passwd' in names, 'ssl' in directories
+        (True, True)
+        >>> cache.listing('/etc')[0] is names  # unchanged: served from cache
+        True
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_MAX_MB * 1024 * 1024) -> None:
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._listings: "OrderedDict[str, _Listing]" = OrderedDict()
+        self._bytes = 0
+        # Dependencies of the globs since start_recording() (None: not
+        # recording), and whether they can still be revalidated
+        self._recording: Optional[Dependencies] = None
+        self._recording_usable = False
+
+    def listing(self, directory: str) -> Tuple[Tuple[str, ...], FrozenSet[str]]:
+        """
+        List a directory, reusing the cached listing if it is still valid.
+
+        Args:
+            directory: Directory path ('' means the current directory)
+
+        Returns:
+            (names, directory_names) - every entry except '.' and '..',
+            and the subset that are directories (symlinks followed).
+            Both are empty if the directory cannot be read.
+        """
+        listing = self._get(directory)
+        if listing is None:
+            return (), frozenset()
+        return listing.names, listing.directories
+
+    def match(self, directory: str, pattern: str, dironly: bool) -> List[str]:
+        """
+        Names in directory that match a wildcard pattern, in sorted order.
+
+        Hidden names only match patterns starting with '.'. With dironly,
+        only directories match.
+        """
+        listing = self._get(directory)
+        if listing is None:
+            return []
+        key = (pattern, dironly)
+        matched = listing.matches.get(key)
+        if matched is not None:
+            return matched
+
+        match = compile_pattern(pattern)
+        names = listing.names if pattern[0] == "." else listing.visible
+        if dironly:
+            subdirectories = listing.directories
+            matched = [name for name in names if name in subdirectories and match(name)]
+        else:
+            matched = [name for name in names if match(name)]
+        # Sorted once here, so callers sorting joined paths get sorted input
+        matched.sort()
+
+        # Remember the result only on listings that are cached themselves
+        if (
+            len(listing.matches) < _MAX_MATCHES_PER_LISTING
+            and self._listings.get(self._key(directory)) is listing
+        ):
+            # Each remembered match costs a pointer per name
+            extra = 8 * len(matched) + _ENTRY_OVERHEAD
+            listing.matches[key] = matched
+            listing.size += extra
+            self._bytes += extra
+            self._evict()
+        return matched
+
+    def start_recording(self) -> None:
+        """Start noting the directories that the following globs depend on."""
+        self._recording = {}
+        self._recording_usable = True
+
+    def stop_recording(self) -> Optional[Dependencies]:
+        """
+        Stop recording and return what the globs since start_recording() read.
+
+        Returns:
+            {absolute directory: (mtime_ns, (dev, ino))}, or None if the
+            results cannot be revalidated from it (a '**' walk, or a
+            directory changed too recently to trust its mtime)
+        """
+        recorded = self._recording if self._recording_usable else None
+        self._recording = None
+        self._recording_usable = False
+        return recorded
+
+    def configure(self, max_bytes: int) -> None:
+        """Change the size cap (0 disables caching) and evict to fit."""
+        self.max_bytes = max_bytes
+        self._evict()
+
+    def clear(self) -> None:
+        """Drop every cached listing."""
+        self._listings.clear()
+        self._bytes = 0
+
+    @property
+    def size(self) -> int:
+        """Estimated memory held by cached listings, in bytes."""
+        return self._bytes
+
+    def _get(self, directory: str) -> Optional[_Listing]:
+        """Return a valid listing for directory (None if unreadable)."""
+        path = directory or os.curdir
+        try:
+            st = os.stat(path)
+        except (OSError, ValueError):
+            if self._recording is not None:
+                # Nothing to revalidate against if it appears later
+                self._recording_usable = False
+            return None
+        key = self._key(directory)
+        if self._recording is not None:
+            self._record(key, st)
+
+        listing = self._listings.get(key)
+        if (
+            listing is not None
+            and listing.mtime_ns == st.st_mtime_ns
+            and listing.inode == (st.st_dev, st.st_ino)
+        ):
+            self._listings.move_to_end(key)
+            self.hits += 1
+            return listing
+
+        self.misses += 1
+        listed_at = time.time_ns()
+        listing = _read_directory(path, st)
+        if listing is None:
+            # Unreadable (permissions changes don't move the mtime)
+            self._discard(key)
+            if self._recording is not None:
+                self._recording_usable = False
+            return None
+        if listed_at - st.st_mtime_ns > _RACY_WINDOW_NS:
+            self._store(key, listing)
+        else:
+            # Changed too recently to trust the mtime - don't cache
+            self._discard(key)
+        return listing
+
+    def _depend(self, directory: str) -> None:
+        """Note that the current results depend on directory's entries."""
+        if self._recording is None:
+            return
+        try:
+            st = os.stat(directory or os.curdir)
+        except (OSError, ValueError):
+            # Its absence is not something an mtime can vouch for
+            self._recording_usable = False
+            return
+        self._record(self._key(directory), st)
+
+    def _depend_on_walk(self) -> None:
+        """Note that the current results came from an (unrecorded) walk."""
+        self._recording_usable = False
+
+    def _record(self, key: str, st: os.stat_result) -> None:
+        if time.time_ns() - st.st_mtime_ns <= _RACY_WINDOW_NS:
+            # Could change again without moving the mtime
+            self._recording_usable = False
+        self._recording[key] = (st.st_mtime_ns, (st.st_dev, st.st_ino))
+
+    def _key(self, directory: str) -> str:
+        # Relative names depend on the current directory
+        return os.path.abspath(directory or os.curdir)
+
+    def _store(self, key: str, listing: _Listing) -> None:
+        self._discard(key)
+        if listing.size > self.max_bytes:
+            return
+        self._listings[key] = listing
+        self._bytes += listing.size
+        self._evict()
+
+    def _discard(self, key: str) -> None:
+        old = self._listings.pop(key, None)
+        if old is not None:
+            self._bytes -= old.size
+
+    def _evict(self) -> None:
+        """Drop least recently used listings until under max_bytes."""
+        while self._bytes > self.max_bytes and self._listings:
+            _, old = self._listings.popitem(last=False)
+            self._bytes -= old.size
+
+
+def _read_directory(path: str, st: os.stat_result) -> Optional[_Listing]:
+    """Read one directory with scandir (None if it cannot be read)."""
+    names = []
+    directories = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                names.append(entry.name)
+                try:
+                    # d_type answers this without a stat for most entries
+                    if entry.is_dir():
+                        directories.append(entry.name)
+                except OSError:
+                    pass
+    except OSError:
+        return None
+    return _Listing(
+        st.st_mtime_ns, (st.st_dev, st.st_ino), tuple(names), frozenset(directories)
+    )
+
+
+def dependencies_unchanged(dependencies: Dependencies) -> bool:
+    """
+    Check that no recorded directory changed since it was recorded.
+
+    Args:
+        dependencies: As returned by ListingCache.stop_recording()
+
+    Returns:
+        True if every directory still has its recorded mtime and inode
+    """
+    for path, (mtime_ns, inode) in dependencies.items():
+        try:
+            st = os.stat(path)
+        except (OSError, ValueError):
+            return False
+        if st.st_mtime_ns != mtime_ns or (st.st_dev, st.st_ino) != inode:
+            return False
+    return True
+
+
+def has_magic(text: str) -> bool:
+    """True if text contains a wildcard character (*, ? or [)."""
+    return _MAGIC.search(text) is not None
+
+
+def compile_pattern(pattern: str) -> Callable[[str], Any]:
+    """
+    Return a match function for one fnmatch pattern, compiled once.
+
+    Example:
+        >>> bool(compile_pattern('*.log')('app.log'))
+        True
+    """
+    match = _patterns.get(pattern)
+    if match is None:
+        if len(_patterns) >= _MAX_PATTERNS:
+            _patterns.clear()
+        # Lazy import: most lines have no wildcard
+        import fnmatch
+
+        match = re.compile(fnmatch.translate(pattern)).match
+        _patterns[pattern] = match
+    return match
+
+
+def glob_paths(
+    pattern: str,
+    cache: Optional[ListingCache] = None,
+    options: Optional[WalkOptions] = None,
+) -> List[str]:
+    """
+    Expand a wildcard pattern to the sorted list of matching paths.
+
+    Same results as sorted(glob.glob(pattern, recursive=True)), using
+    cached listings, except that '**' only descends into symlinked
+    directories with follow_symlinks.
+
+    Args:
+        pattern: Pattern such as '*.py', 'src/**/test_?.py' or '/var/log/*'
+        cache: Listing cache to use (default: the shared LISTING_CACHE)
+        options: Recursive walk settings (default: the shared WALK_OPTIONS)
+
+    Returns:
+        Matching paths, sorted (empty if nothing matches)
+
+    Raises:
+        GlobLimitError: A '**' pattern matched more than options.max_matches
+                        paths
+
+    Examples:
+        >>> glob_paths('*.txt')
+        ['file1.txt', 'file2.txt']
+        >>> glob_paths('src/**/*.py')
+        ['src/akujobip1/__init__.py', 'src/akujobip1/builtins.py', ...]
+        >>> glob_paths('no*match')
+        []
+    """
+    if cache is None:
+        cache = LISTING_CACHE
+    if options is None:
+        options = WALK_OPTIONS
+
+    # Only recursive walks are limited: they can run away across a whole
+    # tree, while a plain '*' lists directories that already exist
+    walks = options.recursive and "**" in pattern.split("/")
+    limit = options.max_matches if walks else 0
+    paths = []
+    matches = _iglob(pattern, False, cache, options)
+    try:
+        for path in matches:
+            # '**' yields '' for "no directories" - not a path by itself
+            if path:
+                paths.append(path)
+                if limit > 0 and len(paths) > limit:
+                    raise GlobLimitError(
+                        f"{pattern}: more than {limit} matches (glob.max_matches)"
+                    )
+    finally:
+        # Stops a recursive walk that is still running
+        matches.close()
+    paths.sort()
+    return paths
+
+
+def walk(root: str, options: WalkOptions) -> Iterator[_WalkedDirectory]:
+    """
+    Yield root and every directory below it, scanned by a thread pool.
+
+    Directories come out in completion order (callers sort). Hidden
+    directories are listed but not descended into, as '**' never matches
+    them. Closing the generator cancels directories not yet scanned.
+
+    Args:
+        root: Starting directory ('' for the current directory)
+        options: Depth limit, symlink handling and number of threads
+    """
+    workers = options.worker_count()
+    if workers <= 1:
+        # Walk in this thread, depth first
+        stack = [("", 0, ())]
+        while stack:
+            walked, children = _scan(root, *stack.pop(), options)
+            stack.extend(reversed(children))
+            if walked is not None:
+                yield walked
+        return
+
+    # Lazy import: concurrent.futures (with logging and threading) costs
+    # more at startup than the rest of this module
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="glob-walk")
+    try:
+        pending = {pool.submit(_scan, root, "", 0, (), options)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                walked, children = future.result()
+                # Queue the subdirectories before handing this one out,
+                # so the workers stay busy while the caller matches
+                for child in children:
+                    pending.add(pool.submit(_scan, root, *child, options))
+                if walked is not None:
+                    yield walked
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _scan(
+    root: str,
+    path: str,
+    depth: int,
+    ancestors: Tuple[Tuple[int, int], ...],
+    options: WalkOptions,
+) -> Tuple[Optional[_WalkedDirectory], List[tuple]]:
+    """
+    Read one directory (runs in a walker thread).
+
+    Returns:
+        (walked directory or None if unreadable, [(path, depth, ancestors)]
+        for each subdirectory to scan next)
+    """
+    directory = os.path.join(root, path) if path else (root or os.curdir)
+    if options.follow_symlinks:
+        # Symlink loop protection: skip a directory that is its own ancestor
+        try:
+            st = os.stat(directory)
+        except OSError:
+            return None, []
+        identity = (st.st_dev, st.st_ino)
+        if identity in ancestors:
+            return None, []
+        ancestors = ancestors + (identity,)
+
+    descend = options.max_depth <= 0 or depth < options.max_depth
+    names = []
+    directories = set()
+    children = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                name = entry.name
+                names.append(name)
+                try:
+                    if not entry.is_dir():
+                        continue
+                    directories.add(name)
+                    if (
+                        descend
+                        and name[0] != "."
+                        and (options.follow_symlinks or not entry.is_symlink())
+                    ):
+                        children.append(
+                            (os.path.join(path, name), depth + 1, ancestors)
+                        )
+                except OSError:
+                    pass
+    except OSError:
+        return None, []
+    return _WalkedDirectory(path, names, directories), children
+
+
+def configure_from_config(config: Dict[str, Any]) -> None:
+    """Apply the glob section's cache and recursive walk settings."""
+    # Invalid values are already replaced by defaults (see as_settings())
+    glob = as_settings(config).glob
+    if glob.cache_max_bytes != LISTING_CACHE.max_bytes:
+        LISTING_CACHE.configure(glob.cache_max_bytes)
+
+    WALK_OPTIONS.recursive = glob.recursive
+    WALK_OPTIONS.follow_symlinks = glob.follow_symlinks
+    WALK_OPTIONS.workers = glob.walk_workers
+    WALK_OPTIONS.max_depth = glob.max_depth
+    WALK_OPTIONS.max_matches = glob.max_matches
+
+
+def _iglob(
+    pathname: str, dironly: bool, cache: ListingCache, options: WalkOptions
+) -> Iterator[str]:
+    """Yield paths matching pathname (structure follows glob._iglob)."""
+    dirname, basename = os.path.split(pathname)
+    if not has_magic(pathname):
+        cache._depend(dirname)
+        if basename:
+            if os.path.lexists(pathname):
+                yield pathname
+        elif os.path.isdir(dirname):
+            # Patterns ending with a slash should match only directories
+            yield pathname
+        return
+
+    if options.recursive:
+        if basename == "**":
+            # 'dir/**': dir itself ('dir/') and everything below it
+            cache._depend_on_walk()
+            for directory in _directories(dirname, cache, options):
+                for path in _recursive(directory, dironly, options):
+                    yield os.path.join(directory, path)
+            return
+        parent, last = os.path.split(dirname)
+        if last == "**":
+            # 'dir/**/name': match name in every directory of one walk
+            cache._depend_on_walk()
+            for directory in _directories(parent, cache, options):
+                for walked in walk(directory, options):
+                    for name in _match_walked(walked, basename, dironly):
+                        path = os.path.join(directory, walked.path, name)
+                        if path:
+                            yield path
+            return
+
+    if not dirname:
+        yield from _match_in_directory(dirname, basename, dironly, cache)
+        return
+
+    # Match the directory part first (only directories can contain matches)
+    for directory in _directories(dirname, cache, options):
+        if has_magic(basename):
+            names = _match_in_directory(directory, basename, dironly, cache)
+        else:
+            names = _literal_in_directory(directory, basename, cache)
+        for name in names:
+            yield os.path.join(directory, name)
+
+
+def _directories(
+    dirname: str, cache: ListingCache, options: WalkOptions
+) -> Iterator[str]:
+    """Directories matching the directory part of a pattern."""
+    if has_magic(dirname):
+        yield from _iglob(dirname, True, cache, options)
+    else:
+        yield dirname
+
+
+def _recursive(directory: str, dironly: bool, options: WalkOptions) -> Iterator[str]:
+    """'' plus every non-hidden path below directory (what '**' matches)."""
+    if not os.path.isdir(directory or os.curdir):
+        return
+    yield ""
+    for walked in walk(directory, options):
+        for name in walked.names:
+            if name[0] == "." or (dironly and name not in walked.directories):
+                continue
+            yield os.path.join(walked.path, name)
+
+
+def _match_walked(walked: _WalkedDirectory, basename: str, dironly: bool) -> List[str]:
+    """Names in a walked directory matching the pattern's last component."""
+    if not basename:
+        # 'dir/**/' - the walked directory itself
+        return [""]
+    names = walked.directories if dironly else walked.names
+    if not has_magic(basename):
+        return [basename] if basename in names else []
+    match = compile_pattern(basename)
+    hidden = basename[0] == "."
+    return [name for name in names if (hidden or name[0] != ".") and match(name)]
+
+
+def _match_in_directory(
+    directory: str, pattern: str, dironly: bool, cache: ListingCache
+) -> List[str]:
+    """Names in directory matching a wildcard pattern."""
+    return cache.match(directory, pattern, dironly)
+
+
+def _literal_in_directory(
+    directory: str, basename: str, cache: ListingCache
+) -> List[str]:
+    """[basename] if it exists in directory, else [] (no listing needed)."""
+    cache._depend(directory)
+    if basename:
+        if os.path.lexists(os.path.join(directory, basename)):
+            return [basename]
+    elif os.path.isdir(directory):
+        return [basename]
+    return []
+
+
+# Shared listing cache and walk settings used by the parser
+LISTING_CACHE = ListingCache()
+WALK_OPTIONS = WalkOptions()
@@ -0,0 +1,275 @@
+"""
+Background job table module.
+
+This module tracks commands started with a trailing '&' and reaps them
+without ever blocking the prompt. Each background process is watched
+through a pidfd (Linux 5.3+) registered in a selector: a pidfd becomes
+readable when its process exits, so one non-blocking select() tells us
+exactly which children can be reaped with wait4(WNOHANG). Where pidfds
+are unavailable, the same reaping falls back to polling each job's pids
+with WNOHANG.
+
+Reaping happens before every prompt and in the jobs/wait/kill built-ins.
+Only the pids in the table are ever waited for, never wait4(-1), so
+foreground commands reaped by the executor are not disturbed - this
+keeps the shell free of custom SIGCHLD handlers. wait4() also returns
+each process's resource usage, which is added up per job.
+
+POSIX References:
+    - waitpid(): https://pubs.opengroup.org/onlinepubs/9699919799/functions/wait.html
+    - setpgid(): https://pubs.opengroup.org/onlinepubs/9699919799/functions/setpgid.html
+    - kill(): https://pubs.opengroup.org/onlinepubs/9699919799/functions/kill.html
+"""
+
+import os
+import selectors
+import sys
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from akujobip1.executor import ResourceUsage
+
+
+class Job:
+    """
+    A background pipeline (one or more processes sharing a process group).
+
+    Attributes:
+        job_id: Small job number shown as [n] and used as %n
+        pids: Process IDs of every stage, in pipeline order
+        pgid: Process group ID (the first stage's pid)
+        command: Command line text, for display
+        statuses: Raw wait status per pid, None while still running
+        usage: Combined resource usage of the processes reaped so far
+               (None before the first); real_time runs from the start
+               of the job to the latest reap
+    """
+
+    def __init__(self, job_id: int, pids: List[int], command: str) -> None:
+        self.job_id = job_id
+        self.pids = list(pids)
+        self.pgid = pids[0]
+        self.command = command
+        self.statuses: Dict[int, Optional[int]] = {pid: None for pid in pids}
+        self.usage: Optional[ResourceUsage] = None
+        self._started = time.perf_counter()
+
+    @property
+    def done(self) -> bool:
+        """True once every process in the job has been reaped."""
+        return all(status is not None for status in self.statuses.values())
+
+    @property
+    def status(self) -> Optional[int]:
+        """Raw wait status of the last stage (the job's status), once reaped."""
+        return self.statuses[self.pids[-1]]
+
+    def state(self) -> str:
+        """Human-readable state: Running, Done, Exit N, or signal name."""
+        # Lazy import: executor depends on this module
+        from akujobip1.executor import status_to_exit_code
+
+        if not self.done:
+            return "Running"
+        exit_code = status_to_exit_code(self.status)
+        if exit_code == 0:
+            return "Done"
+        if os.WIFSIGNALED(self.status):
+            return f"Terminated (signal {os.WTERMSIG(self.status)})"
+        return f"Exit {exit_code}"
+
+    def record(self, pid: int, status: int, rusage: Any = None) -> None:
+        """Store a reaped process's status and add its usage (from wait4())."""
+        # Lazy import: executor depends on this module
+        from akujobip1.executor import ResourceUsage
+
+        self.statuses[pid] = status
+        usage = self.usage or ResourceUsage()
+        if rusage is not None:
+            usage += ResourceUsage.from_rusage(rusage)
+        usage.real_time = time.perf_counter() - self._started
+        self.usage = usage
+
+
+class JobTable:
+    """
+    Table of background jobs with non-blocking, pidfd-driven reaping.
+    """
+
+    def __init__(self) -> None:
+        self._jobs: Dict[int, Job] = {}
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._pidfds: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def add(self, pids: List[int], command: str) -> Job:
+        """
+        Register a newly started background job.
+
+        Args:
+            pids: Process IDs of every stage, first stage first
+            command: Command line text, for display
+
+        Returns:
+            The new Job (job_id is the lowest free number, like bash)
+        """
+        job_id = 1
+        while job_id in self._jobs:
+            job_id += 1
+        job = Job(job_id, pids, command)
+        self._jobs[job_id] = job
+
+        for pid in pids:
+            self._watch(job, pid)
+        return job
+
+    def jobs(self) -> List[Job]:
+        """All jobs ordered by job number."""
+        return [self._jobs[job_id] for job_id in sorted(self._jobs)]
+
+    def find(self, spec: str) -> Optional[Job]:
+        """
+        Look up a job by %n, %%, %+, or by the pid of any of its processes.
+
+        Returns:
+            Matching Job, or None
+        """
+        if spec in ("%", "%%", "%+"):
+            return self._jobs[max(self._jobs)] if self._jobs else None
+        if spec.startswith("%"):
+            try:
+                return self._jobs.get(int(spec[1:]))
+            except ValueError:
+                return None
+        try:
+            pid = int(spec)
+        except ValueError:
+            return None
+        for job in self._jobs.values():
+            if pid in job.statuses:
+                return job
+        return None
+
+    def remove(self, job: Job) -> None:
+        """Forget a job (after its completion has been reported)."""
+        for pid in job.pids:
+            self._unwatch(pid)
+        self._jobs.pop(job.job_id, None)
+
+    def reap(self) -> List[Job]:
+        """
+        Reap every background process that has exited, without blocking.
+
+        Returns:
+            Jobs that finished during this call
+        """
+        if not self._jobs:
+            return []
+        finished = []
+        if self._selector is not None and self._pidfds:
+            for key, _ in self._selector.select(timeout=0):
+                job, pid = key.data
+                self._try_reap(job, pid, finished)
+        # Processes without a pidfd (fallback platforms) are polled
+        for job in list(self._jobs.values()):
+            for pid, status in job.statuses.items():
+                if status is None and pid not in self._pidfds:
+                    self._try_reap(job, pid, finished)
+        return finished
+
+    def wait(self, job: Job) -> int:
+        """
+        Block until every process of job has exited.
+
+        Blocks in wait4() on each remaining process, so no CPU is
+        burned while waiting. The job's usage is then recorded as the
+        last usage (see executor.last_resource_usage()).
+
+        Returns:
+            Job's exit code (last stage, 128+N for signals)
+        """
+        from akujobip1.executor import record_usage, status_to_exit_code
+
+        for pid in job.pids:
+            if job.statuses[pid] is not None:
+                continue
+            self._unwatch(pid)
+            try:
+                _, status, rusage = os.wait4(pid, 0)
+            except ChildProcessError:
+                status, rusage = 127 << 8, None
+            job.record(pid, status, rusage)
+        if job.usage is not None:
+            record_usage(job.usage)
+        return status_to_exit_code(job.status)
+
+    def notify(self) -> None:
+        """
+        Reap finished jobs and report them, bash-style, before a prompt.
+
+        Example output:
+            [1]   Done                    sleep 1
+        """
+        if not self._jobs:
+            return
+        self.reap()
+        for job in self.jobs():
+            if job.done:
+                print(format_job(job), file=sys.stderr)
+                self.remove(job)
+
+    def _watch(self, job: Job, pid: int) -> None:
+        """Open a pidfd for pid and register it with the selector."""
+        pidfd_open = getattr(os, "pidfd_open", None)
+        if pidfd_open is None:
+            return
+        try:
+            pidfd = pidfd_open(pid)
+        except OSError:
+            # Kernel without pidfd support (ENOSYS) or process already gone
+            return
+        if self._selector is None:
+            self._selector = selectors.DefaultSelector()
+        self._selector.register(pidfd, selectors.EVENT_READ, (job, pid))
+        self._pidfds[pid] = pidfd
+
+    def _unwatch(self, pid: int) -> None:
+        """Unregister and close pid's pidfd, if any."""
+        pidfd = self._pidfds.pop(pid, None)
+        if pidfd is not None:
+            self._selector.unregister(pidfd)
+            os.close(pidfd)
+
+    def _try_reap(self, job: Job, pid: int, finished: List[Job]) -> None:
+        """wait4(WNOHANG) one process and record its status if it exited."""
+        try:
+            reaped_pid, status, rusage = os.wait4(pid, os.WNOHANG)
+        except ChildProcessError:
+            # Reaped elsewhere - treat as a lost child
+            reaped_pid, status, rusage = pid, 127 << 8, None
+        if reaped_pid == 0:
+            return
+        self._unwatch(pid)
+        job.record(pid, status, rusage)
+        if job.done and job not in finished:
+            finished.append(job)
+
+
+def format_job(job: Job) -> str:
+    """
+    Format a job line the way bash's jobs builtin does.
+
+    Example:
+        >>> format_job(job)
+        '[1]   Running                 sleep 10 &'
+    """
+    state = job.state()
+    suffix = " &" if state == "Running" else ""
+    return f"[{job.job_id}]   {state:<24}{job.command}{suffix}"
+
+
+# Shared table used by the executor and the jobs/wait/kill built-ins
+JOB_TABLE = JobTable()
@@ -0,0 +1,323 @@
+"""
+Command result cache module (the memo built-in).
+
+Remembers the stdout, stderr and exit code of commands so that running
+the same inspection command again replays the stored result instead of
+executing it. Entries live on disk, one file per result, under
+$XDG_CACHE_HOME/akujobip1/memo (default ~/.cache/akujobip1/memo).
+
+A result is keyed on everything that can change what the command prints:
+    - argv and the working directory (and the directory's mtime)
+    - the resolved executable and its size/mtime (upgrades invalidate)
+    - selected environment variables (memo.env)
+    - the size/mtime of every argument that names an existing file or
+      directory (and the absence of those that don't)
+The key is the SHA-256 of that description, so equal inputs map to the
+same file and anything that changed simply misses.
+
+The cache is bounded by memo.max_size_mb. Every hit touches its entry's
+mtime, and storing a new entry evicts the least recently used entries
+until the total fits again (LRU by mtime).
+"""
+
+import marshal
+import os
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+from akujobip1.pathcache import COMMAND_HASH
+
+# Bump when the key or entry layout changes (old entries then just miss)
+_FORMAT_VERSION = 1
+
+# Environment variables in the key when memo.env is not configured
+DEFAULT_ENV = ["PATH", "LANG", "LC_ALL", "TZ"]
+
+# Default size cap for the whole cache
+DEFAULT_MAX_SIZE_MB = 64
+
+# Exit codes that describe the launch rather than the command's result
+# (timed out, not executable, not found) - never cached
+_UNCACHEABLE_EXIT_CODES = (124, 126, 127)
+
+
+def default_cache_dir() -> str:
+    """Return $XDG_CACHE_HOME/akujobip1/memo (XDG default: ~/.cache)."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "akujobip1", "memo")
+
+
+class ResultCache:
+    """
+    On-disk, size-capped LRU cache of command results.
+
+    Example:
+        >>> cache = ResultCache('/tmp/memo', max_bytes=1 << 20)
+        >>> key = cache.key(['ls', '-l'], ['PATH'])
+        >>> cache.get(key) is None
+        True
+        >>> cache.put(key, 0, b'total 0\\n', b'')
+        >>> cache.get(key)
+        (0, b'total 0\\n', b'')
+    """
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def key(self, args: List[str], env_names: List[str]) -> str:
+        """
+        Compute the cache key for running args in the current state.
+
+        Args:
+            args: Command arguments (after wildcard expansion)
+            env_names: Environment variables that affect the result
+
+        Returns:
+            Hex digest identifying the result
+        """
+        cwd = os.getcwd()
+        path = COMMAND_HASH.lookup(args[0])
+        description = (
+            _FORMAT_VERSION,
+            list(args),
+            cwd,
+            _file_state(cwd),
+            path,
+            _file_state(path) if path else None,
+            [(name, os.environ.get(name)) for name in env_names],
+            # File arguments: their state, or None if they don't exist
+            [(arg, _file_state(arg)) for arg in args[1:]],
+        )
+        # Lazy import: this module is loaded at startup, the cache only
+        # used for memoized commands
+        import hashlib
+
+        return hashlib.sha256(marshal.dumps(description)).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[int, bytes, bytes]]:
+        """
+        Look up a stored result (and mark it as recently used).
+
+        Returns:
+            (exit_code, stdout, stderr), or None on a miss
+        """
+        entry = self._entry_path(key)
+        try:
+            with open(entry, "rb") as f:
+                version, exit_code, stdout, stderr = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            # Missing, or unreadable/corrupt (treated as a miss)
+            self._count("misses")
+            return None
+        if version != _FORMAT_VERSION:
+            self._count("misses")
+            return None
+
+        # LRU: the entry's mtime is its last use
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        self._count("hits")
+        return exit_code, stdout, stderr
+
+    def put(self, key: str, exit_code: int, stdout: bytes, stderr: bytes) -> None:
+        """
+        Store a result, then evict old entries if over the size cap.
+
+        Results larger than the whole cache are not stored.
+        """
+        data = marshal.dumps((_FORMAT_VERSION, exit_code, stdout, stderr))
+        if len(data) > self.max_bytes:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+
+        # Lazy import: only needed to store a result
+        import tempfile
+
+        # Write to a temporary file and rename, so a reader never sees a
+        # half-written entry
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, self._entry_path(key))
+        except OSError:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+        self._evict()
+
+    def clear(self) -> int:
+        """
+        Delete every entry and reset the statistics.
+
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        for path, _, _ in self._entries():
+            try:
+                os.unlink(path)
+                removed += 1
+            except OSError:
+                pass
+        try:
+            os.unlink(self._stats_path())
+        except OSError:
+            pass
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return hit/miss counters and current size.
+
+        Returns:
+            {'hits', 'misses', 'entries', 'bytes'}
+        """
+        counters = self._load_counters()
+        entries = self._entries()
+        return {
+            "hits": counters.get("hits", 0),
+            "misses": counters.get("misses", 0),
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+        }
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".entry")
+
+    def _stats_path(self) -> str:
+        return os.path.join(self.directory, "stats")
+
+    def _entries(self) -> List[Tuple[str, int, int]]:
+        """List (path, size, mtime_ns) of every entry."""
+        entries = []
+        try:
+            with os.scandir(self.directory) as it:
+                for item in it:
+                    if item.name.endswith(".entry"):
+                        try:
+                            st = item.stat()
+                        except OSError:
+                            continue
+                        entries.append((item.path, st.st_size, st.st_mtime_ns))
+        except OSError:
+            pass
+        return entries
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until under max_bytes."""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def _load_counters(self) -> Dict[str, int]:
+        try:
+            with open(self._stats_path(), "rb") as f:
+                counters = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return {}
+        return counters if isinstance(counters, dict) else {}
+
+    def _count(self, name: str) -> None:
+        """Increment a persistent hit/miss counter (best effort)."""
+        counters = self._load_counters()
+        counters[name] = counters.get(name, 0) + 1
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self._stats_path(), "wb") as f:
+                marshal.dump(counters, f)
+        except OSError:
+            pass
+
+
+def _file_state(path: str) -> Optional[Tuple[int, int]]:
+    """(size, mtime_ns) of path, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except (OSError, ValueError):
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def cache_from_config(config: Dict[str, Any]) -> Tuple[ResultCache, List[str]]:
+    """
+    Build the result cache described by the memo config section.
+
+    Returns:
+        (cache, env_names)
+    """
+    # Handle None values in config (malformed config)
+    memo_config = config.get("memo", {})
+    if memo_config is None:
+        memo_config = {}
+
+    directory = memo_config.get("directory") or default_cache_dir()
+    max_size_mb = memo_config.get("max_size_mb", DEFAULT_MAX_SIZE_MB)
+    if isinstance(max_size_mb, bool) or not isinstance(max_size_mb, (int, float)):
+        max_size_mb = DEFAULT_MAX_SIZE_MB
+    env_names = memo_config.get("env", DEFAULT_ENV)
+    if not isinstance(env_names, list):
+        env_names = DEFAULT_ENV
+
+    cache = ResultCache(str(directory), int(max_size_mb * 1024 * 1024))
+    return cache, [str(name) for name in env_names]
+
+
+def is_memoized(args: List[str], config: Dict[str, Any]) -> bool:
+    """
+    Check whether args[0] is in the memo.commands list (opt-in caching).
+    """
+    memo_config = config.get("memo", {})
+    if memo_config is None:
+        return False
+    commands = memo_config.get("commands", [])
+    return isinstance(commands, list) and args[0] in commands
+
+
+def run_memoized(args: List[str], config: Dict[str, Any]) -> int:
+    """
+    Replay a cached result for args, or run the command and cache it.
+
+    The command's output is captured (stdin is /dev/null) and printed once
+    it finishes; results of commands that could not run, timed out or
+    were killed by a signal are not cached.
+
+    Returns:
+        The command's exit code (replayed or real)
+    """
+    # Lazy import: the executor is only needed on a miss
+    from akujobip1.executor import capture_command, display_exit_status, write_output
+
+    cache, env_names = cache_from_config(config)
+    key = cache.key(args, env_names)
+    result = cache.get(key)
+    if result is None:
+        result = capture_command(args, config)
+        exit_code = result[0]
+        if exit_code < 128 and exit_code not in _UNCACHEABLE_EXIT_CODES:
+            try:
+                cache.put(key, *result)
+            except OSError as e:
+                print(f"memo: cannot store result: {e}", file=sys.stderr)
+
+    exit_code, stdout, stderr = result
+    write_output(sys.stdout, stdout)
+    write_output(sys.stderr, stderr)
+    display_exit_status(exit_code << 8, config)
+    return exit_code
@@ -0,0 +1,285 @@
+"""
+Parallel fan-out engine for the `parallel` built-in.
+
+Runs one external command per input item with at most N children in
+flight. Every child writes stdout and stderr into its own pair of pipes;
+the shell multiplexes all pipes (and the children's pidfds) in a single
+selector, so one thread keeps every core busy without busy-waiting.
+Output of each job is emitted as a unit when the job finishes - either
+in completion order or, with keep_order, in input order.
+
+Example:
+    parallel -j 8 gzip -9 {} ::: *.log
+    ls *.csv | parallel -k wc -l
+"""
+
+import itertools
+import os
+import re
+import selectors
+import signal
+import sys
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from akujobip1.executor import (
+    ResourceUsage,
+    record_usage,
+    resolve_spawn_strategy,
+    start_command,
+    status_to_exit_code,
+    write_output,
+)
+
+# Read size for job output pipes
+_CHUNK_SIZE = 65536
+
+# GNU parallel caps its exit status (the number of failed jobs) at 101
+_MAX_FAILURE_EXIT = 101
+
+# '{}' or '{n}' in a command template
+_PLACEHOLDER = re.compile(r"\{(\d*)\}")
+
+
+class _RunningJob:
+    """Book-keeping for one in-flight command."""
+
+    def __init__(self, index: int, argv: List[str], pid: int) -> None:
+        self.index = index
+        self.argv = argv
+        self.pid = pid
+        self.stdout = bytearray()
+        self.stderr = bytearray()
+        self.open_pipes = 0
+        self.pidfd: Optional[int] = None
+        self.exited = False
+
+
+def build_command(template: Sequence[str], item: Tuple[str, ...]) -> List[str]:
+    """
+    Substitute one input item into the command template.
+
+    '{}' is replaced by all of the item's values joined with spaces and
+    '{1}', '{2}', ... by individual values (one per ':::' group). If the
+    template has no placeholder, the values are appended as arguments.
+    Placeholder text inside a value is not substituted again, and '{n}'
+    past the last value is left as is.
+
+    Examples:
+        >>> build_command(['gzip', '{}'], ('a.log',))
+        ['gzip', 'a.log']
+        >>> build_command(['echo'], ('a', 'b'))
+        ['echo', 'a', 'b']
+        >>> build_command(['cp', '{1}', '{2}/'], ('f.txt', 'dest'))
+        ['cp', 'f.txt', 'dest/']
+    """
+    substituted = False
+
+    def replace(match: "re.Match[str]") -> str:
+        nonlocal substituted
+        position = match.group(1)
+        if not position:
+            substituted = True
+            return " ".join(item)
+        index = int(position)
+        if 1 <= index <= len(item):
+            substituted = True
+            return item[index - 1]
+        return match.group(0)
+
+    # One pass per word, so placeholder text inside a value stays literal
+    argv = [
+        _PLACEHOLDER.sub(replace, word) if "{" in word else word for word in template
+    ]
+
+    if not substituted:
+        argv.extend(item)
+    return argv
+
+
+def argument_items(
+    groups: List[List[str]], stdin: Optional[Iterable[str]] = None
+) -> Iterator[Tuple[str, ...]]:
+    """
+    Produce input items lazily.
+
+    With ':::' groups, items are the cartesian product of the groups
+    (GNU parallel semantics). Without groups, each line of stdin is one
+    item, read only as job slots become free.
+    """
+    if groups:
+        return itertools.product(*groups)
+    if stdin is None:
+        stdin = sys.stdin
+    return ((line.rstrip("\n"),) for line in stdin if line.strip())
+
+
+def run_parallel(
+    template: Sequence[str],
+    items: Iterable[Tuple[str, ...]],
+    config: Dict[str, Any],
+    max_jobs: int,
+    keep_order: bool = False,
+) -> int:
+    """
+    Run template once per item with at most max_jobs children at a time.
+
+    Args:
+        template: Command words, may contain {} / {n} placeholders
+        items: Input items (consumed lazily)
+        config: Configuration dictionary (spawn strategy, debug settings)
+        max_jobs: Maximum concurrent children (<= 0 means unlimited)
+        keep_order: Emit job output in input order instead of completion order
+
+    Returns:
+        0 if every job succeeded, otherwise the number of failed jobs
+        (capped at 101). The jobs' combined resource usage is recorded
+        as the last usage (see executor.last_resource_usage()).
+    """
+    started = time.perf_counter()
+    usage = ResourceUsage()
+    strategy = resolve_spawn_strategy(config)
+    selector = selectors.DefaultSelector()
+    running: Dict[int, _RunningJob] = {}
+    pending_output: Dict[int, _RunningJob] = {}
+    failures: List[Tuple[List[str], int]] = []
+    next_to_emit = 0
+    total = 0
+    source = enumerate(items)
+    exhausted = False
+    devnull = os.open(os.devnull, os.O_RDONLY)
+
+    def finish(job: _RunningJob, exit_code: int) -> None:
+        nonlocal next_to_emit
+        if exit_code != 0:
+            failures.append((job.argv, exit_code))
+        if not keep_order:
+            _emit(job)
+            return
+        pending_output[job.index] = job
+        while next_to_emit in pending_output:
+            _emit(pending_output.pop(next_to_emit))
+            next_to_emit += 1
+
+    try:
+        while True:
+            # Fill free slots from the (lazy) input
+            while not exhausted and (max_jobs <= 0 or len(running) < max_jobs):
+                try:
+                    index, item = next(source)
+                except StopIteration:
+                    exhausted = True
+                    break
+                total += 1
+                argv = build_command(template, item)
+                job, exit_code = _start_job(
+                    index, argv, config, strategy, devnull, selector
+                )
+                if job is None:
+                    # Could not start (e.g. command not found, already reported)
+                    finish(_RunningJob(index, argv, 0), exit_code)
+                else:
+                    running[job.pid] = job
+
+            if not running:
+                break
+
+            # Sleep until some pipe has data or some child exits
+            for key, _ in selector.select():
+                kind, job = key.data
+                if kind == "pid":
+                    selector.unregister(key.fd)
+                    os.close(key.fd)
+                    job.pidfd = None
+                    job.exited = True
+                else:
+                    data = os.read(key.fd, _CHUNK_SIZE)
+                    if data:
+                        buffer = job.stdout if kind == "out" else job.stderr
+                        buffer += data
+                        continue
+                    selector.unregister(key.fd)
+                    os.close(key.fd)
+                    job.open_pipes -= 1
+
+                if job.open_pipes == 0 and (job.exited or job.pidfd is None):
+                    # All output collected and the child has exited (or we
+                    # have no pidfd and must wait for it)
+                    _, status, rusage = os.wait4(job.pid, 0)
+                    usage += ResourceUsage.from_rusage(rusage)
+                    del running[job.pid]
+                    finish(job, status_to_exit_code(status))
+    finally:
+        # Interrupted (Ctrl+C) or failed: don't leave children behind
+        for job in running.values():
+            try:
+                os.kill(job.pid, signal.SIGTERM)
+                _, _, rusage = os.wait4(job.pid, 0)
+                usage += ResourceUsage.from_rusage(rusage)
+            except OSError:
+                pass
+        for key in list(selector.get_map().values()):
+            os.close(key.fd)
+        selector.close()
+        os.close(devnull)
+        usage.real_time = time.perf_counter() - started
+        record_usage(usage)
+
+    if failures:
+        print(f"parallel: {len(failures)} of {total} jobs failed:", file=sys.stderr)
+        for argv, exit_code in failures[:10]:
+            print(f"  [Exit: {exit_code}] {' '.join(argv)}", file=sys.stderr)
+        if len(failures) > 10:
+            print(f"  ... and {len(failures) - 10} more", file=sys.stderr)
+    return min(len(failures), _MAX_FAILURE_EXIT)
+
+
+def _start_job(
+    index: int,
+    argv: List[str],
+    config: Dict[str, Any],
+    strategy: str,
+    devnull: int,
+    selector: selectors.BaseSelector,
+) -> Tuple[Optional[_RunningJob], int]:
+    """
+    Start one job with stdout/stderr on fresh pipes and register it.
+
+    Returns:
+        (the job, 0), or (None, exit_code) as start_command() if it could
+        not be started
+    """
+    out_read, out_write = os.pipe()
+    err_read, err_write = os.pipe()
+    try:
+        pid, exit_code = start_command(
+            argv, config, strategy, [(devnull, 0), (out_write, 1), (err_write, 2)]
+        )
+    finally:
+        os.close(out_write)
+        os.close(err_write)
+
+    if pid is None:
+        os.close(out_read)
+        os.close(err_read)
+        return None, exit_code
+
+    job = _RunningJob(index, argv, pid)
+    selector.register(out_read, selectors.EVENT_READ, ("out", job))
+    selector.register(err_read, selectors.EVENT_READ, ("err", job))
+    job.open_pipes = 2
+
+    pidfd_open = getattr(os, "pidfd_open", None)
+    if pidfd_open is not None:
+        try:
+            job.pidfd = pidfd_open(pid)
+            selector.register(job.pidfd, selectors.EVENT_READ, ("pid", job))
+        except OSError:
+            job.pidfd = None
+    return job, 0
+
+
+def _emit(job: _RunningJob) -> None:
+    """Write a finished job's captured output as one block."""
+    write_output(sys.stdout, job.stdout)
+    write_output(sys.stderr, job.stderr)
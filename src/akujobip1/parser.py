@@ -1,21 +1,325 @@
 """
 Command parsing module.
 
-This module handles parsing user input into command arguments,
-including support for quoted strings and wildcard expansion.
+This module handles parsing user input into a syntax tree (parse(),
+see the syntax module: lists with ;, &&, || and &, pipelines and
+redirections) and expanding each command's words into arguments:
+quoted strings, variable, tilde and command expansion ($HOME,
+${NAME:-default}, ~user, $(cmd)), brace expansion ({a,b}, {1..10}) and
+wildcard expansion.
+
+Sessions and scripts repeat the same lines over and over, so results are
+kept in a bounded LRU cache keyed on the raw line (parser.cache_entries):
+the syntax tree (or tokens) of a line, and separately the expansion of
+each command that has wildcards. An expansion is stored with the
+directories its globs read (and their mtimes) and reused only while none
+of them changed; ones that walked a tree for '**' are expanded again
+every time. Lines with $ or ~ expansions keep their cached tokens but are
+expanded every time, since the result depends on the environment.
 """
 
-import shlex
-import glob
-from typing import List, Dict, Any
+import os
+import sys
+from collections import OrderedDict
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Sequence, Tuple
+
+from akujobip1.braces import expand_token
+from akujobip1.config import as_settings
+from akujobip1.expansion import ExpansionError, expand_parameters
+from akujobip1.globber import (
+    LISTING_CACHE,
+    WALK_OPTIONS,
+    Dependencies,
+    GlobLimitError,
+    WalkOptions,
+    configure_from_config,
+    dependencies_unchanged,
+    glob_paths,
+)
+from akujobip1.syntax import Command, CommandList, ParseError, parse_tokens
+from akujobip1.tokenizer import Token, TokenizeError, tokenize
+
+# Lines remembered by the parse cache (parser.cache_entries)
+DEFAULT_CACHE_ENTRIES = 256
+
+# Longer lines are parsed every time (rarely repeated, costly to keep)
+_MAX_CACHED_LINE = 4096
+
+# Expansions with more arguments are not kept (e.g. {1..100000})
+_MAX_CACHED_ARGS = 4096
+
+
+class ParseCache:
+    """
+    LRU cache of tokenized and expanded command lines.
+
+    Tokens and trees depend only on the line. Expansions also depend on
+    the filesystem, the working directory and the glob settings, so they
+    are kept apart, keyed on all of those, and revalidated against the
+    directories they were read from before each reuse.
+
+    Example:
+        >>> cache = ParseCache()
+        >>> tokens = cache.tokens('ls *.txt')
+        >>> cache.tokens('ls *.txt') is tokens
+        True
+        >>> cache.expand('ls *.txt', tokens)
+        ['ls', 'file1.txt', 'file2.txt']
+        >>> cache.hits, cache.misses
+        (1, 1)
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.expansion_hits = 0
+        self.expansion_misses = 0
+        self._tokens: "OrderedDict[str, List[Token]]" = OrderedDict()
+        self._trees: "OrderedDict[str, CommandList]" = OrderedDict()
+        self._expansions: "OrderedDict[tuple, Tuple[List[str], Dependencies]]" = (
+            OrderedDict()
+        )
+
+    def tokens(self, line: str) -> List[Token]:
+        """
+        Tokenize line, reusing an earlier result for the same line.
+
+        The returned list is shared with the cache - don't modify it.
+
+        Raises:
+            TokenizeError: As tokenize() (errors are not cached)
+        """
+        tokens = self._tokens.get(line)
+        if tokens is not None:
+            self._tokens.move_to_end(line)
+            self.hits += 1
+            return tokens
+
+        self.misses += 1
+        tokens = tokenize(line, expand=True)
+        if self.max_entries > 0 and len(line) <= _MAX_CACHED_LINE:
+            self._tokens[line] = tokens
+            if len(self._tokens) > self.max_entries:
+                self._tokens.popitem(last=False)
+        return tokens
+
+    def tree(self, line: str) -> CommandList:
+        """
+        Parse line into its syntax tree, reusing an earlier result.
+
+        The tree is shared with the cache - don't modify it.
+
+        Raises:
+            ParseError: Syntax error, unclosed quote or trailing backslash
+                        (errors are not cached)
+        """
+        tree = self._trees.get(line)
+        if tree is not None:
+            self._trees.move_to_end(line)
+            self.hits += 1
+            return tree
+
+        self.misses += 1
+        try:
+            tree = parse_tokens(tokenize(line, operators=True, expand=True))
+        except TokenizeError as e:
+            raise ParseError(str(e)) from None
+        if self.max_entries > 0 and len(line) <= _MAX_CACHED_LINE:
+            self._trees[line] = tree
+            if len(self._trees) > self.max_entries:
+                self._trees.popitem(last=False)
+        return tree
+
+    def expand(
+        self,
+        line: str,
+        tokens: Sequence[Token],
+        glob: bool = True,
+        part: Optional[int] = None,
+    ) -> List[str]:
+        """
+        Expand line's tokens, reusing a still valid result.
+
+        Args:
+            line: The raw line the tokens came from (the cache key)
+            tokens: Its tokens
+            glob: Expand wildcards as well as braces
+            part: Which command of the line the tokens are (its offset),
+                  or None for the whole line read as one command
+
+        Returns:
+            The arguments after expansion (a new list)
+
+        Raises:
+            GlobLimitError: A '**' pattern matched more than glob.max_matches
+        """
+        key = self._expansion_key(line, glob, part)
+        if key is not None:
+            cached = self._expansions.get(key)
+            if cached is not None:
+                args, dependencies = cached
+                if dependencies_unchanged(dependencies):
+                    self._expansions.move_to_end(key)
+                    self.expansion_hits += 1
+                    return list(args)
+                del self._expansions[key]
+
+        self.expansion_misses += 1
+        LISTING_CACHE.start_recording()
+        try:
+            args = expand_tokens(tokens, glob)
+        finally:
+            dependencies = LISTING_CACHE.stop_recording()
+        if (
+            key is not None
+            and dependencies is not None
+            and len(args) <= _MAX_CACHED_ARGS
+        ):
+            self._expansions[key] = (list(args), dependencies)
+            if len(self._expansions) > self.max_entries:
+                self._expansions.popitem(last=False)
+        return args
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return hit/miss counters and current size (shown by hash -s).
+
+        Returns:
+            {'hits', 'misses', 'lines', 'expansion_hits', 'expansion_misses',
+            'expansions'}
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "lines": len(self._tokens) + len(self._trees),
+            "expansion_hits": self.expansion_hits,
+            "expansion_misses": self.expansion_misses,
+            "expansions": len(self._expansions),
+        }
+
+    def configure(self, max_entries: int) -> None:
+        """Change the number of lines kept (0 disables caching)."""
+        self.max_entries = max_entries
+        for entries in (self._tokens, self._trees, self._expansions):
+            while len(entries) > max_entries:
+                entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forget every cached line."""
+        self._tokens.clear()
+        self._trees.clear()
+        self._expansions.clear()
+
+    def _expansion_key(
+        self, line: str, glob: bool, part: Optional[int] = None
+    ) -> Optional[tuple]:
+        """Everything an expansion depends on besides directory contents."""
+        if self.max_entries <= 0 or len(line) > _MAX_CACHED_LINE:
+            return None
+        try:
+            cwd = os.getcwd()
+        except OSError:
+            # Working directory was removed - nothing stable to key on
+            return None
+        return (
+            line,
+            part,
+            cwd,
+            glob,
+            WALK_OPTIONS.recursive,
+            WALK_OPTIONS.follow_symlinks,
+            WALK_OPTIONS.max_depth,
+            WALK_OPTIONS.max_matches,
+        )
+
+
+def configure_parse_cache(config: Dict[str, Any]) -> None:
+    """Apply parser.cache_entries to the shared PARSE_CACHE."""
+    entries = as_settings(config).parser.cache_entries
+    if entries != PARSE_CACHE.max_entries:
+        PARSE_CACHE.configure(entries)
+
+
+def parse(command_line: str) -> CommandList:
+    """
+    Parse a command line into its syntax tree.
+
+    This is what the shell runs: lists (;, &, && and ||), pipelines and
+    redirections, with the words left unexpanded (expand_command()
+    expands them when each command runs). Trees are cached per line.
+
+    Args:
+        command_line: Raw command line input from user
+
+    Returns:
+        The line's CommandList (no pipelines for a blank line)
+
+    Raises:
+        ParseError: Syntax error, unclosed quote or trailing backslash
+
+    Example:
+        >>> tree = parse('make && ./test | tee log; echo done')
+        >>> [len(p.commands) for p in tree.pipelines], tree.connectors
+        ([1, 2, 1], ('&&', ';', ''))
+    """
+    return PARSE_CACHE.tree(command_line)
+
+
+def expand_command(
+    command: Command, command_line: str, config: Dict[str, Any]
+) -> List[str]:
+    """
+    Expand a parsed command's words into its arguments.
+
+    Same expansions, in the same order, as parse_command(); wildcard
+    results are cached per command of the line.
+
+    Args:
+        command: A command from parse(command_line)
+        command_line: The line it was parsed from
+        config: Configuration dictionary containing glob settings
+
+    Returns:
+        The arguments (empty if every word expanded to nothing)
+
+    Raises:
+        ExpansionError: ${NAME?word} failed or $(command) printed too much
+        GlobLimitError: A '**' pattern matched more than glob.max_matches paths
+    """
+    if not command.words:
+        return []
+    return _expand_words(command.words, config, command_line, command.words[0].start)
+
+
+def expand_word(word: Token, command_line: str, config: Dict[str, Any]) -> List[str]:
+    """
+    Expand one word of a parsed line (a redirection's file name).
+
+    Returns:
+        The resulting words (a file name must come out as exactly one)
+
+    Raises:
+        ExpansionError, GlobLimitError: As expand_command()
+    """
+    return _expand_words((word,), config, command_line, word.start)
 
 
 def parse_command(command_line: str, config: Dict[str, Any]) -> List[str]:
     """
     Parse a command line string into a list of arguments.
 
-    Uses shlex.split() for proper handling of quoted arguments,
-    then expands wildcards if enabled in configuration.
+    Compatibility API: the whole line is read as one simple command, so
+    ;, &, |, < and > are ordinary characters here (use parse() and
+    expand_command() for lines with operators).
+
+    Uses the tokenizer module (shlex.split() rules, but scanned a run at a
+    time) for quoted arguments, then expands $VARIABLES and ~ (see the
+    expansion module), braces (see the braces module) and wildcards if
+    enabled in configuration. Only unquoted braces and wildcards are
+    expanded: "*.txt", \\*.txt and '{a,b}' stay literal, as in bash,
+    and '$HOME' is not expanded at all. '**' matches any number of directories
+    (src/**/*.py).
 
     Args:
         command_line: Raw command line input from user
@@ -34,34 +338,170 @@ def parse_command(command_line: str, config: Dict[str, Any]) -> List[str]:
         []
         >>> parse_command('ls *.txt', config)  # Expands if files exist
         ['ls', 'file1.txt', 'file2.txt']
+        >>> parse_command('find . -name "*.txt"', config)
+        ['find', '.', '-name', '*.txt']
+        >>> parse_command('touch log{1..3}.txt', config)
+        ['touch', 'log1.txt', 'log2.txt', 'log3.txt']
+        >>> os.environ.update(HOME='/h', DIR='my dir')
+        >>> parse_command('ls ~/"$DIR"', config)
+        ['ls', '/h/my dir']
     """
     # Handle empty or whitespace-only input
     if not command_line or not command_line.strip():
         return []
 
+    configure_parse_cache(config)
     try:
-        # Use shlex to properly parse quoted arguments
-        # This handles both single and double quotes, plus escapes
-        args = shlex.split(command_line)
-    except ValueError as e:
-        # shlex can raise ValueError for unclosed quotes
+        # Tokenize with shlex's rules: single and double quotes, plus escapes
+        tokens = PARSE_CACHE.tokens(command_line)
+    except TokenizeError as e:
+        # Unclosed quotes or a trailing backslash
         # Print error and return empty list (graceful degradation)
-        print(f"Parse error: {e}", file=__import__("sys").stderr)
+        print(f"Parse error: {e}", file=sys.stderr)
         return []
 
-    # If no arguments after parsing, return empty list
-    if not args:
+    try:
+        return _expand_words(tokens, config, command_line, None)
+    except (ExpansionError, GlobLimitError) as e:
+        # ${NAME?message}, too much $(command) output, or too many
+        # matches - don't run the command with a partial list
+        print(f"Parse error: {e}", file=sys.stderr)
         return []
 
-    # Expand wildcards if enabled in config
-    # Handle None values in config (malformed config)
-    glob_config = config.get("glob", {})
-    if glob_config is None:
-        glob_config = {}
-    if glob_config.get("enabled", True):
-        args = expand_wildcards(args, config)
 
-    return args
+def _expand_words(
+    tokens: Sequence[Token],
+    config: Dict[str, Any],
+    command_line: str,
+    part: Optional[int],
+) -> List[str]:
+    """Expand variables, braces and wildcards (see ParseCache.expand())."""
+    expansions = any(token.expansions is not None for token in tokens)
+    if expansions:
+        tokens = expand_parameters(list(tokens), config)
+
+    # Expand braces, and wildcards if enabled in config
+    glob = as_settings(config).glob.enabled
+    wildcards = glob and any(token.wildcard for token in tokens)
+    if wildcards or any(token.braces is not None for token in tokens):
+        if wildcards:
+            configure_from_config(config)
+        if expansions:
+            # Words depend on the environment: not cacheable
+            return expand_tokens(tokens, glob)
+        return PARSE_CACHE.expand(command_line, tokens, glob, part)
+
+    return [token.value for token in tokens]
+
+
+def iter_arguments(
+    command_line: str, config: Dict[str, Any]
+) -> Iterator[Tuple[str, bool]]:
+    """
+    Parse a command line lazily, one argument at a time.
+
+    Used for commands that are split into batches (the batch built-in and
+    execution.auto_batch), where a wildcard may match more files than fit
+    in one exec. Each wildcard is globbed only when the consumer reaches
+    it, so at most one pattern's matches are held at once, and
+    glob.max_matches does not apply (the arguments are never collected
+    into a single command).
+
+    Args:
+        command_line: Raw command line input from user
+        config: Configuration dictionary containing glob settings
+
+    Yields:
+        (argument, expanded) pairs - expanded is True for words produced
+        by a brace expression or a wildcard. Nothing is yielded for empty
+        input or parse errors (which are printed, as in parse_command()).
+        Brace sequences are generated as they are consumed, so
+        {1..1000000} is never built as a list.
+
+    Examples:
+        >>> list(iter_arguments('rm -f *.tmp', {}))
+        [('rm', False), ('-f', False), ('a.tmp', True), ('b.tmp', True)]
+    """
+    configure_parse_cache(config)
+    try:
+        tokens = PARSE_CACHE.tokens(command_line)
+    except TokenizeError as e:
+        print(f"Parse error: {e}", file=sys.stderr)
+        return
+    if any(token.expansions is not None for token in tokens):
+        tokens = _expand_parameters(tokens, config)
+        if tokens is None:
+            return
+
+    glob = as_settings(config).glob.enabled
+    if glob and any(token.wildcard for token in tokens):
+        configure_from_config(config)
+    yield from _expand(tokens, glob, WALK_OPTIONS.without_match_limit())
+
+
+def _expand_parameters(
+    tokens: List[Token], config: Dict[str, Any]
+) -> Optional[List[Token]]:
+    """expand_parameters(), printing errors (None if there was one)."""
+    try:
+        return expand_parameters(tokens, config)
+    except ExpansionError as e:
+        # ${NAME?message} or too much $(command) output: don't run it
+        print(f"Parse error: {e}", file=sys.stderr)
+        return None
+
+
+def expand_tokens(tokens: Sequence[Token], glob: bool = True) -> List[str]:
+    """
+    Expand the brace and wildcard tokens of a tokenized command line.
+
+    Uses the flags the tokenizer computed while scanning, so words
+    without an unquoted {, *, ? or [ are passed through without being
+    inspected again (and never reach the filesystem). Brace expressions
+    are expanded first; each resulting wildcard word is globbed with its
+    quoted parts escaped, through the globber module's cached directory
+    listings. If nothing matches, the word is kept (with its quotes
+    removed).
+
+    Args:
+        tokens: Tokens from tokenizer.tokenize()
+        glob: Expand wildcards (braces are always expanded)
+
+    Returns:
+        List of arguments with braces and wildcards expanded
+
+    Raises:
+        GlobLimitError: A '**' pattern matched more than glob.max_matches paths
+
+    Examples:
+        >>> expand_tokens(tokenize('ls *.txt "*.md"'))
+        ['ls', 'file1.txt', 'file2.txt', '*.md']
+        >>> expand_tokens(tokenize('cat {file,test}1.*'))
+        ['cat', 'file1.txt', 'test1.py']
+    """
+    return [arg for arg, _ in _expand(tokens, glob, None)]
+
+
+def _expand(
+    tokens: Iterable[Token], glob: bool, options: Optional[WalkOptions]
+) -> Iterator[Tuple[str, bool]]:
+    """Yield (argument, expanded) for each word after brace/wildcard expansion."""
+    for token in tokens:
+        words: Iterable[Token] = (token,)
+        expanded = False
+        if token.braces is not None:
+            braced = expand_token(token)
+            if braced is not None:
+                words = braced
+                expanded = True
+        for word in words:
+            if glob and word.wildcard:
+                matches = glob_paths(word.pattern, options=options)
+                if matches:
+                    for path in matches:
+                        yield path, True
+                    continue
+            yield word.value, expanded
 
 
 def expand_wildcards(args: List[str], config: Dict[str, Any]) -> List[str]:
@@ -72,6 +512,10 @@ def expand_wildcards(args: List[str], config: Dict[str, Any]) -> List[str]:
     If no matches are found, the literal argument is kept.
     Respects the glob.enabled configuration setting.
 
+    The arguments are plain strings, so every metacharacter counts as
+    unquoted; parse_command() uses expand_tokens() instead, which knows
+    what was quoted. '**' is recursive unless glob.recursive is false.
+
     Args:
         args: List of command arguments (may contain wildcards)
         config: Configuration dictionary containing glob settings
@@ -79,6 +523,9 @@ def expand_wildcards(args: List[str], config: Dict[str, Any]) -> List[str]:
     Returns:
         List of arguments with wildcards expanded to matching files
 
+    Raises:
+        GlobLimitError: A '**' pattern matched more than glob.max_matches paths
+
     Examples:
         >>> config = {'glob': {'enabled': True}}
         >>> expand_wildcards(['ls', '*.txt'], config)
@@ -89,20 +536,17 @@ def expand_wildcards(args: List[str], config: Dict[str, Any]) -> List[str]:
         ['cp', 'file1.txt', 'file2.txt', 'dest/']
     """
     # Check if glob expansion is disabled
-    # Handle None values in config (malformed config)
-    glob_config = config.get("glob", {})
-    if glob_config is None:
-        glob_config = {}
-    if not glob_config.get("enabled", True):
+    if not as_settings(config).glob.enabled:
         return args
 
+    configure_from_config(config)
     expanded_args = []
 
     for arg in args:
         # Only try to expand if the argument contains wildcard characters
         if _contains_wildcard(arg):
             # Try to expand the wildcard
-            matches = sorted(glob.glob(arg))
+            matches = glob_paths(arg)
 
             # If matches found, add them; otherwise keep the literal
             if matches:
@@ -138,3 +582,7 @@ def _contains_wildcard(arg: str) -> bool:
         False
     """
     return "*" in arg or "?" in arg or "[" in arg
+
+
+# Shared parse cache used by parse(), parse_command() and iter_arguments()
+PARSE_CACHE = ParseCache()
@@ -0,0 +1,154 @@
+"""
+Command hash table module.
+
+This module resolves command names to absolute paths once and remembers
+the answer, like the `hash` facility in bash. Both hits and misses are
+cached, so an unknown command can be reported (exit 127) by the shell
+without creating a child process at all.
+
+The table is invalidated whenever $PATH changes or the modification time
+of any directory on $PATH changes (a command was installed or removed).
+
+POSIX References:
+    - hash utility: https://pubs.opengroup.org/onlinepubs/9699919799/utilities/hash.html
+    - PATH search: https://pubs.opengroup.org/onlinepubs/9699919799/basedefs/V1_chap08.html
+"""
+
+import os
+import stat
+from typing import Dict, List, Optional, Tuple
+
+
+class CommandHash:
+    """
+    Cache of command name -> resolved path, including negative entries.
+
+    Entries map to the resolved path, or to None when the command was not
+    found on PATH. Names containing a slash are never looked up or cached.
+    """
+
+    def __init__(self) -> None:
+        self._table: Dict[str, Optional[str]] = {}
+        self._hits: Dict[str, int] = {}
+        self._path_value: Optional[str] = None
+        self._dir_mtimes: Tuple[int, ...] = ()
+        self._cacheable = True
+
+    def lookup(self, name: str) -> Optional[str]:
+        """
+        Resolve a command name, consulting and filling the cache.
+
+        Args:
+            name: Command name (args[0])
+
+        Returns:
+            Path to execute, or None if the command does not exist on PATH
+
+        Example:
+            >>> COMMAND_HASH.lookup('ls')
+            '/usr/bin/ls'
+            >>> COMMAND_HASH.lookup('nonexistent_cmd') is None
+            True
+        """
+        if "/" in name:
+            # Explicit path - execute exactly what the user typed
+            return name
+
+        self._validate()
+
+        if name in self._table:
+            self._hits[name] += 1
+            return self._table[name]
+
+        path = search_path(name, self._directories())
+        if self._cacheable:
+            self._table[name] = path
+            self._hits[name] = 1
+        return path
+
+    def peek(self, name: str) -> Optional[str]:
+        """
+        Return the cached path for name without searching or counting a hit.
+
+        Returns:
+            Cached path, or None if the name is not hashed (or hashed as missing)
+        """
+        self._validate()
+        return self._table.get(name)
+
+    def forget(self) -> None:
+        """Discard every cached entry (hash -r)."""
+        self._table.clear()
+        self._hits.clear()
+
+    def entries(self) -> List[Tuple[str, int, str]]:
+        """
+        List the positive cache entries.
+
+        Returns:
+            (name, hits, path) tuples sorted by name
+        """
+        self._validate()
+        return [
+            (name, self._hits[name], path)
+            for name, path in sorted(self._table.items())
+            if path is not None
+        ]
+
+    def _directories(self) -> List[str]:
+        """Split the current PATH the same way os.execvp() does."""
+        return os.get_exec_path()
+
+    def _validate(self) -> None:
+        """Drop the table if PATH or any PATH directory changed."""
+        path_value = os.environ.get("PATH", os.defpath)
+        directories = self._directories()
+
+        mtimes = []
+        for directory in directories:
+            try:
+                mtimes.append(os.stat(directory or ".").st_mtime_ns)
+            except OSError:
+                mtimes.append(-1)
+        dir_mtimes = tuple(mtimes)
+
+        if path_value != self._path_value or dir_mtimes != self._dir_mtimes:
+            self.forget()
+            self._path_value = path_value
+            self._dir_mtimes = dir_mtimes
+            # Relative entries ('' or '.') depend on the current directory,
+            # so results found through them can't be reused after a cd
+            self._cacheable = all(os.path.isabs(d) for d in directories)
+
+
+def search_path(name: str, directories: List[str]) -> Optional[str]:
+    """
+    Search directories for an executable named name.
+
+    Follows execvp() semantics: the first executable regular file wins.
+    If only non-executable matches exist, the first of those is returned
+    so that exec reports "Permission denied" (exit 126), as execvp would.
+
+    Args:
+        name: Command name without a slash
+        directories: Directories to search, in order
+
+    Returns:
+        Path to the command, or None if nothing named name exists
+    """
+    denied = None
+    for directory in directories:
+        candidate = os.path.join(directory, name)
+        try:
+            st = os.stat(candidate)
+        except OSError:
+            continue
+        if stat.S_ISREG(st.st_mode) and os.access(candidate, os.X_OK):
+            return candidate
+        if denied is None:
+            denied = candidate
+    return denied
+
+
+# Shared table used by the executor and the hash/type built-ins
+COMMAND_HASH = CommandHash()
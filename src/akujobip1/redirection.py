@@ -0,0 +1,363 @@
+"""
+I/O redirection module.
+
+Turns a command's parsed redirections (syntax.Redirect) into the
+(source_fd, target_fd) pairs the executor applies in the new process:
+    - <file, >file, >>file: the file is opened in the shell (close-on-exec,
+      so no other command inherits it) and becomes the source
+    - n<&m, n>&m: m itself is the source; n<&- and n>&- close n
+    - <<<word: the expanded word plus a newline, in a memory file
+    - <<DELIM, <<-DELIM: the lines up to DELIM (here-documents), read by
+      read_here_documents() before the line runs; $ expansions in them
+      are resolved unless DELIM is quoted, and <<- strips leading tabs
+The pairs are applied in order, after the pipes of a pipeline stage, so
+>log 2>&1 sends both streams to log while 2>&1 >log sends only stdout.
+
+The executor turns the pairs into posix_spawn() file actions (or dup2()
+calls in a forked child), so a redirected command costs no extra process
+- there is no need for `sh -c 'cmd > file'`. A built-in run on its own
+(cd, pwd, memoized commands, ...) has them applied to the shell itself
+for the duration (redirected()), since it must not run in a child.
+
+Here-strings and here-documents live in a memfd (memfd_create(), an
+anonymous file in memory that never touches a filesystem), written once
+and rewound for the command to read; platforms without it get an
+unlinked temporary file. <file, >file, >>file to /dev/null reuse one
+descriptor opened the first time it is needed, so the common
+>/dev/null 2>&1 opens nothing at all. Every descriptor the shell opens
+is moved to 10 or above, clear of the 0-9 a command line can name, so
+3>a <b never has b's descriptor overwritten by a.
+
+POSIX References:
+    Shell Command Language, 2.7 Redirection:
+    https://pubs.opengroup.org/onlinepubs/9699919799/utilities/V3_chap02.html#tag_18_07
+"""
+
+import fcntl
+import os
+import sys
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from akujobip1.executor import CLOSE_FD
+from akujobip1.expansion import expand_here_document, expand_string
+from akujobip1.parser import expand_word
+from akujobip1.syntax import CommandList, Redirect
+from akujobip1.tokenizer import Token
+
+# Descriptors opened by the shell start here (as in bash)
+_FIRST_SHELL_FD = 10
+
+# open() flags for the file redirections
+_OPEN_FLAGS = {
+    "<": os.O_RDONLY,
+    ">": os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+    ">>": os.O_WRONLY | os.O_CREAT | os.O_APPEND,
+}
+
+# Shared /dev/null descriptor (opened on first use)
+_null_fd: Optional[int] = None
+
+
+class RedirectionError(Exception):
+    """A redirection that cannot be made, e.g. "out.txt: Permission denied"."""
+
+
+class Redirections:
+    """
+    The redirections of one command, opened and ready to apply.
+
+    Attributes:
+        pairs: (source_fd, target_fd) in the order to apply them
+               (source CLOSE_FD closes target)
+
+    close() (or leaving a with block) closes the descriptors opened for
+    them; the command must have started by then.
+    """
+
+    __slots__ = ("pairs", "_opened")
+
+    def __init__(self) -> None:
+        self.pairs: List[Tuple[int, int]] = []
+        self._opened: List[int] = []
+
+    def own(self, fd: int) -> int:
+        """Record fd as opened for these redirections; returns it."""
+        self._opened.append(fd)
+        return fd
+
+    def close(self) -> None:
+        """Close the descriptors opened for the redirections."""
+        for fd in self._opened:
+            os.close(fd)
+        self._opened = []
+
+    def __enter__(self) -> "Redirections":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def open_redirections(
+    redirects: Sequence[Redirect],
+    command_line: str,
+    config: Dict[str, Any],
+    here_documents: Optional[Dict[int, str]] = None,
+) -> Redirections:
+    """
+    Expand the targets of a command's redirections and open them.
+
+    Args:
+        redirects: Command.redirects from parse(command_line)
+        command_line: The line they were parsed from
+        config: Configuration dictionary
+        here_documents: Here-document bodies by Redirect.start (from
+                        read_here_documents()); missing ones are empty
+
+    Returns:
+        The opened Redirections (nothing opened if redirects is empty)
+
+    Raises:
+        RedirectionError: A file could not be opened, a target expanded to
+                          more or less than one word, or n>&m named a
+                          descriptor that is not open
+        ExpansionError, GlobLimitError: As parser.expand_command()
+
+    Example:
+        >>> tree = parse('sort < names.txt > sorted.txt 2>&1')
+        >>> with open_redirections(tree.pipelines[0].commands[0].redirects,
+        ...                        line, {}) as redirections:
+        ...     redirections.pairs
+        [(10, 0), (11, 1), (1, 2)]
+    """
+    redirections = Redirections()
+    if not redirects:
+        return redirections
+    try:
+        for redirect in redirects:
+            source = _source(redirect, redirections, command_line, config)
+            if source is None:
+                source = _here_document_fd(
+                    (here_documents or {}).get(redirect.start, ""),
+                    redirect,
+                    redirections,
+                    config,
+                )
+            redirections.pairs.append((source, redirect.fd))
+    except BaseException:
+        redirections.close()
+        raise
+    return redirections
+
+
+def read_here_documents(
+    tree: CommandList, read_line: Optional[Callable[[], Optional[str]]]
+) -> Dict[int, str]:
+    """
+    Read the bodies of a line's here-documents from the input after it.
+
+    Args:
+        tree: The parsed line
+        read_line: Returns the next input line, or None at end of input
+                   (None when there is no more input, as inside $(...))
+
+    Returns:
+        Each body (with its newlines, less the delimiter line) by
+        Redirect.start; a body cut short by end of input is kept, with
+        bash's warning
+    """
+    bodies: Dict[int, str] = {}
+    for redirect in tree.here_documents():
+        delimiter = _delimiter(redirect.target)
+        strip_tabs = redirect.operator == "<<-"
+        lines: List[str] = []
+        while True:
+            line = read_line() if read_line is not None else None
+            if line is None:
+                print(
+                    "akujobip1: warning: here-document delimited by "
+                    f"end-of-file (wanted `{delimiter}')",
+                    file=sys.stderr,
+                )
+                break
+            if strip_tabs:
+                line = line.lstrip("\t")
+            if line == delimiter:
+                break
+            lines.append(line + "\n")
+        bodies[redirect.start] = "".join(lines)
+    return bodies
+
+
+@contextmanager
+def redirected(pairs: Sequence[Tuple[int, int]]) -> Iterator[None]:
+    """
+    Apply redirections to the shell process itself, then undo them.
+
+    For built-ins, which run in the shell: every descriptor changed is
+    saved first (above 10, close-on-exec) and put back on exit, and
+    sys.stdin/stdout/stderr are rebound to fds 0/1/2 meanwhile (they may
+    be replaced streams that don't write to those descriptors).
+
+    Example:
+        >>> with open_redirections(redirects, line, {}) as redirections:
+        ...     with redirected(redirections.pairs):
+        ...         builtin.execute(args, config)
+    """
+    sys.stdout.flush()
+    sys.stderr.flush()
+    streams = (sys.stdin, sys.stdout, sys.stderr)
+    # (target, saved copy or None if it was closed, was it inheritable)
+    saved: List[Tuple[int, Optional[int], bool]] = []
+    try:
+        for source, target in pairs:
+            if all(target != fd for fd, _, _ in saved):
+                saved.append(_save(target))
+            if source == CLOSE_FD:
+                _close_quietly(target)
+            else:
+                os.dup2(source, target)
+        targets = {target for source, target in pairs if source != CLOSE_FD}
+        if 0 in targets:
+            sys.stdin = open(0, "r", closefd=False)
+        if 1 in targets:
+            sys.stdout = open(1, "w", closefd=False)
+        if 2 in targets:
+            sys.stderr = open(2, "w", closefd=False)
+        yield
+    finally:
+        try:
+            for stream in (sys.stdout, sys.stderr):
+                if stream not in streams:
+                    stream.flush()
+        except OSError:
+            # e.g. writing to a closed or full descriptor
+            pass
+        sys.stdin, sys.stdout, sys.stderr = streams
+        for target, copy, inheritable in reversed(saved):
+            if copy is None:
+                _close_quietly(target)
+            else:
+                os.dup2(copy, target, inheritable=inheritable)
+                os.close(copy)
+
+
+def null_fd() -> int:
+    """The shell's /dev/null descriptor (read-write, close-on-exec)."""
+    global _null_fd
+    if _null_fd is None:
+        _null_fd = _move_high(os.open(os.devnull, os.O_RDWR | os.O_CLOEXEC))
+    return _null_fd
+
+
+def memory_file(data: bytes) -> int:
+    """
+    A close-on-exec descriptor for a file holding data, positioned at 0.
+
+    A memfd where available, else an already unlinked temporary file.
+    """
+    try:
+        fd = os.memfd_create("akujobip1-here", os.MFD_CLOEXEC)
+    except (AttributeError, OSError):
+        # No memfd_create() (not Linux, or blocked by a seccomp filter);
+        # tempfile is imported only then (it pulls in shutil and random)
+        import tempfile
+
+        fd, path = tempfile.mkstemp(prefix="akujobip1-here-")
+        os.unlink(path)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view) :]
+        os.lseek(fd, 0, os.SEEK_SET)
+        return _move_high(fd)
+    except BaseException:
+        os.close(fd)
+        raise
+
+
+def _source(
+    redirect: Redirect,
+    redirections: Redirections,
+    command_line: str,
+    config: Dict[str, Any],
+) -> Optional[int]:
+    """Source descriptor for a redirection (None for a here-document)."""
+    operator = redirect.operator
+    if operator in ("<<", "<<-"):
+        return None
+    if operator == "<<<":
+        text = expand_string(redirect.target, config) + "\n"
+        return redirections.own(memory_file(os.fsencode(text)))
+
+    words = expand_word(redirect.target, command_line, config)
+    if len(words) != 1:
+        raise RedirectionError(f"{redirect.target.value}: ambiguous redirect")
+    word = words[0]
+
+    if operator in ("<&", ">&"):
+        if word == "-":
+            return CLOSE_FD
+        if not word.isdigit():
+            raise RedirectionError(f"{word}: ambiguous redirect")
+        fd = int(word)
+        # Descriptors set by an earlier redirection exist by then
+        if all(target != fd for _, target in redirections.pairs):
+            try:
+                fcntl.fcntl(fd, fcntl.F_GETFD)
+            except OSError:
+                raise RedirectionError(f"{word}: Bad file descriptor") from None
+        return fd
+
+    if word == os.devnull:
+        return null_fd()
+    try:
+        fd = os.open(word, _OPEN_FLAGS[operator] | os.O_CLOEXEC, 0o666)
+    except OSError as e:
+        raise RedirectionError(f"{word}: {e.strerror}") from None
+    return redirections.own(_move_high(fd))
+
+
+def _here_document_fd(
+    body: str, redirect: Redirect, redirections: Redirections, config: Dict[str, Any]
+) -> int:
+    """Memory file with a here-document's body (expanded unless quoted)."""
+    if not redirect.target.quoted:
+        body = expand_here_document(body, config)
+    return redirections.own(memory_file(os.fsencode(body)))
+
+
+def _delimiter(word: Token) -> str:
+    """A here-document's delimiter: the word with its quotes removed."""
+    if word.expansions is None:
+        return word.value
+    # $ is not expanded in a delimiter; value is the raw text then
+    return word.value.replace('"', "").replace("'", "")
+
+
+def _move_high(fd: int) -> int:
+    """Move fd to _FIRST_SHELL_FD or above (close-on-exec)."""
+    if fd >= _FIRST_SHELL_FD:
+        return fd
+    try:
+        return fcntl.fcntl(fd, fcntl.F_DUPFD_CLOEXEC, _FIRST_SHELL_FD)
+    finally:
+        os.close(fd)
+
+
+def _save(fd: int) -> Tuple[int, Optional[int], bool]:
+    """Copy of fd to restore later (None if fd is not open)."""
+    try:
+        inheritable = os.get_inheritable(fd)
+        return fd, fcntl.fcntl(fd, fcntl.F_DUPFD_CLOEXEC, _FIRST_SHELL_FD), inheritable
+    except OSError:
+        return fd, None, False
+
+
+def _close_quietly(fd: int) -> None:
+    """Close fd if it is open."""
+    try:
+        os.close(fd)
+    except OSError:
+        pass
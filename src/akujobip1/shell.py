@@ -13,28 +13,102 @@ Signal Handling Strategy:
 
     This approach is simpler and safer than custom handlers, which could
     interfere with waitpid() and child process signal handling.
+
+Batch Mode:
+    akujobip1 -c 'cmd', akujobip1 script.sh, and piped (non-TTY) stdin skip
+    input() entirely: input is read in large chunks and split into lines,
+    which matters for automation feeding tens of thousands of lines.
+
+Startup Time:
+    Scripts may start the shell thousands of times, so nothing that a
+    first prompt does not need is imported up front: yaml only when a
+    config file exists (and not even then once it is cached), threads
+    for parallel '**' walks, hashing for memo, sockets for the zygote,
+    tempfile, fnmatch and glob only when a line uses them. --startup-profile
+    prints how long each startup phase took.
 """
 
+import itertools
+import os
 import sys
-from typing import Dict, Any
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 # Import all required modules
-from akujobip1.config import load_config
-from akujobip1.parser import parse_command
-from akujobip1.builtins import get_builtin
-from akujobip1.executor import execute_external_command
-
-
-def cli() -> int:
+from akujobip1 import IMPORT_STARTED
+from akujobip1.config import ConfigWatcher, as_settings, load_config
+from akujobip1.parser import (
+    configure_parse_cache,
+    expand_command,
+    iter_arguments,
+    parse,
+)
+from akujobip1.builtins import SHELL_OPTIONS, get_builtin, print_time_report
+from akujobip1.memo import is_memoized, run_memoized
+from akujobip1.executor import (
+    ResourceUsage,
+    execute_external_command,
+    execute_pipeline,
+    last_resource_usage,
+    resolve_spawn_strategy,
+)
+from akujobip1.expansion import SPECIAL_PARAMETERS, ExpansionError
+from akujobip1.globber import GlobLimitError
+from akujobip1.jobs import JOB_TABLE
+from akujobip1.redirection import (
+    RedirectionError,
+    Redirections,
+    open_redirections,
+    read_here_documents,
+    redirected,
+)
+from akujobip1.syntax import ParseError, Pipeline, run_list
+
+# Size of each os.read() when reading commands from a pipe or file
+_READ_SIZE = 1 << 16
+
+USAGE = "usage: akujobip1 [-e] [--startup-profile] [-c command | script]"
+
+# Prompt for the lines of a here-document (bash's default $PS2)
+_CONTINUATION_PROMPT = "> "
+
+
+def main() -> int:
+    """Console-script entry point: run the shell with the process arguments."""
+    return cli(sys.argv[1:])
+
+
+def cli(argv: Optional[List[str]] = None) -> int:
     """
     Main entry point for the shell application.
 
     This function is called when the shell is started either via
     the command line (akujobip1) or as a module (python -m akujobip1).
 
+    Args:
+        argv: Command-line arguments (without the program name).
+              None or [] starts the shell on stdin.
+
     Returns:
         Exit code (0 for success, non-zero for error)
 
+    Command-line Options:
+        -c command: Run command (may contain several lines) and exit
+        script: Run the commands in file script and exit
+        -e: Stop at the first failing command (like set -e)
+        --startup-profile: Print how long each startup phase took (to
+                           stderr) before the first prompt or command
+
     Environment Variables:
         AKUJOBIP1_CONFIG: Path to custom configuration file
 
@@ -45,16 +119,89 @@ def cli() -> int:
         AkujobiP1> exit
         Bye!
 
+        $ akujobip1 -c 'echo hello'
+        hello
+
     Error Handling:
         - Catches KeyboardInterrupt during startup (Ctrl+C) -> exits gracefully
         - Catches unexpected exceptions during startup -> prints error, exits with code 1
     """
+    command = None
+    script = None
+    startup_profile = False
+    words = list(argv or [])
+    while words and words[0].startswith("-") and words[0] != "-":
+        option = words.pop(0)
+        if option == "--":
+            break
+        if option in ("-h", "--help"):
+            print(USAGE)
+            return 0
+        if option == "-e":
+            SHELL_OPTIONS["errexit"] = True
+        elif option == "--startup-profile":
+            startup_profile = True
+        elif option == "-c":
+            if not words:
+                print("akujobip1: -c: option requires an argument", file=sys.stderr)
+                return 2
+            command = words.pop(0)
+        else:
+            print(f"akujobip1: {option}: invalid option", file=sys.stderr)
+            print(USAGE, file=sys.stderr)
+            return 2
+    if command is None and words:
+        script = words.pop(0)
+    if words:
+        # No positional parameters ($1, $2...) to bind them to
+        print(f"akujobip1: {words[0]}: unexpected operand", file=sys.stderr)
+        print(USAGE, file=sys.stderr)
+        return 2
+
     try:
-        # Load configuration from YAML file or use defaults
+        # Load configuration from YAML file or use defaults (the watcher
+        # notes the files' state first, so an edit made meanwhile is seen)
+        config_started = time.perf_counter()
+        watcher = ConfigWatcher()
         config = load_config()
 
-        # Run main shell loop
-        return run_shell(config)
+        # With spawn_strategy 'zygote', fork the zygote now, while the
+        # shell is still small (it is started lazily otherwise)
+        spawn_started = time.perf_counter()
+        resolve_spawn_strategy(config)
+
+        if startup_profile:
+            ready = time.perf_counter()
+            _print_startup_profile(
+                [
+                    ("imports", config_started - IMPORT_STARTED),
+                    ("config", spawn_started - config_started),
+                    ("spawn", ready - spawn_started),
+                    ("total", ready - IMPORT_STARTED),
+                ]
+            )
+
+        if command is not None:
+            return run_batch(command.splitlines(), config)
+
+        if script is not None:
+            try:
+                with open(script, "rb") as f:
+                    data = f.read()
+            except OSError as e:
+                print(f"akujobip1: {script}: {e.strerror}", file=sys.stderr)
+                return 127
+            return run_batch(_decode(data).splitlines(), config)
+
+        stdin_fd = _batch_stdin_fd()
+        if stdin_fd is not None:
+            # Piped stdin: no prompts (unless prompt.show_in_batch asks
+            # for the interactive transcript), and no input() per line
+            show_prompt = as_settings(config).prompt.show_in_batch
+            return run_batch(_read_lines(stdin_fd), config, show_prompt=show_prompt)
+
+        # Run main shell loop (picking up config edits between prompts)
+        return run_shell(config, watcher)
 
     except KeyboardInterrupt:
         # Ctrl+C during startup - exit gracefully
@@ -67,21 +214,36 @@ def cli() -> int:
         return 1
 
 
-def run_shell(config: Dict[str, Any]) -> int:
+def _print_startup_profile(phases: List[Tuple[str, float]]) -> None:
+    """
+    Print startup phase timings to stderr (--startup-profile).
+
+    Example:
+        >>> _print_startup_profile([('imports', 0.0123), ('total', 0.0131)])
+        [Startup: imports 12.3ms total 13.1ms]
+    """
+    timings = " ".join(f"{name} {seconds * 1000:.1f}ms" for name, seconds in phases)
+    print(f"[Startup: {timings}]", file=sys.stderr)
+
+
+def run_shell(config: Dict[str, Any], watcher: Optional[ConfigWatcher] = None) -> int:
     """
     Run the main REPL (Read-Eval-Print Loop).
 
     Main loop structure:
     1. Display prompt and read input
-    2. Parse command (handles quotes, wildcards)
+    2. Parse command (handles quotes, wildcards, '|' pipelines)
     3. Skip if empty
     4. Check if built-in command
-    5. Execute built-in or external command
+    5. Execute built-in, external command, or pipeline
+       (a trailing '&' starts it as a background job instead)
     6. Check for exit signal (-1 from exit command)
     7. Repeat
 
     Args:
         config: Configuration dictionary containing all shell settings
+        watcher: Reloads config when its files change (checked before a
+                 prompt, at most every config.reload_interval seconds)
 
     Returns:
         Exit code (0 for normal exit, non-zero for error)
@@ -106,64 +268,40 @@ def run_shell(config: Dict[str, Any]) -> int:
         - Config keys accessed with .get() to handle missing keys gracefully
         - NO custom signal handlers - Python's default behavior is correct
     """
-    # Extract configuration values with safe defaults
-    # Use .get() with nested dicts to handle missing keys gracefully
-    # Handle case where config values might be None
-    prompt_config = config.get("prompt", {})
-    if prompt_config is None:
-        prompt_config = {}
-    prompt = prompt_config.get("text", "AkujobiP1> ")
-    # Guard against non-string prompt values (None, int, etc.)
-    if not isinstance(prompt, str):
-        prompt = "AkujobiP1> "
-
-    exit_config = config.get("exit", {})
-    if exit_config is None:
-        exit_config = {}
-    exit_message = exit_config.get("message", "Bye!")
-    # Guard against non-string exit message values
-    if not isinstance(exit_message, str):
-        exit_message = "Bye!"
+    prompt, exit_message = _prompt_and_exit_message(config)
 
     # Main REPL loop - continues until exit command or Ctrl+D
     while True:
         try:
+            # Report background jobs that finished since the last prompt
+            # (non-blocking: reaps only children that have already exited)
+            JOB_TABLE.notify()
+
+            # Pick up edited config files (a clock read unless a check
+            # is due); the prompt may have changed with them
+            if watcher is not None:
+                reloaded = watcher.poll(config)
+                if reloaded is not config:
+                    config = reloaded
+                    prompt, exit_message = _prompt_and_exit_message(config)
+
             # Step 1: Display prompt and read input
             # input() automatically flushes stdout and handles line buffering
             command_line = input(prompt)
 
-            # Step 2: Parse command line into arguments
-            # Parser handles quotes, escapes, wildcards, and errors
-            # Returns empty list for empty/whitespace/invalid input
-            args = parse_command(command_line, config)
-
-            # Step 3: Skip empty commands (empty input, whitespace, parse errors)
-            # Parser already printed error message if parsing failed
-            if not args:
-                continue
-
-            # Step 4: Check if command is a built-in
-            # Built-ins are executed directly without forking
-            builtin = get_builtin(args[0])
-
-            if builtin:
-                # Step 5a: Execute built-in command
-                exit_code = builtin.execute(args, config)
-
-                # Step 6: Check for exit signal
-                # Exit command returns -1 to signal shell termination
-                # This is the ONLY way to exit the shell normally
-                if exit_code == -1:
-                    # Exit command executed successfully
-                    # Note: exit command already printed exit message
-                    return 0
-
-                # Non-exit built-ins return 0 for success, 1+ for error
-                # We don't display their exit codes (they handle their own output)
-            else:
-                # Step 5b: Execute external command
-                # Executor handles fork/exec/wait and displays exit codes if configured
-                exit_code = execute_external_command(args, config)
+            # Steps 2-5: Parse and execute (here-documents read their
+            # lines from further input)
+            exit_code = execute_line(command_line, config, _read_continuation)
+
+            # Step 6: Check for exit signal
+            # Exit command returns -1 to signal shell termination
+            # This is the ONLY way to exit the shell normally
+            if exit_code == -1:
+                # Exit command executed successfully
+                # Note: exit command already printed exit message
+                return 0
+            # Remembered for $?
+            SPECIAL_PARAMETERS["?"] = str(exit_code)
 
             # Step 7: Continue loop
             # Exit codes are displayed by executor if configured
@@ -184,17 +322,7 @@ def run_shell(config: Dict[str, Any]) -> int:
         except Exception as e:
             # Unexpected error - defensive programming
             # Shell should be resilient and not crash on unexpected errors
-            print(f"Shell error: {e}", file=sys.stderr)
-
-            # If verbose error mode is enabled, show traceback
-            # Handle None values in config (malformed config)
-            errors_config = config.get("errors", {})
-            if errors_config is None:
-                errors_config = {}
-            if errors_config.get("verbose", False):
-                import traceback
-
-                traceback.print_exc()
+            _report_error(e, config)
 
             # Continue shell - user can still type commands or exit
             continue
@@ -202,3 +330,385 @@ def run_shell(config: Dict[str, Any]) -> int:
     # Should never reach here (loop exits via return statements)
     # But if we do, return success code
     return 0
+
+
+def run_batch(
+    lines: Iterable[str], config: Dict[str, Any], show_prompt: bool = False
+) -> int:
+    """
+    Run commands non-interactively (-c, script file, or piped stdin).
+
+    Unlike run_shell(), this never calls input(): lines come from an
+    iterable (a pre-read string or the chunked stdin reader), and stdout
+    stays block-buffered between commands (it is flushed before any child
+    process starts). With errexit set (set -e or -e), the first failing
+    command ends the run with its exit code.
+
+    Args:
+        lines: Command lines, without trailing newlines
+        config: Configuration dictionary containing all shell settings
+        show_prompt: Print the prompt before each line and the exit message
+                     at end of input, like an interactive session
+
+    Returns:
+        Exit code of the last command (0 after the exit command)
+
+    Example:
+        >>> run_batch(['echo one', 'false', 'echo two'], config)
+        one
+        two
+        0
+    """
+    prompt, exit_message = _prompt_and_exit_message(config)
+    exit_code = 0
+    line_iter = iter(lines)
+
+    while True:
+        JOB_TABLE.notify()
+        if show_prompt:
+            sys.stdout.write(prompt)
+
+        try:
+            command_line = next(line_iter)
+        except StopIteration:
+            # End of input behaves like Ctrl+D
+            if show_prompt:
+                print()
+                print(exit_message)
+            return exit_code
+
+        try:
+            status = execute_line(command_line, config, lambda: next(line_iter, None))
+        except KeyboardInterrupt:
+            # Ctrl+C aborts a non-interactive run (128 + SIGINT)
+            print()
+            return 130
+        except Exception as e:
+            _report_error(e, config)
+            status = 1
+
+        if status == -1:
+            # exit command (already printed its message)
+            return 0
+        exit_code = status
+        SPECIAL_PARAMETERS["?"] = str(exit_code)
+        if exit_code != 0 and SHELL_OPTIONS["errexit"]:
+            return exit_code
+
+
+def execute_line(
+    command_line: str,
+    config: Dict[str, Any],
+    read_line: Optional[Callable[[], Optional[str]]] = None,
+) -> int:
+    """
+    Parse and execute one command line.
+
+    Shared by the interactive loop and batch mode. Handles lists (';',
+    '&&', '||'), background jobs ('&'), pipelines ('|'), redirections,
+    built-ins and external commands.
+
+    Args:
+        command_line: Raw command line (without the trailing newline)
+        config: Configuration dictionary containing all shell settings
+        read_line: Returns the next input line (None at end of input),
+                   for the bodies of here-documents (<<EOF)
+
+    Returns:
+        Exit code of the command (0 for empty lines and comments),
+        or -1 if the exit command was executed
+    """
+    # Comments (and a script's #! line) are ignored
+    if command_line.lstrip().startswith("#"):
+        return 0
+
+    # Child processes write straight to fd 1, so anything still sitting in
+    # sys.stdout's buffer (prompts, built-in output) must go out first
+    sys.stdout.flush()
+
+    # Step 2: Parse the line into its syntax tree: commands separated by
+    # ';', '&', '&&' and '||', each a pipeline of one or more commands
+    configure_parse_cache(config)
+    try:
+        tree = parse(command_line)
+    except ParseError as e:
+        # Unclosed quotes, a trailing backslash or a misplaced operator
+        print(f"Parse error: {e}", file=sys.stderr)
+        return 2
+
+    # Step 3: Skip empty lines
+    if not tree.pipelines:
+        return 0
+
+    if tree.is_simple() and _wants_batching(command_line, config):
+        # `batch ...` or execution.auto_batch: stream the arguments
+        return _execute_batched_line(command_line, config)
+
+    # Here-document bodies follow the line, so they are read before
+    # anything runs (even if the commands using them are skipped)
+    here_documents = read_here_documents(tree, read_line)
+
+    def run_pipeline(pipeline: Pipeline, background: bool) -> int:
+        exit_code = _execute_pipeline_node(
+            pipeline, command_line, config, background, here_documents
+        )
+        if exit_code != -1:
+            # Later commands in the line see it as $?
+            SPECIAL_PARAMETERS["?"] = str(exit_code)
+        return exit_code
+
+    # Steps 4-5: Run each pipeline, as '&&' and '||' allow
+    return run_list(tree, run_pipeline)
+
+
+def _execute_pipeline_node(
+    pipeline: Pipeline,
+    command_line: str,
+    config: Dict[str, Any],
+    background: bool,
+    here_documents: Optional[Dict[int, str]] = None,
+) -> int:
+    """
+    Expand and run one pipeline of a parsed line.
+
+    Returns:
+        Its exit code (1 if a word could not be expanded or a redirection
+        failed, 0 once a background job has started), or -1 for the exit
+        built-in
+    """
+    # Expand every stage before starting any of them
+    try:
+        stages = [
+            expand_command(command, command_line, config)
+            for command in pipeline.commands
+        ]
+    except (ExpansionError, GlobLimitError) as e:
+        # ${NAME?message}, too much $(command) output or too many matches
+        print(f"Parse error: {e}", file=sys.stderr)
+        return 1
+
+    if not any(command.redirects for command in pipeline.commands):
+        return _run_stages(stages, pipeline, command_line, config, background)
+
+    # Open every stage's files before starting any of them
+    opened: List[Redirections] = []
+    try:
+        for command in pipeline.commands:
+            opened.append(
+                open_redirections(
+                    command.redirects, command_line, config, here_documents
+                )
+            )
+        return _run_stages(
+            stages,
+            pipeline,
+            command_line,
+            config,
+            background,
+            [redirections.pairs for redirections in opened],
+        )
+    except (RedirectionError, ExpansionError, GlobLimitError) as e:
+        # Missing file, no permission, ambiguous redirect, ...
+        print(f"akujobip1: {e}", file=sys.stderr)
+        return 1
+    finally:
+        # The commands have their own copies by now
+        for redirections in opened:
+            redirections.close()
+
+
+def _run_stages(
+    stages: List[List[str]],
+    pipeline: Pipeline,
+    command_line: str,
+    config: Dict[str, Any],
+    background: bool,
+    redirections: Optional[List[List[Tuple[int, int]]]] = None,
+) -> int:
+    """Run a pipeline's expanded stages (see _execute_pipeline_node())."""
+    if background:
+        # Returns as soon as the job has started
+        start, end = pipeline.span()
+        return execute_pipeline(
+            stages,
+            config,
+            background=True,
+            command=command_line[start:end],
+            redirections=redirections,
+        )
+    if len(stages) > 1:
+        if stages[0][:1] == ["time"] and len(stages[0]) > 1:
+            # 'time a | b' times the whole pipeline, as in bash
+            stages = [stages[0][1:]] + stages[1:]
+            exit_code = execute_pipeline(stages, config, redirections=redirections)
+            print_time_report(last_resource_usage() or ResourceUsage())
+            return exit_code
+        # All stages run concurrently; exit code is the last stage's
+        return execute_pipeline(stages, config, redirections=redirections)
+
+    # Words that all expanded to nothing ($UNSET) run nothing (a line of
+    # only redirections, like `> file`, just creates the file)
+    if not stages[0]:
+        return 0
+    if redirections is None:
+        return _dispatch(stages[0], config)
+    return _dispatch(stages[0], config, redirections[0])
+
+
+def _dispatch(
+    args: List[str],
+    config: Dict[str, Any],
+    redirections: Sequence[Tuple[int, int]] = (),
+) -> int:
+    """Run parsed args as a built-in, a memoized command or an external one."""
+    # Step 4: Check if command is a built-in
+    # Built-ins are executed directly without forking
+    builtin = get_builtin(args[0])
+
+    if builtin:
+        # Step 5a: Execute built-in command
+        # Non-exit built-ins return 0 for success, 1+ for error
+        # We don't display their exit codes (they handle their own output)
+        if redirections:
+            # Built-ins run in the shell, so redirect the shell meanwhile
+            with redirected(redirections):
+                return builtin.execute(args, config)
+        return builtin.execute(args, config)
+
+    # Step 5b: Commands listed in memo.commands replay cached results
+    if is_memoized(args, config):
+        if redirections:
+            with redirected(redirections):
+                return run_memoized(args, config)
+        return run_memoized(args, config)
+
+    # Step 5c: Execute external command
+    # Executor handles fork/exec/wait and displays exit codes if configured
+    # (redirections become spawn file actions in the child)
+    return execute_external_command(args, config, redirections=redirections)
+
+
+def _wants_batching(command_line: str, config: Dict[str, Any]) -> bool:
+    """
+    Check whether a (non-pipeline) line should be parsed lazily.
+
+    True for lines starting with the batch built-in, and for every line
+    when execution.auto_batch is enabled.
+    """
+    if as_settings(config).execution.auto_batch:
+        return True
+    words = command_line.split(None, 1)
+    return bool(words) and words[0] == "batch"
+
+
+def _execute_batched_line(command_line: str, config: Dict[str, Any]) -> int:
+    """
+    Run a line whose arguments are streamed (see the batching module).
+
+    External commands are split into as many execs as ARG_MAX requires;
+    built-ins and memoized commands get the full argument list as usual.
+    """
+    # Lazy import: only needed for batched lines
+    from akujobip1.batching import execute_batched, split_fixed
+
+    words = iter_arguments(command_line, config)
+    first = next(words, None)
+    if first is None:
+        # Empty line or parse error (already reported)
+        return 0
+
+    name = first[0]
+    builtin = get_builtin(name)
+    if builtin is not None and name == "batch":
+        return builtin.run(words, config)
+    if builtin is not None or is_memoized([name], config):
+        return _dispatch([name] + [word for word, _ in words], config)
+
+    fixed, rest = split_fixed(itertools.chain([first], words))
+    return execute_batched(fixed, rest, config)
+
+
+def _read_continuation() -> Optional[str]:
+    """Read one more line at the continuation prompt (None on Ctrl+D)."""
+    try:
+        return input(_CONTINUATION_PROMPT)
+    except EOFError:
+        return None
+
+
+def _prompt_and_exit_message(config: Dict[str, Any]) -> Tuple[str, str]:
+    """Read prompt text and exit message from config, with safe defaults."""
+    # Non-string prompt values (None, int, etc.) are already the default
+    prompt = as_settings(config).prompt.text
+
+    # Use .get() with nested dicts to handle missing keys gracefully
+    # Handle case where config values might be None
+    exit_config = config.get("exit", {})
+    if exit_config is None:
+        exit_config = {}
+    exit_message = exit_config.get("message", "Bye!")
+    # Guard against non-string exit message values
+    if not isinstance(exit_message, str):
+        exit_message = "Bye!"
+    return prompt, exit_message
+
+
+def _report_error(error: Exception, config: Dict[str, Any]) -> None:
+    """Print an unexpected error (with traceback in verbose mode)."""
+    print(f"Shell error: {error}", file=sys.stderr)
+
+    # If verbose error mode is enabled, show traceback
+    # Handle None values in config (malformed config)
+    errors_config = config.get("errors", {})
+    if errors_config is None:
+        errors_config = {}
+    if errors_config.get("verbose", False):
+        import traceback
+
+        traceback.print_exc()
+
+
+def _batch_stdin_fd() -> Optional[int]:
+    """
+    Return stdin's file descriptor if it is a pipe or file (not a TTY).
+
+    Returns None for terminals and for replaced stdin objects without a
+    real descriptor (e.g. under test runners), which use the input() loop.
+    """
+    try:
+        fd = sys.stdin.fileno()
+    except (AttributeError, OSError, ValueError):
+        return None
+    return None if os.isatty(fd) else fd
+
+
+def _read_lines(fd: int) -> Iterator[str]:
+    """
+    Yield lines from fd, reading it in large chunks.
+
+    One os.read() serves many lines, instead of the line-at-a-time
+    reads input() does. The last line may lack a trailing newline.
+    """
+    # Chunks of a line not yet ended; joined once its newline arrives, so
+    # a very long line is not copied again for every chunk
+    pending: List[bytes] = []
+    while True:
+        chunk = os.read(fd, _READ_SIZE)
+        if not chunk:
+            break
+        lines = chunk.split(b"\n")
+        if len(lines) == 1:
+            pending.append(chunk)
+            continue
+        pending.append(lines[0])
+        lines[0] = b"".join(pending)
+        pending = [lines.pop()]
+        for line in lines:
+            yield _decode(line)
+    if any(pending):
+        yield _decode(b"".join(pending))
+
+
+def _decode(data: bytes) -> str:
+    """Decode command input; undecodable bytes round-trip to arguments."""
+    return data.decode("utf-8", "surrogateescape")
@@ -0,0 +1,316 @@
+"""
+Syntax tree module.
+
+A command line is parsed once into a small tree that says what runs,
+in what order and with which redirections; the words stay unexpanded
+(variables, braces and wildcards are resolved right before each
+command runs, since they depend on the environment and the
+filesystem). The grammar is the POSIX one, minus compound commands:
+
+    list      := and_or ((';' | '&') and_or)* [';' | '&']
+    and_or    := pipeline (('&&' | '||') pipeline)*
+    pipeline  := command ('|' command)*
+    command   := (word | redirect)+
+    redirect  := [digits] ('<' | '>' | '>>' | '<&' | '>&' | '<<' | '<<-'
+                           | '<<<') word
+
+Node               Fields
+CommandList        pipelines, connectors (the operator after each)
+Pipeline           commands
+Command            words, redirects
+Redirect           operator, fd, target, start
+Word               the tokenizer's Token (value, position, quoting, ...)
+
+Parsed lines are cached (see parser.ParseCache), and scripts repeat
+lines, so the nodes are kept small: every class has __slots__, children
+are tuples (no spare list capacity), commands without redirections
+share one empty tuple, and a Word is the Token the tokenizer already
+built rather than a wrapper around it. A tree costs about 170 bytes per
+word and operator, so `ls -la` is well under 1 KiB and a dozen-token
+and-or list about 2 KiB (scripts/bench_ast.py measures it).
+
+Example:
+    >>> tree = parse_tokens(tokenize('make && ./run > log || echo failed',
+    ...                              operators=True))
+    >>> [p.commands[0].words[0].value for p in tree.pipelines]
+    ['make', './run', 'echo']
+    >>> tree.connectors
+    ('&&', '||', '')
+"""
+
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from akujobip1.tokenizer import Token
+
+# Words are tokenizer tokens (already a __slots__ class)
+Word = Token
+
+# Operators joining an and-or list, and redirection operators
+_AND_OR = ("&&", "||")
+_REDIRECTIONS = ("<", ">", ">>", "<&", ">&", "<<", "<<-", "<<<")
+
+# Here-document operators (their body follows the line)
+HERE_DOCUMENTS = ("<<", "<<-")
+
+# Shared by every command without redirections
+_NO_REDIRECTS: Tuple["Redirect", ...] = ()
+
+
+class ParseError(ValueError):
+    """Syntax error (message as bash words it)."""
+
+
+class Redirect:
+    """
+    One redirection, such as 2>errors.log, <input, 2>&1 or <<<"$text".
+
+    Attributes:
+        operator: '<', '>' or '>>' (open a file), '<&' or '>&' (duplicate
+                  a descriptor, or close it with '-'), '<<' or '<<-'
+                  (here-document) or '<<<' (here-string)
+        fd: File descriptor redirected (0 for the operators starting with
+            '<', 1 for the others, unless given as in 2>errors.log)
+        target: The word after the operator (expanded before use): a file
+                name, a descriptor number, a here-document's delimiter or
+                a here-string
+        start: Offset of the redirection in the line (also the key of a
+               here-document's body, see CommandList.here_documents())
+    """
+
+    __slots__ = ("operator", "fd", "target", "start")
+
+    def __init__(self, operator: str, fd: int, target: Word, start: int) -> None:
+        self.operator = operator
+        self.fd = fd
+        self.target = target
+        self.start = start
+
+    def __repr__(self) -> str:
+        return f"Redirect({self.fd}{self.operator}{self.target.value!r})"
+
+
+class Command:
+    """
+    A simple command: its words (command name first) and redirections.
+
+    words may be empty for a line that is only redirections (> file).
+    """
+
+    __slots__ = ("words", "redirects")
+
+    def __init__(
+        self, words: Tuple[Word, ...], redirects: Tuple[Redirect, ...] = _NO_REDIRECTS
+    ) -> None:
+        self.words = words
+        self.redirects = redirects
+
+    def span(self) -> Tuple[int, int]:
+        """(start, end) offsets of the command in its line."""
+        starts = [word.start for word in self.words]
+        starts.extend(redirect.start for redirect in self.redirects)
+        ends = [word.end for word in self.words]
+        ends.extend(redirect.target.end for redirect in self.redirects)
+        return min(starts), max(ends)
+
+    def __repr__(self) -> str:
+        words = " ".join(word.value for word in self.words)
+        redirects = "".join(f" {redirect!r}" for redirect in self.redirects)
+        return f"Command({words!r}{redirects})"
+
+
+class Pipeline:
+    """Commands joined by '|' (a single command is a one-stage pipeline)."""
+
+    __slots__ = ("commands",)
+
+    def __init__(self, commands: Tuple[Command, ...]) -> None:
+        self.commands = commands
+
+    def span(self) -> Tuple[int, int]:
+        """(start, end) offsets of the pipeline in its line."""
+        return self.commands[0].span()[0], self.commands[-1].span()[1]
+
+    def __repr__(self) -> str:
+        return f"Pipeline({list(self.commands)!r})"
+
+
+class CommandList:
+    """
+    A whole line: pipelines with the operators between them.
+
+    connectors[i] is the operator after pipelines[i]: '&&' or '||'
+    (run the next one only if this one succeeded / failed), ';' (run
+    the next one regardless), '&' (run this one in the background and
+    go on) or '' for the last pipeline without a terminator.
+    """
+
+    __slots__ = ("pipelines", "connectors")
+
+    def __init__(
+        self, pipelines: Tuple[Pipeline, ...], connectors: Tuple[str, ...]
+    ) -> None:
+        self.pipelines = pipelines
+        self.connectors = connectors
+
+    def here_documents(self) -> List[Redirect]:
+        """The here-document redirections, in the order their bodies follow."""
+        return [
+            redirect
+            for pipeline in self.pipelines
+            for command in pipeline.commands
+            for redirect in command.redirects
+            if redirect.operator in HERE_DOCUMENTS
+        ]
+
+    def is_simple(self) -> bool:
+        """True for a single command: no operators and no redirections."""
+        return (
+            len(self.pipelines) == 1
+            and self.connectors[0] != "&"
+            and len(self.pipelines[0].commands) == 1
+            and not self.pipelines[0].commands[0].redirects
+        )
+
+    def __repr__(self) -> str:
+        return f"CommandList({list(self.pipelines)!r}, {self.connectors!r})"
+
+
+def parse_tokens(tokens: Sequence[Token]) -> CommandList:
+    """
+    Build the tree for a tokenized line.
+
+    Args:
+        tokens: From tokenize(line, operators=True) (with expand=True the
+                words keep their expansions for later)
+
+    Returns:
+        The line's CommandList (no pipelines for an empty line)
+
+    Raises:
+        ParseError: An operator in the wrong place, e.g. "syntax error
+                    near unexpected token '|'"
+
+    Example:
+        >>> parse_tokens(tokenize('sort < in | uniq -c', operators=True))
+        CommandList([Pipeline([Command('sort' Redirect(0<'in')), Command('uniq -c')])], ('',))
+    """
+    pipelines: List[Pipeline] = []
+    connectors: List[str] = []
+    commands: List[Command] = []
+    words: List[Word] = []
+    redirects: List[Redirect] = []
+    index = 0
+    count = len(tokens)
+
+    while index < count:
+        token = tokens[index]
+        index += 1
+        if not token.operator:
+            words.append(token)
+            continue
+
+        operator = token.value
+        if operator in _REDIRECTIONS:
+            redirects.append(_redirect(token, tokens, index, words))
+            index += 1
+            continue
+
+        # '|', '&&', '||', ';' or '&' ends the current command
+        if not words and not redirects:
+            raise _unexpected(operator)
+        commands.append(_command(words, redirects))
+        words = []
+        redirects = []
+        if operator == "|":
+            continue
+
+        pipelines.append(Pipeline(tuple(commands)))
+        commands = []
+        if operator == "&" and connectors and connectors[-1] in _AND_OR:
+            # Would need the whole and-or list run in a subshell
+            raise ParseError("syntax error: '&' after '&&' or '||' is not supported")
+        connectors.append(operator)
+
+    if words or redirects:
+        commands.append(_command(words, redirects))
+    elif commands or (connectors and connectors[-1] in _AND_OR):
+        # Line ends right after '|', '&&' or '||'
+        last = [token for token in tokens if token.operator][-1]
+        raise _unexpected(last.value)
+
+    if commands:
+        pipelines.append(Pipeline(tuple(commands)))
+        connectors.append("")
+    return CommandList(tuple(pipelines), tuple(connectors))
+
+
+def _command(words: List[Word], redirects: List[Redirect]) -> Command:
+    """Build a Command, sharing the empty redirection tuple."""
+    if redirects:
+        return Command(tuple(words), tuple(redirects))
+    return Command(tuple(words))
+
+
+def _redirect(
+    token: Token, tokens: Sequence[Token], index: int, words: List[Word]
+) -> Redirect:
+    """Build the Redirect for operator token; tokens[index] is its target."""
+    operator = token.value
+    fd = 0 if operator[0] == "<" else 1
+    start = token.start
+    # 2>file: an unquoted number right before the operator names the fd
+    if words:
+        previous = words[-1]
+        if (
+            previous.end == token.start
+            and not previous.quoted
+            and previous.expansions is None
+            and previous.value.isdigit()
+        ):
+            fd = int(previous.value)
+            start = previous.start
+            words.pop()
+
+    if index >= len(tokens):
+        raise _unexpected("newline")
+    target = tokens[index]
+    if target.operator:
+        raise _unexpected(target.value)
+    return Redirect(operator, fd, target, start)
+
+
+def _unexpected(token: Optional[str]) -> ParseError:
+    """The error for an operator where a command should be."""
+    return ParseError(f"syntax error near unexpected token '{token}'")
+
+
+def run_list(tree: CommandList, run_pipeline: Callable[[Pipeline, bool], int]) -> int:
+    """
+    Run a list's pipelines in order, skipping as && and || require.
+
+    A skipped pipeline leaves the status alone, so in 'false && a || b'
+    b still runs.
+
+    Args:
+        tree: Parsed line
+        run_pipeline: Called with (pipeline, background) for each pipeline
+                      that runs; returns its exit code (-1, from the exit
+                      built-in, stops the list at once)
+
+    Returns:
+        Exit code of the last pipeline that ran (0 if none), or -1
+    """
+    status = 0
+    skip = False
+    for pipeline, connector in zip(tree.pipelines, tree.connectors):
+        if not skip:
+            status = run_pipeline(pipeline, connector == "&")
+            if status == -1:
+                return -1
+        if connector == "&&":
+            skip = status != 0
+        elif connector == "||":
+            skip = status == 0
+        else:
+            skip = False
+    return status
@@ -0,0 +1,800 @@
+"""
+Command line tokenizer module.
+
+Splits a command line into words with the same rules (and the same error
+messages) as shlex.split() in POSIX mode:
+    - Words are separated by unquoted spaces, tabs, CRs and newlines
+    - '...' keeps everything literal up to the closing quote
+    - "..." keeps everything literal except \\" and \\\\ (other backslashes
+      stay, e.g. "a\\b" is a\\b)
+    - Outside quotes, a backslash makes the next character literal
+    - Quoted and unquoted pieces next to each other form one word
+      (a"b c"'d' is the single word ab cd), and '' is an empty word
+
+shlex is a general-purpose lexer that reads one character at a time
+through a Python state machine. Here one precompiled regular expression
+matches whole runs at once (an unquoted run, a quoted string, an escape
+or a gap of whitespace), so the Python loop runs once per piece instead
+of once per character, and lines without quotes or backslashes are
+split with a single whitespace scan.
+
+Each word comes back as a Token that also records where it was in the
+line, whether any part of it was quoted or escaped, and whether it has
+an unquoted wildcard (*, ? or [). Only such words are globbed, and their
+quoted parts are escaped in the glob pattern, so "*.txt", 'a[1]' and
+\\* stay literal and never cost a directory scan. Words with an unquoted
+'{' and a '}' keep their quoted/unquoted pieces for brace expansion
+(see the braces module).
+
+With expand=True the tokenizer also recognizes POSIX expansions, which
+the expansion module resolves when the line runs (so tokens stay valid
+however the environment changes):
+    - $NAME, ${NAME}, $?, $$, ${#NAME} and ${NAME:-word} (also -, :=, =,
+      :+, +, :? and ?) outside quotes and inside "..." - never in '...'
+    - ~ and ~user at the start of a word, up to the first '/'
+    - $(command) (quotes and parentheses inside may nest)
+Inside "..." a backslash then also quotes $ and ` (POSIX), not just "
+and \\\\. Lines without '$' or '~' take the same fast path as before.
+scan_here_document() reads the body of a here-document the same way.
+"""
+
+import re
+from typing import List, Optional, Tuple, Union
+
+# Characters that separate words (exactly shlex's whitespace)
+WHITESPACE = " \t\r\n"
+
+# One piece of a word per match, tried in order:
+#   gap of whitespace | unquoted run | '...' | "..." | backslash escape
+_PIECE = re.compile(
+    r"""(?P<space>[ \t\r\n]+)"""
+    r"""|(?P<plain>[^ \t\r\n'"\\]+)"""
+    r"""|'(?P<single>[^']*)'"""
+    r"""|"(?P<double>(?:[^"\\]|\\.)*)\""""
+    r"""|\\(?P<escape>.)""",
+    re.DOTALL,
+)
+
+# Same, with unquoted shell operators as their own pieces (longest first:
+# lists, here-strings and here-documents, then the other redirections)
+_PIECE_WITH_OPERATORS = re.compile(
+    r"""(?P<space>[ \t\r\n]+)"""
+    r"""|(?P<operator>\|\||&&|<<<|<<-|<<|>>|[<>]&|[|&;<>])"""
+    r"""|(?P<plain>[^ \t\r\n'"\\|&;<>]+)"""
+    r"""|'(?P<single>[^']*)'"""
+    r"""|"(?P<double>(?:[^"\\]|\\.)*)\""""
+    r"""|\\(?P<escape>.)""",
+    re.DOTALL,
+)
+
+# Same two, with '$' ending unquoted runs and "..." scanned by hand (it
+# may contain expansions): used when expanding
+_PIECE_EXPANDING = re.compile(
+    r"""(?P<space>[ \t\r\n]+)"""
+    r"""|(?P<plain>[^ \t\r\n'"\\$]+)"""
+    r"""|'(?P<single>[^']*)'"""
+    r"""|(?P<dquote>")"""
+    r"""|\\(?P<escape>.)"""
+    r"""|(?P<dollar>\$)""",
+    re.DOTALL,
+)
+_PIECE_EXPANDING_WITH_OPERATORS = re.compile(
+    r"""(?P<space>[ \t\r\n]+)"""
+    r"""|(?P<operator>\|\||&&|<<<|<<-|<<|>>|[<>]&|[|&;<>])"""
+    r"""|(?P<plain>[^ \t\r\n'"\\$|&;<>]+)"""
+    r"""|'(?P<single>[^']*)'"""
+    r"""|(?P<dquote>")"""
+    r"""|\\(?P<escape>.)"""
+    r"""|(?P<dollar>\$)""",
+    re.DOTALL,
+)
+
+# Inside "...", only \" and \\ lose their backslash
+_DOUBLE_QUOTED_ESCAPE = re.compile(r'\\(["\\])')
+
+# ... and when expanding, also \$ and \` (a backslash-newline vanishes)
+_EXPANDING_DOUBLE_QUOTED_ESCAPES = '"\\$`\n'
+
+# In a here-document body, the same less \"
+_HERE_DOCUMENT_ESCAPES = "\\$`\n"
+
+# Parameter names: NAME, a positional digit, or a special parameter
+_NAME = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_DIGITS = re.compile(r"[0-9]+")
+_SPECIAL_PARAMETERS = "0123456789?$#!-@*"
+
+# ${NAME<operator>word} operators, longest first
+_PARAMETER_OPERATORS = (":-", ":=", ":+", ":?", "-", "=", "+", "?")
+
+# Lines that are just words and whitespace (no quotes, escapes, operators)
+_SIMPLE_LINE = re.compile(r"""[^'"\\]*""")
+_SIMPLE_WORD = re.compile(r"[^ \t\r\n]+")
+
+# Glob metacharacters
+_WILDCARD = re.compile(r"[*?[]")
+
+# (text, quoted) pieces of one word
+Parts = List[Tuple[str, bool]]
+
+
+class TokenizeError(ValueError):
+    """Unclosed quote or trailing backslash (same messages as shlex)."""
+
+
+class Parameter:
+    """
+    One $NAME / ${NAME...} expansion in a word (see expansion module).
+
+    Attributes:
+        name: Variable name, positional digit or special parameter (?, $)
+        operator: None, or one of :- - := = :+ + :? ?
+        word: Pieces of the word after the operator (like Token.expansions)
+        quoted: Inside "..." (the result is not split or globbed)
+        length: ${#NAME} - expands to the value's length
+    """
+
+    __slots__ = ("name", "operator", "word", "quoted", "length")
+
+    def __init__(
+        self,
+        name: str,
+        operator: Optional[str] = None,
+        word: Optional[list] = None,
+        quoted: bool = False,
+        length: bool = False,
+    ) -> None:
+        self.name = name
+        self.operator = operator
+        self.word = word
+        self.quoted = quoted
+        self.length = length
+
+    def __repr__(self) -> str:
+        operator = self.operator or ""
+        return f"Parameter({self.name!r}{operator and ' ' + operator})"
+
+
+class Command:
+    """A $(command) substitution; text is the command line inside."""
+
+    __slots__ = ("text", "quoted")
+
+    def __init__(self, text: str, quoted: bool = False) -> None:
+        self.text = text
+        self.quoted = quoted
+
+    def __repr__(self) -> str:
+        return f"Command({self.text!r})"
+
+
+class Tilde:
+    """A ~ or ~user prefix (user is '' for the current user's home)."""
+
+    __slots__ = ("user",)
+
+    def __init__(self, user: str) -> None:
+        self.user = user
+
+    def __repr__(self) -> str:
+        return f"Tilde({self.user!r})"
+
+
+# A piece of a word that still has expansions in it
+Piece = Union[Tuple[str, bool], Parameter, Command, Tilde]
+
+
+class Token:
+    """
+    One word of a command line.
+
+    Attributes:
+        value: The word after quote removal ('"a b"' -> 'a b')
+        start: Offset of the word's first character in the line
+        end: Offset just past the word's last character
+        quoted: True if any part was quoted or backslash-escaped
+        operator: True for an unquoted operator (|, &, ;, ||, && or a
+                  redirection: <, >, >>, <&, >&, <<, <<- and <<<)
+        wildcard: True if an unquoted part contains *, ? or [
+        pattern: Glob pattern for wildcard tokens - the value with its
+                 quoted parts escaped ('"my dir"/*' -> 'my dir/*', but
+                 '"[a]"*' -> '[[]a]*'); None for other tokens
+        braces: The word's (text, quoted) pieces if an unquoted part has
+                a '{' and the word has a '}' (a brace expansion candidate);
+                None for other tokens
+        expansions: With tokenize(expand=True), the word's pieces - (text,
+                    quoted) pairs plus Parameter, Command and Tilde
+                    items - if it
+                    has any expansion (value is then the raw source text);
+                    None otherwise
+    """
+
+    __slots__ = (
+        "value",
+        "start",
+        "end",
+        "quoted",
+        "operator",
+        "wildcard",
+        "pattern",
+        "braces",
+        "expansions",
+    )
+
+    def __init__(
+        self,
+        value: str,
+        start: int,
+        end: int,
+        quoted: bool = False,
+        operator: bool = False,
+        wildcard: bool = False,
+        pattern: Optional[str] = None,
+        braces: Optional[Parts] = None,
+        expansions: Optional[List[Piece]] = None,
+    ) -> None:
+        self.value = value
+        self.start = start
+        self.end = end
+        self.quoted = quoted
+        self.operator = operator
+        self.wildcard = wildcard
+        # An unquoted word is its own pattern
+        self.pattern = value if wildcard and pattern is None else pattern
+        self.braces = braces
+        self.expansions = expansions
+
+    def __repr__(self) -> str:
+        flags = " quoted" if self.quoted else ""
+        flags += " operator" if self.operator else ""
+        flags += " wildcard" if self.wildcard else ""
+        return f"Token({self.value!r}, {self.start}-{self.end}{flags})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Token):
+            return NotImplemented
+        return (
+            self.value,
+            self.start,
+            self.end,
+            self.quoted,
+            self.operator,
+            self.pattern,
+        ) == (
+            other.value,
+            other.start,
+            other.end,
+            other.quoted,
+            other.operator,
+            other.pattern,
+        )
+
+
+def tokenize(line: str, operators: bool = False, expand: bool = False) -> List[Token]:
+    """
+    Split a command line into tokens.
+
+    Args:
+        line: Raw command line
+        operators: Also split off unquoted |, &, ;, ||, && and the
+                   redirection operators (<, >, >>, <&, >&, <<, <<-, <<<)
+                   as operator tokens (shlex.split() has no equivalent;
+                   with False they are ordinary word characters)
+        expand: Recognize $ and ~ expansions (see Token.expansions);
+                with False they are ordinary characters, as in shlex
+
+    Returns:
+        Tokens in order (empty list for a blank line)
+
+    Raises:
+        TokenizeError: Unclosed quote ("No closing quotation") or a
+                       backslash at the very end ("No escaped character");
+                       when expanding, also "Bad substitution" and
+                       "No closing brace" for a malformed ${...} and
+                       "No closing parenthesis" for an unclosed $(
+
+    Examples:
+        >>> tokenize('ls  -l')
+        [Token('ls', 0-2), Token('-l', 4-6)]
+        >>> tokenize("a'b c'")
+        [Token('ab c', 0-6 quoted)]
+        >>> [t.value for t in tokenize('ls|wc -l', operators=True)]
+        ['ls', '|', 'wc', '-l']
+        >>> tokenize('echo "unclosed')
+        Traceback (most recent call last):
+        ...
+        akujobip1.tokenizer.TokenizeError: No closing quotation
+    """
+    expanding = expand and ("$" in line or "~" in line)
+
+    # Fast path: nothing to unquote, so words are just non-blank runs
+    if (
+        not expanding
+        and (not operators or not _has_operator(line))
+        and _SIMPLE_LINE.fullmatch(line)
+    ):
+        if "{" in line:
+            return [
+                make_word([(match.group(), False)], match.start(), match.end())
+                for match in _SIMPLE_WORD.finditer(line)
+            ]
+        if _WILDCARD.search(line) is None:
+            # No wildcard anywhere - skip the per-word check as well
+            return [
+                Token(match.group(), match.start(), match.end())
+                for match in _SIMPLE_WORD.finditer(line)
+            ]
+        return [
+            Token(
+                match.group(),
+                match.start(),
+                match.end(),
+                wildcard=_WILDCARD.search(match.group()) is not None,
+            )
+            for match in _SIMPLE_WORD.finditer(line)
+        ]
+
+    if expanding:
+        piece_pattern = (
+            _PIECE_EXPANDING_WITH_OPERATORS if operators else _PIECE_EXPANDING
+        )
+    else:
+        piece_pattern = _PIECE_WITH_OPERATORS if operators else _PIECE
+    tokens: List[Token] = []
+    # Pieces of the current word as (text, quoted) pairs (plus Parameter
+    # and Tilde items when expanding)
+    parts: List[Piece] = []
+    expansions = False
+    in_word = False
+    word_start = 0
+    quoted = False
+    wildcard = False
+    brace = False
+    position = 0
+    length = len(line)
+
+    while position < length:
+        match = piece_pattern.match(line, position)
+        if match is None:
+            # Only an unterminated quote or a trailing backslash can fail
+            raise TokenizeError(_error_message(line, position))
+        kind = match.lastgroup
+
+        if kind == "space" or kind == "operator":
+            if in_word:
+                if expansions:
+                    tokens.append(_expanding_word(line, parts, word_start, position))
+                else:
+                    tokens.append(
+                        _word(parts, word_start, position, quoted, wildcard, brace)
+                    )
+                parts = []
+                expansions = False
+                in_word = False
+            if kind == "operator":
+                tokens.append(
+                    Token(match.group(), position, match.end(), operator=True)
+                )
+        else:
+            if not in_word:
+                in_word = True
+                word_start = position
+                quoted = False
+                wildcard = False
+                brace = False
+                if expanding and kind == "plain" and line[position] == "~":
+                    tilde = _tilde_prefix(line, match, operators)
+                    if tilde is not None:
+                        parts.append(tilde)
+                        expansions = True
+                        position += len(tilde.user) + 1
+                        if position == match.end():
+                            continue
+                        match = piece_pattern.match(line, position)
+            if kind == "plain":
+                text = match.group()
+                parts.append((text, False))
+                if not wildcard and _WILDCARD.search(text) is not None:
+                    wildcard = True
+                if "{" in text:
+                    brace = True
+            elif kind == "double":
+                text = _DOUBLE_QUOTED_ESCAPE.sub(r"\1", match.group(kind))
+                parts.append((text, True))
+                quoted = True
+            elif kind == "dquote":
+                pieces, position = _double_quoted(line, position)
+                parts.extend(pieces)
+                quoted = True
+                expansions = expansions or _has_expansion(pieces)
+                continue
+            elif kind == "dollar":
+                piece, position = _dollar(line, position, False)
+                parts.append(piece)
+                expansions = expansions or not isinstance(piece, tuple)
+                continue
+            else:
+                # single quotes or backslash escape: taken literally
+                parts.append((match.group(kind), True))
+                quoted = True
+        position = match.end()
+
+    if in_word:
+        if expansions:
+            tokens.append(_expanding_word(line, parts, word_start, length))
+        else:
+            tokens.append(_word(parts, word_start, length, quoted, wildcard, brace))
+    return tokens
+
+
+def split(line: str) -> List[str]:
+    """
+    Drop-in replacement for shlex.split(line).
+
+    Examples:
+        >>> split('cp "my file.txt" backup\\\\ dir/')
+        ['cp', 'my file.txt', 'backup dir/']
+    """
+    # Same fast path as tokenize(), minus building Token objects
+    if _SIMPLE_LINE.fullmatch(line):
+        return _SIMPLE_WORD.findall(line)
+    return [token.value for token in tokenize(line)]
+
+
+def make_word(parts: Parts, start: int, end: int) -> Token:
+    """
+    Build the Token for a word given as (text, quoted) pieces.
+
+    Used for words produced after tokenizing (brace expansion), so the
+    flags are worked out from the pieces.
+
+    Example:
+        >>> make_word([('*', True), ('.txt', False)], 0, 8)
+        Token('*.txt', 0-8 quoted)
+    """
+    quoted = False
+    wildcard = False
+    brace = False
+    for text, is_quoted in parts:
+        if is_quoted:
+            quoted = True
+        else:
+            if not wildcard and _WILDCARD.search(text) is not None:
+                wildcard = True
+            if "{" in text:
+                brace = True
+    return _word(parts, start, end, quoted, wildcard, brace)
+
+
+def _word(
+    parts: Parts,
+    start: int,
+    end: int,
+    quoted: bool,
+    wildcard: bool,
+    brace: bool = False,
+) -> Token:
+    """Build the Token for one word from its (text, quoted) pieces."""
+    value = "".join(text for text, _ in parts)
+    pattern = None
+    if wildcard and quoted:
+        # Quoted pieces must match literally: escape their metacharacters
+        # (lazy import: only for words mixing quotes and wildcards)
+        import glob
+
+        pattern = "".join(
+            glob.escape(text) if is_quoted else text for text, is_quoted in parts
+        )
+    braces = parts if brace and "}" in value else None
+    return Token(
+        value, start, end, quoted, wildcard=wildcard, pattern=pattern, braces=braces
+    )
+
+
+def _has_operator(line: str) -> bool:
+    """True if line contains any operator character."""
+    return "|" in line or "&" in line or ";" in line or "<" in line or ">" in line
+
+
+def _error_message(line: str, position: int) -> str:
+    """Explain why no piece matched at position (shlex's wording)."""
+    if line[position] == "\\":
+        # Backslash as the very last character
+        return "No escaped character"
+    if line[position] == '"' and line.endswith("\\"):
+        # "... \  - the backslash ran into the end of the line before the
+        # missing quote did (shlex reports the escape first)
+        backslashes = len(line) - len(line.rstrip("\\"))
+        if backslashes % 2 == 1:
+            return "No escaped character"
+    return "No closing quotation"
+
+
+def _expanding_word(line: str, parts: List[Piece], start: int, end: int) -> Token:
+    """Build the Token for a word with expansions (resolved later)."""
+    quoted = any(
+        piece[1] if isinstance(piece, tuple) else getattr(piece, "quoted", False)
+        for piece in parts
+    )
+    return Token(line[start:end], start, end, quoted, expansions=parts)
+
+
+def _has_expansion(pieces: List[Piece]) -> bool:
+    """True if any piece is a Parameter or Tilde."""
+    return any(not isinstance(piece, tuple) for piece in pieces)
+
+
+def _tilde_prefix(
+    line: str, match: "re.Match[str]", operators: bool
+) -> Optional[Tilde]:
+    """
+    The Tilde at the start of a word, or None if it is a literal '~'.
+
+    The prefix runs up to the first '/'; without one it must be the whole
+    word (~"x" and ~$USER are not tilde prefixes, as in POSIX).
+    """
+    text = match.group()
+    slash = text.find("/")
+    if slash >= 0:
+        return Tilde(text[1:slash])
+    after = match.end()
+    if after < len(line):
+        following = line[after]
+        if following not in WHITESPACE and not (operators and _has_operator(following)):
+            return None
+    return Tilde(text[1:])
+
+
+def scan_here_document(body: str) -> List[Piece]:
+    """
+    Split a here-document body into pieces for the expansion module.
+
+    The body reads as if it were inside "..." (without the quotes):
+    $NAME, ${...} and $(command) expand, a backslash quotes $, `, \\ and
+    a newline, and nothing is split into fields or globbed.
+
+    Raises:
+        TokenizeError: Malformed ${...} or an unclosed $(
+
+    Example:
+        >>> scan_here_document('Hello $USER\n')
+        [('Hello ', True), Parameter('USER'), ('\n', True)]
+    """
+    pieces, _ = _quoted_pieces(body, 0, None, _HERE_DOCUMENT_ESCAPES)
+    return pieces
+
+
+def _double_quoted(line: str, position: int) -> Tuple[List[Piece], int]:
+    """
+    Scan a "..." string that may contain expansions.
+
+    Args:
+        line: Command line
+        position: Offset of the opening quote
+
+    Returns:
+        (pieces, offset just past the closing quote); the pieces are
+        quoted text and quoted Parameters, at least one
+
+    Raises:
+        TokenizeError: The closing quote is missing
+    """
+    pieces, index = _quoted_pieces(
+        line, position + 1, '"', _EXPANDING_DOUBLE_QUOTED_ESCAPES
+    )
+    if index > len(line):
+        raise TokenizeError(_error_message(line, position))
+    return pieces, index
+
+
+def _quoted_pieces(
+    line: str, index: int, closing: Optional[str], escapes: str
+) -> Tuple[List[Piece], int]:
+    """
+    Scan quoted text with expansions from index to closing (or the end).
+
+    Returns:
+        (pieces, offset just past closing); the offset is len(line) + 1
+        if closing never came
+    """
+    pieces: List[Piece] = []
+    text: List[str] = []
+    length = len(line)
+    while index < length:
+        char = line[index]
+        if char == closing:
+            break
+        if char == "\\" and index + 1 < length:
+            following = line[index + 1]
+            if following in escapes:
+                if following != "\n":
+                    text.append(following)
+            else:
+                text.append(char + following)
+            index += 2
+        elif char == "$":
+            piece, index = _dollar(line, index, True)
+            if isinstance(piece, tuple):
+                text.append(piece[0])
+            else:
+                if text:
+                    pieces.append(("".join(text), True))
+                    text = []
+                pieces.append(piece)
+        else:
+            text.append(char)
+            index += 1
+    if text or not pieces:
+        pieces.append(("".join(text), True))
+    return pieces, index + 1
+
+
+def _dollar(line: str, position: int, quoted: bool) -> Tuple[Piece, int]:
+    """
+    Scan the expansion starting with the '$' at position.
+
+    Returns:
+        (Parameter or Command, offset past it), or (('$', quoted),
+        position + 1) if the '$' starts no expansion ($ before a space,
+        "$", $%)
+
+    Raises:
+        TokenizeError: Malformed ${...}
+    """
+    index = position + 1
+    if index >= len(line):
+        return ("$", quoted), index
+    char = line[index]
+    if char == "{":
+        return _braced_parameter(line, index + 1, quoted)
+    if char == "(":
+        if line.startswith("((", index):
+            # $((...)) is arithmetic expansion
+            raise TokenizeError("Bad substitution")
+        end = _closing_parenthesis(line, index + 1)
+        return Command(line[index + 1 : end], quoted), end + 1
+    match = _NAME.match(line, index)
+    if match is not None:
+        return Parameter(match.group(), quoted=quoted), match.end()
+    if char in _SPECIAL_PARAMETERS:
+        # Single character: $10 is ${1}0
+        return Parameter(char, quoted=quoted), index + 1
+    return ("$", quoted), index
+
+
+def _braced_parameter(line: str, index: int, quoted: bool) -> Tuple[Parameter, int]:
+    """Scan ${...} from just past the '{' (see _dollar())."""
+    if "}" not in line[index:]:
+        raise TokenizeError("No closing brace")
+    length = False
+    if line.startswith("#", index) and line[index + 1] != "}":
+        length = True
+        index += 1
+
+    match = _NAME.match(line, index)
+    if match is not None:
+        name = match.group()
+    elif line[index].isdigit():
+        # ${10} is the tenth positional parameter
+        name = _DIGITS.match(line, index).group()
+    elif line[index] in _SPECIAL_PARAMETERS:
+        name = line[index]
+    else:
+        raise TokenizeError("Bad substitution")
+    index += len(name)
+
+    if line[index] == "}":
+        return Parameter(name, quoted=quoted, length=length), index + 1
+    if length:
+        raise TokenizeError("Bad substitution")
+    for operator in _PARAMETER_OPERATORS:
+        if line.startswith(operator, index):
+            break
+    else:
+        raise TokenizeError("Bad substitution")
+    word, index = _parameter_word(line, index + len(operator), quoted)
+    return Parameter(name, operator, word, quoted), index
+
+
+def _parameter_word(line: str, index: int, quoted: bool) -> Tuple[List[Piece], int]:
+    """
+    Scan the word of ${NAME<operator>word} up to its closing brace.
+
+    Quotes, escapes and expansions work in the word as they do where the
+    ${...} is (inside "..." single quotes are ordinary characters);
+    braces nest.
+
+    Returns:
+        (pieces, offset just past the '}')
+    """
+    pieces: List[Piece] = []
+    text: List[str] = []
+    depth = 0
+    length = len(line)
+
+    def flush() -> None:
+        if text:
+            pieces.append(("".join(text), quoted))
+            text.clear()
+
+    while index < length:
+        char = line[index]
+        if char == "}" and depth == 0:
+            flush()
+            return pieces, index + 1
+        if char == "$":
+            piece, index = _dollar(line, index, quoted)
+            if isinstance(piece, tuple):
+                text.append(piece[0])
+            else:
+                flush()
+                pieces.append(piece)
+            continue
+        if char == "\\" and index + 1 < length:
+            following = line[index + 1]
+            if not quoted:
+                flush()
+                pieces.append((following, True))
+            elif following in _EXPANDING_DOUBLE_QUOTED_ESCAPES:
+                if following != "\n":
+                    text.append(following)
+            else:
+                text.append(char + following)
+            index += 2
+            continue
+        if char == '"':
+            flush()
+            inner, index = _double_quoted(line, index)
+            pieces.extend(inner)
+            continue
+        if char == "'" and not quoted:
+            close = line.find("'", index + 1)
+            if close < 0:
+                raise TokenizeError("No closing quotation")
+            flush()
+            pieces.append((line[index + 1 : close], True))
+            index = close + 1
+            continue
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+        text.append(char)
+        index += 1
+    raise TokenizeError("No closing brace")
+
+
+def _closing_parenthesis(line: str, index: int) -> int:
+    """
+    Find the ')' that closes a $( whose body starts at index.
+
+    Quotes, escapes and nested $(...) or (...) inside are skipped, so
+    $(echo ")" $(pwd)) ends at the last parenthesis.
+
+    Raises:
+        TokenizeError: There is none ("No closing parenthesis")
+    """
+    # Innermost open construct: '(' or a quote character
+    stack = ["("]
+    length = len(line)
+    while index < length:
+        char = line[index]
+        top = stack[-1]
+        if top == "'":
+            if char == "'":
+                stack.pop()
+        elif char == "\\":
+            index += 1
+        elif char == "$" and line.startswith("(", index + 1):
+            stack.append("(")
+            index += 1
+        elif top == '"':
+            if char == '"':
+                stack.pop()
+        elif char in "'\"(":
+            stack.append(char)
+        elif char == ")":
+            stack.pop()
+            if not stack:
+                return index
+        index += 1
+    raise TokenizeError("No closing parenthesis")
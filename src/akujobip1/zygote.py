@@ -0,0 +1,399 @@
+"""
+Zygote spawner module.
+
+fork() has to copy the parent's page tables, so its cost grows with the
+shell's memory footprint over a long session. The zygote is a small helper
+process forked once at startup, before the shell builds up any large state.
+Afterwards the shell sends it launch requests over a socketpair and the
+zygote starts the command on the shell's behalf (posix_spawn, or
+fork/exec where that is missing), so the cost of a launch depends on the
+zygote's (small, constant) size, not the shell's.
+
+Protocol (SOCK_SEQPACKET, one marshal-encoded tuple per message):
+    shell  -> zygote: (path, args, env, cwd, actions) plus the
+                      redirection source fds as SCM_RIGHTS ancillary data;
+                      actions holds one (source, target) per redirection,
+                      with source None for "the next passed fd" or the
+                      child's own fd (an earlier target, as in 2>&1)
+    zygote -> shell:  ("pid", pid) or ("error", errno, message) if the
+                      command could not be started
+                      ("status", pid, wait_status, rusage_fields) once
+                      the child exits
+
+Children are the zygote's children, not the shell's, so the shell cannot
+waitpid() them. The zygote reaps them with wait4() and forwards each raw
+wait status (decoded with the usual W* macros) and resource usage. For
+the same reason only standalone foreground commands use the zygote;
+pipeline stages and background jobs must be the shell's own children.
+
+POSIX References:
+    - fork(): https://pubs.opengroup.org/onlinepubs/9699919799/functions/fork.html
+    - exec: https://pubs.opengroup.org/onlinepubs/9699919799/functions/exec.html
+    - socketpair(): https://pubs.opengroup.org/onlinepubs/9699919799/functions/socketpair.html
+"""
+
+import fcntl
+import marshal
+import os
+import selectors
+import signal
+import sys
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    # Imported when the zygote starts (most sessions never use it)
+    import socket
+
+# Largest request/reply the zygote accepts (argv + environment)
+_MAX_MESSAGE = 1 << 20
+
+# Most fds one request can pass (one per redirection)
+_MAX_FDS = 64
+
+# Received descriptors are moved here or above, clear of redirection targets
+_FIRST_HIGH_FD = 10
+
+
+class ZygoteError(OSError):
+    """The zygote is not running or stopped responding."""
+
+
+class Zygote:
+    """
+    Shell-side handle to the zygote process.
+
+    Example:
+        >>> zygote = Zygote()
+        >>> zygote.start()
+        True
+        >>> pid = zygote.spawn('/bin/true', ['true'])
+        >>> os.WEXITSTATUS(zygote.wait(pid))
+        0
+    """
+
+    def __init__(self) -> None:
+        self._sock: Optional[socket.socket] = None
+        self._pid: Optional[int] = None
+        # (status, rusage fields) that arrived while waiting for another pid
+        self._statuses: Dict[int, Tuple[int, tuple]] = {}
+
+    @property
+    def running(self) -> bool:
+        """True if the zygote has been started and not stopped."""
+        return self._sock is not None
+
+    @property
+    def pid(self) -> Optional[int]:
+        """Process ID of the zygote itself."""
+        return self._pid
+
+    def start(self) -> bool:
+        """
+        Fork the zygote process (no-op if it is already running).
+
+        Returns:
+            True if the zygote is running, False if it could not be started
+        """
+        if self._sock is not None:
+            return True
+        # Lazy import: only needed once the zygote is used
+        import socket
+
+        try:
+            parent_sock, child_sock = socket.socketpair(
+                socket.AF_UNIX, socket.SOCK_SEQPACKET
+            )
+        except (AttributeError, OSError):
+            # No SOCK_SEQPACKET (non-Linux) - caller falls back
+            return False
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+        try:
+            pid = os.fork()
+        except OSError:
+            parent_sock.close()
+            child_sock.close()
+            return False
+
+        if pid == 0:
+            # ZYGOTE PROCESS PATH - never returns
+            parent_sock.close()
+            code = 0
+            try:
+                _serve(child_sock)
+            except BaseException:
+                code = 1
+            finally:
+                os._exit(code)
+
+        child_sock.close()
+        self._sock = parent_sock
+        self._pid = pid
+        self._statuses.clear()
+        return True
+
+    def stop(self) -> None:
+        """Shut the zygote down (it exits when its socket closes)."""
+        if self._sock is None:
+            return
+        self._sock.close()
+        self._sock = None
+        try:
+            os.waitpid(self._pid, 0)
+        except ChildProcessError:
+            pass
+        self._pid = None
+
+    def spawn(
+        self,
+        path: str,
+        args: List[str],
+        redirections: Sequence[Tuple[int, int]] = (),
+    ) -> int:
+        """
+        Ask the zygote to start a command.
+
+        The child gets the shell's current environment and working
+        directory (both can change between launches).
+
+        Args:
+            path: Resolved executable path
+            args: Command arguments where args[0] is the command name
+            redirections: (source_fd, target_fd) pairs to dup2() in the child,
+                          in order. A source that an earlier pair targets
+                          means the child's descriptor, as in posix_spawn.
+
+        Returns:
+            Child process ID
+
+        Raises:
+            ZygoteError: The zygote is not running or died
+            OSError: The command could not be started (errno preserved,
+                     e.g. FileNotFoundError, PermissionError)
+        """
+        if self._sock is None:
+            raise ZygoteError("zygote is not running")
+
+        actions = []
+        fds = []
+        targets = set()
+        for source, target in redirections:
+            if source in targets:
+                actions.append((source, target))
+            else:
+                actions.append((None, target))
+                fds.append(source)
+            targets.add(target)
+        request = (path, list(args), dict(os.environ), os.getcwd(), actions)
+        import socket  # already loaded by Zygote.start()
+
+        try:
+            socket.send_fds(self._sock, [marshal.dumps(request)], fds)
+        except OSError as e:
+            self._lost()
+            raise ZygoteError(f"zygote unavailable: {e}") from e
+
+        while True:
+            reply = self._receive()
+            if reply[0] == "pid":
+                return reply[1]
+            if reply[0] == "error":
+                raise OSError(reply[1], reply[2])
+
+    def wait(self, pid: int) -> int:
+        """
+        Block until the zygote reports that pid exited.
+
+        Returns:
+            Raw wait status (decode with os.WIFEXITED etc.)
+
+        Raises:
+            ZygoteError: The zygote died before reporting the status
+        """
+        return self.wait4(pid)[0]
+
+    def wait4(self, pid: int) -> Tuple[int, tuple]:
+        """
+        Like wait(), but also return the child's resource usage.
+
+        Returns:
+            (status, fields) where fields are the rusage values in
+            executor.ResourceUsage order (user, sys, maxrss, faults,
+            context switches)
+        """
+        while pid not in self._statuses:
+            self._receive()
+        return self._statuses.pop(pid)
+
+    def _receive(self) -> tuple:
+        """Read one reply, filing status messages as they arrive."""
+        try:
+            data = self._sock.recv(_MAX_MESSAGE)
+        except OSError as e:
+            self._lost()
+            raise ZygoteError(f"zygote unavailable: {e}") from e
+        if not data:
+            self._lost()
+            raise ZygoteError("zygote exited")
+        reply = marshal.loads(data)
+        if reply[0] == "status":
+            self._statuses[reply[1]] = (reply[2], reply[3])
+        return reply
+
+    def _lost(self) -> None:
+        """Forget a zygote that died (so the caller can fall back)."""
+        self._statuses.clear()
+        self.stop()
+
+
+def _serve(sock: "socket.socket") -> None:
+    """
+    Zygote main loop: launch requested commands and report their exits.
+
+    Runs until the shell closes its end of the socket.
+    """
+    import socket  # already loaded by Zygote.start()
+
+    # Ctrl+C is meant for the foreground command, not the zygote (it shares
+    # the shell's process group). Children restore the default below.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    # SIGCHLD wakes the selector through a pipe (set_wakeup_fd), so exits are
+    # noticed without polling. The no-op handler only has to exist; exec()
+    # resets it to the default in the children.
+    wake_read, wake_write = os.pipe()
+    os.set_blocking(wake_write, False)
+    signal.set_wakeup_fd(wake_write)
+    signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+
+    selector = selectors.DefaultSelector()
+    selector.register(sock, selectors.EVENT_READ)
+    selector.register(wake_read, selectors.EVENT_READ)
+
+    while True:
+        for key, _ in selector.select():
+            if key.fileobj is sock:
+                message, fds, _, _ = socket.recv_fds(sock, _MAX_MESSAGE, _MAX_FDS)
+                if not message:
+                    # Shell exited or stopped us
+                    return
+                fds = [_move_high(fd) for fd in fds]
+                try:
+                    reply = _launch(marshal.loads(message), fds)
+                finally:
+                    for fd in fds:
+                        os.close(fd)
+                sock.send(marshal.dumps(reply))
+            else:
+                os.read(wake_read, 512)
+                _report_exits(sock)
+
+
+def _launch(request: tuple, fds: List[int]) -> tuple:
+    """Start one child for request; return the reply for the shell."""
+    path, args, env, cwd, actions = request
+    passed = iter(fds)
+    redirections = [
+        (next(passed) if source is None else source, target)
+        for source, target in actions
+    ]
+
+    if not hasattr(os, "posix_spawn"):
+        return _launch_forked(path, args, env, cwd, redirections)
+
+    # posix_spawn() cannot change directory, but the zygote is
+    # single-threaded, so it can simply move there itself first
+    try:
+        os.chdir(cwd)
+    except OSError:
+        # Shell's directory was removed - run wherever we are
+        pass
+    file_actions = [
+        (os.POSIX_SPAWN_DUP2, source, target) for source, target in redirections
+    ]
+    try:
+        pid = os.posix_spawn(
+            path,
+            args,
+            env,
+            file_actions=file_actions,
+            setsigdef=(signal.SIGINT, signal.SIGPIPE, signal.SIGCHLD),
+        )
+    except OSError as e:
+        return ("error", e.errno, e.strerror)
+    return ("pid", pid)
+
+
+def _launch_forked(
+    path: str,
+    args: List[str],
+    env: Dict[str, str],
+    cwd: str,
+    redirections: List[Tuple[int, int]],
+) -> tuple:
+    """fork()/execve() fallback for platforms without posix_spawn."""
+    try:
+        pid = os.fork()
+    except OSError as e:
+        return ("error", e.errno, e.strerror)
+
+    if pid == 0:
+        # CHILD PROCESS PATH - never returns
+        _exec_request(path, args, env, cwd, redirections)
+
+    return ("pid", pid)
+
+
+def _exec_request(
+    path: str,
+    args: List[str],
+    env: Dict[str, str],
+    cwd: str,
+    redirections: List[Tuple[int, int]],
+) -> None:
+    """Set up and exec one command inside a zygote child. Never returns."""
+    # Lazy import: the executor imports this module
+    from akujobip1.executor import _exec_error_exit_code
+
+    try:
+        signal.set_wakeup_fd(-1)
+        for signum in (signal.SIGINT, signal.SIGPIPE, signal.SIGCHLD):
+            signal.signal(signum, signal.SIG_DFL)
+        try:
+            os.chdir(cwd)
+        except OSError:
+            pass
+        for source, target in redirections:
+            os.dup2(source, target)
+        os.execve(path, args, env)
+    except BaseException as e:
+        # CRITICAL: Must use os._exit(), NOT return! (bypasses Python cleanup)
+        os._exit(_exec_error_exit_code(args[0], e))
+
+
+def _move_high(fd: int) -> int:
+    """Move a received fd to _FIRST_HIGH_FD or above (close-on-exec)."""
+    try:
+        return fcntl.fcntl(fd, fcntl.F_DUPFD_CLOEXEC, _FIRST_HIGH_FD)
+    finally:
+        os.close(fd)
+
+
+def _report_exits(sock: "socket.socket") -> None:
+    """Reap every exited child and send its status and usage to the shell."""
+    # Lazy import: the executor imports this module
+    from akujobip1.executor import rusage_fields
+
+    while True:
+        try:
+            pid, status, rusage = os.wait4(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+        sock.send(marshal.dumps(("status", pid, status, rusage_fields(rusage))))
+
+
+# Shared zygote used by the executor when spawn_strategy is 'zygote'
+ZYGOTE = Zygote()
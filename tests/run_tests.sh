@@ -3,6 +3,13 @@ set -euo pipefail
 
 BIN="python3 -m akujobip1"
 
+# The transcripts below include the prompt, which piped stdin only shows
+# when the config asks for it
+TRANSCRIPT_CONFIG="$(mktemp)"
+trap 'rm -f "$TRANSCRIPT_CONFIG"' EXIT
+printf 'prompt:\n  show_in_batch: true\n' >"$TRANSCRIPT_CONFIG"
+export AKUJOBIP1_CONFIG="$TRANSCRIPT_CONFIG"
+
 run_exact () {
   local name="$1"; local input="$2"; local expected="$3"
   printf "%s" "$input" | eval "$BIN" >"out_${name}.txt" 2>&1
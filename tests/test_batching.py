@@ -0,0 +1,134 @@
+"""
+Tests for ARG_MAX-aware argument batching (batching module).
+
+Covers size accounting, splitting of the fixed prefix, batch assembly,
+and running batches (sequentially and in parallel) with a small limit.
+"""
+
+import pytest
+
+from akujobip1 import batching
+from akujobip1.batching import (
+    argument_limit,
+    argv_size,
+    batch_arguments,
+    execute_batched,
+    split_fixed,
+)
+
+CONFIG = {"execution": {"show_exit_codes": "never"}}
+
+
+@pytest.fixture
+def small_limit(monkeypatch):
+    """Limit each exec to roughly 10 short arguments."""
+    limit = argv_size(["sh", "-c", 'echo "$#"', "x"]) + 10 * argv_size(["n99"])
+    monkeypatch.setattr(batching, "argument_limit", lambda: limit)
+    return limit
+
+
+class TestSizes:
+    """Test argv/environment size accounting."""
+
+    def test_argv_size_counts_nul_and_pointer(self):
+        pointer = batching._POINTER_SIZE
+        assert argv_size(["ls", "-l"]) == 2 * (2 + 1 + pointer)
+
+    def test_argv_size_uses_encoded_length(self):
+        assert argv_size(["é"]) == argv_size(["ab"])
+
+    def test_limit_leaves_room_for_environment(self, monkeypatch):
+        before = argument_limit()
+        monkeypatch.setenv("AKUJOBIP1_TEST_PADDING", "x" * 10000)
+        assert argument_limit() <= before - 10000
+
+
+class TestSplitFixed:
+    """Test which words are repeated in every batch."""
+
+    def test_words_before_first_expansion_are_fixed(self):
+        words = [("grep", False), ("-l", False), ("TODO", False), ("a.py", True)]
+        fixed, rest = split_fixed(iter(words + [("b.py", True), ("end", False)]))
+        assert fixed == ["grep", "-l", "TODO"]
+        assert list(rest) == ["a.py", "b.py", "end"]
+
+    def test_without_expansion_options_are_fixed(self):
+        words = [("rm", False), ("-f", False), ("a", False), ("b", False)]
+        fixed, rest = split_fixed(iter(words))
+        assert fixed == ["rm", "-f"]
+        assert list(rest) == ["a", "b"]
+
+    def test_rest_is_lazy(self):
+        def words():
+            yield "rm", False
+            yield "a.o", True
+            raise AssertionError("read too far")
+
+        fixed, rest = split_fixed(words())
+        assert fixed == ["rm"]
+        assert next(rest) == "a.o"
+
+
+class TestBatchArguments:
+    """Test batch assembly."""
+
+    def test_everything_fits(self):
+        assert list(batch_arguments(["echo"], ["a", "b"], 1000)) == [["echo", "a", "b"]]
+
+    def test_split_at_limit(self):
+        limit = argv_size(["echo", "a", "b"])
+        batches = list(batch_arguments(["echo"], ["a", "b", "c"], limit))
+        assert batches == [["echo", "a", "b"], ["echo", "c"]]
+
+    def test_oversized_word_gets_own_batch(self):
+        batches = list(batch_arguments(["echo"], ["a", "x" * 100, "b"], 30))
+        assert batches == [["echo", "a"], ["echo", "x" * 100], ["echo", "b"]]
+
+    def test_no_words(self):
+        assert list(batch_arguments(["ls"], [], 1000)) == [["ls"]]
+
+    def test_words_are_consumed_lazily(self):
+        consumed = []
+
+        def words():
+            for n in range(100):
+                consumed.append(n)
+                yield str(n)
+
+        batches = batch_arguments(["echo"], words(), argv_size(["echo", "0", "1"]))
+        assert next(batches) == ["echo", "0", "1"]
+        assert len(consumed) == 3
+
+
+class TestExecuteBatched:
+    """Test running the batches."""
+
+    def test_single_batch_runs_normally(self, capfd):
+        assert execute_batched(["echo"], iter(["a", "b"]), CONFIG) == 0
+        assert capfd.readouterr().out == "a b\n"
+
+    def test_runs_every_batch(self, small_limit, capfd):
+        words = iter(f"n{number}" for number in range(35))
+        assert execute_batched(["sh", "-c", 'echo "$#"', "x"], words, CONFIG) == 0
+        counts = [int(line) for line in capfd.readouterr().out.split()]
+        assert len(counts) > 1
+        assert sum(counts) == 35
+
+    def test_parallel_batches_keep_order(self, small_limit, capfd):
+        words = iter(f"n{number}" for number in range(35))
+        fixed = ["sh", "-c", 'echo "$1"', "x"]
+        assert execute_batched(fixed, words, CONFIG, jobs=3) == 0
+        firsts = capfd.readouterr().out.split()
+        assert firsts[0] == "n0"
+        assert firsts == sorted(firsts, key=lambda word: int(word[1:]))
+
+    def test_failed_batch_gives_123(self, small_limit, capfd):
+        words = iter(f"n{number}" for number in range(35))
+        assert execute_batched(["false"], words, CONFIG) == 123
+
+    def test_not_found_stops_early(self, small_limit, capfd):
+        words = iter(f"n{number}" for number in range(35))
+        assert execute_batched(["no-such-command-xyz"], words, CONFIG) == 127
+        err = capfd.readouterr().err
+        assert err.count("command not found") == 1
+        assert "stopped after exit code 127" in err
@@ -0,0 +1,112 @@
+"""
+Tests for brace expansion (braces module).
+
+Expected results are what bash prints for `printf '%s\\n' WORD`; lazy
+generation is checked with sequences far too large to build as a list.
+"""
+
+import itertools
+
+import pytest
+
+from akujobip1.braces import expand_braces, expand_token
+from akujobip1.tokenizer import tokenize
+
+
+def expand_line(word):
+    """Brace-expand one word of a command line (quotes respected)."""
+    (token,) = tokenize(word)
+    if token.braces is None:
+        return [token.value]
+    words = expand_token(token)
+    return [token.value] if words is None else [word.value for word in words]
+
+
+class TestLists:
+    """Test {a,b,c} lists."""
+
+    @pytest.mark.parametrize(
+        "word, expected",
+        [
+            ("a{b,c}d", ["abd", "acd"]),
+            ("{a,b}{1,2}", ["a1", "a2", "b1", "b2"]),
+            ("x{a,b{1,2}}", ["xa", "xb1", "xb2"]),
+            ("x{,s}", ["x", "xs"]),
+            ("a{,}b", ["ab", "ab"]),
+            ("{{a,b}}", ["{a}", "{b}"]),
+            ("a{b}c{d,e}", ["a{b}cd", "a{b}ce"]),
+            ("a{1..3}{b,c{d,e}}f", ["a1bf", "a1cdf", "a1cef", "a2bf", "a2cdf"]),
+        ],
+    )
+    def test_expansion(self, word, expected):
+        assert expand_braces(word)[: len(expected)] == expected
+
+    @pytest.mark.parametrize("word", ["{}", "{a}", "{a,b", "a,b}", "${x,y}"])
+    def test_not_an_expression(self, word):
+        assert expand_braces(word) == [word]
+
+    def test_empty_words_are_dropped(self):
+        assert expand_braces("{,}") == []
+
+
+class TestSequences:
+    """Test {x..y[..step]} sequences."""
+
+    @pytest.mark.parametrize(
+        "word, expected",
+        [
+            ("{1..5}", ["1", "2", "3", "4", "5"]),
+            ("{5..1}", ["5", "4", "3", "2", "1"]),
+            ("{0..10..5}", ["0", "5", "10"]),
+            ("{1..10..-3}", ["1", "4", "7", "10"]),
+            ("{0..3..0}", ["0", "1", "2", "3"]),
+            ("{-2..2}", ["-2", "-1", "0", "1", "2"]),
+            ("{01..03}", ["01", "02", "03"]),
+            ("{9..011}", ["009", "010", "011"]),
+            ("{-05..5..5}", ["-05", "000", "005"]),
+            ("{a..e}", ["a", "b", "c", "d", "e"]),
+            ("{a..z..10}", ["a", "k", "u"]),
+            ("{c..a}", ["c", "b", "a"]),
+            ("{a..c}{1..2}", ["a1", "a2", "b1", "b2", "c1", "c2"]),
+        ],
+    )
+    def test_expansion(self, word, expected):
+        assert expand_braces(word) == expected
+
+    @pytest.mark.parametrize("word", ["{1..x}", "{a..1}", "{1..2..x}", "{ab..c}"])
+    def test_not_a_sequence(self, word):
+        assert expand_braces(word) == [word]
+
+    def test_huge_sequence_is_lazy(self):
+        (token,) = tokenize("file{1..1000000000000}.txt")
+        words = expand_token(token)
+        first = [word.value for word in itertools.islice(words, 3)]
+        assert first == ["file1.txt", "file2.txt", "file3.txt"]
+
+
+class TestQuoting:
+    """Test that quoted braces are literal."""
+
+    @pytest.mark.parametrize(
+        "word, expected",
+        [
+            ('"{a,b}"', ["{a,b}"]),
+            ("'{1..3}'", ["{1..3}"]),
+            ("\\{a,b}", ["{a,b}"]),
+            ('{"a",b}', ["a", "b"]),
+            ('{"1"..3}', ["{1..3}"]),
+            ('x{a,"b c"}y', ["xay", "xb cy"]),
+            ('{a,"b,c"}', ["a", "b,c"]),
+        ],
+    )
+    def test_quotes(self, word, expected):
+        assert expand_line(word) == expected
+
+    def test_words_keep_glob_flags(self):
+        (token,) = tokenize('{"*",*}.txt')
+        words = list(expand_token(token))
+        assert [(word.value, word.wildcard) for word in words] == [
+            ("*.txt", False),
+            ("*.txt", True),
+        ]
+        assert words[0].start == token.start and words[0].end == token.end
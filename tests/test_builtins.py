@@ -7,6 +7,7 @@ exit, cd, pwd, and help.
 
 import os
 import pytest
+import sys
 import tempfile
 from unittest.mock import patch
 
@@ -16,9 +17,24 @@ from akujobip1.builtins import (
     CdCommand,
     PwdCommand,
     HelpCommand,
+    HashCommand,
+    TypeCommand,
+    JobsCommand,
+    WaitCommand,
+    KillCommand,
+    ParallelCommand,
+    SetCommand,
+    TimeCommand,
+    TimeoutCommand,
+    MemoCommand,
+    BatchCommand,
+    SHELL_OPTIONS,
     get_builtin,
     BUILTINS,
 )
+from akujobip1.jobs import JOB_TABLE
+from akujobip1.parser import ParseCache
+from akujobip1.pathcache import COMMAND_HASH
 
 
 class TestExitCommand:
@@ -217,6 +233,20 @@ class TestCdCommandBasic:
         cmd.execute(["cd", "-"], config)
         assert os.getcwd() == dir2
 
+    def test_cd_sets_pwd_and_oldpwd(self, monkeypatch):
+        """Test cd updates $PWD and $OLDPWD, as bash does."""
+        # Restored after the test
+        monkeypatch.setenv("PWD", os.getcwd())
+        monkeypatch.setenv("OLDPWD", "")
+        start_dir = os.getcwd()
+
+        assert CdCommand().execute(["cd", "/tmp"], {}) == 0
+        assert os.environ["PWD"] == "/tmp"
+        assert os.environ["OLDPWD"] == start_dir
+
+        assert CdCommand().execute(["cd", "/nonexistent_dir_xyz"], {}) == 1
+        assert os.environ["PWD"] == "/tmp"
+
 
 class TestCdCommandErrors:
     """Error handling tests for CdCommand."""
@@ -433,7 +463,468 @@ class TestGetBuiltin:
         assert "cd" in BUILTINS
         assert "pwd" in BUILTINS
         assert "help" in BUILTINS
-        assert len(BUILTINS) == 4
+        assert "hash" in BUILTINS
+        assert "type" in BUILTINS
+        assert "jobs" in BUILTINS
+        assert "wait" in BUILTINS
+        assert "kill" in BUILTINS
+        assert "parallel" in BUILTINS
+        assert "set" in BUILTINS
+        assert "time" in BUILTINS
+        assert "timeout" in BUILTINS
+        assert "memo" in BUILTINS
+        assert "batch" in BUILTINS
+        assert len(BUILTINS) == 15
+
+
+class TestHashCommand:
+    """Tests for HashCommand."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_table(self, tmp_path, monkeypatch):
+        """Isolated PATH with a single executable, and an empty table."""
+        tool = tmp_path / "tool"
+        tool.write_text("#!/bin/sh\nexit 0\n")
+        tool.chmod(0o755)
+        monkeypatch.setenv("PATH", str(tmp_path))
+        COMMAND_HASH.forget()
+        yield tool
+        COMMAND_HASH.forget()
+
+    def test_hash_empty(self, capsys):
+        """Test listing an empty table."""
+        assert HashCommand().execute(["hash"], {}) == 0
+        assert "hash table empty" in capsys.readouterr().out
+
+    def test_hash_name_then_list(self, fresh_table, capsys):
+        """Test hashing a name and listing it with hit count."""
+        assert HashCommand().execute(["hash", "tool"], {}) == 0
+        COMMAND_HASH.lookup("tool")
+        assert HashCommand().execute(["hash"], {}) == 0
+
+        output = capsys.readouterr().out
+        assert "hits" in output
+        assert str(fresh_table) in output
+        assert "   2" in output
+
+    def test_hash_unknown_name(self, capsys):
+        """Test hashing a missing command fails."""
+        assert HashCommand().execute(["hash", "missing_tool"], {}) == 1
+        assert "hash: missing_tool: not found" in capsys.readouterr().err
+
+    def test_hash_reset(self, capsys):
+        """Test hash -r clears the table."""
+        COMMAND_HASH.lookup("tool")
+        assert HashCommand().execute(["hash", "-r"], {}) == 0
+        assert COMMAND_HASH.entries() == []
+
+    def test_hash_parse_cache_stats(self, monkeypatch, capsys):
+        """Test hash -s reports the parse cache's counters."""
+        cache = ParseCache()
+        monkeypatch.setattr("akujobip1.builtins.PARSE_CACHE", cache)
+        for _ in range(3):
+            cache.tree("echo hi")
+        cache.expand("echo hi", cache.tokens("echo hi"), glob=False)
+
+        assert HashCommand().execute(["hash", "-s"], {}) == 0
+        output = capsys.readouterr().out.splitlines()
+        assert output == [
+            "parse: 2 hits, 2 misses (50.0% hit rate), 2 lines cached",
+            "expand: 0 hits, 1 misses (0.0% hit rate), 1 results cached",
+        ]
+
+
+class TestTypeCommand:
+    """Tests for TypeCommand."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_table(self, tmp_path, monkeypatch):
+        """Isolated PATH with a single executable, and an empty table."""
+        tool = tmp_path / "tool"
+        tool.write_text("#!/bin/sh\nexit 0\n")
+        tool.chmod(0o755)
+        monkeypatch.setenv("PATH", str(tmp_path))
+        COMMAND_HASH.forget()
+        yield tool
+        COMMAND_HASH.forget()
+
+    def test_type_builtin(self, capsys):
+        """Test built-ins are reported as such."""
+        assert TypeCommand().execute(["type", "cd"], {}) == 0
+        assert "cd is a shell builtin" in capsys.readouterr().out
+
+    def test_type_path_and_hashed(self, fresh_table, capsys):
+        """Test external commands before and after hashing."""
+        assert TypeCommand().execute(["type", "tool"], {}) == 0
+        assert f"tool is {fresh_table}" in capsys.readouterr().out
+        # type must not add the entry itself
+        assert COMMAND_HASH.entries() == []
+
+        COMMAND_HASH.lookup("tool")
+        assert TypeCommand().execute(["type", "tool"], {}) == 0
+        assert f"tool is hashed ({fresh_table})" in capsys.readouterr().out
+
+    def test_type_not_found(self, capsys):
+        """Test missing names return 1."""
+        assert TypeCommand().execute(["type", "missing_tool"], {}) == 1
+        assert "type: missing_tool: not found" in capsys.readouterr().err
+
+
+class TestJobControlCommands:
+    """Tests for JobsCommand, WaitCommand and KillCommand."""
+
+    @pytest.fixture(autouse=True)
+    def empty_table(self):
+        """Make sure no job leaks between tests."""
+        yield
+        for job in JOB_TABLE.jobs():
+            for pid in job.pids:
+                try:
+                    os.kill(pid, 9)
+                except ProcessLookupError:
+                    pass
+            JOB_TABLE.wait(job)
+            JOB_TABLE.remove(job)
+
+    def start(self, *argv):
+        """Start a background job and return it."""
+        from akujobip1.executor import execute_pipeline
+
+        config = {"execution": {"show_exit_codes": "never"}}
+        execute_pipeline([list(argv)], config, background=True)
+        return JOB_TABLE.jobs()[-1]
+
+    def test_jobs_lists_running(self, capsys):
+        """Test jobs shows a running job with its command."""
+        job = self.start("sleep", "5")
+        capsys.readouterr()
+
+        assert JobsCommand().execute(["jobs"], {}) == 0
+        output = capsys.readouterr().out
+        assert f"[{job.job_id}]" in output
+        assert "Running" in output
+        assert "sleep 5 &" in output
+
+    def test_wait_returns_job_status(self):
+        """Test wait %n returns the job's exit code and forgets it."""
+        job = self.start("bash", "-c", "exit 3")
+        assert WaitCommand().execute(["wait", f"%{job.job_id}"], {}) == 3
+        assert JOB_TABLE.find(f"%{job.job_id}") is None
+
+    def test_wait_by_pid(self):
+        """Test wait accepts a pid."""
+        job = self.start("true")
+        assert WaitCommand().execute(["wait", str(job.pids[0])], {}) == 0
+
+    def test_wait_all(self):
+        """Test wait with no arguments waits for every job."""
+        self.start("true")
+        self.start("false")
+        assert WaitCommand().execute(["wait"], {}) == 0
+        assert len(JOB_TABLE) == 0
+
+    def test_wait_unknown_job(self, capsys):
+        """Test waiting for a missing job returns 127."""
+        assert WaitCommand().execute(["wait", "%42"], {}) == 127
+        assert "no such job" in capsys.readouterr().err
+
+    def test_kill_job_default_term(self):
+        """Test kill %n sends SIGTERM to the job."""
+        job = self.start("sleep", "30")
+        assert KillCommand().execute(["kill", f"%{job.job_id}"], {}) == 0
+        assert JOB_TABLE.wait(job) == 128 + 15
+
+    @pytest.mark.parametrize("spec", ["-KILL", "-9", "-SIGKILL"])
+    def test_kill_signal_forms(self, spec):
+        """Test the -SIG forms."""
+        job = self.start("sleep", "30")
+        assert KillCommand().execute(["kill", spec, f"%{job.job_id}"], {}) == 0
+        assert JOB_TABLE.wait(job) == 128 + 9
+
+    def test_kill_dash_s(self):
+        """Test the -s SIG form."""
+        job = self.start("sleep", "30")
+        assert KillCommand().execute(["kill", "-s", "INT", f"%{job.job_id}"], {}) == 0
+        assert JOB_TABLE.wait(job) == 128 + 2
+
+    def test_kill_errors(self, capsys):
+        """Test invalid signals, jobs and pids."""
+        assert KillCommand().execute(["kill", "-BOGUS", "1"], {}) == 1
+        assert KillCommand().execute(["kill", "%99"], {}) == 1
+        assert KillCommand().execute(["kill", "notapid"], {}) == 1
+        assert KillCommand().execute(["kill"], {}) == 1
+        err = capsys.readouterr().err
+        assert "invalid signal specification" in err
+        assert "no such job" in err
+        assert "arguments must be process or job IDs" in err
+        assert "usage" in err
+
+    def test_invalid_signal_named(self, capsys):
+        """Test the message names the spec, in both forms, as bash does."""
+        assert KillCommand().execute(["kill", "-s", "FOO", "1"], {}) == 1
+        assert KillCommand().execute(["kill", "-BAR", "1"], {}) == 1
+        err = capsys.readouterr().err
+        assert "kill: FOO: invalid signal specification" in err
+        assert "kill: BAR: invalid signal specification" in err
+
+
+class TestParallelCommand:
+    """Tests for ParallelCommand."""
+
+    CONFIG = {"execution": {"show_exit_codes": "never"}}
+
+    def test_keep_order(self, capsys):
+        """Test -k prints job output in argument order."""
+        args = ["parallel", "-k", "-j", "3", "sh", "-c", "sleep 0.{}; echo {}"]
+        args += [":::", "3", "1", "2"]
+        assert ParallelCommand().execute(args, self.CONFIG) == 0
+        assert capsys.readouterr().out == "3\n1\n2\n"
+
+    def test_unordered_collects_all_output(self, capsys):
+        """Test default mode prints every job's output as a whole block."""
+        args = ["parallel", "-j2", "sh", "-c", "echo {}; echo {}-end"]
+        args += [":::", "a", "b", "c"]
+        assert ParallelCommand().execute(args, self.CONFIG) == 0
+        lines = capsys.readouterr().out.splitlines()
+        assert sorted(lines) == ["a", "a-end", "b", "b-end", "c", "c-end"]
+        for name in "abc":
+            assert lines.index(f"{name}-end") == lines.index(name) + 1
+
+    def test_reads_arguments_from_stdin(self, capsys):
+        """Test one job per stdin line when there is no ':::'."""
+        with patch("sys.stdin", ["x\n", "\n", "y\n"]):
+            assert (
+                ParallelCommand().execute(["parallel", "-k", "echo"], self.CONFIG) == 0
+            )
+        assert capsys.readouterr().out == "x\ny\n"
+
+    def test_failure_summary(self, capsys):
+        """Test the exit code counts failed jobs and they are summarized."""
+        args = ["parallel", "sh", "-c", "exit {}", ":::", "0", "2", "3"]
+        assert ParallelCommand().execute(args, self.CONFIG) == 2
+        err = capsys.readouterr().err
+        assert "2 of 3 jobs failed" in err
+        assert "[Exit: 2] sh -c exit 2" in err
+        assert "[Exit: 3] sh -c exit 3" in err
+
+    @pytest.mark.parametrize(
+        "args",
+        [["parallel"], ["parallel", "-j", "x", "echo"], ["parallel", "-q", "echo"]],
+    )
+    def test_usage_errors(self, args, capsys):
+        """Test usage errors return 255."""
+        assert ParallelCommand().execute(args, self.CONFIG) == 255
+        assert "parallel:" in capsys.readouterr().err
+
+
+class TestSetCommand:
+    """Tests for SetCommand."""
+
+    @pytest.fixture(autouse=True)
+    def restore_options(self):
+        """Reset errexit after each test."""
+        yield
+        SHELL_OPTIONS["errexit"] = False
+
+    @pytest.mark.parametrize(
+        "on, off",
+        [
+            (["set", "-e"], ["set", "+e"]),
+            (["set", "-o", "errexit"], ["set", "+o", "errexit"]),
+        ],
+    )
+    def test_toggle_errexit(self, on, off):
+        """Test short and long forms."""
+        assert SetCommand().execute(on, {}) == 0
+        assert SHELL_OPTIONS["errexit"] is True
+        assert SetCommand().execute(off, {}) == 0
+        assert SHELL_OPTIONS["errexit"] is False
+
+    def test_show_options(self, capsys):
+        """Test set -o lists options."""
+        assert SetCommand().execute(["set", "-o"], {}) == 0
+        assert "errexit" in capsys.readouterr().out
+
+    @pytest.mark.parametrize(
+        "args", [["set", "-x"], ["set", "-o", "bogus"], ["set", "e"]]
+    )
+    def test_invalid_options(self, args, capsys):
+        """Test invalid options return 2."""
+        assert SetCommand().execute(args, {}) == 2
+        assert "invalid option" in capsys.readouterr().err
+
+
+class TestTimeCommand:
+    """Tests for TimeCommand."""
+
+    CONFIG = {"execution": {"show_exit_codes": "never"}}
+
+    def test_time_external(self, capsys):
+        """Test timing an external command reports every field."""
+        assert TimeCommand().execute(["time", "sleep", "0.1"], self.CONFIG) == 0
+        err = capsys.readouterr().err
+        for label in ("real", "user", "sys", "maxrss", "faults", "ctxsw"):
+            assert label in err
+        real = [line for line in err.splitlines() if line.startswith("real")][0]
+        assert float(real.split("m")[1].rstrip("s")) >= 0.1
+
+    def test_time_returns_exit_code(self, capsys):
+        """Test the timed command's exit code is returned."""
+        assert TimeCommand().execute(["time", "sh", "-c", "exit 3"], self.CONFIG) == 3
+
+    def test_time_builtin(self, capsys):
+        """Test built-ins can be timed too."""
+        assert TimeCommand().execute(["time", "pwd"], self.CONFIG) == 0
+        captured = capsys.readouterr()
+        assert captured.out.strip() == os.getcwd()
+        assert "real" in captured.err
+
+    def test_time_parallel_counts_jobs(self, capsys):
+        """Test timing parallel includes the CPU time of its jobs."""
+        burn = "for i in range(3000000): pass"
+        args = ["time", "parallel", sys.executable, "-c", ":::", burn, burn]
+        assert TimeCommand().execute(args, self.CONFIG) == 0
+        err = capsys.readouterr().err
+        user = [line for line in err.splitlines() if line.startswith("user")][0]
+        assert float(user.split("m")[1].rstrip("s")) >= 0.05
+
+    def test_time_usage(self, capsys):
+        """Test time without a command is a usage error."""
+        assert TimeCommand().execute(["time"], self.CONFIG) == 2
+        assert "usage" in capsys.readouterr().err
+
+
+class TestTimeoutCommand:
+    """Tests for TimeoutCommand."""
+
+    CONFIG = {"execution": {"show_exit_codes": "never", "timeout_grace": 0.2}}
+
+    def test_times_out(self, capsys):
+        """Test a slow command is terminated with exit code 124."""
+        args = ["timeout", "0.2", "sleep", "10"]
+        assert TimeoutCommand().execute(args, self.CONFIG) == 124
+        assert "timed out" in capsys.readouterr().err
+
+    def test_passes_exit_code(self):
+        """Test a command finishing in time keeps its exit code."""
+        args = ["timeout", "5s", "sh", "-c", "exit 4"]
+        assert TimeoutCommand().execute(args, self.CONFIG) == 4
+
+    def test_kill_after(self, capsys):
+        """Test -k sets the grace period before SIGKILL."""
+        args = ["timeout", "-k", "0.1", "0.2", "sh", "-c", "trap '' TERM; sleep 10"]
+        assert TimeoutCommand().execute(args, self.CONFIG) == 124
+
+    @pytest.mark.parametrize(
+        "text, seconds",
+        [("10", 10), ("1.5", 1.5), ("30s", 30), ("2m", 120), ("1h", 3600)],
+    )
+    def test_parse_duration(self, text, seconds):
+        """Test duration suffixes."""
+        assert TimeoutCommand()._parse_duration(text) == seconds
+
+    @pytest.mark.parametrize(
+        "args",
+        [["timeout"], ["timeout", "5"], ["timeout", "x", "true"], ["timeout", "-k"]],
+    )
+    def test_usage_errors(self, args, capsys):
+        """Test usage errors return 125."""
+        assert TimeoutCommand().execute(args, self.CONFIG) == 125
+        assert "timeout:" in capsys.readouterr().err
+
+    @pytest.mark.parametrize("text", ["inf", "infs", "nan", "1e400"])
+    def test_non_finite_duration(self, text, capsys):
+        """Test inf and nan are invalid intervals, not a crash."""
+        assert TimeoutCommand().execute(["timeout", text, "true"], self.CONFIG) == 125
+        assert "invalid time interval" in capsys.readouterr().err
+
+    def test_huge_duration(self):
+        """Test a limit beyond what poll() takes still waits normally."""
+        args = ["timeout", "1e12", "sh", "-c", "exit 3"]
+        assert TimeoutCommand().execute(args, self.CONFIG) == 3
+
+
+class TestMemoCommand:
+    """Tests for MemoCommand."""
+
+    @pytest.fixture
+    def config(self, tmp_path):
+        """Config with a private cache directory."""
+        return {
+            "execution": {"show_exit_codes": "never"},
+            "memo": {"directory": str(tmp_path / "memo"), "max_size_mb": 1},
+        }
+
+    def test_replays_cached_output(self, config, tmp_path, capfd):
+        """Test the second run replays output without running the command."""
+        counter = tmp_path / "runs"
+        args = ["memo", "sh", "-c", f"echo run >> {counter}; echo out; exit 3"]
+        assert MemoCommand().execute(args, config) == 3
+        assert MemoCommand().execute(args, config) == 3
+        assert capfd.readouterr().out == "out\nout\n"
+        assert counter.read_text() == "run\n"
+
+    def test_stats_and_clear(self, config, capsys):
+        """Test --stats reports the hit rate and --clear empties the cache."""
+        MemoCommand().execute(["memo", "echo", "hi"], config)
+        MemoCommand().execute(["memo", "echo", "hi"], config)
+        capsys.readouterr()
+
+        assert MemoCommand().execute(["memo", "--stats"], config) == 0
+        out = capsys.readouterr().out
+        assert "1 hits, 1 misses (50.0% hit rate)" in out
+        assert "1 entries" in out
+
+        assert MemoCommand().execute(["memo", "--clear"], config) == 0
+        assert "removed 1" in capsys.readouterr().out
+
+    @pytest.mark.parametrize(
+        "args", [["memo"], ["memo", "--bogus"], ["memo", "cd", "/tmp"]]
+    )
+    def test_usage_errors(self, args, config, capsys):
+        """Test usage errors (and built-ins) return 2."""
+        assert MemoCommand().execute(args, config) == 2
+        assert "memo:" in capsys.readouterr().err
+
+
+class TestBatchCommand:
+    """Tests for BatchCommand."""
+
+    CONFIG = {"execution": {"show_exit_codes": "never"}}
+
+    def test_runs_command(self, capfd):
+        """Test a command that fits runs once with all its arguments."""
+        assert BatchCommand().execute(["batch", "echo", "a", "b"], self.CONFIG) == 0
+        assert capfd.readouterr().out == "a b\n"
+
+    def test_splits_streamed_arguments(self, capfd):
+        """Test expanded words are split and the words before them repeated."""
+        words = [("sh", False), ("-c", False), ('echo "$#"', False), ("x", False)]
+        words += [("f" * 100, True)] * 40000
+        assert BatchCommand().run(iter(words), self.CONFIG) == 0
+        counts = [int(line) for line in capfd.readouterr().out.split()]
+        assert len(counts) > 1
+        assert sum(counts) == 40000
+
+    def test_parallel_option(self, capfd):
+        """Test -P N is accepted in both spellings."""
+        assert BatchCommand().execute(["batch", "-P", "2", "true"], self.CONFIG) == 0
+        assert BatchCommand().execute(["batch", "-P2", "true"], self.CONFIG) == 0
+
+    @pytest.mark.parametrize(
+        "args",
+        [
+            ["batch"],
+            ["batch", "-x", "ls"],
+            ["batch", "-P", "zero", "ls"],
+            ["batch", "-P", "0", "ls"],
+            ["batch", "cd", "/tmp"],
+        ],
+    )
+    def test_usage_errors(self, args, capsys):
+        """Test usage errors (and built-ins) return 2."""
+        assert BatchCommand().execute(args, self.CONFIG) == 2
+        assert "batch:" in capsys.readouterr().err
 
 
 class TestBuiltinCommandBase:
@@ -8,12 +8,17 @@ Tests cover:
 - Configuration validation
 - YAML file loading
 - Priority order loading
+- The parsed config cache
+- Reloading edited files
+- Compiled settings
 """
 
 import pytest
 import os
+import subprocess
 import sys
 from pathlib import Path
+from unittest.mock import patch
 
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
@@ -25,9 +30,21 @@ from akujobip1.config import (
     validate_config,
     load_yaml_file,
     load_config,
+    default_cache_path,
+    as_settings,
+    Settings,
+    ShowExitCodes,
+    ConfigWatcher,
 )
 
 
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path, monkeypatch):
+    """Keep the config cache out of the real ~/.cache."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    return tmp_path / "cache"
+
+
 class TestDefaultConfig:
     """Test default configuration values."""
 
@@ -65,6 +82,7 @@ class TestDefaultConfig:
         config = get_default_config()
         assert config["glob"]["enabled"] is True
         assert config["glob"]["show_expansions"] is False
+        assert config["glob"]["cache_max_mb"] == 16
 
     def test_default_builtins_settings(self):
         """Test default built-in command settings."""
@@ -246,6 +264,36 @@ class TestValidateConfig:
         captured = capsys.readouterr()
         assert "show_exit_codes" in captured.err
 
+    @pytest.mark.parametrize("value", [-1, "10", True])
+    def test_validate_invalid_default_timeout(self, value, capsys):
+        """Test validation catches non-numeric or negative timeouts."""
+        config = get_default_config()
+        config["execution"]["default_timeout"] = value
+
+        assert validate_config(config) is False
+        assert "default_timeout" in capsys.readouterr().err
+
+    @pytest.mark.parametrize("value", [-1, "16", None])
+    def test_validate_invalid_glob_cache_size(self, value, capsys):
+        """Test validation catches a bad glob.cache_max_mb."""
+        config = get_default_config()
+        config["glob"]["cache_max_mb"] = value
+
+        assert validate_config(config) is False
+        assert "glob.cache_max_mb" in capsys.readouterr().err
+
+    @pytest.mark.parametrize(
+        "key, value",
+        [("commands", "git"), ("env", [1]), ("max_size_mb", 0), ("max_size_mb", "64")],
+    )
+    def test_validate_invalid_memo_settings(self, key, value, capsys):
+        """Test validation catches malformed memo settings."""
+        config = get_default_config()
+        config["memo"][key] = value
+
+        assert validate_config(config) is False
+        assert f"memo.{key}" in capsys.readouterr().err
+
     def test_validate_valid_show_exit_codes(self):
         """Test validation accepts valid show_exit_codes values."""
         for value in ["never", "on_failure", "always"]:
@@ -263,6 +311,31 @@ class TestValidateConfig:
         assert "glob.enabled" in captured.err
         assert "boolean" in captured.err
 
+    def test_validate_auto_batch_boolean(self, capsys):
+        """Test execution.auto_batch must be a boolean."""
+        config = get_default_config()
+        config["execution"]["auto_batch"] = "yes"
+
+        assert validate_config(config) is False
+        assert "execution.auto_batch" in capsys.readouterr().err
+
+    def test_validate_parser_cache_entries(self, capsys):
+        """Test parser.cache_entries must be a non-negative integer."""
+        config = get_default_config()
+        config["parser"]["cache_entries"] = -1
+
+        assert validate_config(config) is False
+        assert "parser.cache_entries" in capsys.readouterr().err
+
+    @pytest.mark.parametrize("value", [0, -1, "16", True])
+    def test_validate_parser_max_capture_mb(self, value, capsys):
+        """Test parser.max_capture_mb must be a positive number."""
+        config = get_default_config()
+        config["parser"]["max_capture_mb"] = value
+
+        assert validate_config(config) is False
+        assert "parser.max_capture_mb" in capsys.readouterr().err
+
 
 class TestLoadYamlFile:
     """Test YAML file loading."""
@@ -458,5 +531,315 @@ class TestLoadConfig:
         assert config["exit"]["message"] == "Goodbye!"
 
 
+class TestConfigCache:
+    """Test the cache of parsed config files."""
+
+    @pytest.fixture
+    def local_config(self, tmp_path, monkeypatch):
+        """A local akujobip1.yaml in an otherwise empty directory."""
+        work_dir = tmp_path / "work"
+        work_dir.mkdir()
+        monkeypatch.chdir(work_dir)
+        monkeypatch.setenv("HOME", str(tmp_path / "home"))
+        monkeypatch.delenv("AKUJOBIP1_CONFIG", raising=False)
+        local_config = work_dir / "akujobip1.yaml"
+        local_config.write_text('prompt:\n  text: "Local> "\n')
+        return local_config
+
+    def test_cache_location(self, cache_home):
+        """Test the cache lives under $XDG_CACHE_HOME/akujobip1."""
+        assert default_cache_path() == str(cache_home / "akujobip1" / "config.marshal")
+
+    def test_nothing_cached_without_files(self, local_config):
+        """Test a load with no config file at all writes no cache."""
+        local_config.unlink()
+        load_config()
+        assert not Path(default_cache_path()).exists()
+
+    def test_warm_load_skips_yaml(self, local_config):
+        """Test a second load is served from the cache."""
+        cold = load_config()
+        assert Path(default_cache_path()).exists()
+        with patch("akujobip1.config.load_yaml_file") as mock_load:
+            warm = load_config()
+        mock_load.assert_not_called()
+        assert warm == cold
+        assert warm["prompt"]["text"] == "Local> "
+
+    def test_warm_start_never_imports_yaml(self, local_config):
+        """Test a fresh interpreter loads the cached config without PyYAML."""
+        load_config()
+        src = Path(__file__).parent.parent / "src"
+        code = (
+            f"import sys; sys.path.insert(0, {str(src)!r}); "
+            "from akujobip1.config import load_config; "
+            "print(load_config()['prompt']['text'], 'yaml' in sys.modules)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True
+        )
+        assert result.stdout == "Local>  False\n"
+
+    def test_edit_invalidates(self, local_config):
+        """Test changing a file's contents is noticed."""
+        load_config()
+        local_config.write_text('prompt:\n  text: "Edited> "\n')
+        assert load_config()["prompt"]["text"] == "Edited> "
+
+    def test_new_and_deleted_files_invalidate(self, local_config, tmp_path):
+        """Test a config file appearing or disappearing is noticed."""
+        load_config()
+        user_dir = tmp_path / "home" / ".config" / "akujobip1"
+        user_dir.mkdir(parents=True)
+        (user_dir / "config.yaml").write_text('exit:\n  message: "Later!"\n')
+        assert load_config()["exit"]["message"] == "Later!"
+        local_config.unlink()
+        assert load_config()["prompt"]["text"] == "AkujobiP1> "
+
+    def test_env_variable_in_key(self, local_config, tmp_path, monkeypatch):
+        """Test pointing $AKUJOBIP1_CONFIG elsewhere is noticed."""
+        env_config = tmp_path / "env.yaml"
+        env_config.write_text('prompt:\n  text: "Env> "\n')
+        load_config()
+        monkeypatch.setenv("AKUJOBIP1_CONFIG", str(env_config))
+        assert load_config()["prompt"]["text"] == "Env> "
+
+    def test_invalid_file_not_cached(self, local_config, capsys):
+        """Test warnings are repeated rather than hidden by the cache."""
+        local_config.write_text("invalid: yaml: content:\n  - broken")
+        load_config()
+        assert not Path(default_cache_path()).exists()
+        load_config()
+        assert capsys.readouterr().err.count("Failed to parse YAML") == 2
+
+    def test_paths_expanded_on_every_load(self, local_config, monkeypatch):
+        """Test environment variables are expanded after the cache."""
+        local_config.write_text('debug:\n  log_file: "$LOG_DIR/shell.log"\n')
+        monkeypatch.setenv("LOG_DIR", "/first")
+        assert load_config()["debug"]["log_file"] == "/first/shell.log"
+        monkeypatch.setenv("LOG_DIR", "/second")
+        assert load_config()["debug"]["log_file"] == "/second/shell.log"
+
+    def test_corrupt_cache_ignored(self, local_config):
+        """Test a damaged cache file is treated as a miss and replaced."""
+        load_config()
+        Path(default_cache_path()).write_bytes(b"\x00garbage")
+        assert load_config()["prompt"]["text"] == "Local> "
+        with patch("akujobip1.config.load_yaml_file") as mock_load:
+            load_config()
+        mock_load.assert_not_called()
+
+    def test_unwritable_cache_dir(self, local_config, monkeypatch, tmp_path):
+        """Test loading works when the cache cannot be written."""
+        blocker = tmp_path / "not-a-dir"
+        blocker.write_text("")
+        monkeypatch.setenv("XDG_CACHE_HOME", str(blocker))
+        assert load_config()["prompt"]["text"] == "Local> "
+
+    def test_unmarshalable_values_not_cached(self, local_config):
+        """Test YAML values marshal can't store are loaded every time."""
+        local_config.write_text("prompt:\n  text: 2024-01-01\n")
+        load_config()
+        assert not Path(default_cache_path()).exists()
+
+
+class TestConfigWatcher:
+    """Test reloading config files edited during a session."""
+
+    @pytest.fixture
+    def local_config(self, tmp_path, monkeypatch):
+        """A local akujobip1.yaml in an otherwise empty directory."""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("HOME", str(tmp_path / "home"))
+        monkeypatch.delenv("AKUJOBIP1_CONFIG", raising=False)
+        local_config = tmp_path / "akujobip1.yaml"
+        local_config.write_text('prompt:\n  text: "Old> "\n')
+        return local_config
+
+    @pytest.fixture
+    def clock(self):
+        """A settable clock for the watcher, starting at 100 seconds."""
+        return [100.0]
+
+    def start(self, clock):
+        """A watcher and the config it watches, as cli() creates them."""
+        watcher = ConfigWatcher(clock=lambda: clock[0])
+        return watcher, load_config()
+
+    def test_unchanged_returns_same_object(self, local_config, clock):
+        """Test nothing is rebuilt when no file changed."""
+        watcher, config = self.start(clock)
+        assert watcher.poll(config) is config
+        clock[0] += 10
+        assert watcher.poll(config) is config
+
+    def test_edit_reloaded(self, local_config, clock):
+        """Test an edited file gives new settings at the next check."""
+        watcher, config = self.start(clock)
+        local_config.write_text(
+            'prompt:\n  text: "Newer> "\nexecution:\n  show_exit_codes: always\n'
+        )
+        config = watcher.poll(config)
+        assert config["prompt"]["text"] == "Newer> "
+        assert config.execution.show_exit_codes is ShowExitCodes.ALWAYS
+
+    def test_checks_throttled(self, local_config, clock):
+        """Test files are not stat()ed again until the interval passed."""
+        watcher, config = self.start(clock)
+        config = watcher.poll(config)
+        local_config.write_text('prompt:\n  text: "Newer> "\n')
+        with patch("akujobip1.config._cache_key") as mock_key:
+            assert watcher.poll(config) is config
+            clock[0] += 1.9
+            assert watcher.poll(config) is config
+        mock_key.assert_not_called()
+        clock[0] += 0.1
+        assert watcher.poll(config)["prompt"]["text"] == "Newer> "
+
+    def test_interval_from_config(self, local_config, clock):
+        """Test config.reload_interval sets the interval; 0 turns it off."""
+        local_config.write_text("config:\n  reload_interval: 0\n")
+        watcher, config = self.start(clock)
+        config = watcher.poll(config)
+        local_config.write_text('prompt:\n  text: "Newer> "\n')
+        clock[0] += 3600
+        assert watcher.poll(config) is config
+
+    def test_new_file_noticed(self, local_config, clock, tmp_path):
+        """Test a config file created after startup is loaded."""
+        watcher, config = self.start(clock)
+        user_dir = tmp_path / "home" / ".config" / "akujobip1"
+        user_dir.mkdir(parents=True)
+        (user_dir / "config.yaml").write_text('exit:\n  message: "Later!"\n')
+        assert watcher.poll(config)["exit"]["message"] == "Later!"
+
+    def test_broken_file_keeps_old_settings(self, local_config, clock, capsys):
+        """Test a file that no longer parses is reported once and ignored."""
+        watcher, config = self.start(clock)
+        local_config.write_text("invalid: yaml: content:\n  - broken")
+        assert watcher.poll(config) is config
+        clock[0] += 2
+        assert watcher.poll(config) is config
+        err = capsys.readouterr().err
+        assert err.count("Failed to parse YAML") == 1
+        assert err.count("config reload failed") == 1
+        local_config.write_text('prompt:\n  text: "Fixed> "\n')
+        clock[0] += 2
+        assert watcher.poll(config)["prompt"]["text"] == "Fixed> "
+
+    def test_sources_fixed_at_start(self, local_config, clock, tmp_path, monkeypatch):
+        """Test a cd does not make another directory's file the config."""
+        watcher, config = self.start(clock)
+        other = tmp_path / "other"
+        other.mkdir()
+        (other / "akujobip1.yaml").write_text('prompt:\n  text: "Other> "\n')
+        monkeypatch.chdir(other)
+        local_config.write_text('prompt:\n  text: "Newer> "\n')
+        assert watcher.poll(config)["prompt"]["text"] == "Newer> "
+
+    def test_invalid_interval_warns(self, capsys):
+        """Test a negative or non-numeric interval is reported."""
+        assert not validate_config({"config": {"reload_interval": -1}})
+        assert not validate_config({"config": {"reload_interval": "2s"}})
+        assert "config.reload_interval" in capsys.readouterr().err
+
+
+class TestSettings:
+    """Test the compiled, read-only settings."""
+
+    def test_load_config_returns_settings(self, tmp_path, monkeypatch):
+        """Test load_config() compiles its result."""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.delenv("AKUJOBIP1_CONFIG", raising=False)
+        config = load_config()
+        assert isinstance(config, Settings)
+        assert config.execution.show_exit_codes is ShowExitCodes.ON_FAILURE
+        assert config.glob.max_matches == 100000
+
+    def test_dict_view(self):
+        """Test a Settings reads like the dictionary it came from."""
+        settings = as_settings(get_default_config())
+        assert settings["prompt"]["text"] == "AkujobiP1> "
+        assert settings.get("exit", {}).get("message") == "Bye!"
+        assert settings.get("missing") is None
+        assert settings == get_default_config()
+        assert dict(settings)["glob"]["enabled"] is True
+
+    def test_view_is_read_only(self):
+        """Test neither the top level nor a section can be changed."""
+        settings = as_settings(get_default_config())
+        with pytest.raises(TypeError):
+            settings["prompt"] = {}
+        with pytest.raises(TypeError):
+            settings["execution"]["show_exit_codes"] = "always"
+        with pytest.raises(AttributeError):
+            settings.execution.show_rusage = True
+
+    def test_view_is_a_copy(self):
+        """Test changing the source dict afterwards changes nothing."""
+        config = get_default_config()
+        settings = as_settings(config)
+        config["prompt"]["text"] = "changed> "
+        assert settings["prompt"]["text"] == "AkujobiP1> "
+
+    def test_settings_passed_through(self):
+        """Test as_settings() does not recompile a Settings."""
+        settings = as_settings({})
+        assert as_settings(settings) is settings
+
+    def test_defaults_for_missing_sections(self):
+        """Test an empty or malformed config gives the defaults."""
+        for config in ({}, {"execution": None, "glob": "x", "parser": None}):
+            settings = as_settings(config)
+            assert settings.execution.show_exit_codes is ShowExitCodes.ON_FAILURE
+            assert settings.execution.spawn_strategy == "auto"
+            assert settings.execution.timeout_grace == 2.0
+            assert settings.glob.enabled is True
+            assert settings.glob.cache_max_bytes == 16 * 1024 * 1024
+            assert settings.parser.cache_entries == 256
+            assert settings.parser.max_capture_bytes == 16 * 1024 * 1024
+            assert settings.debug.show_fork_pids is False
+
+    def test_invalid_values_fall_back(self):
+        """Test values validate_config() warns about are replaced."""
+        settings = as_settings(
+            {
+                "execution": {
+                    "show_exit_codes": "sometimes",
+                    "spawn_strategy": "vfork",
+                    "default_timeout": -5,
+                    "timeout_grace": "soon",
+                },
+                "glob": {"max_depth": -1, "recursive": "yes", "cache_max_mb": -1},
+                "parser": {"cache_entries": True, "max_capture_mb": 0},
+            }
+        )
+        assert settings.execution.show_exit_codes is ShowExitCodes.NEVER
+        assert settings.execution.spawn_strategy == "auto"
+        assert settings.execution.default_timeout == 0.0
+        assert settings.execution.timeout_grace == 2.0
+        assert settings.glob.max_depth == 0
+        assert settings.glob.recursive is True
+        assert settings.glob.cache_max_bytes == 16 * 1024 * 1024
+        assert settings.parser.cache_entries == 256
+        assert settings.parser.max_capture_bytes == 16 * 1024 * 1024
+
+    @pytest.mark.parametrize(
+        "format_str, expected",
+        [
+            ("[Exit: {code}]", "[Exit: 3]"),
+            ("exit={code:03d}", "exit=003"),
+            ("{status}", "[Exit: 3]"),
+            ("{0}", "[Exit: 3]"),
+            ("{code", "[Exit: 3]"),
+            (None, "[Exit: 3]"),
+        ],
+    )
+    def test_exit_code_formatter(self, format_str, expected):
+        """Test the formatter is checked once, with the default as fallback."""
+        settings = as_settings({"execution": {"exit_code_format": format_str}})
+        assert settings.execution.format_exit_code(3) == expected
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
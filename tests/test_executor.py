@@ -4,15 +4,27 @@ Test suite for the executor module.
 This module tests external command execution using fork/exec/wait.
 """
 
+import os
 import shutil
+import signal
 import sys
+import time
 import pytest
 from unittest.mock import patch
 
-from akujobip1.executor import execute_external_command, display_exit_status
+from akujobip1.executor import (
+    CLOSE_FD,
+    capture_output,
+    execute_external_command,
+    execute_pipeline,
+    display_exit_status,
+    last_resource_usage,
+    resolve_spawn_strategy,
+    status_to_exit_code,
+    ResourceUsage,
+)
 from akujobip1.config import get_default_config
 
-
 # Fixtures
 
 
@@ -122,11 +134,22 @@ class TestExecuteExternalCommandFailure:
         exit_code = execute_external_command(["bash", "-c", "exit 42"], silent_config)
         assert exit_code == 42
 
+    @pytest.mark.parametrize("strategy", ["fork", "posix_spawn"])
+    def test_argument_list_too_long(self, silent_config, strategy, capfd):
+        """Test E2BIG returns 126 with a hint at the batch built-in."""
+        silent_config["execution"]["spawn_strategy"] = strategy
+        args = ["true"] + ["x" * 1000] * (os.sysconf("SC_ARG_MAX") // 1000 + 1)
+        assert execute_external_command(args, silent_config) == 126
+        assert "Argument list too long (split it with: batch true" in (
+            capfd.readouterr().err
+        )
+
     @pytest.mark.skipif(
         sys.platform == "win32", reason="fork() not available on Windows"
     )
     def test_fork_failure_mocked(self, silent_config, capsys):
         """Test fork failure handling."""
+        silent_config["execution"]["spawn_strategy"] = "fork"
         with patch("os.fork") as mock_fork:
             mock_fork.side_effect = OSError("Resource temporarily unavailable")
 
@@ -137,6 +160,408 @@ class TestExecuteExternalCommandFailure:
             assert "Fork failed" in captured.err
 
 
+# Test Class 2b: Spawn Strategies
+
+
+@pytest.mark.skipif(not hasattr(os, "posix_spawn"), reason="posix_spawn required")
+class TestSpawnStrategies:
+    """Test fork and posix_spawn strategies behave identically."""
+
+    @pytest.mark.parametrize("strategy", ["fork", "posix_spawn", "auto"])
+    def test_exit_codes_match(self, strategy):
+        """Test 0/1/42/127 exit codes for every strategy."""
+        config = {"execution": {"show_exit_codes": "never", "spawn_strategy": strategy}}
+        assert execute_external_command(["true"], config) == 0
+        assert execute_external_command(["false"], config) == 1
+        assert execute_external_command(["bash", "-c", "exit 42"], config) == 42
+        assert execute_external_command(["nonexistent_xyz123"], config) == 127
+
+    @pytest.mark.parametrize("strategy", ["fork", "posix_spawn"])
+    def test_signal_exit_code(self, strategy):
+        """Test 128+N for signal termination for every strategy."""
+        config = {"execution": {"show_exit_codes": "never", "spawn_strategy": strategy}}
+        exit_code = execute_external_command(["bash", "-c", "kill -TERM $$"], config)
+        assert exit_code == 143
+
+    @pytest.mark.parametrize("strategy", ["fork", "posix_spawn"])
+    def test_sigint_reset_in_child(self, strategy):
+        """Test the child starts with SIGINT at its default disposition."""
+        config = {"execution": {"show_exit_codes": "never", "spawn_strategy": strategy}}
+        # Even if the shell ignores SIGINT, the child must not inherit that;
+        # a child that ignored SIGINT would survive and exit 0
+        old_handler = signal.signal(signal.SIGINT, signal.SIG_IGN)
+        try:
+            exit_code = execute_external_command(
+                ["bash", "-c", "kill -INT $$; exit 0"], config
+            )
+        finally:
+            signal.signal(signal.SIGINT, old_handler)
+        assert exit_code == 130
+
+    def test_not_found_does_not_fork(self, capsys):
+        """Test unknown commands are reported by the parent without a child."""
+        config = {"execution": {"show_exit_codes": "never", "spawn_strategy": "fork"}}
+        with patch("os.fork") as mock_fork:
+            exit_code = execute_external_command(["nonexistent_xyz123"], config)
+            exit_code_again = execute_external_command(["nonexistent_xyz123"], config)
+
+        assert exit_code == exit_code_again == 127
+        mock_fork.assert_not_called()
+        assert "nonexistent_xyz123: command not found" in capsys.readouterr().err
+
+    def test_posix_spawn_not_found_displays_exit(self, capsys):
+        """Test spawn failure is reported like a failed child."""
+        config = {
+            "execution": {
+                "show_exit_codes": "on_failure",
+                "spawn_strategy": "posix_spawn",
+            }
+        }
+        exit_code = execute_external_command(["nonexistent_xyz123"], config)
+        assert exit_code == 127
+
+        captured = capsys.readouterr()
+        assert "nonexistent_xyz123: command not found" in captured.err
+        assert "[Exit: 127]" in captured.out
+
+    def test_posix_spawn_permission_denied(self, tmp_path, capsys):
+        """Test non-executable file returns 126 under posix_spawn."""
+        script = tmp_path / "noexec.sh"
+        script.write_text("#!/bin/sh\nexit 0\n")
+        script.chmod(0o644)
+        config = {
+            "execution": {"show_exit_codes": "never", "spawn_strategy": "posix_spawn"}
+        }
+        exit_code = execute_external_command([str(script)], config)
+        assert exit_code == 126
+        assert "Permission denied" in capsys.readouterr().err
+
+    def test_resolve_strategy(self):
+        """Test strategy resolution and fallback."""
+        assert resolve_spawn_strategy({}) == "posix_spawn"
+        assert resolve_spawn_strategy({"execution": None}) == "posix_spawn"
+        assert (
+            resolve_spawn_strategy({"execution": {"spawn_strategy": "fork"}}) == "fork"
+        )
+        assert (
+            resolve_spawn_strategy({"execution": {"spawn_strategy": "bogus"}})
+            == "posix_spawn"
+        )
+
+    def test_resolve_strategy_without_posix_spawn(self):
+        """Test auto falls back to fork where posix_spawn is missing."""
+        with patch("akujobip1.executor.os") as mock_os:
+            del mock_os.posix_spawn
+            assert resolve_spawn_strategy({}) == "fork"
+
+    def test_status_to_exit_code(self):
+        """Test raw wait status decoding."""
+        assert status_to_exit_code(0) == 0
+        assert status_to_exit_code(42 << 8) == 42
+        assert status_to_exit_code(9) == 137
+
+
+# Test Class 2c: Pipelines
+
+
+class TestExecutePipeline:
+    """Test concurrent pipeline execution."""
+
+    @pytest.mark.parametrize("strategy", ["fork", "posix_spawn"])
+    def test_data_flows_between_stages(self, strategy, tmp_path):
+        """Test output of each stage feeds the next."""
+        out = tmp_path / "out.txt"
+        config = {"execution": {"show_exit_codes": "never", "spawn_strategy": strategy}}
+        exit_code = execute_pipeline(
+            [
+                ["printf", "b\\na\\nc\\n"],
+                ["sort"],
+                ["bash", "-c", f"cat > {out}"],
+            ],
+            config,
+        )
+        assert exit_code == 0
+        assert out.read_text() == "a\nb\nc\n"
+
+    def test_exit_code_is_last_stage(self, silent_config):
+        """Test pipeline status follows the last stage."""
+        assert execute_pipeline([["false"], ["true"]], silent_config) == 0
+        assert execute_pipeline([["true"], ["false"]], silent_config) == 1
+
+    def test_stages_run_concurrently(self, silent_config):
+        """Test a writer that outlives its reader does not hang the shell."""
+        # 'yes' never ends on its own; it must die of SIGPIPE once head exits
+        exit_code = execute_pipeline(
+            [["yes"], ["head", "-n", "1"], ["cat"]], silent_config
+        )
+        assert exit_code == 0
+
+    def test_missing_stage_command(self, silent_config, capsys):
+        """Test an unknown stage reports 127 while the others still run."""
+        exit_code = execute_pipeline([["true"], ["nonexistent_xyz123"]], silent_config)
+        assert exit_code == 127
+        assert "nonexistent_xyz123: command not found" in capsys.readouterr().err
+
+    def test_pipestatus_display(self, capsys):
+        """Test the per-stage status vector is shown when enabled."""
+        config = {"execution": {"show_exit_codes": "never", "show_pipestatus": True}}
+        execute_pipeline([["false"], ["true"], ["bash", "-c", "exit 3"]], config)
+        assert "[Pipestatus: 1 0 3]" in capsys.readouterr().out
+
+    def test_pipestatus_hidden_by_default(self, silent_config, capsys):
+        """Test the vector is not shown unless configured."""
+        execute_pipeline([["false"], ["true"]], silent_config)
+        assert "Pipestatus" not in capsys.readouterr().out
+
+    def test_builtin_stage_runs_in_subshell(self, silent_config, tmp_path):
+        """Test a built-in stage writes into the pipe."""
+        out = tmp_path / "out.txt"
+        cwd = os.getcwd()
+        exit_code = execute_pipeline(
+            [["pwd"], ["bash", "-c", f"cat > {out}"]], silent_config
+        )
+        assert exit_code == 0
+        assert out.read_text().strip() == cwd
+
+    def test_empty_stage_rejected(self, silent_config, capsys):
+        """Test defensive validation."""
+        assert execute_pipeline([["ls"], []], silent_config) == 1
+        assert "No command specified" in capsys.readouterr().err
+
+
+class TestCaptureOutput:
+    """Test capture_output() (used for $(command))."""
+
+    def test_captures_last_stage(self, silent_config):
+        """Test only the last stage's stdout is collected."""
+        exit_code, output = capture_output(
+            [["printf", "b\\na\\n"], ["sort"]], silent_config, 1024
+        )
+        assert exit_code == 0
+        assert output == b"a\nb\n"
+
+    def test_large_output_grows_buffer(self, silent_config):
+        """Test output larger than the first chunk is read completely."""
+        exit_code, output = capture_output(
+            [["head", "-c", "1000000", "/dev/zero"]], silent_config, 1 << 20
+        )
+        assert exit_code == 0
+        assert len(output) == 1000000
+
+    def test_exact_limit_is_accepted(self, silent_config):
+        """Test output of exactly max_bytes still fits."""
+        _, output = capture_output([["printf", "abcd"]], silent_config, 4)
+        assert output == b"abcd"
+
+    def test_over_limit_stops_command(self, silent_config):
+        """Test a runaway command is stopped once it passes the cap."""
+        start = time.perf_counter()
+        exit_code, output = capture_output([["yes"]], silent_config, 100000)
+        assert output is None
+        assert exit_code > 128
+        assert time.perf_counter() - start < 5
+
+    def test_exit_code_and_builtin(self, silent_config):
+        """Test the exit status is returned and built-ins run in a child."""
+        assert capture_output([["false"]], silent_config, 10) == (1, b"")
+        assert capture_output([["pwd"]], silent_config, 4096)[1] == (
+            os.getcwd().encode() + b"\n"
+        )
+
+    def test_missing_command(self, silent_config, capsys):
+        """Test an unknown command gives 127 and no output."""
+        assert capture_output([["nonexistent_xyz123"]], silent_config, 10) == (
+            127,
+            b"",
+        )
+        assert "command not found" in capsys.readouterr().err
+
+
+class TestRedirectionPairs:
+    """Test (source_fd, target_fd) pairs given to the executor."""
+
+    @pytest.mark.parametrize("strategy", ["fork", "posix_spawn", "zygote"])
+    def test_external_command_output_to_file(self, strategy, tmp_path):
+        """Test stdout and stderr go where the pairs say, in order."""
+        path = tmp_path / "out.txt"
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_CLOEXEC)
+        config = {"execution": {"show_exit_codes": "never", "spawn_strategy": strategy}}
+        try:
+            exit_code = execute_external_command(
+                ["sh", "-c", "echo out; echo err >&2"],
+                config,
+                redirections=[(fd, 1), (1, 2)],
+            )
+        finally:
+            os.close(fd)
+        assert exit_code == 0
+        assert path.read_text() == "out\nerr\n"
+
+    @pytest.mark.parametrize("strategy", ["fork", "posix_spawn"])
+    def test_close_pair(self, strategy):
+        """Test CLOSE_FD closes the target in the child."""
+        config = {"execution": {"show_exit_codes": "never", "spawn_strategy": strategy}}
+        exit_code = execute_external_command(
+            ["sh", "-c", "echo hidden >&7"], config, redirections=[(CLOSE_FD, 7)]
+        )
+        assert exit_code != 0
+
+    def test_missing_command_still_displayed(self, tmp_path, capsys):
+        """Test a redirected command that is not found shows its status."""
+        config = {"execution": {"show_exit_codes": "always"}}
+        exit_code = execute_external_command(
+            ["nonexistent_xyz123"], config, redirections=[(0, 0)]
+        )
+        assert exit_code == 127
+        assert "[Exit: 127]" in capsys.readouterr().out
+
+    def test_pipeline_stage_pairs_follow_pipes(self, silent_config, tmp_path):
+        """Test a stage's own pairs are applied after its pipe."""
+        path = tmp_path / "out.txt"
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_CLOEXEC)
+        try:
+            execute_pipeline(
+                [["echo", "to file"], ["cat"]],
+                silent_config,
+                redirections=[[(fd, 1)], []],
+            )
+        finally:
+            os.close(fd)
+        assert path.read_text() == "to file\n"
+
+    def test_capture_output_pairs(self, silent_config):
+        """Test 2>&1 inside a captured command reaches the capture pipe."""
+        exit_code, output = capture_output(
+            [["sh", "-c", "echo err >&2"]], silent_config, 100, [[(1, 2)]]
+        )
+        assert (exit_code, output) == (0, b"err\n")
+
+
+# Test Class 2d: Resource Usage
+
+
+class TestResourceUsage:
+    """Test wait4()-based resource accounting."""
+
+    CONFIG = {"execution": {"show_exit_codes": "never", "show_rusage": False}}
+
+    def test_usage_recorded_for_command(self):
+        """Test CPU time and faults are recorded for an external command."""
+        code = "x = bytearray(32 * 1024 * 1024)\nfor i in range(200000): pass"
+        assert execute_external_command([sys.executable, "-c", code], self.CONFIG) == 0
+        usage = last_resource_usage()
+        assert usage.user_time + usage.system_time > 0
+        assert usage.max_rss_kb >= 32 * 1024
+        assert usage.minor_faults > 0
+        assert usage.real_time > 0
+
+    def test_usage_summed_for_pipeline(self):
+        """Test a pipeline's usage covers every stage."""
+        burn = "for i in range(3000000): pass"
+        stages = [[sys.executable, "-c", burn], [sys.executable, "-c", burn]]
+        assert execute_pipeline(stages, self.CONFIG) == 0
+        both = last_resource_usage()
+        execute_external_command([sys.executable, "-c", burn], self.CONFIG)
+        single = last_resource_usage()
+        assert both.user_time > single.user_time
+
+    def test_usage_recorded_for_capture(self):
+        """Test $(command) output capture records its stages' usage."""
+        burn = "for i in range(3000000): pass"
+        stages = [[sys.executable, "-c", burn], [sys.executable, "-c", burn]]
+        assert capture_output(stages, self.CONFIG, 1024) == (0, bytearray())
+        assert last_resource_usage().user_time > 0
+
+    def test_not_found_records_empty_usage(self, capsys):
+        """Test a command that never started has no CPU usage."""
+        execute_external_command(["no-such-command-xyz"], self.CONFIG)
+        usage = last_resource_usage()
+        assert usage.user_time == 0
+        assert usage.max_rss_kb == 0
+
+    def test_add_combines_usage(self):
+        """Test CPU/faults add up while real time and RSS take the maximum."""
+        a = ResourceUsage(1.0, 0.5, 0.25, 1000, 10, 1, 2, 3)
+        b = ResourceUsage(2.0, 0.5, 0.25, 500, 5, 0, 1, 1)
+        assert a + b == ResourceUsage(2.0, 1.0, 0.5, 1000, 15, 1, 3, 4)
+
+    def test_show_rusage(self, capsys):
+        """Test execution.show_rusage prints a usage line to stderr."""
+        config = {"execution": {"show_exit_codes": "never", "show_rusage": True}}
+        usage = ResourceUsage(0.5, 0.25, 0.125, 2048, 100, 1, 3, 4)
+        display_exit_status(0, config, usage=usage)
+        err = capsys.readouterr().err
+        assert "[Usage: real 0.500s user 0.250s sys 0.125s maxrss 2048KB" in err
+        assert "faults 100/1 ctxsw 3/4]" in err
+
+    def test_rusage_hidden_by_default(self, capsys):
+        """Test no usage line without show_rusage."""
+        display_exit_status(0, {}, usage=ResourceUsage())
+        assert "Usage" not in capsys.readouterr().err
+
+
+# Test Class 2e: Timeouts
+
+
+class TestTimeouts:
+    """Test deadline enforcement with pidfd waits."""
+
+    CONFIG = {"execution": {"show_exit_codes": "never"}}
+
+    def timed_config(self, timeout, grace=0.2):
+        return {
+            "execution": {
+                "show_exit_codes": "never",
+                "default_timeout": timeout,
+                "timeout_grace": grace,
+            }
+        }
+
+    def test_default_timeout_kills_command(self, capsys):
+        """Test a hung command is terminated and reports 124."""
+        start = time.monotonic()
+        assert execute_external_command(["sleep", "10"], self.timed_config(0.2)) == 124
+        assert time.monotonic() - start < 2
+        assert "sleep: timed out after 0.2s" in capsys.readouterr().err
+
+    def test_fast_command_unaffected(self):
+        """Test commands finishing in time keep their exit code."""
+        config = self.timed_config(5)
+        assert execute_external_command(["sh", "-c", "exit 3"], config) == 3
+
+    def test_escalates_to_sigkill(self, capsys):
+        """Test a command ignoring SIGTERM is killed after the grace period."""
+        args = ["sh", "-c", "trap '' TERM; sleep 10"]
+        start = time.monotonic()
+        assert execute_external_command(args, self.timed_config(0.2, 0.2)) == 124
+        elapsed = time.monotonic() - start
+        assert 0.4 <= elapsed < 3
+
+    def test_explicit_timeout_overrides_config(self, capsys):
+        """Test the timeout argument wins over default_timeout."""
+        config = self.timed_config(0)
+        assert execute_external_command(["sleep", "10"], config, 0.2, 0.1) == 124
+
+    def test_pipeline_timeout(self, capsys):
+        """Test the deadline covers every pipeline stage."""
+        stages = [["sleep", "10"], ["cat"]]
+        start = time.monotonic()
+        assert execute_pipeline(stages, self.timed_config(0.2)) == 124
+        assert time.monotonic() - start < 2
+
+    def test_no_timeout_by_default(self):
+        """Test default config applies no limit."""
+        assert execute_external_command(["sleep", "0.1"], get_default_config()) == 0
+
+    def test_waits_without_pidfd(self, capsys, monkeypatch):
+        """Test the fallback when pidfds are unavailable."""
+        monkeypatch.delattr(os, "pidfd_open", raising=False)
+        assert execute_external_command(["sleep", "10"], self.timed_config(0.2)) == 124
+        start = time.monotonic()
+        assert execute_external_command(["true"], self.timed_config(5)) == 0
+        assert time.monotonic() - start < 1
+
+
 # Test Class 3: Signal Termination
 
 
@@ -514,10 +939,10 @@ class TestDisplayExitStatusEdgeCases:
             assert f"[Exit: {code}]" in captured.out
 
     def test_child_process_error_handling(self, silent_config):
-        """Test ChildProcessError handling in waitpid."""
+        """Test ChildProcessError handling in wait4."""
         # This is a defensive code path - hard to trigger in practice
         # We test the happy path; the error handling is for robustness
-        with patch("os.waitpid") as mock_wait:
+        with patch("os.wait4") as mock_wait:
             # Simulate a child that doesn't exist (already reaped)
             mock_wait.side_effect = ChildProcessError("No child processes")
 
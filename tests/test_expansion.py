@@ -0,0 +1,195 @@
+"""
+Tests for parameter and tilde expansion (expansion module).
+
+Expected results are what bash passes as arguments for the same line.
+"""
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+from akujobip1.expansion import (
+    SPECIAL_PARAMETERS,
+    ExpansionError,
+    capture_limit,
+    command_output,
+    expand_parameters,
+    home_directory,
+    split_fields,
+)
+from akujobip1.tokenizer import tokenize
+
+
+@pytest.fixture
+def environment():
+    """A known environment (restored afterwards)."""
+    values = {"HOME": "/home/user", "A": "a  b", "EMPTY": "", "GLOB": "*.py"}
+    with patch.dict(os.environ, values):
+        os.environ.pop("UNSET", None)
+        os.environ.pop("IFS", None)
+        yield
+
+
+def words(line, config=None):
+    """Argument values for line after parameter and tilde expansion."""
+    tokens = expand_parameters(tokenize(line, expand=True), config)
+    return [token.value for token in tokens]
+
+
+@pytest.mark.usefixtures("environment")
+class TestParameters:
+    """Test $NAME and ${NAME...}."""
+
+    @pytest.mark.parametrize(
+        "line, expected",
+        [
+            ("echo $A", ["echo", "a", "b"]),
+            ('echo "$A"', ["echo", "a  b"]),
+            ("echo x$A${A}y", ["echo", "xa", "ba", "by"]),
+            ("echo $UNSET", ["echo"]),
+            ('echo "$UNSET" ""$UNSET', ["echo", "", ""]),
+            ("echo ${#A}", ["echo", "4"]),
+            ("echo ${UNSET:-d e}", ["echo", "d", "e"]),
+            ('echo "${UNSET:-d e}"', ["echo", "d e"]),
+            ("echo ${UNSET:-'d e'}", ["echo", "d e"]),
+            ("echo ${EMPTY-x} ${EMPTY:-x}", ["echo", "x"]),
+            ("echo ${A:+set} ${UNSET+set}", ["echo", "set"]),
+            ("echo ${UNSET:-$A}", ["echo", "a", "b"]),
+        ],
+    )
+    def test_expand(self, line, expected):
+        assert words(line) == expected
+
+    def test_assign(self):
+        assert words("echo ${UNSET:=v  w} $UNSET") == ["echo", "v", "w", "v", "w"]
+        assert os.environ["UNSET"] == "v  w"
+
+    @pytest.mark.parametrize("line", ["echo ${UNSET?}", "echo ${EMPTY:?}"])
+    def test_required(self, line):
+        with pytest.raises(ExpansionError, match="parameter null or not set"):
+            words(line)
+
+    def test_required_message(self):
+        with pytest.raises(ExpansionError, match="UNSET: set it first"):
+            words("echo ${UNSET:?set it first}")
+
+    def test_special(self):
+        with patch.dict(SPECIAL_PARAMETERS, {"?": "3"}):
+            assert words("echo $? $$") == ["echo", "3", str(os.getpid())]
+        assert words("echo $1 ${10}") == ["echo"]
+
+    def test_cannot_assign_special(self):
+        with pytest.raises(ExpansionError, match="cannot assign"):
+            words("echo ${1:=x}")
+
+    def test_result_is_globbed_unless_quoted(self):
+        tokens = expand_parameters(tokenize('$GLOB "$GLOB"', expand=True))
+        assert [t.wildcard for t in tokens] == [True, False]
+
+    def test_single_quotes(self):
+        assert words("echo '$A' \\$A") == ["echo", "$A", "$A"]
+
+
+@pytest.mark.usefixtures("environment")
+class TestTilde:
+    """Test ~ and ~user."""
+
+    @pytest.mark.parametrize(
+        "line, expected",
+        [
+            ("~", ["/home/user"]),
+            ("~/src", ["/home/user/src"]),
+            ("~root", [home_directory("root")]),
+            ("a~ '~' ~no-such-user", ["a~", "~", "~no-such-user"]),
+        ],
+    )
+    def test_expand(self, line, expected):
+        assert words(line) == expected
+
+    def test_home_with_spaces_is_one_word(self):
+        with patch.dict(os.environ, {"HOME": "/home/my user"}):
+            assert words("ls ~/*") == ["ls", "/home/my user/*"]
+
+    def test_current_directory(self):
+        assert words("~+") == [os.getcwd()]
+
+    def test_user_lookup_cached(self):
+        with patch("akujobip1.expansion.pwd.getpwnam") as getpwnam:
+            getpwnam.return_value.pw_dir = "/srv/cached"
+            assert home_directory("cached-user") == "/srv/cached"
+            assert home_directory("cached-user") == "/srv/cached"
+        assert getpwnam.call_count == 1
+
+
+@pytest.mark.usefixtures("environment")
+class TestCommandSubstitution:
+    """Test $(command)."""
+
+    @pytest.mark.parametrize(
+        "line, expected",
+        [
+            ("echo $(echo a  b)", ["echo", "a", "b"]),
+            ('echo "$(echo a  b)"', ["echo", "a b"]),
+            ("echo x$(printf 'y\\n\\n\\n')z", ["echo", "xyz"]),
+            ("echo $(printf '')", ["echo"]),
+            ('echo "$(printf "")"', ["echo", ""]),
+            ("echo $(echo $(echo nested))", ["echo", "nested"]),
+            ("echo $(echo a b c | wc -w)", ["echo", "3"]),
+            ("echo ${UNSET:-$(echo default)}", ["echo", "default"]),
+            ("echo $(echo a; false || echo b && echo c)", ["echo", "a", "b", "c"]),
+            ("echo $(false && echo skipped)", ["echo"]),
+        ],
+    )
+    def test_expand(self, line, expected):
+        assert words(line) == expected
+
+    def test_builtin_runs_in_subshell(self):
+        cwd = os.getcwd()
+        assert words("echo $(cd /) $(pwd)") == ["echo", cwd]
+        assert os.getcwd() == cwd
+
+    def test_sets_exit_status(self):
+        with patch.dict(SPECIAL_PARAMETERS):
+            assert words("echo $(false) $?") == ["echo", "1"]
+            assert words("echo $(true) $?") == ["echo", "0"]
+
+    def test_redirections(self, tmp_path, capsys):
+        (tmp_path / "in.txt").write_text("from file\n")
+        assert words(f"echo $(cat < {tmp_path}/in.txt)") == ["echo", "from", "file"]
+        assert words("echo $(cat <<< here)") == ["echo", "here"]
+        assert words(f"echo $(cat < {tmp_path}/missing)") == ["echo"]
+        assert "missing: No such file" in capsys.readouterr().err
+
+    def test_nul_bytes_dropped(self):
+        assert command_output("printf 'a\\0b'", {}) == "ab"
+
+    def test_output_over_limit(self):
+        config = {"parser": {"max_capture_mb": 0.0001}}
+        assert capture_limit(config) == 104
+        with pytest.raises(ExpansionError, match="parser.max_capture_mb"):
+            words("echo $(yes)", config)
+
+    def test_limit_default(self):
+        assert capture_limit({}) == 16 * 1024 * 1024
+        assert capture_limit({"parser": {"max_capture_mb": "x"}}) == capture_limit({})
+
+
+class TestSplitFields:
+    """Test split_fields() with different $IFS values."""
+
+    @pytest.mark.parametrize(
+        "ifs, value, expected",
+        [
+            (None, "  a \t b\n", ["a", "b"]),
+            (":", "a::b:", ["a", "", "b"]),
+            (": ", " a : b ", ["a", "b"]),
+            ("", "a b", ["a b"]),
+        ],
+    )
+    def test_split(self, ifs, value, expected):
+        values = {} if ifs is None else {"IFS": ifs}
+        with patch.dict(os.environ, values):
+            if ifs is None:
+                os.environ.pop("IFS", None)
+            assert split_fields(value) == expected
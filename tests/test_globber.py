@@ -0,0 +1,300 @@
+"""
+Tests for the wildcard expansion engine (globber module).
+
+Results are compared with sorted(glob.glob()) on a small tree, then the
+listing cache is checked: reuse while a directory is unchanged, re-listing
+after it changes, the racy-mtime rule, and the memory cap.
+"""
+
+import glob
+import os
+import time
+
+import pytest
+
+from akujobip1.globber import (
+    LISTING_CACHE,
+    WALK_OPTIONS,
+    GlobLimitError,
+    ListingCache,
+    WalkOptions,
+    compile_pattern,
+    configure_from_config,
+    dependencies_unchanged,
+    glob_paths,
+    walk,
+)
+
+
+def age(*paths):
+    """Move mtimes into the past, out of the racy window."""
+    old = time.time() - 60
+    for path in paths:
+        os.utime(path, (old, old), follow_symlinks=False)
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    """A small tree with hidden entries, subdirectories and symlinks."""
+    for name in ["a.txt", "b.txt", ".hidden.txt", "x[1]", "dir1/f.py", ".hd/z.py"]:
+        path = tmp_path / name
+        path.parent.mkdir(exist_ok=True)
+        path.touch()
+    (tmp_path / "dir1" / "sub").mkdir()
+    (tmp_path / "dir2").mkdir()
+    (tmp_path / "link").symlink_to("dir2")
+    (tmp_path / "broken").symlink_to("missing")
+    monkeypatch.chdir(tmp_path)
+    for root, _, _ in os.walk(tmp_path):
+        age(root)
+    return tmp_path
+
+
+@pytest.fixture
+def cache():
+    return ListingCache()
+
+
+class TestGlobCompatibility:
+    """Test glob_paths() returns exactly sorted(glob.glob())."""
+
+    @pytest.mark.parametrize(
+        "pattern",
+        [
+            "*",
+            "*.txt",
+            ".*",
+            "*/",
+            "*/*",
+            "*/*.py",
+            ".*/*",
+            "d*/f.py",
+            "dir1/*",
+            "x[[]1]",
+            "*[!t]",
+            "?i*",
+            "./*",
+            "missing/*",
+            "*/sub",
+            "dir*/s*/",
+            "b*",
+        ],
+    )
+    def test_same_as_glob(self, tree, cache, pattern):
+        assert glob_paths(pattern, cache) == sorted(glob.glob(pattern))
+
+    def test_absolute_pattern(self, tree, cache):
+        pattern = str(tree / "*" / "*.py")
+        assert glob_paths(pattern, cache) == sorted(glob.glob(pattern))
+
+    def test_unreadable_directory(self, tree, cache):
+        assert glob_paths("a.txt/*", cache) == []
+
+
+class TestListingCache:
+    """Test listing reuse and invalidation."""
+
+    def test_unchanged_directory_is_reused(self, tree, cache):
+        glob_paths("*.txt", cache)
+        glob_paths("*.py", cache)
+        assert cache.misses == 1
+        assert cache.hits == 1
+
+    def test_repeated_pattern_reuses_result(self, tree, cache):
+        first = glob_paths("*.txt", cache)
+        assert glob_paths("*.txt", cache) == first
+        assert cache.misses == 1
+
+    def test_new_file_is_seen(self, tree, cache):
+        assert glob_paths("*.txt", cache) == ["a.txt", "b.txt"]
+        (tree / "c.txt").touch()
+        assert glob_paths("*.txt", cache) == ["a.txt", "b.txt", "c.txt"]
+
+    def test_removed_file_is_gone(self, tree, cache):
+        glob_paths("*.txt", cache)
+        (tree / "a.txt").unlink()
+        assert glob_paths("*.txt", cache) == ["b.txt"]
+
+    def test_recent_change_is_not_cached(self, tree, cache):
+        """A directory changed just now is listed again next time."""
+        (tree / "c.txt").touch()
+        glob_paths("*.txt", cache)
+        glob_paths("*.txt", cache)
+        assert cache.misses == 2
+        assert cache.size == 0
+
+    def test_same_mtime_different_directory(self, tree, cache, monkeypatch):
+        """Relative patterns follow the current directory."""
+        assert glob_paths("*", cache)
+        monkeypatch.chdir(tree / "dir1")
+        assert glob_paths("*", cache) == ["f.py", "sub"]
+
+    def test_memory_cap(self, tree):
+        cache = ListingCache(max_bytes=400)
+        glob_paths("*", cache)
+        glob_paths("dir1/*", cache)
+        assert 0 < cache.size <= 400
+        cache.configure(0)
+        assert cache.size == 0
+        assert glob_paths("*.txt", cache) == ["a.txt", "b.txt"]
+
+    def test_clear(self, tree, cache):
+        glob_paths("*", cache)
+        cache.clear()
+        assert cache.size == 0
+
+
+class TestRecording:
+    """Test recording the directories a glob depended on."""
+
+    def record(self, cache, *patterns):
+        cache.start_recording()
+        for pattern in patterns:
+            glob_paths(pattern, cache)
+        return cache.stop_recording()
+
+    def test_listed_directories_are_recorded(self, tree, cache):
+        dependencies = self.record(cache, "*.txt", "dir*/*.py")
+        expected = {str(tree), str(tree / "dir1"), str(tree / "dir2")}
+        assert set(dependencies) == expected
+        assert dependencies_unchanged(dependencies)
+
+    def test_literal_lookup_is_recorded(self, tree, cache):
+        dependencies = self.record(cache, "*/f.py")
+        assert str(tree / "dir1") in dependencies
+
+    def test_change_is_detected(self, tree, cache):
+        dependencies = self.record(cache, "dir1/*")
+        (tree / "dir1" / "new.py").touch()
+        assert not dependencies_unchanged(dependencies)
+
+    def test_replaced_directory_is_detected(self, tree, cache):
+        dependencies = self.record(cache, "dir2/*")
+        (tree / "dir2").rename(tree / "old")  # keeps the old inode in use
+        (tree / "dir2").mkdir()
+        os.utime(tree / "dir2", ns=(0, dependencies[str(tree / "dir2")][0]))
+        assert not dependencies_unchanged(dependencies)
+
+    def test_recent_change_is_unusable(self, tree, cache):
+        (tree / "c.txt").touch()
+        assert self.record(cache, "*.txt") is None
+
+    def test_missing_directory_is_unusable(self, tree, cache):
+        assert self.record(cache, "missing/*.txt") is None
+
+    def test_recursive_walk_is_unusable(self, tree, cache):
+        assert self.record(cache, "**/*.py") is None
+
+    def test_not_recording_by_default(self, tree, cache):
+        glob_paths("*.txt", cache)
+        assert cache.stop_recording() is None
+
+
+@pytest.fixture
+def deep_tree(tmp_path, monkeypatch):
+    """Nested directories with files at every level and a symlink loop."""
+    for name in ["top.py", "a/one.py", "a/b/two.py", "a/b/c/three.py", "a/.h/x.py"]:
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+    (tmp_path / "a" / "b" / "loop").symlink_to("..")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+class TestRecursive:
+    """Test '**' patterns and the threaded walker."""
+
+    @pytest.mark.parametrize("workers", [1, 4])
+    @pytest.mark.parametrize(
+        "pattern", ["**", "**/", "**/*.py", "a/**", "a/**/", "*/**/*.py", "a/**/c/*"]
+    )
+    def test_same_as_recursive_glob(self, deep_tree, pattern, workers):
+        """Matches glob.glob(recursive=True), minus the symlinked directory."""
+        expected = sorted(
+            path
+            for path in glob.glob(pattern, recursive=True)
+            if "loop/" not in path and not path.endswith("loop/")
+        )
+        result = glob_paths(pattern, ListingCache(), WalkOptions(workers=workers))
+        assert result == expected
+
+    def test_symlinks_not_followed_by_default(self, deep_tree):
+        result = glob_paths("**/two.py", ListingCache(), WalkOptions())
+        assert result == ["a/b/two.py"]
+
+    def test_symlinks_followed_on_request(self, deep_tree):
+        (deep_tree / "link").symlink_to("a/b/c")
+        options = WalkOptions(follow_symlinks=True, workers=2)
+        result = glob_paths("**/three.py", ListingCache(), options)
+        assert result == ["a/b/c/three.py", "link/three.py"]
+
+    def test_symlink_loop_is_cut(self, deep_tree):
+        """A symlink back to an ancestor is not descended into."""
+        options = WalkOptions(follow_symlinks=True, workers=2)
+        result = glob_paths("**/two.py", ListingCache(), options)
+        assert result == ["a/b/two.py"]
+
+    def test_max_depth(self, deep_tree):
+        options = WalkOptions(max_depth=1)
+        assert glob_paths("**/*.py", ListingCache(), options) == [
+            "a/one.py",
+            "top.py",
+        ]
+
+    def test_max_matches(self, deep_tree):
+        options = WalkOptions(max_matches=2)
+        with pytest.raises(GlobLimitError, match="more than 2 matches"):
+            glob_paths("**/*.py", ListingCache(), options)
+
+    def test_max_matches_only_limits_walks(self, deep_tree):
+        """A pattern without '**' over the limit still expands, as in bash."""
+        for name in ("x.py", "y.py", "z.py"):
+            (deep_tree / name).touch()
+        options = WalkOptions(max_matches=2)
+        assert len(glob_paths("*.py", ListingCache(), options)) == 4
+        assert len(glob_paths("*", ListingCache(), options)) == 5
+
+    def test_not_recursive(self, deep_tree):
+        """recursive=False makes '**' a plain '*'."""
+        options = WalkOptions(recursive=False)
+        assert glob_paths("**/*.py", ListingCache(), options) == ["a/one.py"]
+
+    def test_walk_yields_every_directory(self, deep_tree):
+        paths = sorted(w.path for w in walk("", WalkOptions(workers=3)))
+        assert paths == ["", "a", "a/b", "a/b/c"]
+
+    def test_walk_can_be_abandoned(self, deep_tree):
+        walker = walk("", WalkOptions(workers=2))
+        next(walker)
+        walker.close()
+
+
+class TestHelpers:
+    """Test pattern compilation and configuration."""
+
+    def test_compile_pattern_is_cached(self):
+        assert compile_pattern("*.log") is compile_pattern("*.log")
+        assert compile_pattern("*.log")("app.log")
+        assert not compile_pattern("*.log")("app.txt")
+
+    def test_configure_from_config(self):
+        original = LISTING_CACHE.max_bytes
+        try:
+            configure_from_config(
+                {"glob": {"cache_max_mb": 1, "walk_workers": 3, "max_depth": 2}}
+            )
+            assert LISTING_CACHE.max_bytes == 1024 * 1024
+            assert WALK_OPTIONS.workers == 3
+            assert WALK_OPTIONS.max_depth == 2
+            configure_from_config({"glob": None})
+            assert LISTING_CACHE.max_bytes == 16 * 1024 * 1024
+            assert WALK_OPTIONS.workers == 0
+            assert WALK_OPTIONS.max_matches == 100000
+        finally:
+            LISTING_CACHE.configure(original)
+
+    def test_worker_count(self):
+        assert WalkOptions(workers=3).worker_count() == 3
+        assert WalkOptions(workers=1000).worker_count() == 32
+        assert 1 <= WalkOptions().worker_count() <= 32
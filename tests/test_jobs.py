@@ -0,0 +1,183 @@
+"""
+Tests for the background job table (jobs module).
+
+Covers job registration, non-blocking reaping, job lookup and the
+completion notices printed before each prompt.
+"""
+
+import os
+import sys
+import time
+import pytest
+
+from akujobip1.executor import execute_pipeline, last_resource_usage
+from akujobip1.jobs import JobTable, JOB_TABLE, format_job
+
+
+@pytest.fixture
+def silent_config():
+    """Config that never shows exit codes."""
+    return {"execution": {"show_exit_codes": "never"}}
+
+
+@pytest.fixture(autouse=True)
+def clean_job_table():
+    """Reap and forget any job a test leaves behind."""
+    yield
+    for job in JOB_TABLE.jobs():
+        for pid in job.pids:
+            try:
+                os.kill(pid, 9)
+            except ProcessLookupError:
+                pass
+        JOB_TABLE.wait(job)
+        JOB_TABLE.remove(job)
+
+
+def spawn(*argv):
+    """Start a child directly and return its pid."""
+    return os.posix_spawnp(argv[0], list(argv), os.environ)
+
+
+def wait_until(predicate, timeout=5.0):
+    """Poll predicate (test helper only) until true or timeout."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestJobTable:
+    """Test JobTable bookkeeping and reaping."""
+
+    def test_job_ids_reuse_lowest_free(self):
+        table = JobTable()
+        first = table.add([spawn("true")], "true")
+        second = table.add([spawn("true")], "true")
+        assert (first.job_id, second.job_id) == (1, 2)
+
+        table.wait(first)
+        table.remove(first)
+        third = table.add([spawn("true")], "true")
+        assert third.job_id == 1
+
+        for job in table.jobs():
+            table.wait(job)
+            table.remove(job)
+
+    def test_reap_is_non_blocking(self):
+        table = JobTable()
+        job = table.add([spawn("sleep", "5")], "sleep 5")
+
+        start = time.monotonic()
+        assert table.reap() == []
+        assert time.monotonic() - start < 0.5
+        assert not job.done
+
+        os.kill(job.pids[0], 9)
+        assert table.wait(job) == 137
+
+    def test_reap_collects_exited_children(self):
+        table = JobTable()
+        job = table.add([spawn("true")], "true")
+
+        finished = []
+        assert wait_until(lambda: finished.extend(table.reap()) or job.done)
+        assert finished == [job]
+        assert job.state() == "Done"
+        # The zombie is gone: the pid can no longer be waited for
+        with pytest.raises(ChildProcessError):
+            os.waitpid(job.pids[0], os.WNOHANG)
+
+    def test_reap_without_pidfd_falls_back_to_polling(self, monkeypatch):
+        monkeypatch.delattr(os, "pidfd_open", raising=False)
+        table = JobTable()
+        job = table.add([spawn("false")], "false")
+
+        assert wait_until(lambda: table.reap() or job.done)
+        assert job.state() == "Exit 1"
+
+    def test_usage_recorded_on_job(self):
+        table = JobTable()
+        burn = "for i in range(3000000): pass"
+        job = table.add([spawn(sys.executable, "-c", burn)], "python")
+        assert job.usage is None
+
+        assert table.wait(job) == 0
+        assert job.usage.user_time > 0
+        assert job.usage.real_time > 0
+        assert last_resource_usage() is job.usage
+
+    def test_find(self):
+        table = JobTable()
+        pid = spawn("true")
+        job = table.add([pid], "true")
+
+        assert table.find("%1") is job
+        assert table.find("%%") is job
+        assert table.find("%+") is job
+        assert table.find(str(pid)) is job
+        assert table.find("%2") is None
+        assert table.find("%x") is None
+        assert table.find("junk") is None
+
+        table.wait(job)
+        table.remove(job)
+
+    def test_notify_reports_and_removes(self, capsys):
+        table = JobTable()
+        job = table.add([spawn("true")], "true")
+        assert wait_until(lambda: table.reap() or job.done)
+
+        table.notify()
+        assert "[1]   Done                    true" in capsys.readouterr().err
+        assert len(table) == 0
+
+    def test_format_running_job(self):
+        table = JobTable()
+        job = table.add([spawn("sleep", "5")], "sleep 5")
+        assert format_job(job) == "[1]   Running                 sleep 5 &"
+        os.kill(job.pids[0], 15)
+        table.wait(job)
+        assert "Terminated (signal 15)" in format_job(job)
+
+
+class TestBackgroundExecution:
+    """Test execute_pipeline(background=True)."""
+
+    def test_returns_immediately(self, silent_config, capsys):
+        start = time.monotonic()
+        assert execute_pipeline([["sleep", "5"]], silent_config, background=True) == 0
+        assert time.monotonic() - start < 1.0
+
+        job = JOB_TABLE.jobs()[-1]
+        assert f"[{job.job_id}] {job.pids[-1]}" in capsys.readouterr().err
+
+    def test_job_runs_in_own_process_group(self, silent_config):
+        execute_pipeline([["sleep", "5"], ["cat"]], silent_config, background=True)
+        job = JOB_TABLE.jobs()[-1]
+        assert job.pgid != os.getpgrp()
+        assert os.getpgid(job.pids[0]) == job.pgid
+        assert os.getpgid(job.pids[1]) == job.pgid
+
+    @pytest.mark.parametrize("strategy", ["fork", "posix_spawn"])
+    def test_stdin_is_dev_null(self, strategy, tmp_path):
+        out = tmp_path / "out.txt"
+        config = {"execution": {"show_exit_codes": "never", "spawn_strategy": strategy}}
+        execute_pipeline(
+            [["bash", "-c", f"cat > {out}; echo done >> {out}"]],
+            config,
+            background=True,
+        )
+        job = JOB_TABLE.jobs()[-1]
+        assert JOB_TABLE.wait(job) == 0
+        assert out.read_text() == "done\n"
+
+    def test_unknown_command_starts_no_job(self, silent_config, capsys):
+        exit_code = execute_pipeline(
+            [["nonexistent_xyz123"]], silent_config, background=True
+        )
+        assert exit_code == 127
+        assert len(JOB_TABLE) == 0
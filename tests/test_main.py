@@ -5,15 +5,77 @@ This module tests the entry point for running the shell as a module
 using `python -m akujobip1`.
 """
 
+import os
+import select
 import sys
 import subprocess
+import time
 from pathlib import Path
 
+import pytest
+
+# How much longer than a bare interpreter the shell may take to show its
+# first prompt (several times the actual cost, to allow for slow CI)
+STARTUP_BUDGET_SECONDS = 0.25
+
+# Modules a first prompt must not need (imported by the first line or
+# setting that uses them)
+DEFERRED_MODULES = [
+    "yaml",
+    "dataclasses",
+    "inspect",
+    "pathlib",
+    "concurrent.futures",
+    "tempfile",
+    "hashlib",
+    "socket",
+    "glob",
+    "fnmatch",
+    "shlex",
+]
+
+
+@pytest.fixture
+def clean_home(tmp_path):
+    """Environment with no config files and an empty cache."""
+    env = dict(os.environ, HOME=str(tmp_path), XDG_CACHE_HOME=str(tmp_path / "c"))
+    env.pop("AKUJOBIP1_CONFIG", None)
+    return env
+
+
+@pytest.fixture
+def transcript_env(tmp_path):
+    """Environment whose config asks for prompts on piped stdin."""
+    config = tmp_path / "transcript.yaml"
+    config.write_text("prompt:\n  show_in_batch: true\n")
+    return dict(os.environ, AKUJOBIP1_CONFIG=str(config))
+
+
+def time_to_prompt(command, env, cwd):
+    """Seconds from starting command on a terminal until it prints a prompt."""
+    master, slave = os.openpty()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        command, stdin=slave, stdout=slave, stderr=slave, env=env, cwd=cwd
+    )
+    os.close(slave)
+    output = b""
+    try:
+        while b"> " not in output:
+            ready, _, _ = select.select([master], [], [], 10)
+            assert ready, f"no prompt after 10s: {output!r}"
+            output += os.read(master, 1024)
+        return time.perf_counter() - started
+    finally:
+        process.kill()
+        process.wait()
+        os.close(master)
+
 
 class TestMainModule:
     """Test the __main__.py entry point."""
 
-    def test_main_module_can_be_executed(self):
+    def test_main_module_can_be_executed(self, transcript_env):
         """
         Test that the shell can be run as a module with 'python -m akujobip1'.
 
@@ -32,6 +94,7 @@ class TestMainModule:
             capture_output=True,
             text=True,
             cwd=project_root,
+            env=transcript_env,
             timeout=5,
         )
 
@@ -42,7 +105,7 @@ class TestMainModule:
         assert "AkujobiP1>" in result.stdout, "Prompt not displayed"
         assert "Bye!" in result.stdout, "Exit message not displayed"
 
-    def test_main_module_handles_empty_input(self):
+    def test_main_module_handles_empty_input(self, transcript_env):
         """
         Test that the shell handles empty input when run as a module.
         """
@@ -54,6 +117,7 @@ class TestMainModule:
             capture_output=True,
             text=True,
             cwd=project_root,
+            env=transcript_env,
             timeout=5,
         )
 
@@ -100,3 +164,66 @@ class TestMainModule:
         # Should exit gracefully with exit message
         assert result.returncode == 0
         assert "Bye!" in result.stdout or result.returncode == 0
+
+    def test_piped_stdin_has_no_prompt(self, clean_home, tmp_path):
+        """Test piped commands print only their output by default."""
+        result = subprocess.run(
+            [sys.executable, "-m", "akujobip1"],
+            input="echo one\necho two\n",
+            capture_output=True,
+            text=True,
+            cwd=tmp_path,
+            env=clean_home,
+            timeout=5,
+        )
+
+        assert result.returncode == 0
+        assert result.stdout == "one\ntwo\n"
+
+
+class TestStartup:
+    """Test how much work happens before the first prompt."""
+
+    def test_deferred_modules_not_imported(self, clean_home, tmp_path):
+        """Test loading the shell and its config imports none of them."""
+        code = (
+            "import sys; before = set(sys.modules); "
+            "import akujobip1.shell as shell; shell.load_config(); "
+            f"print(sorted(set({DEFERRED_MODULES!r}) & (set(sys.modules) - before)))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            env=clean_home,
+            cwd=tmp_path,
+            timeout=10,
+        )
+        assert result.stdout == "[]\n", result.stderr
+
+    def test_startup_profile(self, clean_home, tmp_path):
+        """Test --startup-profile reports each phase before running."""
+        result = subprocess.run(
+            [sys.executable, "-m", "akujobip1", "--startup-profile", "-c", "echo hi"],
+            capture_output=True,
+            text=True,
+            env=clean_home,
+            cwd=tmp_path,
+            timeout=10,
+        )
+        assert result.stdout == "hi\n"
+        assert result.stderr.startswith("[Startup: imports ")
+        for phase in ("config", "spawn", "total"):
+            assert f" {phase} " in result.stderr
+
+    def test_time_to_first_prompt(self, clean_home, tmp_path):
+        """Test the first prompt appears within the startup budget."""
+        bare = [sys.executable, "-c", "input('> ')"]
+        shell = [sys.executable, "-m", "akujobip1"]
+        # Best of three, so a busy machine does not fail the test
+        baseline = min(time_to_prompt(bare, clean_home, tmp_path) for _ in range(3))
+        startup = min(time_to_prompt(shell, clean_home, tmp_path) for _ in range(3))
+        assert startup - baseline < STARTUP_BUDGET_SECONDS, (
+            f"first prompt after {startup * 1000:.0f}ms, "
+            f"bare interpreter {baseline * 1000:.0f}ms"
+        )
@@ -0,0 +1,162 @@
+"""
+Tests for the command result cache (memo module).
+
+Covers key invalidation (arguments, file arguments, environment, working
+directory), LRU eviction under the size cap, persistent hit/miss counters,
+and the memo.commands hook in the shell.
+"""
+
+import os
+import time
+
+import pytest
+
+from akujobip1.memo import (
+    ResultCache,
+    cache_from_config,
+    default_cache_dir,
+    is_memoized,
+    run_memoized,
+)
+from akujobip1.shell import execute_line
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """A private 1 MB cache."""
+    return ResultCache(str(tmp_path / "memo"), 1 << 20)
+
+
+@pytest.fixture
+def config(tmp_path):
+    """Config whose memo cache lives in tmp_path."""
+    return {
+        "execution": {"show_exit_codes": "never"},
+        "memo": {"directory": str(tmp_path / "memo"), "commands": ["cat"]},
+    }
+
+
+class TestResultCache:
+    """Test storing, replaying and invalidating results."""
+
+    def test_miss_then_hit(self, cache):
+        key = cache.key(["echo", "hi"], [])
+        assert cache.get(key) is None
+        cache.put(key, 0, b"hi\n", b"")
+        assert cache.get(key) == (0, b"hi\n", b"")
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_key_depends_on_argv(self, cache):
+        assert cache.key(["echo", "a"], []) != cache.key(["echo", "b"], [])
+
+    def test_key_changes_with_file_argument(self, cache, tmp_path):
+        data = tmp_path / "data.txt"
+        data.write_text("one")
+        before = cache.key(["cat", str(data)], [])
+        assert cache.key(["cat", str(data)], []) == before
+
+        data.write_text("one, two")
+        assert cache.key(["cat", str(data)], []) != before
+
+    def test_key_changes_with_selected_env(self, cache, monkeypatch):
+        monkeypatch.setenv("MEMO_TEST", "1")
+        before = cache.key(["env"], ["MEMO_TEST"])
+        monkeypatch.setenv("MEMO_TEST", "2")
+        assert cache.key(["env"], ["MEMO_TEST"]) != before
+        # Variables outside the list don't matter
+        assert cache.key(["env"], []) == cache.key(["env"], [])
+
+    def test_key_changes_with_cwd(self, cache, tmp_path, monkeypatch):
+        (tmp_path / "a").mkdir()
+        (tmp_path / "b").mkdir()
+        monkeypatch.chdir(tmp_path / "a")
+        before = cache.key(["ls"], [])
+        monkeypatch.chdir(tmp_path / "b")
+        assert cache.key(["ls"], []) != before
+
+    def test_lru_eviction(self, tmp_path):
+        cache = ResultCache(str(tmp_path / "memo"), 3000)
+        payload = b"x" * 1000
+        keys = [cache.key(["echo", str(n)], []) for n in range(3)]
+        cache.put(keys[0], 0, payload, b"")
+        cache.put(keys[1], 0, payload, b"")
+        # Make entry 0 the most recently used one
+        old = time.time() - 10
+        os.utime(cache._entry_path(keys[1]), (old, old))
+        assert cache.get(keys[0]) is not None
+
+        cache.put(keys[2], 0, payload, b"")
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) is not None
+        assert cache.stats()["bytes"] <= 3000
+
+    def test_oversized_result_not_stored(self, tmp_path):
+        cache = ResultCache(str(tmp_path / "memo"), 100)
+        key = cache.key(["big"], [])
+        cache.put(key, 0, b"x" * 1000, b"")
+        assert cache.stats()["entries"] == 0
+
+    def test_corrupt_entry_is_a_miss(self, cache):
+        key = cache.key(["echo"], [])
+        cache.put(key, 0, b"", b"")
+        with open(cache._entry_path(key), "wb") as f:
+            f.write(b"garbage")
+        assert cache.get(key) is None
+
+    def test_clear(self, cache):
+        cache.put(cache.key(["a"], []), 0, b"", b"")
+        cache.put(cache.key(["b"], []), 0, b"", b"")
+        assert cache.clear() == 2
+        assert cache.stats() == {"hits": 0, "misses": 0, "entries": 0, "bytes": 0}
+
+
+class TestConfig:
+    """Test reading the memo config section."""
+
+    def test_default_directory_follows_xdg(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        assert default_cache_dir() == str(tmp_path / "akujobip1" / "memo")
+        cache, env_names = cache_from_config({})
+        assert cache.directory == default_cache_dir()
+        assert "PATH" in env_names
+
+    def test_size_and_env_from_config(self):
+        cache, env_names = cache_from_config(
+            {"memo": {"max_size_mb": 2, "env": ["HOME"], "directory": "/x"}}
+        )
+        assert cache.max_bytes == 2 * 1024 * 1024
+        assert env_names == ["HOME"]
+        assert cache.directory == "/x"
+
+    def test_is_memoized(self, config):
+        assert is_memoized(["cat", "file"], config)
+        assert not is_memoized(["ls"], config)
+        assert not is_memoized(["cat"], {"memo": None})
+
+
+class TestRunMemoized:
+    """Test running commands through the cache."""
+
+    def test_failures_are_cached(self, config, capfd):
+        assert run_memoized(["sh", "-c", "echo err >&2; exit 2"], config) == 2
+        assert run_memoized(["sh", "-c", "echo err >&2; exit 2"], config) == 2
+        assert capfd.readouterr().err == "err\nerr\n"
+
+    def test_command_not_found_not_cached(self, config, capfd):
+        assert run_memoized(["no-such-command-xyz"], config) == 127
+        cache, _ = cache_from_config(config)
+        assert cache.stats()["entries"] == 0
+
+    def test_configured_command_in_shell(self, config, tmp_path, capfd):
+        data = tmp_path / "data.txt"
+        data.write_text("first\n")
+        execute_line(f"cat {data}", config)
+        execute_line(f"cat {data}", config)
+        data.write_text("second\n")
+        execute_line(f"cat {data}", config)
+        assert capfd.readouterr().out == "first\nfirst\nsecond\n"
+
+        cache, _ = cache_from_config(config)
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 2
@@ -0,0 +1,108 @@
+"""
+Tests for the parallel fan-out engine (parallel module).
+
+Covers placeholder substitution, argument sources, and the concurrency
+limit of run_parallel.
+"""
+
+import io
+import sys
+import time
+
+from akujobip1.executor import last_resource_usage
+from akujobip1.parallel import argument_items, build_command, run_parallel
+
+CONFIG = {"execution": {"show_exit_codes": "never"}}
+
+
+class TestBuildCommand:
+    """Test template substitution."""
+
+    def test_braces_replaced(self):
+        assert build_command(["gzip", "{}"], ("a.log",)) == ["gzip", "a.log"]
+
+    def test_appended_without_placeholder(self):
+        assert build_command(["echo", "-n"], ("a", "b")) == ["echo", "-n", "a", "b"]
+
+    def test_positional_placeholders(self):
+        argv = build_command(["cp", "{1}", "{2}/{1}.bak"], ("f", "d"))
+        assert argv == ["cp", "f", "d/f.bak"]
+
+    def test_braces_join_all_values(self):
+        assert build_command(["echo", "<{}>"], ("a", "b")) == ["echo", "<a b>"]
+
+    def test_placeholders_in_values_stay_literal(self):
+        assert build_command(["echo", "{1}", "{2}"], ("{2}", "b")) == [
+            "echo",
+            "{2}",
+            "b",
+        ]
+        assert build_command(["echo", "{}"], ("x{1}",)) == ["echo", "x{1}"]
+        assert build_command(["echo", "{}"], ("{}",)) == ["echo", "{}"]
+
+    def test_out_of_range_placeholder_unchanged(self):
+        assert build_command(["echo", "{1}", "{3}"], ("a",)) == ["echo", "a", "{3}"]
+
+
+class TestArgumentItems:
+    """Test argument sources."""
+
+    def test_cartesian_product(self):
+        items = list(argument_items([["a", "b"], ["1", "2"]]))
+        assert items == [("a", "1"), ("a", "2"), ("b", "1"), ("b", "2")]
+
+    def test_stdin_lines_skip_blank(self):
+        stdin = io.StringIO("one\n\ntwo words\n")
+        assert list(argument_items([], stdin)) == [("one",), ("two words",)]
+
+    def test_stdin_is_read_lazily(self):
+        stdin = io.StringIO("a\nb\n")
+        items = argument_items([], stdin)
+        assert next(items) == ("a",)
+        assert stdin.readline() == "b\n"
+
+
+class TestRunParallel:
+    """Test scheduling."""
+
+    def test_jobs_run_concurrently(self, capsys):
+        items = [("0.3",)] * 4
+        start = time.monotonic()
+        assert run_parallel(["sleep"], items, CONFIG, max_jobs=4) == 0
+        assert time.monotonic() - start < 1.0
+
+    def test_limit_is_respected(self, capsys):
+        items = [("0.2",)] * 4
+        start = time.monotonic()
+        assert run_parallel(["sleep"], items, CONFIG, max_jobs=2) == 0
+        assert time.monotonic() - start >= 0.4
+
+    def test_unlimited(self, capsys):
+        items = [(str(n),) for n in range(20)]
+        assert run_parallel(["true"], items, CONFIG, max_jobs=0) == 0
+
+    def test_not_found_counts_as_failure(self, capsys):
+        assert run_parallel(["no-such-command-xyz"], [("a",)], CONFIG, 1) == 1
+        err = capsys.readouterr().err
+        assert "command not found" in err
+        assert "1 of 1 jobs failed" in err
+
+    def test_start_failure_keeps_exit_code(self, capsys, tmp_path):
+        """Test a command that cannot be executed is reported as 126."""
+        script = tmp_path / "not-executable"
+        script.write_text("echo hi\n")
+        assert run_parallel([str(script)], [("a",)], CONFIG, 1) == 1
+        assert "[Exit: 126]" in capsys.readouterr().err
+
+    def test_usage_summed_over_jobs(self, capsys):
+        """Test the run records every job's resource usage together."""
+        burn = "for i in range(3000000): pass"
+        items = [(burn,)] * 3
+        assert run_parallel([sys.executable, "-c"], items, CONFIG, 3) == 0
+        usage = last_resource_usage()
+        assert usage.user_time > 0
+        assert usage.real_time > 0
+
+    def test_large_output_does_not_deadlock(self, capsys):
+        assert run_parallel(["head", "-c"], [("200000", "/dev/zero")], CONFIG, 1) == 0
+        assert len(capsys.readouterr().out) == 200000
@@ -9,10 +9,21 @@ import pytest
 import os
 import tempfile
 import shutil
+import time
 from pathlib import Path
-
-from akujobip1.parser import parse_command, expand_wildcards, _contains_wildcard
-
+from unittest.mock import patch
+
+from akujobip1.parser import (
+    parse_command,
+    expand_wildcards,
+    iter_arguments,
+    parse,
+    expand_command,
+    ParseCache,
+    PARSE_CACHE,
+    _contains_wildcard,
+)
+from akujobip1.syntax import ParseError
 
 # ============================================================================
 # Test Fixtures
@@ -136,8 +147,10 @@ class TestParseCommandQuotes:
 
     def test_quotes_with_special_chars(self, default_config):
         """Test parsing quoted strings with special characters."""
-        result = parse_command("echo \"test$HOME\" 'test$HOME'", default_config)
-        assert result == ["echo", "test$HOME", "test$HOME"]
+        # $ expands inside double quotes but not inside single quotes
+        with patch.dict(os.environ, {"HOME": "/home/user"}):
+            result = parse_command("echo \"test$HOME\" 'test$HOME'", default_config)
+        assert result == ["echo", "test/home/user", "test$HOME"]
 
     def test_escaped_quotes(self, default_config):
         """Test parsing escaped quotes."""
@@ -423,18 +436,142 @@ class TestParseCommandIntegration:
 
     def test_parse_quoted_wildcard_expansion(self, default_config, temp_dir_with_files):
         """
-        Test wildcard expansion with quoted wildcards.
+        Test quoted and escaped wildcards are not expanded.
 
-        Note: shlex removes quotes before wildcard expansion, so quoted
-        wildcards are still expanded. This is a known limitation - full
-        bash-like quote handling would require more complex parsing.
-        For this assignment's scope, this behavior is acceptable.
+        The tokenizer records which parts of a word were quoted, so only
+        unquoted metacharacters trigger expansion (as in bash).
         """
-        result = parse_command('echo "*.txt"', default_config)
-        # After shlex processes, quotes are removed and wildcard is expanded
-        assert result[0] == "echo"
-        assert "file1.txt" in result
-        assert "file2.txt" in result
+        result = parse_command("echo \"*.txt\" 'file[12].txt' \\*.py", default_config)
+        assert result == ["echo", "*.txt", "file[12].txt", "*.py"]
+
+    def test_parse_partly_quoted_wildcard(self, default_config, temp_dir_with_files):
+        """Test the unquoted part of a word still expands, the quoted part doesn't."""
+        result = parse_command('ls "file"*.txt "test"?.p"*"', default_config)
+        assert result == ["ls", "file1.txt", "file2.txt", "test?.p*"]
+
+    def test_quoted_wildcard_skips_filesystem(self, default_config):
+        """Test quoted wildcards never reach glob."""
+        with patch("akujobip1.parser.glob_paths") as mock_glob:
+            parse_command("grep -e 'a*' \"[x]\" \\?", default_config)
+        mock_glob.assert_not_called()
+
+    def test_parse_recursive_wildcard(self, default_config, temp_dir_with_files):
+        """Test '**' finds files in subdirectories."""
+        Path("sub/deeper").mkdir(parents=True)
+        Path("sub/deeper/test3.py").touch()
+        result = parse_command("ls **/*.py", default_config)
+        assert result == ["ls", "sub/deeper/test3.py", "test1.py", "test2.py"]
+
+    def test_parse_too_many_matches(self, temp_dir_with_files, capsys):
+        """Test a '**' pattern exceeding glob.max_matches is a parse error."""
+        config = {"glob": {"enabled": True, "max_matches": 2}}
+        try:
+            assert parse_command("rm **", config) == []
+            assert "max_matches" in capsys.readouterr().err
+            assert len(parse_command("rm *", config)) > 3
+        finally:
+            parse_command("ls *.txt", {})  # restore default walk settings
+
+    def test_iter_arguments_marks_expanded(self, default_config, temp_dir_with_files):
+        """Test the lazy parser flags the words produced by wildcards."""
+        result = list(iter_arguments('rm -f "*.txt" *.txt', default_config))
+        assert result == [
+            ("rm", False),
+            ("-f", False),
+            ("*.txt", False),
+            ("file1.txt", True),
+            ("file2.txt", True),
+        ]
+
+    def test_iter_arguments_is_lazy(self, default_config):
+        """Test a wildcard is only globbed once the consumer reaches it."""
+        with patch("akujobip1.parser.glob_paths", return_value=[]) as mock_glob:
+            words = iter_arguments("ls -l *.txt", default_config)
+            assert next(words) == ("ls", False)
+            mock_glob.assert_not_called()
+            assert list(words) == [("-l", False), ("*.txt", False)]
+        mock_glob.assert_called_once()
+
+    def test_iter_arguments_ignores_max_matches(self, temp_dir_with_files):
+        """Test streamed arguments are not limited by glob.max_matches."""
+        config = {"glob": {"enabled": True, "max_matches": 2}}
+        try:
+            assert len(list(iter_arguments("rm *", config))) > 3
+        finally:
+            parse_command("ls *.txt", {})  # restore default walk settings
+
+    def test_parse_braces_before_wildcards(self, default_config, temp_dir_with_files):
+        """Test brace expansion runs first and its words are globbed."""
+        result = parse_command("ls {file,test}1.* x{1..2}", default_config)
+        assert result == ["ls", "file1.txt", "test1.py", "x1", "x2"]
+
+    def test_parse_braces_without_glob(self, config_glob_disabled):
+        """Test braces are expanded even with glob expansion disabled."""
+        result = parse_command("echo {a,b}* '{c,d}'", config_glob_disabled)
+        assert result == ["echo", "a*", "b*", "{c,d}"]
+
+    def test_iter_arguments_streams_sequences(self, default_config):
+        """Test a huge brace sequence is produced one word at a time."""
+        words = iter_arguments("touch f{1..100000000000}", default_config)
+        assert next(words) == ("touch", False)
+        assert next(words) == ("f1", True)
+        assert next(words) == ("f2", True)
+
+    def test_parse_variables_before_wildcards(
+        self, default_config, temp_dir_with_files
+    ):
+        """Test an unquoted variable's value is split and globbed."""
+        with patch.dict(os.environ, {"PATTERN": "test1.* file1.txt"}):
+            result = parse_command('ls $PATTERN "$PATTERN"', default_config)
+        assert result == ["ls", "test1.py", "file1.txt", "test1.* file1.txt"]
+
+    def test_parse_variables_not_cached(self, default_config, temp_dir_with_files):
+        """Test a line with $ is expanded again when the variable changes."""
+        with patch.dict(os.environ, {"EXT": "txt"}):
+            result = parse_command("ls *.$EXT", default_config)
+            assert result == ["ls", "file1.txt", "file2.txt"]
+            os.environ["EXT"] = "py"
+            result = parse_command("ls *.$EXT", default_config)
+            assert result == ["ls", "test1.py", "test2.py"]
+
+    def test_parse_required_variable(self, default_config, capsys):
+        """Test ${NAME?message} reports the error and runs nothing."""
+        os.environ.pop("AKUJOBIP1_UNSET", None)
+        assert (
+            parse_command("rm -rf ${AKUJOBIP1_UNSET:?no target}/", default_config) == []
+        )
+        assert "Parse error: AKUJOBIP1_UNSET: no target" in capsys.readouterr().err
+
+    def test_iter_arguments_expands_variables(self, default_config):
+        """Test iter_arguments() also expands variables and ~."""
+        with patch.dict(os.environ, {"HOME": "/home/user", "FILES": "a b"}):
+            assert list(iter_arguments("rm ~/x $FILES", default_config)) == [
+                ("rm", False),
+                ("/home/user/x", False),
+                ("a", False),
+                ("b", False),
+            ]
+
+    def test_parse_command_substitution(self, default_config, temp_dir_with_files):
+        """Test $(...) output is split and globbed like a variable."""
+        result = parse_command("ls $(echo '*.py') \"$(echo 'a  b')\"", default_config)
+        assert result == ["ls", "test1.py", "test2.py", "a  b"]
+
+    def test_pipe_inside_substitution(self, default_config):
+        """Test a '|' or '&' inside $(...) does not split the line."""
+        line = "echo $(echo a | tr a b) | cat"
+        [pipeline] = parse(line).pipelines
+        assert len(pipeline.commands) == 2
+        line = "echo $(echo a | tr a b & wait)"
+        tree = parse(line)
+        assert tree.connectors == ("",)
+        command = tree.pipelines[0].commands[0]
+        assert expand_command(command, line, default_config) == ["echo", "b"]
+
+    def test_iter_arguments_parse_error(self, default_config, capsys):
+        """Test tokenize errors are reported and yield nothing."""
+        assert list(iter_arguments('echo "open', default_config)) == []
+        assert "Parse error" in capsys.readouterr().err
 
     def test_parse_complex_command_with_wildcards(
         self, default_config, temp_dir_with_files
@@ -484,16 +621,10 @@ class TestRealWorldScenarios:
         """
         Test find command with complex arguments.
 
-        Note: Quoted wildcards are still expanded due to shlex quote removal.
-        In real usage, users would pass literal wildcards to find by escaping them.
+        The quoted pattern reaches find unexpanded.
         """
         result = parse_command('find . -name "*.txt" -type f', default_config)
-        assert result[0] == "find"
-        assert "." in result
-        assert "-name" in result
-        # The *.txt will be expanded because shlex removes quotes first
-        assert "-type" in result
-        assert "f" in result
+        assert result == ["find", ".", "-name", "*.txt", "-type", "f"]
 
     def test_printf_with_format_string(self, default_config):
         """Test printf with format string and arguments."""
@@ -513,3 +644,140 @@ class TestRealWorldScenarios:
         """Test command with relative path."""
         result = parse_command("./my_script.sh arg1 arg2", default_config)
         assert result == ["./my_script.sh", "arg1", "arg2"]
+
+
+# ============================================================================
+# Test the parse cache
+# ============================================================================
+
+
+@pytest.fixture
+def quiet_dir(tmp_path, monkeypatch):
+    """A directory with files, last changed long enough ago to be trusted."""
+    for name in ("a.txt", "b.txt", "c.py"):
+        (tmp_path / name).touch()
+    old = time.time() - 60
+    os.utime(tmp_path, (old, old))
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+class TestParseCache:
+    """Test reuse of tokenized and expanded lines."""
+
+    def test_tokens_are_reused(self):
+        cache = ParseCache()
+        tokens = cache.tokens('echo "a b"')
+        assert cache.tokens('echo "a b"') is tokens
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_tokenize_errors_are_not_cached(self):
+        cache = ParseCache()
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                cache.tokens('echo "open')
+        assert cache.misses == 2
+
+    def test_lru_bound(self):
+        cache = ParseCache(max_entries=2)
+        for line in ("a", "b", "a", "c"):
+            cache.tokens(line)
+        cache.tokens("a")
+        assert cache.hits == 2  # "b" was evicted, "a" was not
+        cache.tokens("b")
+        assert cache.misses == 4
+
+    def test_expansion_is_reused(self, quiet_dir):
+        cache = ParseCache()
+        tokens = cache.tokens("ls *.txt")
+        assert cache.expand("ls *.txt", tokens) == ["ls", "a.txt", "b.txt"]
+        with patch("akujobip1.parser.glob_paths") as mock_glob:
+            assert cache.expand("ls *.txt", tokens) == ["ls", "a.txt", "b.txt"]
+        mock_glob.assert_not_called()
+        assert (cache.expansion_hits, cache.expansion_misses) == (1, 1)
+
+    def test_changed_directory_is_expanded_again(self, quiet_dir):
+        cache = ParseCache()
+        tokens = cache.tokens("ls *.txt")
+        cache.expand("ls *.txt", tokens)
+        (quiet_dir / "d.txt").touch()
+        assert cache.expand("ls *.txt", tokens) == ["ls", "a.txt", "b.txt", "d.txt"]
+        assert cache.expansion_hits == 0
+
+    def test_other_directory_is_expanded_again(self, quiet_dir, monkeypatch):
+        cache = ParseCache()
+        tokens = cache.tokens("ls *")
+        cache.expand("ls *", tokens)
+        (quiet_dir / "sub").mkdir()
+        (quiet_dir / "sub" / "x").touch()
+        monkeypatch.chdir(quiet_dir / "sub")
+        assert cache.expand("ls *", tokens) == ["ls", "x"]
+
+    def test_recent_directory_is_not_cached(self, quiet_dir):
+        cache = ParseCache()
+        (quiet_dir / "d.txt").touch()
+        tokens = cache.tokens("ls *.txt")
+        cache.expand("ls *.txt", tokens)
+        cache.expand("ls *.txt", tokens)
+        assert cache.expansion_misses == 2
+
+    def test_parse_command_uses_shared_cache(self, quiet_dir):
+        hits = PARSE_CACHE.expansion_hits
+        assert parse_command("wc -l *.py", {}) == ["wc", "-l", "c.py"]
+        assert parse_command("wc -l *.py", {}) == ["wc", "-l", "c.py"]
+        assert PARSE_CACHE.expansion_hits == hits + 1
+
+    def test_result_can_be_modified(self, quiet_dir):
+        args = parse_command("ls *.txt", {})
+        args.append("extra")
+        assert parse_command("ls *.txt", {}) == ["ls", "a.txt", "b.txt"]
+
+    def test_disabled_by_config(self, quiet_dir):
+        config = {"parser": {"cache_entries": 0}}
+        try:
+            misses = PARSE_CACHE.misses
+            parse_command("echo hi", config)
+            parse_command("echo hi", config)
+            assert PARSE_CACHE.misses == misses + 2
+        finally:
+            parse_command("echo hi", {})  # restore the default size
+
+
+class TestParseTree:
+    """Test parse() and expand_command()."""
+
+    def test_trees_are_reused(self):
+        cache = ParseCache()
+        tree = cache.tree("make && make test")
+        assert cache.tree("make && make test") is tree
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_tokenize_errors_become_parse_errors(self):
+        with pytest.raises(ParseError, match="No closing quotation"):
+            parse('echo "open')
+        with pytest.raises(ParseError, match="unexpected token"):
+            parse("ls | | wc")
+
+    def test_expand_each_command(self, quiet_dir):
+        line = "ls *.txt | grep a && echo *.py"
+        tree = parse(line)
+        first, second = tree.pipelines[0].commands
+        assert expand_command(first, line, {}) == ["ls", "a.txt", "b.txt"]
+        assert expand_command(second, line, {}) == ["grep", "a"]
+        command = tree.pipelines[1].commands[0]
+        assert expand_command(command, line, {}) == ["echo", "c.py"]
+
+    def test_commands_cached_separately(self, quiet_dir):
+        line = "echo *.txt; echo *.py"
+        tree = parse(line)
+        commands = [pipeline.commands[0] for pipeline in tree.pipelines]
+        for _ in range(2):
+            assert expand_command(commands[0], line, {}) == ["echo", "a.txt", "b.txt"]
+            assert expand_command(commands[1], line, {}) == ["echo", "c.py"]
+
+    def test_only_redirections(self):
+        tree = parse("> out")
+        assert expand_command(tree.pipelines[0].commands[0], "> out", {}) == []
+
+    def test_parse_command_ignores_operators(self):
+        assert parse_command("echo a;b", {}) == ["echo", "a;b"]
@@ -0,0 +1,126 @@
+"""
+Tests for the command hash table (pathcache module).
+
+Covers PATH resolution, hit/miss caching, and invalidation when PATH or
+a PATH directory changes.
+"""
+
+import os
+import pytest
+
+from akujobip1.pathcache import CommandHash, search_path
+
+
+@pytest.fixture
+def bin_dirs(tmp_path, monkeypatch):
+    """Create two bin directories and put them on PATH."""
+    first = tmp_path / "bin1"
+    second = tmp_path / "bin2"
+    first.mkdir()
+    second.mkdir()
+    monkeypatch.setenv("PATH", f"{first}{os.pathsep}{second}")
+    return first, second
+
+
+def make_executable(path, mode=0o755):
+    """Create a small shell script with the given mode."""
+    path.write_text("#!/bin/sh\nexit 0\n")
+    path.chmod(mode)
+    return path
+
+
+class TestSearchPath:
+    """Test execvp-style PATH search."""
+
+    def test_first_executable_wins(self, bin_dirs):
+        first, second = bin_dirs
+        make_executable(first / "tool")
+        make_executable(second / "tool")
+        assert search_path("tool", [str(first), str(second)]) == str(first / "tool")
+
+    def test_skips_non_executable_for_later_executable(self, bin_dirs):
+        first, second = bin_dirs
+        make_executable(first / "tool", 0o644)
+        make_executable(second / "tool")
+        assert search_path("tool", [str(first), str(second)]) == str(second / "tool")
+
+    def test_only_non_executable_returns_it(self, bin_dirs):
+        first, second = bin_dirs
+        make_executable(first / "tool", 0o644)
+        assert search_path("tool", [str(first), str(second)]) == str(first / "tool")
+
+    def test_missing_returns_none(self, bin_dirs):
+        first, second = bin_dirs
+        assert search_path("tool", [str(first), str(second)]) is None
+
+
+class TestCommandHash:
+    """Test caching and invalidation."""
+
+    def test_lookup_caches_hit(self, bin_dirs):
+        first, _ = bin_dirs
+        make_executable(first / "tool")
+        table = CommandHash()
+
+        assert table.lookup("tool") == str(first / "tool")
+        assert table.lookup("tool") == str(first / "tool")
+        assert table.entries() == [("tool", 2, str(first / "tool"))]
+
+    def test_lookup_caches_miss(self, bin_dirs):
+        table = CommandHash()
+        assert table.lookup("tool") is None
+
+        # A cached miss must not search the directories again
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(
+                "akujobip1.pathcache.search_path",
+                lambda *a: pytest.fail("searched again"),
+            )
+            assert table.lookup("tool") is None
+
+        # Misses are not listed
+        assert table.entries() == []
+
+    def test_slash_names_bypass_table(self, bin_dirs):
+        table = CommandHash()
+        assert table.lookup("./tool") == "./tool"
+        assert table.lookup("/bin/true") == "/bin/true"
+        assert table.entries() == []
+
+    def test_directory_change_invalidates_miss(self, bin_dirs):
+        first, _ = bin_dirs
+        table = CommandHash()
+        assert table.lookup("tool") is None
+
+        make_executable(first / "tool")
+        # Force a visible mtime change even on coarse-grained filesystems
+        os.utime(first, ns=(0, os.stat(first).st_mtime_ns + 1_000_000_000))
+        assert table.lookup("tool") == str(first / "tool")
+
+    def test_path_change_invalidates(self, bin_dirs, monkeypatch):
+        first, second = bin_dirs
+        make_executable(first / "tool")
+        make_executable(second / "tool")
+        table = CommandHash()
+        assert table.lookup("tool") == str(first / "tool")
+
+        monkeypatch.setenv("PATH", str(second))
+        assert table.lookup("tool") == str(second / "tool")
+
+    def test_forget(self, bin_dirs):
+        first, _ = bin_dirs
+        make_executable(first / "tool")
+        table = CommandHash()
+        table.lookup("tool")
+        table.forget()
+        assert table.entries() == []
+        assert table.peek("tool") is None
+
+    def test_relative_path_entries_not_cached(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("PATH", f".{os.pathsep}/nonexistent")
+        make_executable(tmp_path / "tool")
+        table = CommandHash()
+
+        assert table.lookup("tool") == "./tool"
+        assert table.entries() == []
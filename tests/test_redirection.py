@@ -0,0 +1,239 @@
+"""
+Tests for I/O redirections (redirection module).
+
+Redirections are opened from parsed lines as the shell does, and the
+resulting pairs are checked by running real commands through the
+executor where it matters.
+"""
+
+import fcntl
+import os
+from unittest.mock import patch
+
+import pytest
+
+from akujobip1.executor import CLOSE_FD, execute_external_command
+from akujobip1.parser import parse
+from akujobip1.redirection import (
+    RedirectionError,
+    memory_file,
+    null_fd,
+    open_redirections,
+    read_here_documents,
+    redirected,
+)
+
+QUIET = {"execution": {"show_exit_codes": "never"}}
+
+
+def open_line(line, here_documents=None):
+    """Open the redirections of the first command of line."""
+    command = parse(line).pipelines[0].commands[0]
+    return open_redirections(command.redirects, line, QUIET, here_documents)
+
+
+def read_fd(fd):
+    """Everything readable from fd (from its current offset)."""
+    chunks = []
+    while True:
+        data = os.read(fd, 65536)
+        if not data:
+            return b"".join(chunks)
+        chunks.append(data)
+
+
+def open_fds():
+    """The descriptors open in this process."""
+    return set(os.listdir("/proc/self/fd"))
+
+
+@pytest.fixture
+def in_tmp(tmp_path, monkeypatch):
+    """Run in an empty temporary directory."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+class TestOpenRedirections:
+    """Test files, descriptors and their order."""
+
+    def test_no_redirections(self):
+        """Test commands without redirections open nothing."""
+        with open_line("ls") as redirections:
+            assert redirections.pairs == []
+
+    def test_output_file(self, in_tmp):
+        """Test > creates/truncates and >> appends."""
+        (in_tmp / "out.txt").write_text("old contents\n")
+        with open_line("echo > out.txt") as redirections:
+            execute_external_command(
+                ["echo", "one"], QUIET, redirections=redirections.pairs
+            )
+        with open_line("echo >> out.txt") as redirections:
+            execute_external_command(
+                ["echo", "two"], QUIET, redirections=redirections.pairs
+            )
+        assert (in_tmp / "out.txt").read_text() == "one\ntwo\n"
+
+    def test_input_file(self, in_tmp):
+        """Test < opens the file for reading on fd 0."""
+        (in_tmp / "in.txt").write_text("data")
+        with open_line("cat < in.txt") as redirections:
+            [(source, target)] = redirections.pairs
+            assert target == 0
+            assert read_fd(source) == b"data"
+
+    def test_descriptor_order(self, in_tmp):
+        """Test pairs keep the command line's order and numbered fds."""
+        with open_line("cmd > out.txt 2>&1 3<&0 4>&-") as redirections:
+            pairs = redirections.pairs
+        assert [target for _, target in pairs] == [1, 2, 3, 4]
+        assert pairs[1:] == [(1, 2), (0, 3), (CLOSE_FD, 4)]
+
+    def test_opened_fds_are_high_and_cloexec(self, in_tmp):
+        """Test the shell's copies can't clash with fds 0-9 or leak."""
+        with open_line("cmd > a 3> b < /etc/hostname") as redirections:
+            for source, _ in redirections.pairs:
+                assert source >= 10
+                assert fcntl.fcntl(source, fcntl.F_GETFD) & fcntl.FD_CLOEXEC
+
+    def test_dev_null_opens_nothing(self):
+        """Test /dev/null reuses the shell's descriptor."""
+        null = null_fd()
+        before = open_fds()
+        with open_line("cmd > /dev/null 2>/dev/null < /dev/null") as redirections:
+            assert open_fds() == before
+            assert redirections.pairs == [(null, 1), (null, 2), (null, 0)]
+        assert null_fd() == null
+
+    def test_target_expansion(self, in_tmp, monkeypatch):
+        """Test file names are expanded like arguments."""
+        monkeypatch.setenv("OUT", "expanded.txt")
+        with open_line("cmd > $OUT"):
+            pass
+        assert (in_tmp / "expanded.txt").exists()
+
+    def test_closed_after_use(self, in_tmp):
+        """Test close() releases every descriptor opened."""
+        before = open_fds()
+        with open_line("cmd > a >> b <<< text"):
+            assert len(open_fds()) == len(before) + 3
+        assert open_fds() == before
+
+
+class TestErrors:
+    """Test failures are reported as bash words them."""
+
+    def test_missing_file(self, in_tmp):
+        """Test a missing input file."""
+        with pytest.raises(RedirectionError, match="missing.txt: No such file"):
+            open_line("cat < missing.txt")
+
+    def test_ambiguous_redirect(self, in_tmp):
+        """Test a target that expands to several words, or none."""
+        (in_tmp / "a.log").touch()
+        (in_tmp / "b.log").touch()
+        with pytest.raises(RedirectionError, match=r"\*.log: ambiguous redirect"):
+            open_line("cmd > *.log")
+        os.environ.pop("UNSET_XYZ", None)
+        with pytest.raises(RedirectionError, match="ambiguous redirect"):
+            open_line("cmd > $UNSET_XYZ")
+
+    def test_bad_descriptor(self):
+        """Test duplicating a descriptor that is not open."""
+        with pytest.raises(RedirectionError, match="57: Bad file descriptor"):
+            open_line("cmd >&57")
+
+    def test_descriptor_set_earlier_is_valid(self, in_tmp):
+        """Test 5>file >&5: fd 5 exists by the time it is duplicated."""
+        with open_line("cmd 5> out.txt >&5") as redirections:
+            assert redirections.pairs[1] == (5, 1)
+
+    def test_nothing_left_open_on_error(self, in_tmp):
+        """Test files opened before the failing one are closed."""
+        before = open_fds()
+        with pytest.raises(RedirectionError):
+            open_line("cmd > ok.txt < missing.txt")
+        assert open_fds() == before
+
+
+class TestHereDocuments:
+    """Test here-strings and here-documents."""
+
+    def test_here_string(self, monkeypatch):
+        """Test <<< adds a newline and is never split."""
+        monkeypatch.setenv("A", "a  b")
+        with open_line("cat <<< $A") as redirections:
+            [(source, target)] = redirections.pairs
+            assert target == 0
+            assert read_fd(source) == b"a  b\n"
+
+    def test_here_document_expands(self, monkeypatch):
+        """Test an unquoted delimiter expands $ in the body."""
+        monkeypatch.setenv("NAME", "world")
+        line = "cat <<EOF"
+        bodies = {4: "hello $NAME \\$NAME\n"}
+        with open_line(line, bodies) as redirections:
+            assert read_fd(redirections.pairs[0][0]) == b"hello world $NAME\n"
+
+    def test_quoted_delimiter_is_literal(self):
+        """Test <<'EOF' keeps the body as written."""
+        with open_line("cat <<'EOF'", {4: "$HOME\n"}) as redirections:
+            assert read_fd(redirections.pairs[0][0]) == b"$HOME\n"
+
+    def test_read_bodies(self):
+        """Test bodies are read in order, each up to its delimiter."""
+        lines = iter(["one", "EOF", "\t\ttwo", "\tEND", "after"])
+        tree = parse("cat <<EOF; cat <<-END")
+        bodies = read_here_documents(tree, lambda: next(lines, None))
+        assert list(bodies.values()) == ["one\n", "two\n"]
+        assert next(lines) == "after"
+
+    def test_end_of_input(self, capsys):
+        """Test a body cut short by end of input is kept, with a warning."""
+        lines = iter(["partial"])
+        bodies = read_here_documents(parse("cat <<EOF"), lambda: next(lines, None))
+        assert list(bodies.values()) == ["partial\n"]
+        assert "wanted `EOF'" in capsys.readouterr().err
+
+    def test_memfd_fallback(self):
+        """Test an unlinked temporary file stands in without memfd."""
+        with patch("os.memfd_create", side_effect=OSError("blocked")):
+            fd = memory_file(b"x" * 100000)
+        try:
+            assert read_fd(fd) == b"x" * 100000
+            assert os.fstat(fd).st_nlink == 0
+        finally:
+            os.close(fd)
+
+
+class TestRedirected:
+    """Test redirecting the shell itself around a built-in."""
+
+    def test_output_and_restore(self, in_tmp, capfd):
+        """Test print() goes to the file, and fd 1 comes back after."""
+        with open_line("pwd > out.txt") as redirections:
+            with redirected(redirections.pairs):
+                print("inside")
+        print("outside")
+        assert (in_tmp / "out.txt").read_text() == "inside\n"
+        assert capfd.readouterr().out == "outside\n"
+
+    def test_restores_after_error(self, in_tmp):
+        """Test descriptors come back even if the built-in fails."""
+        before = os.fstat(1)
+        with pytest.raises(RuntimeError):
+            with open_line("cmd > out.txt") as redirections:
+                with redirected(redirections.pairs):
+                    raise RuntimeError("failed")
+        after = os.fstat(1)
+        assert (before.st_dev, before.st_ino) == (after.st_dev, after.st_ino)
+
+    def test_fd_not_open_before_is_closed_after(self, in_tmp):
+        """Test a new descriptor (n>file) does not outlive the built-in."""
+        fd = next(n for n in range(200, 300) if str(n) not in open_fds())
+        with open_line(f"cmd {fd}> out.txt") as redirections:
+            with redirected(redirections.pairs):
+                os.write(fd, b"new")
+        assert (in_tmp / "out.txt").read_text() == "new"
+        assert str(fd) not in open_fds()
@@ -6,13 +6,14 @@ covering basic functionality, built-in integration, external command
 execution, signal handling, error recovery, and edge cases.
 """
 
+import os
 import pytest
 import signal
-from unittest.mock import patch
-from akujobip1.shell import cli, run_shell
+from unittest.mock import MagicMock, patch
+from akujobip1.shell import cli, run_shell, run_batch, execute_line, _read_lines
+from akujobip1.builtins import SHELL_OPTIONS
 from akujobip1.config import get_default_config
 
-
 # Test Fixtures
 
 
@@ -330,6 +331,61 @@ class TestExternalCommandIntegration:
         # pwd is built-in, so should only see 2 external commands (ls, echo)
         assert mock_exec.call_count == 2
 
+    def test_pipeline_dispatch(self, mock_input_sequence, default_config):
+        """Test lines with '|' are run as pipelines."""
+        with patch("builtins.input", mock_input_sequence("ls | wc -l", "exit")):
+            with patch(
+                "akujobip1.shell.execute_pipeline", return_value=0
+            ) as mock_pipeline:
+                exit_code = run_shell(default_config)
+
+        assert exit_code == 0
+        mock_pipeline.assert_called_once()
+        assert mock_pipeline.call_args[0][0] == [["ls"], ["wc", "-l"]]
+
+    def test_quoted_pipe_is_single_command(self, mock_input_sequence, default_config):
+        """Test a quoted '|' stays an argument of a single command."""
+        with patch("builtins.input", mock_input_sequence('echo "a|b"', "exit")):
+            with patch(
+                "akujobip1.shell.execute_external_command", return_value=0
+            ) as mock_exec:
+                run_shell(default_config)
+
+        assert mock_exec.call_args[0][0] == ["echo", "a|b"]
+
+    def test_background_dispatch(self, mock_input_sequence, default_config):
+        """Test a trailing '&' starts a background job."""
+        with patch("builtins.input", mock_input_sequence("sleep 10 &", "exit")):
+            with patch(
+                "akujobip1.shell.execute_pipeline", return_value=0
+            ) as mock_pipeline:
+                exit_code = run_shell(default_config)
+
+        assert exit_code == 0
+        args, kwargs = mock_pipeline.call_args
+        assert args[0] == [["sleep", "10"]]
+        assert kwargs["background"] is True
+        assert kwargs["command"] == "sleep 10"
+
+    def test_lone_ampersand_is_syntax_error(
+        self, mock_input_sequence, default_config, capsys
+    ):
+        """Test '&' by itself is rejected."""
+        with patch("builtins.input", mock_input_sequence("&", "exit")):
+            run_shell(default_config)
+
+        assert "syntax error" in capsys.readouterr().err
+
+    def test_finished_jobs_reported_before_prompt(
+        self, mock_input_sequence, default_config
+    ):
+        """Test the job table is checked before every prompt."""
+        with patch("builtins.input", mock_input_sequence("", "exit")):
+            with patch("akujobip1.shell.JOB_TABLE") as mock_table:
+                run_shell(default_config)
+
+        assert mock_table.notify.call_count == 2
+
 
 # Test Class 4: Signal Handling
 
@@ -432,9 +488,9 @@ class TestErrorHandling:
     ):
         """Test that unexpected errors don't crash shell."""
         with patch("builtins.input", mock_input_sequence("test", "exit")):
-            # Mock parse_command to raise unexpected exception
+            # Mock expand_command to raise unexpected exception
             with patch(
-                "akujobip1.shell.parse_command",
+                "akujobip1.shell.expand_command",
                 side_effect=[RuntimeError("Test error"), ["exit"]],
             ):
                 exit_code = run_shell(default_config)
@@ -450,7 +506,7 @@ class TestErrorHandling:
 
         with patch("builtins.input", mock_input_sequence("test", "exit")):
             with patch(
-                "akujobip1.shell.parse_command",
+                "akujobip1.shell.expand_command",
                 side_effect=[RuntimeError("Test error"), ["exit"]],
             ):
                 run_shell(config)
@@ -509,15 +565,15 @@ class TestEdgeCases:
 
     def test_special_characters_in_command(self, mock_input_sequence, default_config):
         """Test commands with special characters."""
-        with patch("builtins.input", mock_input_sequence("echo $HOME", "exit")):
+        with patch("builtins.input", mock_input_sequence("echo $HOME '$HOME'", "exit")):
             with patch(
                 "akujobip1.shell.execute_external_command", return_value=0
             ) as mock_exec:
                 run_shell(default_config)
 
-        # Verify special characters passed through
+        # $HOME is expanded, the quoted one passed through
         args = mock_exec.call_args[0][0]
-        assert "$HOME" in args
+        assert args == ["echo", os.environ["HOME"], "$HOME"]
 
     def test_consecutive_spaces(self, mock_input_sequence, default_config):
         """Test commands with consecutive spaces."""
@@ -573,7 +629,7 @@ class TestConfigurationIntegration:
         """Test that config is passed to parser."""
         with patch("builtins.input", mock_input_sequence("ls *.txt", "exit")):
             with patch(
-                "akujobip1.shell.parse_command",
+                "akujobip1.shell.expand_command",
                 side_effect=[["ls", "file.txt"], ["exit"]],
             ) as mock_parse:
                 with patch(
@@ -583,7 +639,7 @@ class TestConfigurationIntegration:
 
         # Verify config passed to parser
         assert mock_parse.call_count >= 1
-        assert mock_parse.call_args[0][1] == default_config
+        assert mock_parse.call_args[0][2] == default_config
 
     def test_config_passed_to_executor(self, mock_input_sequence, default_config):
         """Test that config is passed to executor."""
@@ -605,6 +661,20 @@ class TestConfigurationIntegration:
 
         # If this doesn't crash, config was passed correctly
 
+    def test_reloaded_config_used(
+        self, mock_input_sequence, default_config, custom_config, capsys
+    ):
+        """Test a config reloaded between prompts takes effect at once."""
+        watcher = MagicMock()
+        watcher.poll.side_effect = [default_config, custom_config]
+        with patch("builtins.input", mock_input_sequence("", "exit")):
+            run_shell(default_config, watcher)
+
+        output = capsys.readouterr().out
+        assert output.startswith("AkujobiP1> custom> ")
+        assert "Goodbye!" in output
+        assert watcher.poll.call_count == 2
+
 
 # Test Class 8: Bash Test Simulation
 
@@ -742,3 +812,255 @@ class TestCLIFunction:
         assert exit_code == 1
         output = capsys.readouterr().err
         assert "Fatal error" in output
+
+
+# Test Class 10: Batch Mode Tests
+
+
+@pytest.fixture
+def reset_errexit():
+    """Restore errexit after tests that turn it on."""
+    yield
+    SHELL_OPTIONS["errexit"] = False
+
+
+class TestBatchMode:
+    """Test non-interactive execution (-c, scripts, piped stdin)."""
+
+    def test_run_batch_no_prompt(self, default_config, capfd):
+        """Test batch mode prints no prompt or exit message by default."""
+        assert run_batch(["echo one", "echo two"], default_config) == 0
+        captured = capfd.readouterr()
+        assert captured.out == "one\ntwo\n"
+
+    def test_run_batch_with_prompt(self, default_config, capsys):
+        """Test show_prompt reproduces the interactive transcript."""
+        assert run_batch(["", "exit"], default_config, show_prompt=True) == 0
+        assert capsys.readouterr().out == "AkujobiP1> AkujobiP1> Bye!\n"
+
+    def test_run_batch_eof_with_prompt(self, default_config, capsys):
+        """Test end of input prints the exit message like Ctrl+D."""
+        assert run_batch([], default_config, show_prompt=True) == 0
+        assert capsys.readouterr().out == "AkujobiP1> \nBye!\n"
+
+    def test_run_batch_returns_last_status(self, default_config):
+        """Test the exit code is the last command's."""
+        assert run_batch(["false", "true"], default_config) == 0
+        assert run_batch(["true", "false"], default_config) == 1
+
+    def test_run_batch_errexit(self, default_config, capfd, reset_errexit):
+        """Test set -e stops at the first failing command."""
+        lines = ["set -e", "echo before", "sh -c 'exit 3'", "echo after"]
+        assert run_batch(lines, default_config) == 3
+        assert capfd.readouterr().out == "before\n[Exit: 3]\n"
+
+    def test_run_batch_exit_stops(self, default_config, capfd):
+        """Test exit ends the run."""
+        assert run_batch(["exit", "echo after"], default_config) == 0
+        assert "after" not in capfd.readouterr().out
+
+    def test_batch_line_streams_wildcards(self, default_config, tmp_path, capfd):
+        """Test a batch line runs its wildcard matches through the batcher."""
+        for name in ("a.txt", "b.txt"):
+            (tmp_path / name).touch()
+        line = f"batch echo found {tmp_path}/*.txt"
+        assert execute_line(line, default_config) == 0
+        assert capfd.readouterr().out == f"found {tmp_path}/a.txt {tmp_path}/b.txt\n"
+
+    def test_auto_batch_keeps_builtins(self, default_config, capsys):
+        """Test execution.auto_batch still hands built-ins the full list."""
+        default_config["execution"]["auto_batch"] = True
+        assert execute_line("type cd", default_config) == 0
+        assert "cd is a shell builtin" in capsys.readouterr().out
+
+    def test_comments_ignored(self, default_config, capsys):
+        """Test comment lines and #! are skipped."""
+        assert execute_line("#!/usr/bin/env akujobip1", default_config) == 0
+        assert execute_line("   # echo hidden", default_config) == 0
+        assert capsys.readouterr().out == ""
+
+    def test_read_lines_chunked(self, tmp_path):
+        """Test the chunked reader splits lines across chunk boundaries."""
+        path = tmp_path / "input"
+        lines = [f"echo line {n}" for n in range(20000)]
+        path.write_text("\n".join(lines))
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            assert list(_read_lines(fd)) == lines
+        finally:
+            os.close(fd)
+
+    def test_read_lines_long_line(self, tmp_path):
+        """Test a line spanning many chunks comes back whole."""
+        path = tmp_path / "input"
+        long_line = "echo " + "x" * (3 * 1024 * 1024)
+        path.write_text(f"{long_line}\nexit\n")
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            assert list(_read_lines(fd)) == [long_line, "exit"]
+        finally:
+            os.close(fd)
+
+    def test_cli_dash_c(self, capfd):
+        """Test -c runs the command without a prompt."""
+        assert cli(["-c", "echo hello\necho world"]) == 0
+        assert capfd.readouterr().out == "hello\nworld\n"
+
+    def test_cli_dash_e(self, capfd, reset_errexit):
+        """Test -e enables errexit."""
+        assert cli(["-e", "-c", "false\necho after"]) == 1
+        assert "after" not in capfd.readouterr().out
+
+    def test_cli_script_file(self, tmp_path, capfd):
+        """Test running a script file."""
+        script = tmp_path / "script.sh"
+        script.write_text("# setup\necho from script\nsh -c 'exit 5'\n")
+        assert cli([str(script)]) == 5
+        assert "from script" in capfd.readouterr().out
+
+    def test_cli_missing_script(self, tmp_path, capsys):
+        """Test a missing script file returns 127."""
+        assert cli([str(tmp_path / "missing.sh")]) == 127
+        assert "No such file or directory" in capsys.readouterr().err
+
+    @pytest.mark.parametrize("argv", [["-c"], ["-x"]])
+    def test_cli_usage_errors(self, argv, capsys):
+        """Test invalid options return 2."""
+        assert cli(argv) == 2
+        assert "akujobip1:" in capsys.readouterr().err
+
+    @pytest.mark.parametrize(
+        "argv", [["-c", "echo hi", "name", "arg"], ["script.sh", "arg"]]
+    )
+    def test_cli_extra_operands(self, argv, capfd):
+        """Test operands after the command or script are rejected."""
+        assert cli(argv) == 2
+        captured = capfd.readouterr()
+        assert captured.out == ""
+        assert "unexpected operand" in captured.err
+
+
+# Test Class 11: Command Lists
+
+
+class TestCommandLists:
+    """Test ';', '&&', '||' and '&' between pipelines."""
+
+    def test_sequence(self, default_config, capfd):
+        """Test ';' runs every command in turn."""
+        assert execute_line("echo one; echo two", default_config) == 0
+        assert capfd.readouterr().out == "one\ntwo\n"
+
+    def test_cd_then_expand_pwd(self, default_config, capfd, tmp_path, monkeypatch):
+        """Test $PWD and $OLDPWD follow a cd earlier in the line."""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("PWD", str(tmp_path))
+        monkeypatch.setenv("OLDPWD", "")
+        assert execute_line("cd /tmp; echo $PWD $OLDPWD", default_config) == 0
+        assert capfd.readouterr().out == f"/tmp {tmp_path}\n"
+
+    def test_and_or(self, default_config, capfd):
+        """Test '&&' and '||' run commands depending on the status."""
+        assert execute_line("true && echo yes || echo no", default_config) == 0
+        assert execute_line("false && echo yes || echo no", default_config) == 0
+        out = capfd.readouterr().out
+        assert out.splitlines()[0] == "yes"
+        assert out.splitlines()[-1] == "no"
+        assert "yes" not in out.splitlines()[1:]
+
+    def test_status_visible_to_next_command(self, default_config, capfd):
+        """Test $? holds the previous pipeline's status within a line."""
+        execute_line("sh -c 'exit 4'; echo $?", default_config)
+        assert capfd.readouterr().out.splitlines()[-1] == "4"
+
+    def test_exit_stops_list(self, default_config, capfd):
+        """Test exit in a list ends the shell before later commands."""
+        assert execute_line("exit; echo after", default_config) == -1
+        assert "after" not in capfd.readouterr().out
+
+    def test_background_then_foreground(self, default_config):
+        """Test '&' in the middle of a line starts a job and goes on."""
+        with patch("akujobip1.shell.execute_pipeline", return_value=0) as mock_pipeline:
+            with patch(
+                "akujobip1.shell.execute_external_command", return_value=0
+            ) as mock_exec:
+                execute_line("sleep 10 | cat & echo started", default_config)
+
+        args, kwargs = mock_pipeline.call_args
+        assert args[0] == [["sleep", "10"], ["cat"]]
+        assert kwargs["command"] == "sleep 10 | cat"
+        assert mock_exec.call_args[0][0] == ["echo", "started"]
+
+    def test_syntax_error_runs_nothing(self, default_config, capsys):
+        """Test a misplaced operator rejects the whole line."""
+        with patch("akujobip1.shell.execute_external_command") as mock_exec:
+            assert execute_line("echo a; ; echo b", default_config) == 2
+        mock_exec.assert_not_called()
+        assert "unexpected token ';'" in capsys.readouterr().err
+
+    def test_time_whole_pipeline(self, default_config, capfd):
+        """Test 'time a | b' reports once, for the whole pipeline."""
+        line = "time echo hi | sh -c 'sleep 0.2; tr a-z A-Z'"
+        assert execute_line(line, default_config) == 0
+        captured = capfd.readouterr()
+        assert "HI" in captured.out
+        real = [line for line in captured.err.splitlines() if line.startswith("real")]
+        assert len(real) == 1
+        assert float(real[0].split("m")[1].rstrip("s")) >= 0.2
+
+
+# Test Class 12: Redirections
+
+
+class TestRedirections:
+    """Test redirections and here-documents through the shell."""
+
+    def test_external_output_and_errors(self, default_config, tmp_path, capfd):
+        """Test >file 2>&1 sends both streams to the file."""
+        out = tmp_path / "out.txt"
+        line = f"sh -c 'echo out; echo err >&2' > {out} 2>&1"
+        assert execute_line(line, default_config) == 0
+        assert out.read_text() == "out\nerr\n"
+        assert capfd.readouterr().out == ""
+
+    def test_builtin_runs_in_shell(self, default_config, tmp_path, monkeypatch):
+        """Test a redirected cd still changes the shell's directory."""
+        monkeypatch.chdir(tmp_path)
+        assert execute_line("cd / > /dev/null", default_config) == 0
+        assert os.getcwd() == "/"
+
+    def test_builtin_output_to_file(self, default_config, tmp_path, monkeypatch):
+        """Test a built-in's output goes to the file, not the terminal."""
+        monkeypatch.chdir(tmp_path)
+        assert execute_line("pwd > where.txt", default_config) == 0
+        assert (tmp_path / "where.txt").read_text() == f"{tmp_path}\n"
+
+    def test_failed_redirection(self, default_config, tmp_path, capsys):
+        """Test a missing input file fails the command with status 1."""
+        line = f"cat < {tmp_path}/missing || echo fallback"
+        with patch("akujobip1.shell.execute_external_command", return_value=0) as mock:
+            assert execute_line(line, default_config) == 0
+        assert mock.call_args[0][0] == ["echo", "fallback"]
+        assert "missing: No such file or directory" in capsys.readouterr().err
+
+    def test_here_document_in_batch(self, default_config, capfd):
+        """Test a script's here-document body is read from the next lines."""
+        lines = ["cat <<EOF", "body ${ANSWER:-42}", "EOF", "echo after"]
+        assert run_batch(lines, default_config) == 0
+        assert capfd.readouterr().out == "body 42\nafter\n"
+
+    def test_here_document_interactive(
+        self, mock_input_sequence, default_config, capfd
+    ):
+        """Test the interactive shell prompts for here-document lines."""
+        with patch(
+            "builtins.input",
+            mock_input_sequence("tr a-z A-Z <<END", "shout", "END", "exit"),
+        ):
+            run_shell(default_config)
+        assert "SHOUT\n" in capfd.readouterr().out
+
+    def test_here_string_in_pipeline(self, default_config, capfd):
+        """Test <<< feeds a pipeline stage."""
+        assert execute_line("cat <<< 'b a' | tr ' ' '\\n' | sort", default_config) == 0
+        assert capfd.readouterr().out == "a\nb\n"
@@ -0,0 +1,246 @@
+"""
+Tests for the syntax tree (syntax module).
+
+Trees are checked through their repr and the words' values; error
+messages match what bash prints for the same line.
+"""
+
+import tracemalloc
+
+import pytest
+
+from akujobip1.syntax import (
+    CommandList,
+    ParseError,
+    Pipeline,
+    parse_tokens,
+    run_list,
+)
+from akujobip1.tokenizer import tokenize
+
+
+def tree(line):
+    """The syntax tree for line."""
+    return parse_tokens(tokenize(line, operators=True, expand=True))
+
+
+def words(line):
+    """Word values of each command, one list per pipeline."""
+    return [
+        [[word.value for word in command.words] for command in pipeline.commands]
+        for pipeline in tree(line).pipelines
+    ]
+
+
+class TestGrammar:
+    """Lists, and-or lists and pipelines."""
+
+    def test_single_command(self):
+        """One command is one single-stage pipeline."""
+        result = tree("ls -la")
+        assert words("ls -la") == [[["ls", "-la"]]]
+        assert result.connectors == ("",)
+        assert result.is_simple()
+
+    def test_empty_line(self):
+        """Blank lines have no pipelines."""
+        assert tree("   ").pipelines == ()
+        assert tree("").connectors == ()
+
+    def test_pipeline(self):
+        """'|' joins commands into one pipeline."""
+        assert words("ls | sort | uniq -c") == [[["ls"], ["sort"], ["uniq", "-c"]]]
+        assert not tree("ls | sort").is_simple()
+
+    def test_sequence(self):
+        """';' separates pipelines; a trailing ';' is allowed."""
+        result = tree("cd build; make;")
+        assert words("cd build; make;") == [[["cd", "build"]], [["make"]]]
+        assert result.connectors == (";", ";")
+
+    def test_and_or(self):
+        """'&&' and '||' are recorded after the pipeline they follow."""
+        result = tree("make && make test || echo failed")
+        assert len(result.pipelines) == 3
+        assert result.connectors == ("&&", "||", "")
+
+    def test_background(self):
+        """'&' marks the pipeline before it as a background job."""
+        result = tree("sleep 10 & echo started")
+        assert result.connectors == ("&", "")
+        assert not result.is_simple()
+        assert tree("sleep 10 &").connectors == ("&",)
+
+    def test_operators_inside_quotes_are_words(self):
+        """Quoted operators are ordinary text."""
+        assert words("echo 'a && b' \"|\" \\;") == [[["echo", "a && b", "|", ";"]]]
+
+    def test_operators_without_spaces(self):
+        """Operators need no surrounding blanks."""
+        assert words("true&&echo yes;ls|wc") == [
+            [["true"]],
+            [["echo", "yes"]],
+            [["ls"], ["wc"]],
+        ]
+
+    def test_words_keep_expansions(self):
+        """Words are left unexpanded for the executor."""
+        word = tree("echo $HOME")
+        assert word.pipelines[0].commands[0].words[1].value == "$HOME"
+
+    def test_span_covers_pipeline(self):
+        """Pipeline.span() gives its offsets in the line."""
+        line = "true; sleep 10 | cat & echo"
+        start, end = tree(line).pipelines[1].span()
+        assert line[start:end] == "sleep 10 | cat"
+
+
+class TestRedirects:
+    """Redirections attached to commands."""
+
+    def test_output_and_input(self):
+        """'<', '>' and '>>' take the next word as target."""
+        command = tree("sort < in > out").pipelines[0].commands[0]
+        assert [word.value for word in command.words] == ["sort"]
+        assert [(r.fd, r.operator, r.target.value) for r in command.redirects] == [
+            (0, "<", "in"),
+            (1, ">", "out"),
+        ]
+
+    def test_numbered_fd(self):
+        """A number right before the operator names the descriptor."""
+        command = tree("make 2>> errors.log").pipelines[0].commands[0]
+        assert [word.value for word in command.words] == ["make"]
+        assert command.redirects[0].fd == 2
+        assert command.redirects[0].operator == ">>"
+
+    def test_separated_number_is_a_word(self):
+        """'echo 2 > f' writes 2 to f; quoted numbers are words too."""
+        command = tree("echo 2 > f").pipelines[0].commands[0]
+        assert [word.value for word in command.words] == ["echo", "2"]
+        assert command.redirects[0].fd == 1
+        command = tree("echo '2'> f").pipelines[0].commands[0]
+        assert [word.value for word in command.words] == ["echo", "2"]
+
+    def test_redirect_anywhere_in_command(self):
+        """Redirections may come before the command name."""
+        command = tree("> out echo hi").pipelines[0].commands[0]
+        assert [word.value for word in command.words] == ["echo", "hi"]
+        assert not tree("> out echo hi").is_simple()
+
+    def test_duplicate_and_here_operators(self):
+        """n>&m, <&m and <<< redirect fd 0 or 1 unless a number is given."""
+        command = tree("cmd 2>&1 <&3 <<< text").pipelines[0].commands[0]
+        assert [(r.fd, r.operator, r.target.value) for r in command.redirects] == [
+            (2, ">&", "1"),
+            (0, "<&", "3"),
+            (0, "<<<", "text"),
+        ]
+
+    def test_here_documents_in_order(self):
+        """here_documents() lists the << and <<- redirections in order."""
+        result = tree("cat <<A | cat <<-B; cat <<< C < file")
+        assert [r.target.value for r in result.here_documents()] == ["A", "B"]
+        assert tree("ls").here_documents() == []
+
+    def test_commands_without_redirects_share_tuple(self):
+        """The empty redirection tuple is not allocated per command."""
+        first, second = tree("ls | wc").pipelines[0].commands
+        assert first.redirects is second.redirects
+
+
+class TestErrors:
+    """Misplaced operators."""
+
+    @pytest.mark.parametrize(
+        "line, token",
+        [
+            ("| ls", "|"),
+            ("ls | | wc", "|"),
+            ("ls |", "|"),
+            ("&& ls", "&&"),
+            ("ls ||", "||"),
+            ("; ls", ";"),
+            ("&", "&"),
+            ("ls ;;", ";"),
+            ("echo >", "newline"),
+            ("echo > | wc", "|"),
+            ("cat <<", "newline"),
+            ("echo 2>&", "newline"),
+        ],
+    )
+    def test_unexpected_token(self, line, token):
+        """The offending operator is named as bash does."""
+        with pytest.raises(ParseError) as error:
+            tree(line)
+        assert str(error.value) == f"syntax error near unexpected token '{token}'"
+
+    def test_background_and_or_list(self):
+        """Backgrounding a whole and-or list is rejected."""
+        with pytest.raises(ParseError, match="not supported"):
+            tree("make && make install &")
+
+
+class TestRunList:
+    """run_list() skip semantics."""
+
+    def run(self, line, statuses):
+        """Run line with each command's exit code taken from statuses."""
+        ran = []
+
+        def run_pipeline(pipeline: Pipeline, background: bool) -> int:
+            name = pipeline.commands[0].words[0].value
+            ran.append(name + ("&" if background else ""))
+            return statuses.get(name, 0)
+
+        return run_list(tree(line), run_pipeline), ran
+
+    def test_sequence_runs_everything(self):
+        """';' runs the next pipeline whatever the status."""
+        assert self.run("a; b; c", {"a": 1, "b": 2}) == (0, ["a", "b", "c"])
+
+    def test_and_stops_on_failure(self):
+        """'&&' skips the next pipeline after a failure."""
+        assert self.run("a && b", {"a": 1}) == (1, ["a"])
+        assert self.run("a && b", {}) == (0, ["a", "b"])
+
+    def test_or_runs_on_failure(self):
+        """'||' runs the next pipeline only after a failure."""
+        assert self.run("a || b", {"a": 1}) == (0, ["a", "b"])
+        assert self.run("a || b", {}) == (0, ["a"])
+
+    def test_skipped_pipeline_keeps_status(self):
+        """false && a || b runs b."""
+        assert self.run("x && a || b", {"x": 1}) == (0, ["x", "b"])
+        assert self.run("x || a && b", {}) == (0, ["x", "b"])
+
+    def test_sequence_resets_skipping(self):
+        """A ';' after a skipped pipeline runs the next one."""
+        assert self.run("x && a; b", {"x": 1}) == (0, ["x", "b"])
+
+    def test_background_flag(self):
+        """Pipelines before '&' are run as background jobs."""
+        assert self.run("a & b", {}) == (0, ["a&", "b"])
+
+    def test_exit_stops_list(self):
+        """-1 (the exit built-in) stops at once."""
+        assert self.run("a; b; c", {"b": -1}) == (-1, ["a", "b"])
+
+    def test_empty_list(self):
+        """Nothing to run gives 0."""
+        assert run_list(CommandList((), ()), lambda p, b: 1) == 0
+
+
+class TestMemory:
+    """Trees are kept small, since the parse cache holds them."""
+
+    def test_bytes_per_line(self):
+        """A short command costs well under 1 KiB."""
+        lines = [f"ls -la dir{i}" for i in range(1000)]
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        trees = [tree(line) for line in lines]
+        after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        assert len(trees) == 1000
+        assert (after - before) / len(trees) < 1024
@@ -0,0 +1,305 @@
+"""
+Tests for the command line tokenizer (tokenizer module).
+
+The tokenizer must agree with shlex.split() on every input, including
+the error raised for unclosed quotes and trailing backslashes, so most
+tests compare the two directly.
+"""
+
+import random
+import shlex
+
+import pytest
+
+from akujobip1.tokenizer import (
+    Parameter,
+    Token,
+    TokenizeError,
+    scan_here_document,
+    split,
+    tokenize,
+)
+
+
+def shlex_outcome(line):
+    """shlex.split(line), or its error message."""
+    try:
+        return shlex.split(line)
+    except ValueError as e:
+        return str(e)
+
+
+def tokenizer_outcome(line):
+    """split(line), or its error message."""
+    try:
+        return split(line)
+    except TokenizeError as e:
+        return str(e)
+
+
+class TestShlexCompatibility:
+    """Test split() gives exactly what shlex.split() gives."""
+
+    @pytest.mark.parametrize(
+        "line",
+        [
+            "",
+            "   ",
+            "ls -la",
+            "  ls \t -la\n",
+            'echo "hello world"',
+            "echo 'single quoted'",
+            'echo "it\'s"',
+            "echo 'say \"hi\"'",
+            'echo a"b c"d',
+            "echo '' \"\"",
+            'echo "a\\"b" "c\\\\d" "e\\f"',
+            "echo a\\ b \\'x\\'",
+            "echo '\\n'",
+            "cat file | sort",
+            "echo *.txt 'lit*' \"?\"",
+            'echo "unclosed',
+            "echo 'unclosed",
+            "echo trailing\\",
+            'echo "ends in escape\\',
+            'echo "escaped quote\\"',
+            "echo \\\\",
+            "a\nb",
+            "naïve ünïcode 'ok'",
+        ],
+    )
+    def test_same_result(self, line):
+        assert tokenizer_outcome(line) == shlex_outcome(line)
+
+    def test_random_lines(self):
+        """Random lines built from every character that matters."""
+        rng = random.Random(42)
+        alphabet = "ab \t\n'\"\\|&*"
+        for _ in range(5000):
+            line = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+            assert tokenizer_outcome(line) == shlex_outcome(line), repr(line)
+
+    def test_error_type(self):
+        """Errors are ValueErrors, like shlex's."""
+        with pytest.raises(ValueError, match="No closing quotation"):
+            split("echo 'oops")
+
+
+class TestTokens:
+    """Test token positions and flags."""
+
+    def test_positions(self):
+        tokens = tokenize("ls  -l  'my dir'")
+        assert [(t.start, t.end) for t in tokens] == [(0, 2), (4, 6), (8, 16)]
+
+    def test_quoted_flag(self):
+        tokens = tokenize("plain 'single' \"double\" esc\\aped mi'x'ed")
+        assert [t.quoted for t in tokens] == [False, True, True, True, True]
+
+    def test_wildcard_flag(self):
+        tokens = tokenize('*.txt \'*.txt\' "a?" \\[x] plain mi"x"*')
+        assert [t.wildcard for t in tokens] == [True, False, False, False, False, True]
+
+    def test_wildcard_flag_fast_path(self):
+        assert [t.wildcard for t in tokenize("ls *.py a")] == [False, True, False]
+        assert not any(t.wildcard for t in tokenize("ls -l /tmp"))
+
+    def test_pattern_escapes_quoted_parts(self):
+        (token,) = tokenize("'[a]'*")
+        assert token.value == "[a]*"
+        assert token.pattern == "[[]a]*"
+
+    def test_pattern_of_unquoted_word_is_value(self):
+        (token,) = tokenize("src/*.py")
+        assert token.pattern == "src/*.py"
+        assert tokenize("plain")[0].pattern is None
+
+    def test_braces_flag(self):
+        tokens = tokenize('a{b,c} "{b,c}" \\{b,c} {x,"y}" {open')
+        assert [t.braces is not None for t in tokens] == [
+            True,
+            False,
+            False,
+            True,
+            False,
+        ]
+        assert tokens[3].braces == [("{x,", False), ("y}", True)]
+        assert tokenize("f{1..3}")[0].braces == [("f{1..3}", False)]
+
+    def test_empty_quotes_are_a_word(self):
+        assert tokenize("''") == [Token("", 0, 2, quoted=True)]
+
+    def test_slots(self):
+        with pytest.raises(AttributeError):
+            Token("a", 0, 1).extra = 1
+
+
+class TestOperators:
+    """Test operators=True."""
+
+    def test_split_off(self):
+        tokens = tokenize("ls|wc -l>out && a||b; c &", operators=True)
+        assert [t.value for t in tokens] == [
+            "ls",
+            "|",
+            "wc",
+            "-l",
+            ">",
+            "out",
+            "&&",
+            "a",
+            "||",
+            "b",
+            ";",
+            "c",
+            "&",
+        ]
+        assert [t.value for t in tokens if t.operator] == [
+            "|",
+            ">",
+            "&&",
+            "||",
+            ";",
+            "&",
+        ]
+
+    def test_quoted_operators_are_words(self):
+        tokens = tokenize("echo '|' \\& \">>\"", operators=True)
+        assert [t.value for t in tokens] == ["echo", "|", "&", ">>"]
+        assert not any(t.operator for t in tokens)
+
+    def test_off_by_default(self):
+        assert split("a|b") == ["a|b"]
+
+    def test_redirection_operators(self):
+        tokens = tokenize("cat<<<x 2>&1 <&3 <<-EOF <<END", operators=True)
+        assert [t.value for t in tokens if t.operator] == [
+            "<<<",
+            ">&",
+            "<&",
+            "<<-",
+            "<<",
+        ]
+        assert [t.value for t in tokens if not t.operator] == [
+            "cat",
+            "x",
+            "2",
+            "1",
+            "3",
+            "EOF",
+            "END",
+        ]
+
+
+class TestHereDocument:
+    """Test scan_here_document()."""
+
+    def test_plain_text(self):
+        assert scan_here_document("a 'b' \"c\"\n") == [("a 'b' \"c\"\n", True)]
+
+    def test_expansions_are_quoted(self):
+        pieces = scan_here_document("hi $USER!\n")
+        assert pieces[0] == ("hi ", True)
+        assert isinstance(pieces[1], Parameter) and pieces[1].quoted
+        assert pieces[2] == ("!\n", True)
+
+    def test_escapes(self):
+        # \$ and \\ lose the backslash, \" keeps it, \newline joins lines
+        assert scan_here_document('\\$A \\\\ \\" a\\\nb') == [('$A \\ \\" ab', True)]
+
+    def test_unclosed_substitution(self):
+        with pytest.raises(TokenizeError, match="No closing parenthesis"):
+            scan_here_document("$(date\n")
+
+
+class TestExpansions:
+    """Test expand=True ($ and ~ recognized, resolved later)."""
+
+    @pytest.mark.parametrize(
+        "line",
+        ["ls -la", "echo 'a b' c\\ d", 'echo "x" *.txt {a,b}', "echo a|b", ""],
+    )
+    def test_same_without_dollar_or_tilde(self, line):
+        assert tokenize(line, expand=True) == tokenize(line)
+        assert all(t.expansions is None for t in tokenize(line, expand=True))
+
+    def test_off_by_default(self):
+        (token,) = tokenize("$HOME")
+        assert token.value == "$HOME"
+        assert token.expansions is None
+
+    def test_parameters(self):
+        tokens = tokenize("echo $A ${B} $? $$ ${#C} $1", expand=True)
+        names = [t.expansions[0].name for t in tokens[1:]]
+        assert names == ["A", "B", "?", "$", "C", "1"]
+        assert tokens[5].expansions[0].length
+
+    def test_operator_word(self):
+        (token,) = tokenize('a${X:-"b c"}d', expand=True)
+        text, parameter, rest = token.expansions
+        assert (text, rest) == (("a", False), ("d", False))
+        assert parameter.operator == ":-"
+        assert parameter.word == [("b c", True)]
+
+    def test_command_substitution(self):
+        tokens = tokenize('echo $(ls "a)" | wc (x)) "$(pwd)"', expand=True)
+        assert len(tokens) == 3
+        (command,) = tokens[1].expansions
+        assert command.text == 'ls "a)" | wc (x)'
+        assert not command.quoted
+        assert tokens[2].expansions[0].quoted
+
+    def test_value_is_source_text(self):
+        (token,) = tokenize('"$A b"', expand=True)
+        assert token.value == '"$A b"'
+        assert token.quoted
+        assert token.expansions[0].quoted
+        assert token.expansions[1] == (" b", True)
+
+    @pytest.mark.parametrize(
+        "line, expected",
+        [
+            ("'$HOME'", "$HOME"),
+            ("\\$HOME", "$HOME"),
+            ('"\\$HOME"', "$HOME"),
+            ('"a\\b"', "a\\b"),
+            ("$", "$"),
+            ("a$%", "a$%"),
+            ('"$"', "$"),
+            ('~"x"', "~x"),
+            ("a~", "a~"),
+        ],
+    )
+    def test_literal(self, line, expected):
+        (token,) = tokenize(line, expand=True)
+        assert token.expansions is None
+        assert token.value == expected
+
+    @pytest.mark.parametrize(
+        "line, user, rest",
+        [("~", "", None), ("~/src", "", "/src"), ("~root/x", "root", "/x")],
+    )
+    def test_tilde(self, line, user, rest):
+        (token,) = tokenize(line, expand=True)
+        assert token.expansions[0].user == user
+        assert token.expansions[1:] == ([] if rest is None else [(rest, False)])
+
+    def test_tilde_before_operator(self):
+        tokens = tokenize("ls ~|wc", expand=True, operators=True)
+        assert tokens[1].expansions[0].user == ""
+
+    @pytest.mark.parametrize(
+        "line, message",
+        [
+            ("${A", "No closing brace"),
+            ("${}", "Bad substitution"),
+            ("${A B}", "Bad substitution"),
+            ("${#A:-x}", "Bad substitution"),
+            ('"$A', "No closing quotation"),
+            ("$(ls", "No closing parenthesis"),
+            ("$((1 + 2))", "Bad substitution"),
+        ],
+    )
+    def test_errors(self, line, message):
+        with pytest.raises(TokenizeError, match=message):
+            tokenize(line, expand=True)
@@ -0,0 +1,149 @@
+"""
+Tests for the zygote spawner (zygote module).
+
+Covers launching through the zygote, status forwarding, environment and
+working-directory propagation, fd passing, and the executor integration.
+"""
+
+import os
+import signal
+
+import pytest
+
+from akujobip1.executor import execute_external_command, resolve_spawn_strategy
+from akujobip1.zygote import ZYGOTE, Zygote, ZygoteError
+
+CONFIG = {"execution": {"show_exit_codes": "never", "spawn_strategy": "zygote"}}
+
+
+@pytest.fixture
+def zygote():
+    """A private zygote, stopped after the test."""
+    instance = Zygote()
+    assert instance.start()
+    yield instance
+    instance.stop()
+
+
+@pytest.fixture
+def shared_zygote():
+    """Stop the shared zygote the executor starts."""
+    yield ZYGOTE
+    ZYGOTE.stop()
+
+
+class TestZygote:
+    """Test the zygote process directly."""
+
+    def test_exit_status_forwarded(self, zygote):
+        pid = zygote.spawn("/bin/sh", ["sh", "-c", "exit 7"])
+        status = zygote.wait(pid)
+        assert os.WIFEXITED(status)
+        assert os.WEXITSTATUS(status) == 7
+
+    def test_signal_status_forwarded(self, zygote):
+        pid = zygote.spawn("/bin/sh", ["sh", "-c", "kill -TERM $$"])
+        status = zygote.wait(pid)
+        assert os.WIFSIGNALED(status)
+        assert os.WTERMSIG(status) == signal.SIGTERM
+
+    def test_children_are_not_ours(self, zygote):
+        pid = zygote.spawn("/bin/true", ["true"])
+        with pytest.raises(ChildProcessError):
+            os.waitpid(pid, 0)
+        zygote.wait(pid)
+
+    def test_statuses_out_of_order(self, zygote):
+        slow = zygote.spawn("/bin/sh", ["sh", "-c", "sleep 0.2; exit 1"])
+        fast = zygote.spawn("/bin/sh", ["sh", "-c", "exit 2"])
+        assert os.WEXITSTATUS(zygote.wait(slow)) == 1
+        assert os.WEXITSTATUS(zygote.wait(fast)) == 2
+
+    def test_env_and_cwd_follow_shell(self, zygote, tmp_path, monkeypatch):
+        monkeypatch.setenv("ZYGOTE_TEST", "value")
+        monkeypatch.chdir(tmp_path)
+        read_fd, write_fd = os.pipe()
+        try:
+            pid = zygote.spawn(
+                "/bin/sh",
+                ["sh", "-c", 'echo "$ZYGOTE_TEST $(pwd)"'],
+                redirections=[(write_fd, 1)],
+            )
+        finally:
+            os.close(write_fd)
+        with os.fdopen(read_fd) as reader:
+            output = reader.read()
+        assert zygote.wait(pid) == 0
+        assert output == f"value {os.path.realpath(tmp_path)}\n"
+
+    def test_redirections_applied_in_order(self, zygote, tmp_path):
+        first = os.open(tmp_path / "first", os.O_WRONLY | os.O_CREAT)
+        second = os.open(tmp_path / "second", os.O_WRONLY | os.O_CREAT)
+        try:
+            # Targets may clash with the numbers the zygote receives fds at
+            pid = zygote.spawn(
+                "/bin/sh",
+                ["sh", "-c", "echo eight >&8; echo seven >&7"],
+                redirections=[(first, 8), (second, 7)],
+            )
+        finally:
+            os.close(first)
+            os.close(second)
+        assert zygote.wait(pid) == 0
+        assert (tmp_path / "first").read_text() == "eight\n"
+        assert (tmp_path / "second").read_text() == "seven\n"
+
+    def test_exec_error_keeps_errno(self, zygote):
+        with pytest.raises(FileNotFoundError):
+            zygote.spawn("/nonexistent/tool", ["tool"])
+
+    def test_stopped_zygote_raises(self):
+        instance = Zygote()
+        with pytest.raises(ZygoteError):
+            instance.spawn("/bin/true", ["true"])
+
+    def test_dead_zygote_raises(self, zygote):
+        os.kill(zygote.pid, signal.SIGKILL)
+        with pytest.raises(ZygoteError):
+            pid = zygote.spawn("/bin/true", ["true"])
+            zygote.wait(pid)
+        assert not zygote.running
+
+
+class TestExecutorIntegration:
+    """Test spawn_strategy 'zygote' in the executor."""
+
+    def test_resolves_and_starts(self, shared_zygote):
+        assert resolve_spawn_strategy(CONFIG) == "zygote"
+        assert shared_zygote.running
+
+    def test_exit_codes(self, shared_zygote):
+        assert execute_external_command(["true"], CONFIG) == 0
+        assert execute_external_command(["sh", "-c", "exit 3"], CONFIG) == 3
+        assert execute_external_command(["sh", "-c", "kill -9 $$"], CONFIG) == 137
+
+    def test_command_not_found(self, shared_zygote, capsys):
+        assert execute_external_command(["no-such-command-xyz"], CONFIG) == 127
+        assert "command not found" in capsys.readouterr().err
+
+    def test_redirected_command_uses_zygote(self, shared_zygote, tmp_path, monkeypatch):
+        def no_start(*args, **kwargs):
+            raise AssertionError("launched without the zygote")
+
+        monkeypatch.setattr("akujobip1.executor.start_command", no_start)
+        resolve_spawn_strategy(CONFIG)
+        fd = os.open(tmp_path / "out", os.O_WRONLY | os.O_CREAT)
+        try:
+            code = execute_external_command(
+                ["sh", "-c", "echo redirected"], CONFIG, redirections=[(fd, 1)]
+            )
+        finally:
+            os.close(fd)
+        assert code == 0
+        assert (tmp_path / "out").read_text() == "redirected\n"
+
+    def test_falls_back_when_zygote_dies(self, shared_zygote, capsys):
+        resolve_spawn_strategy(CONFIG)
+        os.kill(shared_zygote.pid, signal.SIGKILL)
+        assert execute_external_command(["sh", "-c", "exit 4"], CONFIG) == 4
+        assert "using posix_spawn" in capsys.readouterr().err